@@ -364,7 +364,9 @@ class InputSanitizationMiddleware:
         async def new_receive() -> Message:
             nonlocal sent
             if sent:
-                return {"type": "http.disconnect"}
+                # Defer to the server so a disconnect is only reported when the
+                # client actually goes away (streaming responses listen for it).
+                return await receive()
             sent = True
             return {"type": "http.request", "body": new_body, "more_body": False}
 
@@ -0,0 +1,107 @@
+"""Add optional pgvector column + ANN index for RAG chunk embeddings.
+
+Revision ID: 20261016_rag_pgvector
+Revises: 9f4b2a7c6d11
+Create Date: 2026-10-16
+
+Only applies on PostgreSQL where the ``vector`` extension is available;
+everywhere else (SQLite, managed Postgres without pgvector) this is a
+no-op and RAG retrieval keeps using the in-app scorer.
+
+Existing JSON embeddings are backfilled in batches so the migration does
+not hold a single long-running UPDATE over the whole chunk table.
+"""
+
+from __future__ import annotations
+
+import os
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_rag_pgvector"
+down_revision = "9f4b2a7c6d11"
+branch_labels = None
+depends_on = None
+
+_TABLE = "rag_document_chunks"
+_COLUMN = "embedding_vec"
+_INDEX = "ix_rag_chunks_embedding_ann"
+_DIM = 1536
+_BATCH_SIZE = int(os.getenv("RAG_PGVECTOR_BACKFILL_BATCH", "1000"))
+# hnsw (pgvector >= 0.5, better recall/latency) or ivfflat (faster build)
+_INDEX_METHOD = os.getenv("RAG_PGVECTOR_INDEX", "hnsw").strip().lower()
+
+
+def _column_exists(bind) -> bool:
+    inspector = sa.inspect(bind)
+    return any(col.get("name") == _COLUMN for col in inspector.get_columns(_TABLE))
+
+
+def _ensure_extension(bind) -> bool:
+    """Create the ``vector`` extension if possible; return True when present."""
+    installed = bind.execute(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = 'vector'")
+    ).first()
+    if installed:
+        return True
+
+    available = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'vector'")
+    ).first()
+    if not available:
+        return False
+
+    try:
+        with bind.begin_nested():
+            bind.execute(sa.text("CREATE EXTENSION IF NOT EXISTS vector"))
+    except Exception:  # insufficient privilege — leave the in-app path in place
+        return False
+    return True
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    if not _ensure_extension(bind):
+        return
+
+    if not _column_exists(bind):
+        op.execute(f"ALTER TABLE {_TABLE} ADD COLUMN {_COLUMN} vector({_DIM})")
+
+    # Backfill from the JSON column in batches
+    backfill = sa.text(
+        f"UPDATE {_TABLE} SET {_COLUMN} = CAST(CAST(embedding AS text) AS vector) "
+        f"WHERE id IN ("
+        f"  SELECT id FROM {_TABLE} "
+        f"  WHERE {_COLUMN} IS NULL "
+        f"  AND json_typeof(embedding::json) = 'array' "
+        f"  AND json_array_length(embedding::json) = {_DIM} "
+        f"  LIMIT :batch"
+        f")"
+    )
+    while True:
+        result = bind.execute(backfill, {"batch": _BATCH_SIZE})
+        if not result.rowcount:
+            break
+
+    if _INDEX_METHOD == "ivfflat":
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {_INDEX} ON {_TABLE} "
+            f"USING ivfflat ({_COLUMN} vector_cosine_ops) WITH (lists = 100)"
+        )
+    else:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {_INDEX} ON {_TABLE} "
+            f"USING hnsw ({_COLUMN} vector_cosine_ops)"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    op.execute(f"DROP INDEX IF EXISTS {_INDEX}")
+    if _column_exists(bind):
+        op.drop_column(_TABLE, _COLUMN)
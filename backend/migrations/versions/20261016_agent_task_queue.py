@@ -0,0 +1,66 @@
+"""Add background queue columns to agent tasks.
+
+Revision ID: 20261016_agent_task_queue
+Revises: 20261016_chat_thread_summary
+Create Date: 2026-10-16
+
+Columns used by ``backend.src.modules.agents.task_queue`` and
+``backend.src.worker.agent_task_worker``: attempts/backoff
+(``attempts``, ``max_attempts``, ``run_after``), worker leases
+(``locked_by``, ``heartbeat_at``), ``cancel_requested`` and the latest
+``progress`` event.  The ``(status, run_after)`` index serves the claim
+query.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_agent_task_queue"
+down_revision = "20261016_chat_thread_summary"
+branch_labels = None
+depends_on = None
+
+_INDEX_NAME = "ix_tasks_status_run_after"
+
+
+def _columns():
+    return (
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="3"),
+        sa.Column("run_after", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("locked_by", sa.String(64), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "cancel_requested", sa.Boolean(), nullable=False, server_default=sa.false()
+        ),
+        sa.Column("progress", sa.JSON(), nullable=True),
+    )
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "tasks" not in inspector.get_table_names():
+        return
+    existing = {col.get("name") for col in inspector.get_columns("tasks")}
+    for column in _columns():
+        if column.name not in existing:
+            op.add_column("tasks", column)
+    indexes = {ix.get("name") for ix in inspector.get_indexes("tasks")}
+    if _INDEX_NAME not in indexes:
+        op.create_index(_INDEX_NAME, "tasks", ["status", "run_after"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "tasks" not in inspector.get_table_names():
+        return
+    indexes = {ix.get("name") for ix in inspector.get_indexes("tasks")}
+    if _INDEX_NAME in indexes:
+        op.drop_index(_INDEX_NAME, table_name="tasks")
+    existing = {col.get("name") for col in inspector.get_columns("tasks")}
+    with op.batch_alter_table("tasks") as batch:
+        for column in reversed(_columns()):
+            if column.name in existing:
+                batch.drop_column(column.name)
@@ -0,0 +1,55 @@
+"""Store per-event token counts for incremental chat context building.
+
+Revision ID: 20261016_chat_event_token_count
+Revises: 20261016_rag_lexical_index
+Create Date: 2026-10-16
+
+Adds ``app_chat_events.token_count`` (filled at write time; existing rows
+stay NULL and are counted on first use) and a ``(thread_id, created_at)``
+index for the context builder's "events since cursor" query.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_chat_event_token_count"
+down_revision = "20261016_rag_lexical_index"
+branch_labels = None
+depends_on = None
+
+_INDEX_NAME = "ix_app_chat_events_thread_created"
+
+
+def _column_exists(inspector: sa.Inspector, table_name: str, column_name: str) -> bool:
+    return any(
+        col.get("name") == column_name for col in inspector.get_columns(table_name)
+    )
+
+
+def _index_exists(inspector: sa.Inspector, table_name: str, index_name: str) -> bool:
+    return any(ix.get("name") == index_name for ix in inspector.get_indexes(table_name))
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "app_chat_events" not in inspector.get_table_names():
+        return
+    if not _column_exists(inspector, "app_chat_events", "token_count"):
+        op.add_column(
+            "app_chat_events", sa.Column("token_count", sa.Integer(), nullable=True)
+        )
+    if not _index_exists(inspector, "app_chat_events", _INDEX_NAME):
+        op.create_index(_INDEX_NAME, "app_chat_events", ["thread_id", "created_at"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "app_chat_events" not in inspector.get_table_names():
+        return
+    if _index_exists(inspector, "app_chat_events", _INDEX_NAME):
+        op.drop_index(_INDEX_NAME, table_name="app_chat_events")
+    if _column_exists(inspector, "app_chat_events", "token_count"):
+        with op.batch_alter_table("app_chat_events") as batch:
+            batch.drop_column("token_count")
@@ -0,0 +1,50 @@
+"""Add rolling conversation summary columns to chat threads.
+
+Revision ID: 20261016_chat_thread_summary
+Revises: 20261016_chat_event_token_count
+Create Date: 2026-10-16
+
+``app_chat_threads.summary`` holds the abstractive summary written by
+``backend.src.modules.chat.summary``; ``summary_through`` is the
+``created_at`` of the last event it covers.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_chat_thread_summary"
+down_revision = "20261016_chat_event_token_count"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    ("summary", sa.Text()),
+    ("summary_through", sa.DateTime(timezone=True)),
+)
+
+
+def _column_names(inspector: sa.Inspector) -> set:
+    return {col.get("name") for col in inspector.get_columns("app_chat_threads")}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "app_chat_threads" not in inspector.get_table_names():
+        return
+    existing = _column_names(inspector)
+    for name, type_ in _COLUMNS:
+        if name not in existing:
+            op.add_column("app_chat_threads", sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "app_chat_threads" not in inspector.get_table_names():
+        return
+    existing = _column_names(inspector)
+    with op.batch_alter_table("app_chat_threads") as batch:
+        for name, _type in reversed(_COLUMNS):
+            if name in existing:
+                batch.drop_column(name)
@@ -0,0 +1,144 @@
+"""Store RAG chunk embeddings as compact binary instead of JSON arrays.
+
+Revision ID: 20261016_rag_embedding_bin
+Revises: 20261016_rag_pgvector
+Create Date: 2026-10-16
+
+Adds ``rag_document_chunks.embedding_bin`` and converts existing JSON
+embeddings in batches (``RAG_EMBEDDING_MIGRATION_BATCH`` rows at a time)
+using the encoding from ``RAG_EMBEDDING_ENCODING`` (format matches
+``backend.src.modules.rag.embedding_codec``).  Converted rows have
+their JSON ``embedding`` cleared to reclaim space, so that column becomes
+nullable.  Downgrade decodes the binary column back into JSON.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_rag_embedding_bin"
+down_revision = "20261016_rag_pgvector"
+branch_labels = None
+depends_on = None
+
+_TABLE = "rag_document_chunks"
+_BATCH_SIZE = int(os.getenv("RAG_EMBEDDING_MIGRATION_BATCH", "500"))
+
+# Frozen copy of the ``rag.embedding_codec`` wire format (tag byte + LE payload)
+_TAGS = {"float32": (0x01, "f"), "float16": (0x02, "e"), "int8": (0x03, "b")}
+_CODES = {tag: code for tag, code in _TAGS.values()}
+
+
+def _encoding() -> str:
+    value = os.getenv("RAG_EMBEDDING_ENCODING", "float32").strip().lower()
+    return value if value in _TAGS else "float32"
+
+
+def _encode(vec: list, encoding: str) -> bytes:
+    tag, code = _TAGS[encoding]
+    if encoding == "int8":
+        peak = max((abs(float(x)) for x in vec), default=0.0)
+        scale = peak / 127.0 if peak > 0 else 1.0
+        quantized = [max(-127, min(127, round(float(x) / scale))) for x in vec]
+        return bytes([tag]) + struct.pack("<f", scale) + struct.pack(f"<{len(vec)}b", *quantized)
+    return bytes([tag]) + struct.pack(f"<{len(vec)}{code}", *(float(x) for x in vec))
+
+
+def _decode(blob: bytes) -> list:
+    tag, payload, scale = blob[0], blob[1:], 1.0
+    if tag == 0x03:
+        (scale,) = struct.unpack_from("<f", payload)
+        payload = payload[4:]
+    code = _CODES[tag]
+    values = struct.unpack(f"<{len(payload) // struct.calcsize(code)}{code}", payload)
+    return [v * scale for v in values] if tag == 0x03 else list(values)
+
+
+def _column_exists(column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return any(col.get("name") == column_name for col in inspector.get_columns(_TABLE))
+
+
+def _load_json(value):
+    if isinstance(value, (bytes, str)):
+        return json.loads(value)
+    return value
+
+
+def upgrade() -> None:
+    if not _column_exists("embedding_bin"):
+        op.add_column(_TABLE, sa.Column("embedding_bin", sa.LargeBinary(), nullable=True))
+    with op.batch_alter_table(_TABLE) as batch:
+        batch.alter_column("embedding", existing_type=sa.JSON(), nullable=True)
+
+    bind = op.get_bind()
+    encoding = _encoding()
+    select_batch = sa.text(
+        f"SELECT id, embedding FROM {_TABLE} "
+        "WHERE embedding_bin IS NULL AND embedding IS NOT NULL "
+        "LIMIT :batch"
+    )
+    update = sa.text(
+        f"UPDATE {_TABLE} SET embedding_bin = :blob, embedding = NULL WHERE id = :id"
+    )
+    skip = sa.text(f"UPDATE {_TABLE} SET embedding = NULL WHERE id = :id")
+
+    while True:
+        rows = bind.execute(select_batch, {"batch": _BATCH_SIZE}).all()
+        if not rows:
+            break
+        converted, malformed = [], []
+        for chunk_id, raw in rows:
+            vec = _load_json(raw)
+            if isinstance(vec, list) and vec:
+                converted.append(
+                    {"id": chunk_id, "blob": _encode(vec, encoding)}
+                )
+            else:
+                malformed.append({"id": chunk_id})
+        if converted:
+            bind.execute(update, converted)
+        if malformed:
+            # Never retrievable before either; clear so the loop terminates.
+            bind.execute(skip, malformed)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    select_batch = sa.text(
+        f"SELECT id, embedding_bin FROM {_TABLE} "
+        "WHERE embedding IS NULL AND embedding_bin IS NOT NULL "
+        "LIMIT :batch"
+    )
+    update = sa.text(
+        f"UPDATE {_TABLE} SET embedding = :vec, embedding_bin = NULL WHERE id = :id"
+    ).bindparams(sa.bindparam("vec", type_=sa.JSON()))
+
+    while True:
+        rows = bind.execute(select_batch, {"batch": _BATCH_SIZE}).all()
+        if not rows:
+            break
+        bind.execute(
+            update,
+            [
+                {"id": chunk_id, "vec": _decode(bytes(blob))}
+                for chunk_id, blob in rows
+            ],
+        )
+
+    bind.execute(
+        sa.text(f"UPDATE {_TABLE} SET embedding = :empty WHERE embedding IS NULL").bindparams(
+            sa.bindparam("empty", type_=sa.JSON())
+        ),
+        {"empty": []},
+    )
+    with op.batch_alter_table(_TABLE) as batch:
+        batch.alter_column("embedding", existing_type=sa.JSON(), nullable=False)
+    if _column_exists("embedding_bin"):
+        op.drop_column(_TABLE, "embedding_bin")
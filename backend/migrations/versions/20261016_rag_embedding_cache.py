@@ -0,0 +1,43 @@
+"""Add content-addressed RAG embedding cache table.
+
+Revision ID: 20261016_rag_embedding_cache
+Revises: 20261016_rag_ingestion_stats
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_rag_embedding_cache"
+down_revision = "20261016_rag_ingestion_stats"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(inspector: sa.Inspector, table_name: str) -> bool:
+    return table_name in inspector.get_table_names()
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not _table_exists(inspector, "rag_embedding_cache"):
+        op.create_table(
+            "rag_embedding_cache",
+            sa.Column("content_hash", sa.String(64), primary_key=True),
+            sa.Column("model", sa.String(128), nullable=False),
+            sa.Column("embedding_bin", sa.LargeBinary(), nullable=False),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                nullable=False,
+                server_default=sa.func.now(),
+            ),
+        )
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if _table_exists(inspector, "rag_embedding_cache"):
+        op.drop_table("rag_embedding_cache")
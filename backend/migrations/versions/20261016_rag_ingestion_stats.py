@@ -0,0 +1,37 @@
+"""Add ingestion_stats to RAG approved documents.
+
+Revision ID: 20261016_rag_ingestion_stats
+Revises: 20261016_rag_embedding_bin
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_rag_ingestion_stats"
+down_revision = "20261016_rag_embedding_bin"
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return any(
+        col.get("name") == column_name for col in inspector.get_columns(table_name)
+    )
+
+
+def upgrade() -> None:
+    if not _column_exists("rag_approved_documents", "ingestion_stats"):
+        op.add_column(
+            "rag_approved_documents",
+            sa.Column("ingestion_stats", sa.JSON(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    if _column_exists("rag_approved_documents", "ingestion_stats"):
+        op.drop_column("rag_approved_documents", "ingestion_stats")
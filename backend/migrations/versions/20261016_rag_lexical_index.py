@@ -0,0 +1,109 @@
+"""Add RAG inverted index (chunk postings + term counts) for BM25 retrieval.
+
+Revision ID: 20261016_rag_lexical_index
+Revises: 20261016_rag_embedding_cache
+Create Date: 2026-10-16
+
+Creates ``rag_chunk_postings`` and ``rag_document_chunks.term_count`` and
+backfills both from existing chunk text in batches
+(``RAG_LEXICAL_MIGRATION_BATCH`` chunks at a time).  Tokenisation matches
+``backend.src.modules.rag.lexical_index.tokenise``.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections import Counter
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20261016_rag_lexical_index"
+down_revision = "20261016_rag_embedding_cache"
+branch_labels = None
+depends_on = None
+
+_BATCH_SIZE = int(os.getenv("RAG_LEXICAL_MIGRATION_BATCH", "500"))
+
+# Frozen copy of ``lexical_index.tokenise``
+_WORD_RE = re.compile(r"[a-zA-Z0-9]+")
+
+
+def _tokenise(text: str) -> list:
+    return [t[:64] for t in _WORD_RE.findall((text or "").lower())]
+
+
+def _table_exists(inspector: sa.Inspector, table_name: str) -> bool:
+    return table_name in inspector.get_table_names()
+
+
+def _column_exists(inspector: sa.Inspector, table_name: str, column_name: str) -> bool:
+    return any(
+        col.get("name") == column_name for col in inspector.get_columns(table_name)
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not _column_exists(inspector, "rag_document_chunks", "term_count"):
+        op.add_column(
+            "rag_document_chunks",
+            sa.Column("term_count", sa.Integer(), nullable=False, server_default="0"),
+        )
+    if not _table_exists(inspector, "rag_chunk_postings"):
+        op.create_table(
+            "rag_chunk_postings",
+            sa.Column(
+                "chunk_id",
+                sa.String(36),
+                sa.ForeignKey("rag_document_chunks.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("term", sa.String(64), primary_key=True),
+            sa.Column("tf", sa.Integer(), nullable=False),
+        )
+        op.create_index(
+            "ix_rag_postings_term", "rag_chunk_postings", ["term", "chunk_id"]
+        )
+
+    # Backfill: keyset pagination over chunks not yet indexed
+    select_batch = sa.text(
+        "SELECT id, chunk_text FROM rag_document_chunks "
+        "WHERE term_count = 0 AND id > :after ORDER BY id LIMIT :batch"
+    )
+    set_count = sa.text(
+        "UPDATE rag_document_chunks SET term_count = :n WHERE id = :id"
+    )
+    insert_posting = sa.text(
+        "INSERT INTO rag_chunk_postings (chunk_id, term, tf) VALUES (:chunk_id, :term, :tf)"
+    )
+    after = ""
+    while True:
+        rows = bind.execute(select_batch, {"after": after, "batch": _BATCH_SIZE}).all()
+        if not rows:
+            break
+        counts, postings = [], []
+        for chunk_id, text in rows:
+            tokens = _tokenise(text)
+            counts.append({"id": chunk_id, "n": len(tokens)})
+            postings.extend(
+                {"chunk_id": chunk_id, "term": term, "tf": tf}
+                for term, tf in Counter(tokens).items()
+            )
+        bind.execute(set_count, counts)
+        if postings:
+            bind.execute(insert_posting, postings)
+        after = rows[-1][0]
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if _table_exists(inspector, "rag_chunk_postings"):
+        op.drop_index("ix_rag_postings_term", table_name="rag_chunk_postings")
+        op.drop_table("rag_chunk_postings")
+    if _column_exists(inspector, "rag_document_chunks", "term_count"):
+        with op.batch_alter_table("rag_document_chunks") as batch:
+            batch.drop_column("term_count")
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import re
@@ -773,8 +774,32 @@ def create_app() -> FastAPI:
 
     @application.get("/api/metrics", include_in_schema=False)
     def api_metrics():
-        """Return request metrics snapshot (latency, error rates, status codes)."""
-        return JSONResponse(metrics_store.snapshot())
+        """Return request metrics snapshot (latency, error rates, status codes, caches)."""
+        from backend.src.core.async_bridge import async_bridge
+        from backend.src.modules.ai_router.clients import provider_clients
+        from backend.src.modules.ai_router.health import provider_health
+        from backend.src.modules.ai_router.hedging import hedge_policy
+        from backend.src.modules.chat.broadcast import chat_bus
+        from backend.src.modules.chat.context import context_windows
+        from backend.src.modules.chat.summary import thread_summariser
+        from backend.src.modules.rag.matrix_cache import matrix_cache
+        from backend.src.modules.usage.llm_cache import llm_cache
+        from backend.src.modules.usage.semantic_cache import semantic_cache
+
+        snapshot = metrics_store.snapshot()
+        snapshot["caches"] = {
+            "llm": llm_cache.stats,
+            "semantic": semantic_cache.stats,
+            "rag_matrix": matrix_cache.stats,
+        }
+        snapshot["provider_clients"] = provider_clients.stats
+        snapshot["provider_health"] = provider_health.stats
+        snapshot["hedging"] = hedge_policy.stats
+        snapshot["chat_broadcast"] = chat_bus.stats
+        snapshot["chat_context"] = context_windows.stats
+        snapshot["chat_summaries"] = thread_summariser.stats
+        snapshot["async_bridge"] = async_bridge.stats
+        return JSONResponse(snapshot)
 
     @application.get("/api/version", include_in_schema=False)
     def api_version():
@@ -934,6 +959,54 @@ def create_app() -> FastAPI:
     def _record_build_metadata() -> None:
         record_build_if_new()
 
+    # ----------------------------- LLM cache expiry -----------------------
+    @application.on_event("startup")
+    def _start_llm_cache_sweeper() -> None:
+        from backend.src.modules.usage.llm_cache import llm_cache
+
+        llm_cache.start_sweeper()
+
+    @application.on_event("shutdown")
+    def _stop_llm_cache_sweeper() -> None:
+        from backend.src.modules.usage.llm_cache import llm_cache
+
+        llm_cache.stop_sweeper()
+
+    # ----------------------------- Chat summaries -------------------------
+    # Registered before the provider clients so runs stop before they close.
+    @application.on_event("shutdown")
+    async def _stop_thread_summariser() -> None:
+        from backend.src.modules.chat.summary import thread_summariser
+
+        await thread_summariser.aclose()
+
+    # ----------------------------- Provider clients -----------------------
+    @application.on_event("shutdown")
+    async def _close_provider_clients() -> None:
+        from backend.src.modules.ai_router.clients import provider_clients
+
+        await provider_clients.aclose()
+
+    # ----------------------------- Sync-to-async bridge -------------------
+    @application.on_event("shutdown")
+    async def _close_async_bridge() -> None:
+        from backend.src.core.async_bridge import async_bridge
+
+        await asyncio.to_thread(async_bridge.close)
+
+    # ----------------------------- Chat broadcast bus ---------------------
+    @application.on_event("startup")
+    async def _start_chat_bus() -> None:
+        from backend.src.modules.chat.broadcast import chat_bus
+
+        await chat_bus.start()
+
+    @application.on_event("shutdown")
+    async def _stop_chat_bus() -> None:
+        from backend.src.modules.chat.broadcast import chat_bus
+
+        await chat_bus.stop()
+
     # ----------------------------- Billing scheduler ----------------------
     @application.on_event("startup")
     def _start_billing_scheduler() -> None:
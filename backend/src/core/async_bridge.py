@@ -0,0 +1,124 @@
+"""Run coroutines from synchronous code on one long-lived event loop.
+
+Sync code paths (ChatKit tool handlers, the flow run engine) sometimes
+need an async service such as ``RAGService.query``.  Calling
+``asyncio.run`` there fails on an event-loop thread, and the usual
+workaround — a fresh ``ThreadPoolExecutor`` running ``asyncio.run`` —
+builds and tears down a thread and an event loop per call, and throws
+away the loop-bound provider connection pools with it.
+
+``async_bridge`` starts one daemon thread with a persistent loop on first
+use.  ``run_sync(coro)`` submits the coroutine there and blocks the
+calling thread until it finishes, so concurrent callers share the loop
+(and its pooled clients) instead of each paying for a new one.  It must
+not be called from the bridge loop itself; coroutines already on that
+loop should ``await`` directly.  Because every caller shares this one
+loop, coroutines run on it must not block: synchronous DB or CPU-heavy
+work belongs in ``asyncio.to_thread`` (as ``RAGService.query`` does).
+
+Usage::
+
+    from backend.src.core.async_bridge import run_sync
+
+    result = run_sync(service.query(db, user, request))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+log = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class AsyncBridge:
+    """A background event loop on a daemon thread, started lazily."""
+
+    def __init__(self, name: str = "async-bridge") -> None:
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"calls": 0, "errors": 0, "starts": 0}
+        self._inflight = 0
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _serve() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=_serve, name=self.name, daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop, self._thread = loop, thread
+            self._counters["starts"] += 1
+            return loop
+
+    def run(self, coro: Awaitable[_T], *, timeout: Optional[float] = None) -> _T:
+        """Run ``coro`` on the bridge loop and return its result."""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            if asyncio.iscoroutine(coro):
+                coro.close()
+            raise RuntimeError("run_sync() called from the bridge loop; await instead")
+        future = asyncio.run_coroutine_threadsafe(coro, loop)  # type: ignore[arg-type]
+        self._counters["calls"] += 1
+        self._inflight += 1
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            self._counters["errors"] += 1
+            raise
+        finally:
+            self._inflight -= 1
+
+    def close(self) -> None:
+        """Stop the loop (application shutdown); the next call restarts it."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+
+        async def _shutdown() -> None:
+            from backend.src.modules.ai_router.clients import provider_clients
+
+            # Connection pools opened on this loop must close on it.
+            await provider_clients.aclose()
+            await loop.shutdown_default_executor()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(10)
+        except Exception:  # noqa: BLE001
+            log.warning("Async bridge shutdown did not finish cleanly", exc_info=True)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        if not thread.is_alive():
+            loop.close()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Bridge counters for monitoring."""
+        running = self._thread is not None and self._thread.is_alive()
+        return {"running": running, "inflight": self._inflight, **self._counters}
+
+
+# Module-level singleton
+async_bridge = AsyncBridge()
+
+
+def run_sync(coro: Awaitable[_T], *, timeout: Optional[float] = None) -> _T:
+    """Block until ``coro`` finishes on the shared bridge loop."""
+    return async_bridge.run(coro, timeout=timeout)
@@ -365,6 +365,10 @@ class ChatThread(Base):
     placement = Column(String(64), nullable=False)
     title = Column(String(200), nullable=True)
     context = Column(JSON, nullable=True)
+    # Rolling abstractive summary of turns older than the prompt window,
+    # covering events up to and including ``summary_through``.
+    summary = Column(Text, nullable=True)
+    summary_through = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
@@ -385,6 +389,9 @@ class ChatEvent(Base):
     """Individual ChatKit messages or tool invocations stored per thread."""
 
     __tablename__ = "app_chat_events"
+    __table_args__ = (
+        Index("ix_app_chat_events_thread_created", "thread_id", "created_at"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     thread_id = Column(
@@ -397,6 +404,8 @@ class ChatEvent(Base):
     content = Column(Text, nullable=False)
     tool_name = Column(String(64), nullable=True)
     event_metadata = Column(JSON, nullable=True)
+    # Prompt tokens for ``content``, computed once at write time.
+    token_count = Column(Integer, nullable=True)
     created_at = Column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
@@ -571,6 +580,16 @@ class Task(Base):
     )
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    # Background queue bookkeeping (``modules.agents.task_queue``)
+    attempts = Column(Integer, nullable=False, server_default="0", default=0)
+    max_attempts = Column(Integer, nullable=False, server_default="3", default=3)
+    run_after = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String(64), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, server_default="0", default=False)
+    progress = Column(JSON, nullable=True)
+
+    __table_args__ = (Index("ix_tasks_status_run_after", "status", "run_after"),)
 
     user = relationship("User")
     agent = relationship("Agent")
@@ -1478,6 +1497,8 @@ class BillingEvent(Base):
 # ---------------------------------------------------------------------------
 from backend.src.modules.rag.models import (  # noqa: E402, F401
     ApprovedDocument,
+    ChunkPosting,
     DocumentChunk,
+    EmbeddingCacheEntry,
     RAGQueryLog,
 )
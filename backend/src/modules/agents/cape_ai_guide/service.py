@@ -9,11 +9,12 @@ import json
 import time
 from typing import Any, Dict, List, Optional
 
-from anthropic import AnthropicError, AsyncAnthropic
-from openai import AsyncOpenAI, OpenAIError
+from anthropic import AnthropicError
+from openai import OpenAIError
 from sqlalchemy.orm import Session
 
 from backend.src.db import models
+from backend.src.modules.ai_router.clients import provider_clients
 from backend.src.modules.usage.track import try_record_usage
 from backend.src.modules.agents.tool_use import (
     ToolUseContext,
@@ -42,10 +43,10 @@ class CapeAIGuideService:
     ):
         """Initialize the CapeAI Guide service."""
         self.openai_client = (
-            AsyncOpenAI(api_key=openai_api_key) if openai_api_key else None
+            provider_clients.openai(openai_api_key) if openai_api_key else None
         )
         self.anthropic_client = (
-            AsyncAnthropic(api_key=anthropic_api_key) if anthropic_api_key else None
+            provider_clients.anthropic(anthropic_api_key) if anthropic_api_key else None
         )
         self.model = model
         self.knowledge_base = KnowledgeBase()
@@ -9,14 +9,16 @@ import time
 import logging
 from typing import Any, Dict, List, Optional
 
-from anthropic import AsyncAnthropic
-from openai import AsyncOpenAI
 from sqlalchemy.orm import Session
 
 from backend.src.db import models
-from backend.src.modules.usage.track import try_record_usage
+from backend.src.modules.ai_router.clients import provider_clients
+from backend.src.modules.ai_router.health import provider_health
+from backend.src.modules.ai_router.hedging import Discarded, hedged_call
+from backend.src.modules.usage.token_counter import count_tokens
+from backend.src.modules.usage.track import try_record_discarded_usage, try_record_usage
 from backend.src.modules.usage.input_guard import validate_llm_input
-from backend.src.modules.usage.llm_cache import llm_cache
+from backend.src.modules.usage.llm_cache import llm_cache, provider_answered
 
 from .schemas import (
     CustomerAgentTaskInput,
@@ -80,10 +82,10 @@ class CustomerAgentService:
     ):
         """Initialize the Customer Agent service."""
         self.openai_client = (
-            AsyncOpenAI(api_key=openai_api_key) if openai_api_key else None
+            provider_clients.openai(openai_api_key) if openai_api_key else None
         )
         self.anthropic_client = (
-            AsyncAnthropic(api_key=anthropic_api_key) if anthropic_api_key else None
+            provider_clients.anthropic(anthropic_api_key) if anthropic_api_key else None
         )
         self.model = model
         self.knowledge_base = CustomerKnowledgeBase()
@@ -132,8 +134,10 @@ class CustomerAgentService:
                 templates=template_text,
             )
 
+            hedge_losers: List[Discarded] = []
             ai_response, usage_meta = await self._call_llm(
-                validate_llm_input(user_prompt, label="customer query")
+                validate_llm_input(user_prompt, label="customer query"),
+                discarded=hedge_losers,
             )
 
             # Record LLM usage for cost tracking
@@ -146,6 +150,12 @@ class CustomerAgentService:
                     tokens_in=usage_meta.get("tokens_in", 0),
                     tokens_out=usage_meta.get("tokens_out", 0),
                 )
+            try_record_discarded_usage(
+                db,
+                user_id=user.id if user else None,
+                event_type="agent:customer",
+                discarded=hedge_losers,
+            )
 
             # Build workflow suggestions from templates
             suggestions = [
@@ -199,57 +209,46 @@ class CustomerAgentService:
                 processing_time_ms=processing_time,
             )
 
-    async def _call_llm(self, user_prompt: str) -> tuple[str, dict]:
+    async def _call_llm(
+        self, user_prompt: str, discarded: Optional[List[Discarded]] = None
+    ) -> tuple[str, dict]:
         """Call the LLM provider (Anthropic preferred, OpenAI fallback).
 
         Returns (text, usage_meta) where usage_meta contains model/tokens
         for cost tracking.  usage_meta is empty on failure.
+
+        Identical concurrent calls share one provider request and
+        successful results are cached (``llm_cache.get_or_compute``).
+        Provider calls that lost a hedge race are appended to ``discarded``.
         """
         cache_key = llm_cache.make_key(self.model, SYSTEM_PROMPT, user_prompt)
-        cached = llm_cache.get(cache_key)
-        if cached is not None:
-            return cached
+        return await llm_cache.get_or_compute(
+            cache_key,
+            lambda: self._call_providers(user_prompt, discarded),
+            should_cache=provider_answered,
+        )
 
+    async def _call_providers(
+        self, user_prompt: str, discarded: Optional[List[Discarded]] = None
+    ) -> tuple[str, dict]:
+        """Try Anthropic and OpenAI in health order (hedged); canned text if both fail."""
+        calls = {}
         if self.anthropic_client and "claude" in self.model:
-            try:
-                response = await self.anthropic_client.messages.create(
-                    model=self.model,
-                    max_tokens=1024,
-                    temperature=0.3,
-                    system=[{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
-                    messages=[{"role": "user", "content": user_prompt}],
-                )
-                result = (response.content[0].text, {
-                    "model": response.model,
-                    "tokens_in": response.usage.input_tokens,
-                    "tokens_out": response.usage.output_tokens,
-                })
-                llm_cache.put(cache_key, result)
-                return result
-            except Exception as e:
-                log.warning("Anthropic call failed, trying OpenAI fallback: %s", e)
-
+            calls["anthropic"] = self._request_anthropic
         if self.openai_client:
-            try:
-                response = await self.openai_client.chat.completions.create(
-                    model="gpt-4o-mini" if "claude" in self.model else self.model,
-                    max_tokens=1024,
-                    temperature=0.3,
-                    messages=[
-                        {"role": "system", "content": SYSTEM_PROMPT},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                )
-                usage = getattr(response, "usage", None)
-                result = (response.choices[0].message.content or "", {
-                    "model": response.model,
-                    "tokens_in": getattr(usage, "prompt_tokens", 0),
-                    "tokens_out": getattr(usage, "completion_tokens", 0),
-                })
-                llm_cache.put(cache_key, result)
-                return result
-            except Exception as e:
-                log.error("OpenAI call also failed: %s", e)
+            calls["openai"] = self._request_openai
+
+        outcome = await hedged_call(
+            provider_health.rank(list(calls)),
+            lambda provider: calls[provider](user_prompt),
+            placement="agent:customer",
+            model_of=self._provider_model,
+            estimate_prompt=lambda: count_tokens(SYSTEM_PROMPT + user_prompt),
+        )
+        if discarded is not None:
+            discarded.extend(outcome.discarded)
+        if outcome.ok:
+            return outcome.value
 
         return (
             "I understand you're looking for help with your business automation needs. "
@@ -258,6 +257,45 @@ class CustomerAgentService:
             "feel free to reach out to support@capecontrol.ai."
         ), {}
 
+    def _provider_model(self, provider: str) -> str:
+        if provider == "openai":
+            return "gpt-4o-mini" if "claude" in self.model else self.model
+        return self.model
+
+    async def _request_anthropic(self, user_prompt: str) -> tuple[str, dict]:
+        with provider_health.track("anthropic", self.model):
+            response = await self.anthropic_client.messages.create(
+                model=self.model,
+                max_tokens=1024,
+                temperature=0.3,
+                system=[{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
+                messages=[{"role": "user", "content": user_prompt}],
+            )
+        return (response.content[0].text, {
+            "model": response.model,
+            "tokens_in": response.usage.input_tokens,
+            "tokens_out": response.usage.output_tokens,
+        })
+
+    async def _request_openai(self, user_prompt: str) -> tuple[str, dict]:
+        openai_model = self._provider_model("openai")
+        with provider_health.track("openai", openai_model):
+            response = await self.openai_client.chat.completions.create(
+                model=openai_model,
+                max_tokens=1024,
+                temperature=0.3,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ],
+            )
+        usage = getattr(response, "usage", None)
+        return (response.choices[0].message.content or "", {
+            "model": response.model,
+            "tokens_in": getattr(usage, "prompt_tokens", 0),
+            "tokens_out": getattr(usage, "completion_tokens", 0),
+        })
+
     def _extract_next_steps(
         self, response: str, templates: list
     ) -> List[str]:
@@ -9,14 +9,16 @@ import time
 import logging
 from typing import List, Optional
 
-from anthropic import AsyncAnthropic
-from openai import AsyncOpenAI
 from sqlalchemy.orm import Session
 
 from backend.src.db import models
-from backend.src.modules.usage.track import try_record_usage
+from backend.src.modules.ai_router.clients import provider_clients
+from backend.src.modules.ai_router.health import provider_health
+from backend.src.modules.ai_router.hedging import Discarded, hedged_call
+from backend.src.modules.usage.token_counter import count_tokens
+from backend.src.modules.usage.track import try_record_discarded_usage, try_record_usage
 from backend.src.modules.usage.input_guard import validate_llm_input
-from backend.src.modules.usage.llm_cache import llm_cache
+from backend.src.modules.usage.llm_cache import llm_cache, provider_answered
 
 from .schemas import DevAgentTaskInput, DevAgentTaskOutput, CodeSuggestion
 from .knowledge_base import DevKnowledgeBase
@@ -74,10 +76,10 @@ class DevAgentService:
         model: str = "claude-3-5-haiku-20241022",
     ):
         self.openai_client = (
-            AsyncOpenAI(api_key=openai_api_key) if openai_api_key else None
+            provider_clients.openai(openai_api_key) if openai_api_key else None
         )
         self.anthropic_client = (
-            AsyncAnthropic(api_key=anthropic_api_key) if anthropic_api_key else None
+            provider_clients.anthropic(anthropic_api_key) if anthropic_api_key else None
         )
         self.model = model
         self.knowledge_base = DevKnowledgeBase()
@@ -118,8 +120,10 @@ class DevAgentService:
             )
 
             # Generate AI response
+            hedge_losers: List[Discarded] = []
             ai_response, usage_meta = await self._call_llm(
-                validate_llm_input(user_prompt, label="dev query")
+                validate_llm_input(user_prompt, label="dev query"),
+                discarded=hedge_losers,
             )
 
             # Record LLM usage for cost tracking
@@ -132,6 +136,12 @@ class DevAgentService:
                     tokens_in=usage_meta.get("tokens_in", 0),
                     tokens_out=usage_meta.get("tokens_out", 0),
                 )
+            try_record_discarded_usage(
+                db,
+                user_id=user.id if user else None,
+                event_type="agent:dev",
+                discarded=hedge_losers,
+            )
 
             # Build code suggestions from matching docs
             code_suggestions = [
@@ -188,56 +198,45 @@ class DevAgentService:
                 processing_time_ms=processing_time,
             )
 
-    async def _call_llm(self, user_prompt: str) -> tuple[str, dict]:
+    async def _call_llm(
+        self, user_prompt: str, discarded: Optional[List[Discarded]] = None
+    ) -> tuple[str, dict]:
         """Call the LLM provider.
 
         Returns (text, usage_meta) for cost tracking.
+
+        Identical concurrent calls share one provider request and
+        successful results are cached (``llm_cache.get_or_compute``).
+        Provider calls that lost a hedge race are appended to ``discarded``.
         """
         cache_key = llm_cache.make_key(self.model, SYSTEM_PROMPT, user_prompt)
-        cached = llm_cache.get(cache_key)
-        if cached is not None:
-            return cached
+        return await llm_cache.get_or_compute(
+            cache_key,
+            lambda: self._call_providers(user_prompt, discarded),
+            should_cache=provider_answered,
+        )
 
+    async def _call_providers(
+        self, user_prompt: str, discarded: Optional[List[Discarded]] = None
+    ) -> tuple[str, dict]:
+        """Try Anthropic and OpenAI in health order (hedged); canned text if both fail."""
+        calls = {}
         if self.anthropic_client and "claude" in self.model:
-            try:
-                response = await self.anthropic_client.messages.create(
-                    model=self.model,
-                    max_tokens=2048,
-                    temperature=0.2,
-                    system=[{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
-                    messages=[{"role": "user", "content": user_prompt}],
-                )
-                result = (response.content[0].text, {
-                    "model": response.model,
-                    "tokens_in": response.usage.input_tokens,
-                    "tokens_out": response.usage.output_tokens,
-                })
-                llm_cache.put(cache_key, result)
-                return result
-            except Exception as e:
-                log.warning("Anthropic call failed: %s", e)
-
+            calls["anthropic"] = self._request_anthropic
         if self.openai_client:
-            try:
-                response = await self.openai_client.chat.completions.create(
-                    model="gpt-4o-mini" if "claude" in self.model else self.model,
-                    max_tokens=2048,
-                    temperature=0.2,
-                    messages=[
-                        {"role": "system", "content": SYSTEM_PROMPT},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                )
-                usage = getattr(response, "usage", None)
-                result = (response.choices[0].message.content or "", {
-                    "model": response.model,
-                    "tokens_in": getattr(usage, "prompt_tokens", 0),
-                    "tokens_out": getattr(usage, "completion_tokens", 0),
-                })
-                llm_cache.put(cache_key, result)
-                return result
-            except Exception as e:
-                log.error("OpenAI call also failed: %s", e)
+            calls["openai"] = self._request_openai
+
+        outcome = await hedged_call(
+            provider_health.rank(list(calls)),
+            lambda provider: calls[provider](user_prompt),
+            placement="agent:dev",
+            model_of=self._provider_model,
+            estimate_prompt=lambda: count_tokens(SYSTEM_PROMPT + user_prompt),
+        )
+        if discarded is not None:
+            discarded.extend(outcome.discarded)
+        if outcome.ok:
+            return outcome.value
 
         return (
             "Based on CapeControl's agent development patterns, I'd recommend following "
@@ -245,6 +244,45 @@ class DevAgentService:
             "Check the documentation for detailed examples and code templates."
         ), {}
 
+    def _provider_model(self, provider: str) -> str:
+        if provider == "openai":
+            return "gpt-4o-mini" if "claude" in self.model else self.model
+        return self.model
+
+    async def _request_anthropic(self, user_prompt: str) -> tuple[str, dict]:
+        with provider_health.track("anthropic", self.model):
+            response = await self.anthropic_client.messages.create(
+                model=self.model,
+                max_tokens=2048,
+                temperature=0.2,
+                system=[{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}],
+                messages=[{"role": "user", "content": user_prompt}],
+            )
+        return (response.content[0].text, {
+            "model": response.model,
+            "tokens_in": response.usage.input_tokens,
+            "tokens_out": response.usage.output_tokens,
+        })
+
+    async def _request_openai(self, user_prompt: str) -> tuple[str, dict]:
+        openai_model = self._provider_model("openai")
+        with provider_health.track("openai", openai_model):
+            response = await self.openai_client.chat.completions.create(
+                model=openai_model,
+                max_tokens=2048,
+                temperature=0.2,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ],
+            )
+        usage = getattr(response, "usage", None)
+        return (response.choices[0].message.content or "", {
+            "model": response.model,
+            "tokens_in": getattr(usage, "prompt_tokens", 0),
+            "tokens_out": getattr(usage, "completion_tokens", 0),
+        })
+
     def _get_best_practices(self, task_type: Optional[str]) -> List[str]:
         """Get relevant best practices for the task type."""
         common = [
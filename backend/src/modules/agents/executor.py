@@ -5,14 +5,16 @@ from __future__ import annotations
 import asyncio
 import json
 from datetime import datetime
-from typing import Any, Dict, Optional
-from uuid import uuid4
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 from backend.src.db import models
 from fastapi import WebSocket
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+# Receives progress/status events (``{"message": ..., "progress": ...}``).
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
 
 class TaskStatus:
     """Task execution status constants."""
@@ -46,12 +48,40 @@ class TaskResponse(BaseModel):
     completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
     result: Optional[Dict[str, Any]] = None  # sourced from tasks.output_data
+    progress: Optional[Dict[str, Any]] = None  # latest queued-run progress event
     created_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 
+def task_response(task: models.Task) -> TaskResponse:
+    """Build the API view of a ``tasks`` row."""
+    return TaskResponse(
+        id=str(task.id),
+        user_id=task.user_id,
+        agent_id=task.agent_id,
+        goal=task.title,
+        input=task.input_data,
+        status=task.status,
+        started_at=task.started_at,
+        completed_at=task.completed_at,
+        error_message=task.error_message,
+        result=task.output_data,
+        progress=task.progress,
+        created_at=task.created_at,
+    )
+
+
+def websocket_progress(websocket: WebSocket) -> ProgressCallback:
+    """Progress callback that sends each event to ``websocket`` as JSON text."""
+
+    async def _send(event: Dict[str, Any]) -> None:
+        await websocket.send_text(json.dumps(event))
+
+    return _send
+
+
 class AgentExecutor:
     """Core agent execution engine with resource management."""
 
@@ -62,9 +92,7 @@ class AgentExecutor:
     async def execute_task(
         self, task_data: TaskCreate, websocket: Optional[WebSocket] = None
     ) -> TaskResponse:
-        """Execute an agent task with real-time progress tracking."""
-
-        task_id = str(uuid4())
+        """Execute an agent task inline with real-time progress tracking."""
 
         # Create task record
         task = models.Task(
@@ -76,35 +104,27 @@ class AgentExecutor:
         )
         self.db.add(task)
         self.db.commit()
+        task_id = str(task.id)
+        progress = websocket_progress(websocket) if websocket else None
 
         try:
             # Update status to running
-            self.db.query(models.Task).filter(models.Task.id == task_id).update(
+            self.db.query(models.Task).filter(models.Task.id == task.id).update(
                 {"status": TaskStatus.RUNNING, "started_at": datetime.utcnow()}
             )
             self.db.commit()
 
-            if websocket:
-                await websocket.send_text(
-                    json.dumps(
-                        {
-                            "task_id": task_id,
-                            "status": "running",
-                            "message": "Task started",
-                        }
-                    )
+            if progress:
+                await progress(
+                    {"task_id": task_id, "status": "running", "message": "Task started"}
                 )
 
-            # Execute agent logic (placeholder for actual implementation)
-            result = await self._execute_agent_logic(
-                task_data.agent_id, task_data.input, websocket
+            result = await self.run_pipeline(
+                task_data.agent_id, task_data.input, progress
             )
 
-            # Apply unsupported-policy enforcement to RAG-aware responses
-            result = self._apply_unsupported_policy(result, task_data.input)
-
             # Update task as completed
-            self.db.query(models.Task).filter(models.Task.id == task_id).update(
+            self.db.query(models.Task).filter(models.Task.id == task.id).update(
                 {
                     "status": TaskStatus.COMPLETED,
                     "completed_at": datetime.utcnow(),
@@ -113,33 +133,18 @@ class AgentExecutor:
             )
             self.db.commit()
 
-            if websocket:
-                await websocket.send_text(
-                    json.dumps(
-                        {"task_id": task_id, "status": "completed", "result": result}
-                    )
+            if progress:
+                await progress(
+                    {"task_id": task_id, "status": "completed", "result": result}
                 )
 
             # Refresh task from database to get updated fields
             self.db.refresh(task)
-
-            return TaskResponse(
-                id=str(task.id),
-                user_id=task.user_id,
-                agent_id=task.agent_id,
-                goal=task.title,
-                input=task.input_data,
-                status=task.status,
-                started_at=task.started_at,
-                completed_at=task.completed_at,
-                error_message=task.error_message,
-                result=task.output_data,
-                created_at=task.created_at,
-            )
+            return task_response(task)
 
         except Exception as e:
             # Update task as failed
-            self.db.query(models.Task).filter(models.Task.id == task_id).update(
+            self.db.query(models.Task).filter(models.Task.id == task.id).update(
                 {
                     "status": TaskStatus.FAILED,
                     "completed_at": datetime.utcnow(),
@@ -148,20 +153,26 @@ class AgentExecutor:
             )
             self.db.commit()
 
-            if websocket:
-                await websocket.send_text(
-                    json.dumps(
-                        {"task_id": task_id, "status": "failed", "error": str(e)}
-                    )
-                )
+            if progress:
+                await progress({"task_id": task_id, "status": "failed", "error": str(e)})
 
             raise
 
+    async def run_pipeline(
+        self,
+        agent_id: str,
+        input_data: Dict[str, Any],
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """Run the agent and the unsupported-policy gate (inline or queued)."""
+        result = await self._execute_agent_logic(agent_id, input_data, progress)
+        return self._apply_unsupported_policy(result, input_data)
+
     async def _execute_agent_logic(
         self,
         agent_id: str,
         input_data: Dict[str, Any],
-        websocket: Optional[WebSocket] = None,
+        progress: Optional[ProgressCallback] = None,
     ) -> Dict[str, Any]:
         """Execute the actual agent logic by dispatching to the appropriate agent service."""
         import os
@@ -170,10 +181,8 @@ class AgentExecutor:
 
         settings = get_settings()
 
-        if websocket:
-            await websocket.send_text(
-                json.dumps({"message": "Initializing agent...", "progress": 10})
-            )
+        if progress:
+            await progress({"message": "Initializing agent...", "progress": 10})
 
         query = input_data.get("query") or input_data.get("goal", "")
         agent_slug = str(agent_id).lower().strip()
@@ -362,14 +371,12 @@ class AgentExecutor:
 
             else:
                 # Fallback for unknown/custom agents
-                if websocket:
-                    await websocket.send_text(
-                        json.dumps(
-                            {
-                                "message": f"Executing agent '{agent_slug}'...",
-                                "progress": 50,
-                            }
-                        )
+                if progress:
+                    await progress(
+                        {
+                            "message": f"Executing agent '{agent_slug}'...",
+                            "progress": 50,
+                        }
                     )
                 await asyncio.sleep(1)
                 return {
@@ -388,10 +395,8 @@ class AgentExecutor:
             }
 
         finally:
-            if websocket:
-                await websocket.send_text(
-                    json.dumps({"message": "Processing complete", "progress": 100})
-                )
+            if progress:
+                await progress({"message": "Processing complete", "progress": 100})
 
     @staticmethod
     def _apply_unsupported_policy(
@@ -10,18 +10,23 @@ import os
 import time
 from typing import List, Optional
 
-from anthropic import AsyncAnthropic
 from backend.src.core.config import get_settings
 from backend.src.db import models
+from backend.src.modules.ai_router.clients import provider_clients
 from backend.src.modules.ai_router.bedrock import (
-    invoke_bedrock_text,
+    ainvoke_bedrock_text,
     is_bedrock_enabled,
 )
+from backend.src.modules.ai_router.health import provider_health
+from backend.src.modules.ai_router.hedging import Discarded, hedged_call
 from backend.src.modules.ai_router.strategy import resolve_available_provider_order
 from backend.src.modules.usage.input_guard import validate_llm_input
-from backend.src.modules.usage.llm_cache import llm_cache
-from backend.src.modules.usage.track import try_record_usage
-from openai import AsyncOpenAI
+from backend.src.modules.usage.llm_cache import llm_cache, provider_answered
+from backend.src.modules.usage.token_counter import count_tokens
+from backend.src.modules.usage.track import (
+    try_record_discarded_usage,
+    try_record_usage,
+)
 from sqlalchemy.orm import Session
 
 from .knowledge_base import FinanceKnowledgeBase
@@ -81,10 +86,10 @@ class FinanceAgentService:
         ai_provider_fallback_order: str = "bedrock,anthropic,openai",
     ):
         self.openai_client = (
-            AsyncOpenAI(api_key=openai_api_key) if openai_api_key else None
+            provider_clients.openai(openai_api_key) if openai_api_key else None
         )
         self.anthropic_client = (
-            AsyncAnthropic(api_key=anthropic_api_key) if anthropic_api_key else None
+            provider_clients.anthropic(anthropic_api_key) if anthropic_api_key else None
         )
         self.model = model
         self.ai_provider_strategy = ai_provider_strategy
@@ -122,8 +127,10 @@ class FinanceAgentService:
                 knowledge=knowledge_text,
             )
 
+            hedge_losers: List[Discarded] = []
             ai_response, usage_meta = await self._call_llm(
-                validate_llm_input(user_prompt, label="finance query")
+                validate_llm_input(user_prompt, label="finance query"),
+                discarded=hedge_losers,
             )
 
             # Record LLM usage for cost tracking
@@ -136,6 +143,12 @@ class FinanceAgentService:
                     tokens_in=usage_meta.get("tokens_in", 0),
                     tokens_out=usage_meta.get("tokens_out", 0),
                 )
+            try_record_discarded_usage(
+                db,
+                user_id=user.id if user else None,
+                event_type="agent:finance",
+                discarded=hedge_losers,
+            )
 
             # Generate insights based on analysis type
             insights = self._generate_insights(input_data.analysis_type, relevant_docs)
@@ -186,16 +199,28 @@ class FinanceAgentService:
                 processing_time_ms=processing_time,
             )
 
-    async def _call_llm(self, user_prompt: str) -> tuple[str, dict]:
+    async def _call_llm(
+        self, user_prompt: str, discarded: Optional[List[Discarded]] = None
+    ) -> tuple[str, dict]:
         """Call the LLM provider.
 
         Returns (text, usage_meta) for cost tracking.
+
+        Identical concurrent calls share one provider request and
+        successful results are cached (``llm_cache.get_or_compute``).
+        Provider calls that lost a hedge race are appended to ``discarded``.
         """
         cache_key = llm_cache.make_key(self.model, SYSTEM_PROMPT, user_prompt)
-        cached = llm_cache.get(cache_key)
-        if cached is not None:
-            return cached
+        return await llm_cache.get_or_compute(
+            cache_key,
+            lambda: self._call_providers(user_prompt, discarded),
+            should_cache=provider_answered,
+        )
 
+    async def _call_providers(
+        self, user_prompt: str, discarded: Optional[List[Discarded]] = None
+    ) -> tuple[str, dict]:
+        """Try the configured providers (hedged); canned fallback text if all fail."""
         provider_order = resolve_available_provider_order(
             strategy=self.ai_provider_strategy,
             fallback_order=self.ai_provider_fallback_order,
@@ -203,94 +228,27 @@ class FinanceAgentService:
             has_anthropic=self.anthropic_client is not None,
             has_openai=self.openai_client is not None,
         )
-
-        for provider in provider_order:
-            if provider == "anthropic":
-                if not self.anthropic_client or "claude" not in self.model:
-                    continue
-                try:
-                    response = await self.anthropic_client.messages.create(
-                        model=self.model,
-                        max_tokens=1500,
-                        temperature=0.2,
-                        system=[
-                            {
-                                "type": "text",
-                                "text": SYSTEM_PROMPT,
-                                "cache_control": {"type": "ephemeral"},
-                            }
-                        ],
-                        messages=[{"role": "user", "content": user_prompt}],
-                    )
-                    result = (
-                        response.content[0].text,
-                        {
-                            "model": response.model,
-                            "tokens_in": response.usage.input_tokens,
-                            "tokens_out": response.usage.output_tokens,
-                        },
-                    )
-                    llm_cache.put(cache_key, result)
-                    return result
-                except Exception as e:
-                    log.warning("Anthropic call failed: %s", e)
-                    continue
-
-            if provider == "openai":
-                if not self.openai_client:
-                    continue
-                try:
-                    response = await self.openai_client.chat.completions.create(
-                        model="gpt-4o-mini" if "claude" in self.model else self.model,
-                        max_tokens=1500,
-                        temperature=0.2,
-                        messages=[
-                            {"role": "system", "content": SYSTEM_PROMPT},
-                            {"role": "user", "content": user_prompt},
-                        ],
-                    )
-                    usage = getattr(response, "usage", None)
-                    result = (
-                        response.choices[0].message.content or "",
-                        {
-                            "model": response.model,
-                            "tokens_in": getattr(usage, "prompt_tokens", 0),
-                            "tokens_out": getattr(usage, "completion_tokens", 0),
-                        },
-                    )
-                    llm_cache.put(cache_key, result)
-                    return result
-                except Exception as e:
-                    log.error("OpenAI call failed: %s", e)
-                    continue
-
-            if provider == "bedrock":
-                try:
-                    settings = get_settings()
-                    bedrock = invoke_bedrock_text(
-                        system_prompt=SYSTEM_PROMPT,
-                        user_prompt=user_prompt,
-                        model_id=os.getenv("FINANCE_BEDROCK_MODEL_ID")
-                        or settings.ai_bedrock_model_id,
-                        region=settings.ai_bedrock_region,
-                    )
-                    result = (
-                        bedrock.text,
-                        {
-                            "model": bedrock.model_id,
-                            "tokens_in": bedrock.input_tokens,
-                            "tokens_out": bedrock.output_tokens,
-                            "estimated_usd": bedrock.estimated_usd,
-                            "latency_ms": bedrock.latency_ms,
-                            "provider": "bedrock",
-                            "region": bedrock.region,
-                        },
-                    )
-                    llm_cache.put(cache_key, result)
-                    return result
-                except Exception as e:
-                    log.warning("Bedrock call failed: %s", e)
-                    continue
+        calls = {
+            "anthropic": self._request_anthropic,
+            "openai": self._request_openai,
+            "bedrock": self._request_bedrock,
+        }
+        if not self.anthropic_client or "claude" not in self.model:
+            del calls["anthropic"]
+        if not self.openai_client:
+            del calls["openai"]
+
+        outcome = await hedged_call(
+            [provider for provider in provider_order if provider in calls],
+            lambda provider: calls[provider](user_prompt),
+            placement="agent:finance",
+            model_of=self._provider_model,
+            estimate_prompt=lambda: count_tokens(SYSTEM_PROMPT + user_prompt),
+        )
+        if discarded is not None:
+            discarded.extend(outcome.discarded)
+        if outcome.ok:
+            return outcome.value
 
         return (
             "Based on standard financial analysis frameworks, I'd recommend reviewing "
@@ -299,6 +257,85 @@ class FinanceAgentService:
             "more detailed analysis."
         ), {}
 
+    def _provider_model(self, provider: str) -> Optional[str]:
+        if provider == "openai":
+            return "gpt-4o-mini" if "claude" in self.model else self.model
+        if provider == "bedrock":
+            return (
+                os.getenv("FINANCE_BEDROCK_MODEL_ID")
+                or get_settings().ai_bedrock_model_id
+            )
+        return self.model
+
+    async def _request_anthropic(self, user_prompt: str) -> tuple[str, dict]:
+        with provider_health.track("anthropic", self.model):
+            response = await self.anthropic_client.messages.create(
+                model=self.model,
+                max_tokens=1500,
+                temperature=0.2,
+                system=[
+                    {
+                        "type": "text",
+                        "text": SYSTEM_PROMPT,
+                        "cache_control": {"type": "ephemeral"},
+                    }
+                ],
+                messages=[{"role": "user", "content": user_prompt}],
+            )
+        return (
+            response.content[0].text,
+            {
+                "model": response.model,
+                "tokens_in": response.usage.input_tokens,
+                "tokens_out": response.usage.output_tokens,
+            },
+        )
+
+    async def _request_openai(self, user_prompt: str) -> tuple[str, dict]:
+        openai_model = self._provider_model("openai")
+        with provider_health.track("openai", openai_model):
+            response = await self.openai_client.chat.completions.create(
+                model=openai_model,
+                max_tokens=1500,
+                temperature=0.2,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ],
+            )
+        usage = getattr(response, "usage", None)
+        return (
+            response.choices[0].message.content or "",
+            {
+                "model": response.model,
+                "tokens_in": getattr(usage, "prompt_tokens", 0),
+                "tokens_out": getattr(usage, "completion_tokens", 0),
+            },
+        )
+
+    async def _request_bedrock(self, user_prompt: str) -> tuple[str, dict]:
+        settings = get_settings()
+        model_id = self._provider_model("bedrock")
+        with provider_health.track("bedrock", model_id):
+            bedrock = await ainvoke_bedrock_text(
+                system_prompt=SYSTEM_PROMPT,
+                user_prompt=user_prompt,
+                model_id=model_id,
+                region=settings.ai_bedrock_region,
+            )
+        return (
+            bedrock.text,
+            {
+                "model": bedrock.model_id,
+                "tokens_in": bedrock.input_tokens,
+                "tokens_out": bedrock.output_tokens,
+                "estimated_usd": bedrock.estimated_usd,
+                "latency_ms": bedrock.latency_ms,
+                "provider": "bedrock",
+                "region": bedrock.region,
+            },
+        )
+
     def _generate_insights(
         self, analysis_type: Optional[str], docs: list
     ) -> List[FinancialInsight]:
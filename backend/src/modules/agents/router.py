@@ -29,8 +29,8 @@ from backend.src.modules.payments.enforcement import (
 )
 from backend.src.modules.support import service as support_service
 
-from . import schemas
-from .executor import AgentExecutor, TaskCreate, TaskResponse
+from . import schemas, task_queue
+from .executor import AgentExecutor, TaskCreate, TaskResponse, task_response
 
 # Import CapeAI Guide router
 try:
@@ -473,7 +473,7 @@ async def create_task(
     _budget=Depends(enforce_platform_budget),
     _user_budget=Depends(enforce_user_budget),
 ) -> TaskResponse:
-    """Execute an agent task."""
+    """Execute an agent task (queued for the worker pool when enabled)."""
 
     # Verify agent exists and user has access
     _get_agent(db, agent_id, owner)
@@ -482,6 +482,9 @@ async def create_task(
     task_data.user_id = owner.id
     task_data.agent_id = agent_id
 
+    if task_queue.queue_enabled():
+        return task_response(task_queue.enqueue(db, task_data))
+
     # Execute task
     executor = AgentExecutor(db)
     return await executor.execute_task(task_data)
@@ -503,6 +506,12 @@ async def stream_task_execution(
         task_data = TaskCreate(**data)
         task_data.agent_id = agent_id
 
+        if task_queue.queue_enabled():
+            # Relay the worker's progress until the task finishes
+            task = task_queue.enqueue(db, task_data)
+            await task_queue.stream_progress(websocket, task.id)
+            return
+
         # Execute task with WebSocket streaming
         executor = AgentExecutor(db)
         await executor.execute_task(task_data, websocket)
@@ -513,33 +522,38 @@ async def stream_task_execution(
         await websocket.close()
 
 
-@router.get("/tasks/{task_id}", response_model=TaskResponse)
-def get_task_status(
-    task_id: str,
-    owner: models.User = Depends(get_current_user),
-    db: Session = Depends(get_session),
-) -> TaskResponse:
-    """Get task execution status and results."""
-
+def _get_owned_task(db: Session, task_id: str, owner: models.User) -> models.Task:
     task = db.scalar(
         select(models.Task)
         .where(models.Task.id == task_id)
         .where(models.Task.user_id == owner.id)
     )
-
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
         )
+    return task
 
-    return TaskResponse(
-        id=str(task.id),
-        status=task.status,
-        agent_id=task.agent_id,
-        goal=task.title,
-        created_at=task.created_at,
-        started_at=task.started_at,
-        completed_at=task.completed_at,
-        result=task.output_data,
-        error_message=task.error_message,
-    )
+
+@router.get("/tasks/{task_id}", response_model=TaskResponse)
+def get_task_status(
+    task_id: str,
+    owner: models.User = Depends(get_current_user),
+    db: Session = Depends(get_session),
+) -> TaskResponse:
+    """Get task execution status and results."""
+
+    return task_response(_get_owned_task(db, task_id, owner))
+
+
+@router.post("/tasks/{task_id}/cancel", response_model=TaskResponse)
+def cancel_task(
+    task_id: str,
+    owner: models.User = Depends(get_current_user),
+    db: Session = Depends(get_session),
+) -> TaskResponse:
+    """Cancel a queued task, or ask the worker running it to stop."""
+
+    task = _get_owned_task(db, task_id, owner)
+    task_queue.request_cancel(db, task)
+    return task_response(task)
@@ -0,0 +1,376 @@
+"""Database-backed queue for agent tasks.
+
+With the queue enabled, the agents API only inserts a ``tasks`` row with
+status ``queued``; ``backend.src.worker.agent_task_worker`` claims it and
+runs the agent pipeline outside the web process, so long agent runs no
+longer hold web workers and survive a dyno restart.
+
+Claiming uses ``SELECT ... FOR UPDATE SKIP LOCKED`` (a no-op on SQLite)
+plus a conditional update on ``attempts``, so two workers never run the
+same attempt.  A claimed task carries a lease (``locked_by`` and
+``heartbeat_at``); the worker refreshes ``heartbeat_at`` while it runs
+and a task whose heartbeat is older than the visibility timeout is
+reclaimed by another worker (or failed once it is out of attempts).
+Failed attempts are retried with exponential backoff through
+``run_after``.
+
+Cancellation is cooperative: a queued task is cancelled immediately, a
+running one gets ``cancel_requested`` and its worker stops it at the next
+heartbeat.  Progress events are written to ``tasks.progress`` and
+``stream_progress`` relays them to the ``/agents/{id}/tasks/stream``
+socket by polling the row, so the socket may be served by any web
+worker.
+
+Tuning (environment):
+
+- ``AGENT_TASK_QUEUE_ENABLED`` (false) — enqueue instead of running inline;
+  needs a running ``agent_task_worker``
+- ``AGENT_TASK_MAX_ATTEMPTS`` (3)
+- ``AGENT_TASK_VISIBILITY_TIMEOUT`` (120) — seconds without a heartbeat
+  before a running task is reclaimed
+- ``AGENT_TASK_RETRY_SECONDS`` (30) — first retry delay, doubled per attempt
+- ``AGENT_TASK_STREAM_POLL_SECONDS`` (0.5) — socket progress poll interval
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from backend.src.db import models
+from backend.src.db.session import SessionLocal
+from fastapi import WebSocket
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from .executor import TaskCreate, TaskStatus
+
+MAX_ATTEMPTS = max(1, int(os.getenv("AGENT_TASK_MAX_ATTEMPTS", "3")))
+VISIBILITY_TIMEOUT_SECONDS = float(os.getenv("AGENT_TASK_VISIBILITY_TIMEOUT", "120"))
+RETRY_BASE_SECONDS = float(os.getenv("AGENT_TASK_RETRY_SECONDS", "30"))
+STREAM_POLL_SECONDS = float(os.getenv("AGENT_TASK_STREAM_POLL_SECONDS", "0.5"))
+
+_TERMINAL = {TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED}
+
+
+def queue_enabled() -> bool:
+    """True when agent tasks should be enqueued for the worker pool."""
+    return os.getenv("AGENT_TASK_QUEUE_ENABLED", "").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass(frozen=True)
+class ClaimedTask:
+    """A task leased to one worker for one attempt."""
+
+    id: int
+    agent_id: str
+    user_id: str
+    input_data: Dict[str, Any]
+    attempt: int
+    max_attempts: int
+
+
+def enqueue(
+    db: Session, task_data: TaskCreate, *, max_attempts: int = MAX_ATTEMPTS
+) -> models.Task:
+    """Insert a queued task for the worker pool."""
+    task = models.Task(
+        user_id=task_data.user_id,
+        agent_id=task_data.agent_id,
+        title=task_data.goal,
+        input_data=task_data.input,
+        status=TaskStatus.QUEUED,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_after=_now(),
+        cancel_requested=False,
+    )
+    db.add(task)
+    db.commit()
+    db.refresh(task)
+    return task
+
+
+def _expire_leases(db: Session, *, now: datetime, cutoff: datetime) -> None:
+    """Settle stale running tasks that must not be retried."""
+    stale = and_(
+        models.Task.status == TaskStatus.RUNNING,
+        models.Task.heartbeat_at < cutoff,
+    )
+    db.execute(
+        update(models.Task)
+        .where(stale, models.Task.cancel_requested.is_(True))
+        .values(
+            status=TaskStatus.CANCELLED,
+            completed_at=now,
+            locked_by=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(models.Task)
+        .where(stale, models.Task.attempts >= models.Task.max_attempts)
+        .values(
+            status=TaskStatus.FAILED,
+            completed_at=now,
+            locked_by=None,
+            error_message="Task lease expired after its final attempt",
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def claim_next(
+    db: Session,
+    worker_id: str,
+    *,
+    visibility_timeout: float = VISIBILITY_TIMEOUT_SECONDS,
+) -> Optional[ClaimedTask]:
+    """Lease the next due task to ``worker_id``; None when nothing is due."""
+    now = _now()
+    cutoff = now - timedelta(seconds=visibility_timeout)
+    _expire_leases(db, now=now, cutoff=cutoff)
+    db.commit()
+
+    due = or_(
+        and_(
+            models.Task.status == TaskStatus.QUEUED,
+            models.Task.cancel_requested.is_(False),
+            or_(models.Task.run_after.is_(None), models.Task.run_after <= now),
+        ),
+        and_(
+            models.Task.status == TaskStatus.RUNNING,
+            models.Task.heartbeat_at < cutoff,
+        ),
+    )
+    task = db.scalar(
+        select(models.Task)
+        .where(due)
+        .order_by(models.Task.run_after.asc(), models.Task.id.asc())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .execution_options(populate_existing=True)
+    )
+    if task is None:
+        db.commit()
+        return None
+
+    attempt = (task.attempts or 0) + 1
+    claimed = db.execute(
+        update(models.Task)
+        .where(
+            models.Task.id == task.id,
+            models.Task.status == task.status,
+            models.Task.attempts == (task.attempts or 0),
+        )
+        .values(
+            status=TaskStatus.RUNNING,
+            attempts=attempt,
+            locked_by=worker_id,
+            heartbeat_at=now,
+            started_at=now,
+            error_message=None,
+            progress=None,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if not claimed:
+        # Another worker took it between the select and the update.
+        return None
+    return ClaimedTask(
+        id=task.id,
+        agent_id=task.agent_id,
+        user_id=task.user_id,
+        input_data=dict(task.input_data or {}),
+        attempt=attempt,
+        max_attempts=task.max_attempts or MAX_ATTEMPTS,
+    )
+
+
+def _leased(task_id: int, worker_id: str):
+    return and_(
+        models.Task.id == task_id,
+        models.Task.status == TaskStatus.RUNNING,
+        models.Task.locked_by == worker_id,
+    )
+
+
+def heartbeat(db: Session, task_id: int, worker_id: str) -> bool:
+    """Extend the lease; False when it was lost or cancellation was requested."""
+    renewed = db.execute(
+        update(models.Task)
+        .where(_leased(task_id, worker_id), models.Task.cancel_requested.is_(False))
+        .values(heartbeat_at=_now())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return renewed > 0
+
+
+def report_progress(
+    db: Session, task_id: int, worker_id: str, event: Dict[str, Any]
+) -> None:
+    """Store the latest progress event for socket subscribers."""
+    db.execute(
+        update(models.Task)
+        .where(_leased(task_id, worker_id))
+        .values(progress=event, heartbeat_at=_now())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def complete(
+    db: Session, task_id: int, worker_id: str, result: Dict[str, Any]
+) -> bool:
+    """Record a successful run; False when the lease was lost meanwhile."""
+    stored = db.execute(
+        update(models.Task)
+        .where(_leased(task_id, worker_id))
+        .values(
+            status=TaskStatus.COMPLETED,
+            output_data=result,
+            completed_at=_now(),
+            locked_by=None,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return stored > 0
+
+
+def fail(db: Session, task_id: int, worker_id: str, error: str) -> Optional[str]:
+    """Requeue a failed attempt with backoff, or fail it for good.
+
+    Returns the task's new status, or None when the lease was lost.
+    """
+    task = db.scalar(
+        select(models.Task)
+        .where(_leased(task_id, worker_id))
+        .execution_options(populate_existing=True)
+    )
+    if task is None:
+        db.commit()
+        return None
+    now = _now()
+    task.error_message = error[:2000]
+    task.locked_by = None
+    if task.cancel_requested:
+        task.status = TaskStatus.CANCELLED
+        task.completed_at = now
+    elif (task.attempts or 0) >= (task.max_attempts or MAX_ATTEMPTS):
+        task.status = TaskStatus.FAILED
+        task.completed_at = now
+    else:
+        task.status = TaskStatus.QUEUED
+        task.progress = None  # the next attempt starts over
+        task.run_after = now + timedelta(
+            seconds=RETRY_BASE_SECONDS * 2 ** max(0, (task.attempts or 1) - 1)
+        )
+    db.commit()
+    return task.status
+
+
+def mark_cancelled(db: Session, task_id: int, worker_id: str) -> bool:
+    """Settle a running task its worker stopped after a cancel request."""
+    stored = db.execute(
+        update(models.Task)
+        .where(_leased(task_id, worker_id))
+        .values(status=TaskStatus.CANCELLED, completed_at=_now(), locked_by=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return stored > 0
+
+
+def request_cancel(db: Session, task: models.Task) -> str:
+    """Cancel ``task`` now if queued, or ask its worker to stop it."""
+    # Conditional updates: a worker may claim the task concurrently.
+    cancelled = db.execute(
+        update(models.Task)
+        .where(models.Task.id == task.id, models.Task.status == TaskStatus.QUEUED)
+        .values(status=TaskStatus.CANCELLED, completed_at=_now())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not cancelled:
+        db.execute(
+            update(models.Task)
+            .where(models.Task.id == task.id, models.Task.status == TaskStatus.RUNNING)
+            .values(cancel_requested=True)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    db.refresh(task)
+    return task.status
+
+
+def _snapshot(task_id: int) -> Optional[Dict[str, Any]]:
+    with SessionLocal() as db:
+        task = db.get(models.Task, task_id)
+        if task is None:
+            return None
+        return {
+            "status": task.status,
+            "progress": task.progress,
+            "result": task.output_data,
+            "error": task.error_message,
+        }
+
+
+async def stream_progress(
+    websocket: WebSocket,
+    task_id: int,
+    *,
+    poll_seconds: float = STREAM_POLL_SECONDS,
+) -> Optional[str]:
+    """Relay a queued task's progress to ``websocket`` until it finishes.
+
+    Frames match the inline executor's: ``running``, then ``progress``
+    messages, then one ``completed``/``failed``/``cancelled`` frame.
+    Returns the final status (None if the task disappeared).
+    """
+    announced = False
+    last_progress: Optional[Dict[str, Any]] = None
+    while True:
+        snapshot = await asyncio.to_thread(_snapshot, task_id)
+        if snapshot is None:
+            return None
+        status = snapshot["status"]
+        if not announced and status != TaskStatus.QUEUED:
+            announced = True
+            if status not in _TERMINAL or snapshot["progress"]:
+                await websocket.send_text(
+                    json.dumps(
+                        {
+                            "task_id": str(task_id),
+                            "status": TaskStatus.RUNNING,
+                            "message": "Task started",
+                        }
+                    )
+                )
+        progress = snapshot["progress"]
+        if progress and progress != last_progress:
+            last_progress = progress
+            await websocket.send_text(json.dumps(progress))
+        if status in _TERMINAL:
+            frame: Dict[str, Any] = {"task_id": str(task_id), "status": status}
+            if status == TaskStatus.COMPLETED:
+                frame["result"] = snapshot["result"]
+            elif snapshot["error"]:
+                frame["error"] = snapshot["error"]
+            await websocket.send_text(json.dumps(frame))
+            return status
+        await asyncio.sleep(poll_seconds)
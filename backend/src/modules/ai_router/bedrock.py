@@ -2,10 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
 import json
 import os
+import threading
 import time
+import weakref
 from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict
+from urllib.parse import quote
+
+from .clients import provider_clients
 
 
 def _as_bool(value: str | None) -> bool:
@@ -42,23 +50,30 @@ class BedrockTextResult:
     latency_ms: int
 
 
-def invoke_bedrock_text(
+@dataclass
+class _BedrockRequest:
+    model_id: str
+    region: str
+    body: bytes
+    input_cost_per_1k: float
+    output_cost_per_1k: float
+
+
+def _prepare_request(
     *,
     system_prompt: str,
     user_prompt: str,
-    model_id: str | None = None,
-    region: str | None = None,
-    max_tokens: int | None = None,
-    temperature: float | None = None,
-    input_cost_per_1k: float | None = None,
-    output_cost_per_1k: float | None = None,
-) -> BedrockTextResult:
-    """Invoke Amazon Bedrock (Anthropic format) and return normalized metadata."""
+    model_id: str | None,
+    region: str | None,
+    max_tokens: int | None,
+    temperature: float | None,
+    input_cost_per_1k: float | None,
+    output_cost_per_1k: float | None,
+) -> _BedrockRequest:
+    """Resolve defaults from the environment and build the Anthropic-format body."""
     if not is_bedrock_enabled():
         raise RuntimeError("Bedrock is disabled (AI_BEDROCK_ENABLED != 1)")
 
-    resolved_model_id = model_id or default_bedrock_model_id()
-    resolved_region = region or default_bedrock_region()
     resolved_max_tokens = max_tokens or int(
         os.getenv("AI_BEDROCK_MAX_TOKENS")
         or os.getenv("OPENCLAW_BEDROCK_MAX_TOKENS", "2048")
@@ -71,11 +86,6 @@ def invoke_bedrock_text(
             or os.getenv("OPENCLAW_BEDROCK_TEMPERATURE", "0.2")
         )
     )
-
-    import boto3  # type: ignore
-
-    started = time.perf_counter()
-    client = boto3.client("bedrock-runtime", region_name=resolved_region)
     payload = {
         "anthropic_version": "bedrock-2023-05-31",
         "max_tokens": resolved_max_tokens,
@@ -94,31 +104,6 @@ def invoke_bedrock_text(
         ],
     }
 
-    response = client.invoke_model(
-        modelId=resolved_model_id,
-        contentType="application/json",
-        accept="application/json",
-        body=json.dumps(payload),
-    )
-
-    raw_body = response.get("body")
-    body_bytes = raw_body.read() if hasattr(raw_body, "read") else raw_body
-    data = json.loads(
-        body_bytes.decode("utf-8") if isinstance(body_bytes, bytes) else str(body_bytes)
-    )
-
-    segments = data.get("content", []) if isinstance(data, dict) else []
-    text_parts = [
-        str(seg.get("text", ""))
-        for seg in segments
-        if isinstance(seg, dict) and seg.get("type") == "text"
-    ]
-    text = "\n".join(part for part in text_parts if part).strip()
-
-    usage = data.get("usage", {}) if isinstance(data, dict) else {}
-    input_tokens = int(usage.get("input_tokens", 0) or 0)
-    output_tokens = int(usage.get("output_tokens", 0) or 0)
-
     resolved_input_cost = (
         input_cost_per_1k
         if input_cost_per_1k is not None
@@ -137,17 +122,309 @@ def invoke_bedrock_text(
             or "0"
         )
     )
-    estimated_usd = ((input_tokens / 1000.0) * resolved_input_cost) + (
-        (output_tokens / 1000.0) * resolved_output_cost
+    return _BedrockRequest(
+        model_id=model_id or default_bedrock_model_id(),
+        region=region or default_bedrock_region(),
+        body=json.dumps(payload).encode("utf-8"),
+        input_cost_per_1k=resolved_input_cost,
+        output_cost_per_1k=resolved_output_cost,
+    )
+
+
+def _build_result(
+    request: _BedrockRequest, data: object, started: float
+) -> BedrockTextResult:
+    """Normalise an Anthropic-format response body into ``BedrockTextResult``."""
+    segments = data.get("content", []) if isinstance(data, dict) else []
+    text_parts = [
+        str(seg.get("text", ""))
+        for seg in segments
+        if isinstance(seg, dict) and seg.get("type") == "text"
+    ]
+    text = "\n".join(part for part in text_parts if part).strip()
+
+    usage = data.get("usage", {}) if isinstance(data, dict) else {}
+    input_tokens = int(usage.get("input_tokens", 0) or 0)
+    output_tokens = int(usage.get("output_tokens", 0) or 0)
+
+    estimated_usd = ((input_tokens / 1000.0) * request.input_cost_per_1k) + (
+        (output_tokens / 1000.0) * request.output_cost_per_1k
     )
     latency_ms = int((time.perf_counter() - started) * 1000)
 
     return BedrockTextResult(
         text=text,
-        model_id=resolved_model_id,
-        region=resolved_region,
+        model_id=request.model_id,
+        region=request.region,
         input_tokens=max(input_tokens, 0),
         output_tokens=max(output_tokens, 0),
         estimated_usd=max(estimated_usd, 0.0),
         latency_ms=max(latency_ms, 1),
     )
+
+
+def invoke_bedrock_text(
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    model_id: str | None = None,
+    region: str | None = None,
+    max_tokens: int | None = None,
+    temperature: float | None = None,
+    input_cost_per_1k: float | None = None,
+    output_cost_per_1k: float | None = None,
+) -> BedrockTextResult:
+    """Invoke Amazon Bedrock (Anthropic format) and return normalized metadata.
+
+    Blocking (boto3).  Async callers should use ``ainvoke_bedrock_text``.
+    """
+    request = _prepare_request(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        model_id=model_id,
+        region=region,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        input_cost_per_1k=input_cost_per_1k,
+        output_cost_per_1k=output_cost_per_1k,
+    )
+
+    started = time.perf_counter()
+    client = provider_clients.bedrock(request.region)
+    response = client.invoke_model(
+        modelId=request.model_id,
+        contentType="application/json",
+        accept="application/json",
+        body=request.body.decode("utf-8"),
+    )
+
+    raw_body = response.get("body")
+    body_bytes = raw_body.read() if hasattr(raw_body, "read") else raw_body
+    data = json.loads(
+        body_bytes.decode("utf-8") if isinstance(body_bytes, bytes) else str(body_bytes)
+    )
+    return _build_result(request, data, started)
+
+
+# ---------------------------------------------------------------------------
+# Native async path (SigV4-signed httpx request)
+# ---------------------------------------------------------------------------
+
+_MAX_CONCURRENCY = max(1, int(os.getenv("AI_BEDROCK_MAX_CONCURRENCY", "16")))
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+_credentials_lock = threading.Lock()
+_credentials: Any = None
+
+
+def bedrock_endpoint_url(region: str) -> str:
+    """Bedrock runtime base URL; ``AI_BEDROCK_ENDPOINT_URL`` overrides (e.g. a stub)."""
+    override = os.getenv("AI_BEDROCK_ENDPOINT_URL", "").strip()
+    if override:
+        return override.rstrip("/")
+    return f"https://bedrock-runtime.{region}.amazonaws.com"
+
+
+def _aws_credentials() -> Any:
+    """Resolve the AWS credential chain once; refreshable credentials stay live."""
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None:
+            import botocore.session  # type: ignore
+
+            _credentials = botocore.session.get_session().get_credentials()
+            if _credentials is None:
+                raise RuntimeError("No AWS credentials available for Bedrock")
+        return _credentials
+
+
+def _frozen_credentials() -> Any:
+    # Blocking: the first call walks the credential chain and refreshable
+    # credentials (STS, IMDS) refresh over the network.
+    return _aws_credentials().get_frozen_credentials()
+
+
+async def _signed_headers(
+    url: str, body: bytes, region: str, accept: str = "application/json"
+) -> Dict[str, str]:
+    from botocore.auth import SigV4Auth  # type: ignore
+    from botocore.awsrequest import AWSRequest  # type: ignore
+
+    request = AWSRequest(
+        method="POST",
+        url=url,
+        data=body,
+        headers={"Content-Type": "application/json", "Accept": accept},
+    )
+    frozen = await asyncio.to_thread(_frozen_credentials)
+    SigV4Auth(frozen, "bedrock", region).add_auth(request)
+    return dict(request.headers.items())
+
+
+def _operation_url(request: _BedrockRequest, operation: str) -> str:
+    return (
+        f"{bedrock_endpoint_url(request.region)}"
+        f"/model/{quote(request.model_id, safe='')}/{operation}"
+    )
+
+
+def _concurrency_limit() -> asyncio.Semaphore:
+    """Per-event-loop cap on in-flight Bedrock requests."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENCY)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def ainvoke_bedrock_text(
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    model_id: str | None = None,
+    region: str | None = None,
+    max_tokens: int | None = None,
+    temperature: float | None = None,
+    input_cost_per_1k: float | None = None,
+    output_cost_per_1k: float | None = None,
+) -> BedrockTextResult:
+    """Async ``invoke_bedrock_text``: no worker thread is held while waiting.
+
+    Sends a SigV4-signed ``InvokeModel`` request over the pooled httpx client
+    for the region.  At most ``AI_BEDROCK_MAX_CONCURRENCY`` (16) requests per
+    event loop are in flight; the rest queue on a semaphore.
+    """
+    request = _prepare_request(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        model_id=model_id,
+        region=region,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        input_cost_per_1k=input_cost_per_1k,
+        output_cost_per_1k=output_cost_per_1k,
+    )
+    url = _operation_url(request, "invoke")
+
+    started = time.perf_counter()
+    async with _concurrency_limit():
+        headers = await _signed_headers(url, request.body, request.region)
+        client = provider_clients.bedrock_http(request.region)
+        response = await client.post(url, content=request.body, headers=headers)
+
+    if response.status_code >= 400:
+        raise RuntimeError(
+            f"Bedrock InvokeModel failed ({response.status_code}): "
+            f"{response.text[:200]}"
+        )
+    return _build_result(request, response.json(), started)
+
+
+class BedrockTextStream:
+    """Async iterator of text deltas from ``InvokeModelWithResponseStream``.
+
+    ``result`` holds the usual ``BedrockTextResult`` once iteration has
+    finished; it stays ``None`` if the stream fails part-way.
+    """
+
+    def __init__(self, request: _BedrockRequest) -> None:
+        self._request = request
+        self.result: BedrockTextResult | None = None
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[str]:
+        from botocore.eventstream import EventStreamBuffer  # type: ignore
+
+        request = self._request
+        url = _operation_url(request, "invoke-with-response-stream")
+        started = time.perf_counter()
+        parts: list[str] = []
+        usage: Dict[str, int] = {}
+
+        async with _concurrency_limit():
+            headers = await _signed_headers(
+                url, request.body, request.region, "application/vnd.amazon.eventstream"
+            )
+            client = provider_clients.bedrock_http(request.region)
+            async with client.stream(
+                "POST", url, content=request.body, headers=headers
+            ) as response:
+                if response.status_code >= 400:
+                    detail = (await response.aread()).decode("utf-8", "replace")
+                    raise RuntimeError(
+                        "Bedrock InvokeModelWithResponseStream failed "
+                        f"({response.status_code}): {detail[:200]}"
+                    )
+                buffer = EventStreamBuffer()
+                async for raw in response.aiter_bytes():
+                    buffer.add_data(raw)
+                    for message in buffer:
+                        event = _decode_stream_message(message)
+                        text = _apply_stream_event(event, usage)
+                        if text:
+                            parts.append(text)
+                            yield text
+
+        data = {"content": [{"type": "text", "text": "".join(parts)}], "usage": usage}
+        self.result = _build_result(request, data, started)
+
+
+def _decode_stream_message(message: Any) -> Dict[str, Any]:
+    payload = json.loads(message.payload or b"{}")
+    if message.headers.get(":message-type") == "exception":
+        exception_type = message.headers.get(":exception-type", "exception")
+        raise RuntimeError(
+            f"Bedrock stream {exception_type}: {payload.get('message', payload)}"
+        )
+    chunk = payload.get("bytes")
+    return json.loads(base64.b64decode(chunk)) if chunk else {}
+
+
+def _apply_stream_event(event: Dict[str, Any], usage: Dict[str, int]) -> str:
+    """Fold usage counters from an Anthropic stream event; return any text delta."""
+    event_type = event.get("type")
+    if event_type == "message_start":
+        start_usage = (event.get("message") or {}).get("usage") or {}
+        usage["input_tokens"] = int(start_usage.get("input_tokens", 0) or 0)
+    elif event_type == "message_delta":
+        delta_usage = event.get("usage") or {}
+        usage["output_tokens"] = int(delta_usage.get("output_tokens", 0) or 0)
+    elif event_type == "content_block_delta":
+        delta = event.get("delta") or {}
+        if delta.get("type") == "text_delta":
+            return str(delta.get("text", ""))
+    metrics = event.get("amazon-bedrock-invocationMetrics")
+    if isinstance(metrics, dict):
+        usage.setdefault("input_tokens", int(metrics.get("inputTokenCount", 0) or 0))
+        usage.setdefault("output_tokens", int(metrics.get("outputTokenCount", 0) or 0))
+    return ""
+
+
+def astream_bedrock_text(
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    model_id: str | None = None,
+    region: str | None = None,
+    max_tokens: int | None = None,
+    temperature: float | None = None,
+    input_cost_per_1k: float | None = None,
+    output_cost_per_1k: float | None = None,
+) -> BedrockTextStream:
+    """Streaming ``ainvoke_bedrock_text``; iterate the returned stream for deltas."""
+    return BedrockTextStream(
+        _prepare_request(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            model_id=model_id,
+            region=region,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            input_cost_per_1k=input_cost_per_1k,
+            output_cost_per_1k=output_cost_per_1k,
+        )
+    )
@@ -0,0 +1,227 @@
+"""Shared, long-lived provider SDK clients.
+
+Building ``AsyncAnthropic`` / ``AsyncOpenAI`` / ``boto3.client`` per call
+pays for a new connection pool, TLS handshake and credential resolution
+on every LLM request.  ``provider_clients`` keeps one client per
+``(provider, api key | region)`` for the life of the process, each with a
+tuned keep-alive connection pool, and closes them on app shutdown.
+
+Usage::
+
+    from backend.src.modules.ai_router.clients import provider_clients
+
+    client = provider_clients.anthropic(api_key)     # AsyncAnthropic
+    client = provider_clients.openai(api_key)        # AsyncOpenAI
+    client = provider_clients.bedrock(region)        # boto3 bedrock-runtime
+    client = provider_clients.bedrock_http(region)   # httpx, signed async calls
+
+SDKs are imported lazily, so a missing SDK only fails the call that needs
+it.  Async clients are cached per event loop (connection pools are
+loop-bound), so the app loop and the ``core.async_bridge`` loop each get
+their own pool; entries of closed loops are dropped on the next build.
+API keys are never stored as dict keys, only their SHA-256 fingerprint.
+
+Pool tuning (environment):
+
+- ``PROVIDER_HTTP_MAX_CONNECTIONS`` (100) — concurrent connections per client
+- ``PROVIDER_HTTP_MAX_KEEPALIVE`` (20) — idle connections kept warm
+- ``PROVIDER_HTTP_KEEPALIVE_SECONDS`` (60) — idle connection lifetime
+- ``PROVIDER_HTTP_CONNECT_TIMEOUT`` (5) / ``PROVIDER_HTTP_TIMEOUT`` (120) seconds
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+_MAX_CONNECTIONS = int(os.getenv("PROVIDER_HTTP_MAX_CONNECTIONS", "100"))
+_MAX_KEEPALIVE = int(os.getenv("PROVIDER_HTTP_MAX_KEEPALIVE", "20"))
+_KEEPALIVE_SECONDS = float(os.getenv("PROVIDER_HTTP_KEEPALIVE_SECONDS", "60"))
+_CONNECT_TIMEOUT = float(os.getenv("PROVIDER_HTTP_CONNECT_TIMEOUT", "5"))
+_TIMEOUT = float(os.getenv("PROVIDER_HTTP_TIMEOUT", "120"))
+
+
+def _fingerprint(secret: Optional[str]) -> str:
+    return hashlib.sha256((secret or "").encode()).hexdigest()[:16]
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _async_http_client(sdk: Any) -> Any:
+    """Keep-alive ``httpx.AsyncClient`` with the SDK's defaults where available."""
+    import httpx
+
+    factory = getattr(sdk, "DefaultAsyncHttpxClient", httpx.AsyncClient)
+    return factory(
+        limits=httpx.Limits(
+            max_connections=_MAX_CONNECTIONS,
+            max_keepalive_connections=_MAX_KEEPALIVE,
+            keepalive_expiry=_KEEPALIVE_SECONDS,
+        ),
+        timeout=httpx.Timeout(_TIMEOUT, connect=_CONNECT_TIMEOUT),
+    )
+
+
+def _bedrock_config() -> Optional[Any]:
+    try:
+        from botocore.config import Config  # type: ignore
+    except ImportError:
+        return None
+    return Config(
+        max_pool_connections=_MAX_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=_CONNECT_TIMEOUT,
+        read_timeout=_TIMEOUT,
+        retries={"max_attempts": 2, "mode": "standard"},
+    )
+
+
+@dataclass
+class _Entry:
+    client: Any
+    loop: Optional[asyncio.AbstractEventLoop]
+    is_async: bool
+
+
+class ProviderClientRegistry:
+    """Process-wide cache of provider SDK clients.
+
+    Entries are keyed by provider, the SDK factory in use (so a swapped or
+    reloaded SDK module gets fresh clients), a credential fingerprint and
+    region.  Thread-safe; lookups are a dict hit under a lock.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[Tuple[Any, ...], _Entry] = {}
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def _get(
+        self,
+        key: Tuple[Any, ...],
+        build: Callable[[], Any],
+        *,
+        is_async: bool,
+    ) -> Any:
+        loop = _running_loop() if is_async else None
+        if is_async:
+            key = (*key, id(loop) if loop is not None else None)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None and entry.loop is loop and not (
+                loop is not None and loop.is_closed()
+            ):
+                return entry.client
+            for stale in [
+                k for k, e in self._clients.items() if e.loop is not None and e.loop.is_closed()
+            ]:
+                del self._clients[stale]
+            client = build()
+            self._clients[key] = _Entry(client=client, loop=loop, is_async=is_async)
+            self._created += 1
+            log.debug("Created pooled %s client", key[0])
+            return client
+
+    def anthropic(self, api_key: str) -> Any:
+        """Shared ``anthropic.AsyncAnthropic`` for ``api_key``."""
+        import anthropic
+
+        factory = anthropic.AsyncAnthropic
+        return self._get(
+            ("anthropic", factory, _fingerprint(api_key)),
+            lambda: factory(api_key=api_key, http_client=_async_http_client(anthropic)),
+            is_async=True,
+        )
+
+    def openai(self, api_key: str) -> Any:
+        """Shared ``openai.AsyncOpenAI`` for ``api_key``."""
+        import openai
+
+        factory = openai.AsyncOpenAI
+        return self._get(
+            ("openai", factory, _fingerprint(api_key)),
+            lambda: factory(api_key=api_key, http_client=_async_http_client(openai)),
+            is_async=True,
+        )
+
+    def bedrock(self, region: str) -> Any:
+        """Shared boto3 ``bedrock-runtime`` client for ``region`` (thread-safe)."""
+        import boto3  # type: ignore
+
+        factory = boto3.client
+
+        def _build() -> Any:
+            config = _bedrock_config()
+            if config is None:
+                return factory("bedrock-runtime", region_name=region)
+            return factory("bedrock-runtime", region_name=region, config=config)
+
+        return self._get(("bedrock", factory, region), _build, is_async=False)
+
+    def bedrock_http(self, region: str) -> Any:
+        """Shared ``httpx.AsyncClient`` for signed async Bedrock requests."""
+        import httpx
+
+        factory = httpx.AsyncClient
+        return self._get(
+            ("bedrock_http", factory, region),
+            lambda: _async_http_client(httpx),
+            is_async=True,
+        )
+
+    async def aclose(self) -> None:
+        """Close the clients owned by the running loop and drop them.
+
+        Async clients of other live loops are left for those loops to close;
+        clients of dead loops are dropped without closing.
+        """
+        current = _running_loop()
+        with self._lock:
+            entries = []
+            for key, entry in list(self._clients.items()):
+                owned = entry.loop is None or entry.loop is current
+                if owned or entry.loop.is_closed():
+                    entries.append(entry)
+                    del self._clients[key]
+        for entry in entries:
+            closer = getattr(entry.client, "aclose", None) or getattr(
+                entry.client, "close", None
+            )
+            if closer is None:
+                continue
+            try:
+                if entry.is_async:
+                    if entry.loop is not None and entry.loop is not current:
+                        continue  # pool belongs to a dead loop
+                    result = closer()
+                    if asyncio.iscoroutine(result):
+                        await result
+                else:
+                    closer()
+            except Exception:
+                log.warning("Failed to close provider client", exc_info=True)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Client counts for monitoring."""
+        with self._lock:
+            by_provider: Dict[str, int] = {}
+            for key in self._clients:
+                by_provider[key[0]] = by_provider.get(key[0], 0) + 1
+            return {"clients": len(self._clients), "created": self._created, **by_provider}
+
+
+# Module-level singleton
+provider_clients = ProviderClientRegistry()
@@ -0,0 +1,403 @@
+"""Live provider health: latency/error EWMAs and circuit breakers.
+
+``resolve_available_provider_order`` used to return the configured order
+unconditionally, so every request walked Bedrock → Anthropic → OpenAI and
+only moved on after a full failure or timeout.  ``provider_health``
+records the outcome of each provider call and ``rank()`` reorders the
+configured list:
+
+1. healthy providers, in configured order;
+2. degraded providers (error EWMA ≥ ``PROVIDER_DEGRADED_ERROR_RATE`` or
+   latency EWMA ≥ ``PROVIDER_DEGRADED_LATENCY_FACTOR`` × the fastest
+   healthy provider's);
+3. providers whose circuit breaker is open — kept as a last resort
+   rather than dropped, so a request still has somewhere to go when
+   everything is failing.
+
+A breaker opens after ``PROVIDER_BREAKER_FAILURES`` consecutive
+failures, when the error EWMA reaches ``PROVIDER_BREAKER_ERROR_RATE``
+(after ``PROVIDER_BREAKER_MIN_CALLS`` calls), or immediately on a
+throttling response.  After its cooldown it is half-open: ``rank()``
+hands one caller a probe slot in the provider's normal position; a
+success closes the breaker, a failure re-opens it with the cooldown
+doubled (up to ``PROVIDER_BREAKER_MAX_COOLDOWN``).
+
+Latency samples are kept per call kind — ``COMPLETION`` (the full
+response; ``track()``) and ``TTFT`` (time to the first streamed token) —
+and only like is compared with like: the latency demotion in ``rank()``
+measures each provider against the fastest provider *of the same kind*,
+and ``latency_percentile`` reads one kind.  Per-model latency percentiles
+and error counts are kept alongside the provider totals for
+``/api/metrics``; routing decisions are made per provider.  State is per
+process.
+
+Tuning (environment):
+
+- ``PROVIDER_ROUTING_ADAPTIVE`` (true) — false keeps the static order
+- ``PROVIDER_HEALTH_ALPHA`` (0.2) — EWMA weight of the newest sample
+- ``PROVIDER_BREAKER_FAILURES`` (5), ``PROVIDER_BREAKER_ERROR_RATE`` (0.5),
+  ``PROVIDER_BREAKER_MIN_CALLS`` (10)
+- ``PROVIDER_BREAKER_COOLDOWN`` (30) / ``PROVIDER_BREAKER_MAX_COOLDOWN``
+  (300) / ``PROVIDER_THROTTLE_COOLDOWN`` (10) seconds
+- ``PROVIDER_DEGRADED_ERROR_RATE`` (0.25),
+  ``PROVIDER_DEGRADED_LATENCY_FACTOR`` (3)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+_P = TypeVar("_P", bound=str)
+
+_ADAPTIVE = os.getenv("PROVIDER_ROUTING_ADAPTIVE", "true").strip().lower() not in {
+    "0",
+    "false",
+    "no",
+}
+_ALPHA = float(os.getenv("PROVIDER_HEALTH_ALPHA", "0.2"))
+_BREAKER_FAILURES = max(1, int(os.getenv("PROVIDER_BREAKER_FAILURES", "5")))
+_BREAKER_ERROR_RATE = float(os.getenv("PROVIDER_BREAKER_ERROR_RATE", "0.5"))
+_BREAKER_MIN_CALLS = int(os.getenv("PROVIDER_BREAKER_MIN_CALLS", "10"))
+_COOLDOWN_SECONDS = float(os.getenv("PROVIDER_BREAKER_COOLDOWN", "30"))
+_MAX_COOLDOWN_SECONDS = float(os.getenv("PROVIDER_BREAKER_MAX_COOLDOWN", "300"))
+_THROTTLE_COOLDOWN_SECONDS = float(os.getenv("PROVIDER_THROTTLE_COOLDOWN", "10"))
+_DEGRADED_ERROR_RATE = float(os.getenv("PROVIDER_DEGRADED_ERROR_RATE", "0.25"))
+_DEGRADED_LATENCY_FACTOR = float(os.getenv("PROVIDER_DEGRADED_LATENCY_FACTOR", "3"))
+_LATENCY_SAMPLES = 200
+
+# Latency sample kinds
+COMPLETION = "completion"
+TTFT = "ttft"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_THROTTLE_MARKERS = ("throttl", "rate limit", "ratelimit", "too many requests", "429")
+
+
+def is_throttle(error: Any) -> bool:
+    """True when ``error`` (exception or error text) is a throttling response."""
+    if error is None:
+        return False
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):  # botocore ClientError
+        code = str((response.get("Error") or {}).get("Code", ""))
+        if "throttl" in code.lower():
+            return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in _THROTTLE_MARKERS)
+
+
+@dataclass
+class _Stats:
+    """Rolling call statistics for one provider or provider/model pair."""
+
+    calls: int = 0
+    errors: int = 0
+    throttled: int = 0
+    error_ewma: float = 0.0
+    # Keyed by latency kind (``COMPLETION`` / ``TTFT``).
+    latency_ewma_ms: Dict[str, float] = field(default_factory=dict)
+    latencies: Dict[str, Deque[float]] = field(default_factory=dict)
+
+    def record(
+        self,
+        *,
+        ok: bool,
+        latency_ms: Optional[float],
+        throttled: bool,
+        alpha: float,
+        kind: str = COMPLETION,
+    ) -> None:
+        self.calls += 1
+        if not ok:
+            self.errors += 1
+        if throttled:
+            self.throttled += 1
+        self.error_ewma += alpha * ((0.0 if ok else 1.0) - self.error_ewma)
+        if ok and latency_ms is not None:
+            self.latencies.setdefault(kind, deque(maxlen=_LATENCY_SAMPLES)).append(latency_ms)
+            previous = self.latency_ewma_ms.get(kind)
+            self.latency_ewma_ms[kind] = (
+                latency_ms if previous is None else previous + alpha * (latency_ms - previous)
+            )
+
+    def samples(self, kind: str = COMPLETION) -> int:
+        return len(self.latencies.get(kind, ()))
+
+    def percentile(self, pct: float, kind: str = COMPLETION) -> Optional[float]:
+        samples = self.latencies.get(kind)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return round(ordered[index], 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot: Dict[str, Any] = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "error_rate": round(self.error_ewma, 3),
+        }
+        for kind, prefix in ((COMPLETION, ""), (TTFT, "ttft_")):
+            ewma = self.latency_ewma_ms.get(kind)
+            snapshot[f"{prefix}latency_ewma_ms"] = round(ewma, 1) if ewma is not None else None
+            snapshot[f"{prefix}p50_ms"] = self.percentile(50, kind)
+            snapshot[f"{prefix}p95_ms"] = self.percentile(95, kind)
+        return snapshot
+
+
+@dataclass
+class _Breaker:
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    cooldown: float = _COOLDOWN_SECONDS
+    probe_started: Optional[float] = None
+    opened: int = 0
+
+
+class ProviderHealth:
+    """Thread-safe per-process provider health tracker."""
+
+    def __init__(
+        self,
+        *,
+        adaptive: bool = _ADAPTIVE,
+        alpha: float = _ALPHA,
+        clock=time.monotonic,
+    ) -> None:
+        self.adaptive = adaptive
+        self.alpha = alpha
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._providers: Dict[str, _Stats] = {}
+        self._models: Dict[Tuple[str, str], _Stats] = {}
+        self._breakers: Dict[str, _Breaker] = {}
+        self._reordered = 0
+
+    # ── Recording ────────────────────────────────────────────────────
+
+    def record_success(
+        self,
+        provider: str,
+        *,
+        latency_ms: Optional[float] = None,
+        model: Optional[str] = None,
+        kind: str = COMPLETION,
+    ) -> None:
+        """Record a successful call; ``latency_ms`` is a sample of ``kind``."""
+        self._record(
+            provider, model=model, ok=True, latency_ms=latency_ms, throttled=False, kind=kind
+        )
+
+    def record_failure(
+        self,
+        provider: str,
+        *,
+        model: Optional[str] = None,
+        error: Any = None,
+        throttled: Optional[bool] = None,
+    ) -> None:
+        if throttled is None:
+            throttled = is_throttle(error)
+        self._record(provider, model=model, ok=False, latency_ms=None, throttled=throttled)
+
+    @contextmanager
+    def track(self, provider: str, model: Optional[str] = None) -> Iterator[None]:
+        """Time the enclosed provider call and record its outcome (re-raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as exc:
+            # Cancellation is the caller giving up, not a provider fault.
+            if isinstance(exc, Exception):
+                self.record_failure(provider, model=model, error=exc)
+            raise
+        self.record_success(
+            provider, model=model, latency_ms=(time.perf_counter() - started) * 1000
+        )
+
+    def _record(
+        self,
+        provider: str,
+        *,
+        model: Optional[str],
+        ok: bool,
+        latency_ms: Optional[float],
+        throttled: bool,
+        kind: str = COMPLETION,
+    ) -> None:
+        now = self._clock()
+        with self._lock:
+            stats = self._providers.setdefault(provider, _Stats())
+            stats.record(
+                ok=ok, latency_ms=latency_ms, throttled=throttled, alpha=self.alpha, kind=kind
+            )
+            if model:
+                self._models.setdefault((provider, model), _Stats()).record(
+                    ok=ok, latency_ms=latency_ms, throttled=throttled, alpha=self.alpha, kind=kind
+                )
+            breaker = self._breakers.setdefault(provider, _Breaker())
+            if ok:
+                breaker.consecutive_failures = 0
+                if breaker.state != CLOSED:
+                    breaker.state = CLOSED
+                    breaker.cooldown = _COOLDOWN_SECONDS
+                    breaker.probe_started = None
+                return
+            breaker.consecutive_failures += 1
+            if breaker.state == HALF_OPEN:
+                # Failed probe: back off harder before the next one.
+                breaker.cooldown = min(breaker.cooldown * 2, _MAX_COOLDOWN_SECONDS)
+                self._open(breaker, now + breaker.cooldown)
+            elif breaker.state == CLOSED and throttled:
+                self._open(breaker, now + _THROTTLE_COOLDOWN_SECONDS)
+            elif breaker.state == CLOSED and (
+                breaker.consecutive_failures >= _BREAKER_FAILURES
+                or (stats.calls >= _BREAKER_MIN_CALLS and stats.error_ewma >= _BREAKER_ERROR_RATE)
+            ):
+                self._open(breaker, now + breaker.cooldown)
+
+    @staticmethod
+    def _open(breaker: _Breaker, until: float) -> None:
+        breaker.state = OPEN
+        breaker.open_until = until
+        breaker.probe_started = None
+        breaker.opened += 1
+
+    # ── Routing ──────────────────────────────────────────────────────
+
+    def state(self, provider: str) -> str:
+        with self._lock:
+            breaker = self._breakers.get(provider)
+            if breaker is None:
+                return CLOSED
+            if breaker.state == OPEN and self._clock() >= breaker.open_until:
+                return HALF_OPEN
+            return breaker.state
+
+    def latency_percentile(
+        self,
+        provider: str,
+        pct: float,
+        *,
+        model: Optional[str] = None,
+        min_samples: int = 1,
+        kind: str = COMPLETION,
+    ) -> Optional[float]:
+        """Recent ``pct`` latency (ms) of ``kind`` for ``provider``, per ``model``
+        when it has ``min_samples`` samples; None until the provider has that many."""
+        with self._lock:
+            candidates = [self._providers.get(provider)]
+            if model:
+                candidates.insert(0, self._models.get((provider, model)))
+            for stats in candidates:
+                if stats is not None and stats.samples(kind) >= min_samples:
+                    return stats.percentile(pct, kind)
+        return None
+
+    def _claim_probe(self, breaker: _Breaker, now: float) -> bool:
+        """Half-open: one caller at a time gets to try the provider."""
+        if breaker.state == OPEN:
+            if now < breaker.open_until:
+                return False
+            breaker.state = HALF_OPEN
+        if breaker.probe_started is not None and now - breaker.probe_started < breaker.cooldown:
+            return False
+        breaker.probe_started = now
+        return True
+
+    def rank(self, providers: Sequence[_P]) -> List[_P]:
+        """Reorder ``providers``: healthy, then degraded, then open breakers."""
+        ordered = list(providers)
+        if not self.adaptive or not ordered:
+            return ordered
+        now = self._clock()
+        healthy: List[_P] = []
+        degraded: List[_P] = []
+        blocked: List[_P] = []
+        with self._lock:
+            latencies: Dict[str, Dict[str, float]] = {}
+            for provider in ordered:
+                breaker = self._breakers.get(provider)
+                if breaker is not None and breaker.state != CLOSED:
+                    if self._claim_probe(breaker, now):
+                        healthy.append(provider)
+                    else:
+                        blocked.append(provider)
+                    continue
+                stats = self._providers.get(provider)
+                if stats is not None and stats.error_ewma >= _DEGRADED_ERROR_RATE:
+                    degraded.append(provider)
+                    continue
+                healthy.append(provider)
+                if stats is not None:
+                    for kind, ewma in stats.latency_ewma_ms.items():
+                        latencies.setdefault(kind, {})[provider] = ewma
+            # Compare like with like: TTFT against TTFT, completion against completion.
+            slow = set()
+            for by_provider in latencies.values():
+                fastest = min(by_provider.values())
+                if len(by_provider) < 2 or fastest <= 0:
+                    continue
+                threshold = fastest * _DEGRADED_LATENCY_FACTOR
+                slow.update(p for p, ewma in by_provider.items() if ewma >= threshold)
+            if slow:
+                degraded = [p for p in healthy if p in slow] + degraded
+                healthy = [p for p in healthy if p not in slow]
+            ranked = healthy + degraded + blocked
+            if ranked != ordered:
+                self._reordered += 1
+        return ranked
+
+    def reset(self) -> None:
+        with self._lock:
+            self._providers.clear()
+            self._models.clear()
+            self._breakers.clear()
+            self._reordered = 0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Per-provider and per-model health for monitoring."""
+        now = self._clock()
+        with self._lock:
+            providers: Dict[str, Any] = {}
+            for name, stats in self._providers.items():
+                breaker = self._breakers.get(name) or _Breaker()
+                state = breaker.state
+                if state == OPEN and now >= breaker.open_until:
+                    state = HALF_OPEN
+                providers[name] = {
+                    **stats.snapshot(),
+                    "breaker": state,
+                    "breaker_opened": breaker.opened,
+                    "models": {
+                        model: model_stats.snapshot()
+                        for (provider, model), model_stats in self._models.items()
+                        if provider == name
+                    },
+                }
+            return {
+                "adaptive": self.adaptive,
+                "reordered": self._reordered,
+                "providers": providers,
+            }
+
+
+# Module-level singleton
+provider_health = ProviderHealth()
@@ -0,0 +1,418 @@
+"""Hedged provider calls for tail-latency control.
+
+Provider calls fall back in sequence, so one slow response — not a
+failure, just a slow one — sets a request's p99.  ``hedged_call`` runs
+the first provider of a ranked list (``resolve_available_provider_order``)
+and, if it has not answered within the hedge delay, sends the same
+request to the next provider as well.  The first success wins and the
+other call is cancelled; a failure still falls through to the next
+provider as before.  For streams "answered" means the first token.
+
+The hedge delay is the primary's recent p95 latency from
+``provider_health`` (per model once it has enough samples) of the kind the
+caller waits on — ``TTFT`` for streams, ``COMPLETION`` otherwise — clamped to
+``[AI_HEDGE_MIN_DELAY_MS, AI_HEDGE_MAX_DELAY_MS]``; until then
+``AI_HEDGE_DEFAULT_DELAY_MS`` applies.
+
+A hedge costs a second provider request, so each placement has a budget:
+every request earns ``ratio`` hedge credits (capped at ``AI_HEDGE_BURST``)
+and each hedge spends one, so at most ``ratio`` of a placement's requests
+are hedged over time.  Calls that lost the race are returned in
+``HedgeOutcome.discarded`` so the caller can record their usage
+(``usage.track.try_record_discarded_usage``).
+
+Tuning (environment):
+
+- ``AI_HEDGING_ENABLED`` (false) — opt in; off means plain sequential
+  fallback
+- ``AI_HEDGE_BUDGET`` (0.05) — default hedge ratio per placement
+- ``AI_HEDGE_BUDGETS`` — per-placement ratios, e.g.
+  ``rag=0.1,chat=0.05,chat:admin=0,agent:finance=0.02``; ``chat`` covers
+  every ``chat:<placement>`` without its own entry
+- ``AI_HEDGE_BURST`` (5) — most credits a placement can bank
+- ``AI_HEDGE_PERCENTILE`` (95), ``AI_HEDGE_MIN_SAMPLES`` (20)
+- ``AI_HEDGE_DEFAULT_DELAY_MS`` (2000), ``AI_HEDGE_MIN_DELAY_MS`` (200),
+  ``AI_HEDGE_MAX_DELAY_MS`` (10000)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+from backend.src.modules.ai_router.health import COMPLETION, ProviderHealth, provider_health
+
+log = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+_ENABLED = os.getenv("AI_HEDGING_ENABLED", "").strip().lower() in {"1", "true", "yes"}
+_BUDGET = float(os.getenv("AI_HEDGE_BUDGET", "0.05"))
+_BURST = float(os.getenv("AI_HEDGE_BURST", "5"))
+_PERCENTILE = float(os.getenv("AI_HEDGE_PERCENTILE", "95"))
+_MIN_SAMPLES = int(os.getenv("AI_HEDGE_MIN_SAMPLES", "20"))
+_DEFAULT_DELAY_MS = float(os.getenv("AI_HEDGE_DEFAULT_DELAY_MS", "2000"))
+_MIN_DELAY_MS = float(os.getenv("AI_HEDGE_MIN_DELAY_MS", "200"))
+_MAX_DELAY_MS = float(os.getenv("AI_HEDGE_MAX_DELAY_MS", "10000"))
+
+
+def parse_budgets(raw: Optional[str]) -> Dict[str, float]:
+    """Parse ``placement=ratio`` pairs; malformed entries are ignored."""
+    budgets: Dict[str, float] = {}
+    for token in (raw or "").split(","):
+        name, sep, value = token.partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            budgets[name.strip().lower()] = max(0.0, float(value))
+        except ValueError:
+            log.warning("Ignoring malformed AI_HEDGE_BUDGETS entry %r", token)
+    return budgets
+
+
+@dataclass(frozen=True)
+class Discarded:
+    """A provider call that lost the race; its cost was still incurred."""
+
+    provider: str
+    model: Optional[str] = None
+    # The call's result when it finished too; None when it was cancelled.
+    result: Any = None
+    elapsed_ms: int = 0
+    # Estimated prompt tokens, billed even for a cancelled call.
+    prompt_tokens: int = 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self.result is None
+
+
+@dataclass
+class HedgeOutcome(Generic[_T]):
+    """Result of ``hedged_call``.
+
+    ``provider``/``value`` are the winner; with no success ``provider`` is
+    None, ``value`` the last unsuccessful result and ``error`` the last
+    exception.
+    """
+
+    provider: Optional[str] = None
+    value: Optional[_T] = None
+    error: Optional[Exception] = None
+    hedged: bool = False
+    discarded: List[Discarded] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.provider is not None
+
+
+def _always(_value: Any) -> bool:
+    return True
+
+
+def _no_model(_provider: str) -> Optional[str]:
+    return None
+
+
+class HedgePolicy:
+    """Hedge delays and per-placement hedge budgets (thread-safe)."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = _ENABLED,
+        budget: float = _BUDGET,
+        budgets: Optional[Mapping[str, float]] = None,
+        burst: float = _BURST,
+        percentile: float = _PERCENTILE,
+        min_samples: int = _MIN_SAMPLES,
+        default_delay_ms: float = _DEFAULT_DELAY_MS,
+        min_delay_ms: float = _MIN_DELAY_MS,
+        max_delay_ms: float = _MAX_DELAY_MS,
+        health: ProviderHealth = provider_health,
+    ) -> None:
+        self.enabled = enabled
+        self.budget = budget
+        self.budgets = dict(
+            budgets if budgets is not None else parse_budgets(os.getenv("AI_HEDGE_BUDGETS"))
+        )
+        self.burst = burst
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay_ms = default_delay_ms
+        self.min_delay_ms = min_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self._health = health
+        self._lock = threading.Lock()
+        self._credits: Dict[str, float] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    # ── Policy ───────────────────────────────────────────────────────
+
+    def budget_for(self, placement: str) -> float:
+        """Hedge ratio for ``placement`` (exact name, then its prefix)."""
+        key = placement.lower()
+        if key in self.budgets:
+            return self.budgets[key]
+        prefix = key.split(":", 1)[0]
+        return self.budgets.get(prefix, self.budget)
+
+    def delay(
+        self, provider: str, model: Optional[str] = None, *, kind: str = COMPLETION
+    ) -> float:
+        """Seconds to wait on ``provider`` before hedging."""
+        observed = self._health.latency_percentile(
+            provider, self.percentile, model=model, min_samples=self.min_samples, kind=kind
+        )
+        delay_ms = self.default_delay_ms if observed is None else observed
+        return min(max(delay_ms, self.min_delay_ms), self.max_delay_ms) / 1000
+
+    def _count(self, placement: str, name: str, amount: int = 1) -> None:
+        counters = self._counters.setdefault(
+            placement,
+            {
+                "requests": 0,
+                "hedged": 0,
+                "hedge_won": 0,
+                "budget_denied": 0,
+                "discarded": 0,
+                "failed": 0,
+            },
+        )
+        counters[name] += amount
+
+    def _earn(self, placement: str) -> bool:
+        """Count a request; False when hedging is off for ``placement``."""
+        ratio = self.budget_for(placement)
+        with self._lock:
+            self._count(placement, "requests")
+            if not self.enabled or ratio <= 0:
+                return False
+            credits = self._credits.get(placement, 0.0)
+            self._credits[placement] = min(self.burst, credits + ratio)
+            return True
+
+    def _spend(self, placement: str) -> bool:
+        with self._lock:
+            credits = self._credits.get(placement, 0.0)
+            if credits < 1:
+                self._count(placement, "budget_denied")
+                return False
+            self._credits[placement] = credits - 1
+            self._count(placement, "hedged")
+            return True
+
+    # ── Calls ────────────────────────────────────────────────────────
+
+    async def call(
+        self,
+        providers: Sequence[str],
+        call: Callable[[str], Awaitable[_T]],
+        *,
+        placement: str,
+        succeeded: Callable[[_T], bool] = _always,
+        model_of: Callable[[str], Optional[str]] = _no_model,
+        estimate_prompt: Optional[Callable[[], int]] = None,
+        latency_kind: str = COMPLETION,
+    ) -> HedgeOutcome[_T]:
+        """Call ``providers`` in order, hedging a slow one with the next.
+
+        ``call(provider)`` raises or returns a result that ``succeeded``
+        rejects on failure.  ``latency_kind`` names the latency samples that
+        measure when ``call`` returns (``TTFT`` for a call that returns on
+        the first token).
+        """
+        outcome: HedgeOutcome[_T] = HedgeOutcome()
+        queue = deque(providers)
+        hedging = self._earn(placement) and len(queue) > 1
+        if not hedging:
+            while queue:
+                provider = queue.popleft()
+                try:
+                    value = await call(provider)
+                except Exception as exc:  # noqa: BLE001
+                    log.warning("%s %s call failed: %s", placement, provider, exc)
+                    outcome.error = exc
+                    continue
+                if succeeded(value):
+                    outcome.provider, outcome.value = provider, value
+                    return outcome
+                outcome.value = value
+            with self._lock:
+                self._count(placement, "failed")
+            return outcome
+
+        order = {provider: index for index, provider in enumerate(providers)}
+        pending: Dict["asyncio.Future[_T]", tuple[str, float]] = {}
+        first_launched: Optional[str] = None
+        try:
+            while queue or pending:
+                if not pending:
+                    provider = queue.popleft()
+                    first_launched = first_launched or provider
+                    pending[asyncio.ensure_future(call(provider))] = (
+                        provider,
+                        time.perf_counter(),
+                    )
+                timeout = None
+                if hedging and queue and len(pending) == 1:
+                    ((primary, started),) = pending.values()
+                    waited = time.perf_counter() - started
+                    delay = self.delay(primary, model_of(primary), kind=latency_kind)
+                    timeout = max(0.0, delay - waited)
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    if self._spend(placement):
+                        provider = queue.popleft()
+                        outcome.hedged = True
+                        pending[asyncio.ensure_future(call(provider))] = (
+                            provider,
+                            time.perf_counter(),
+                        )
+                    else:
+                        hedging = False
+                    continue
+                # Simultaneous finishers: prefer the earlier-ranked provider.
+                for task in sorted(done, key=lambda t: order[pending[t][0]]):
+                    provider, started = pending.pop(task)
+                    try:
+                        value = task.result()
+                    except Exception as exc:  # noqa: BLE001
+                        log.warning("%s %s call failed: %s", placement, provider, exc)
+                        outcome.error = exc
+                        continue
+                    if not succeeded(value):
+                        if not outcome.ok:
+                            outcome.value = value
+                    elif not outcome.ok:
+                        outcome.provider, outcome.value = provider, value
+                    else:
+                        outcome.discarded.append(
+                            self._discarded(provider, started, value, model_of, estimate_prompt)
+                        )
+                if outcome.ok:
+                    break
+        finally:
+            # The loser (or everything, if we were cancelled) stops here.
+            for task, (provider, started) in pending.items():
+                task.cancel()
+                outcome.discarded.append(
+                    self._discarded(provider, started, None, model_of, estimate_prompt)
+                )
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        with self._lock:
+            if outcome.discarded:
+                self._count(placement, "discarded", len(outcome.discarded))
+            if not outcome.ok:
+                self._count(placement, "failed")
+            elif outcome.hedged and outcome.provider != first_launched:
+                self._count(placement, "hedge_won")
+        return outcome
+
+    @staticmethod
+    def _discarded(
+        provider: str,
+        started: float,
+        result: Any,
+        model_of: Callable[[str], Optional[str]],
+        estimate_prompt: Optional[Callable[[], int]],
+    ) -> Discarded:
+        return Discarded(
+            provider=provider,
+            model=model_of(provider),
+            result=result,
+            elapsed_ms=int((time.perf_counter() - started) * 1000),
+            prompt_tokens=estimate_prompt() if estimate_prompt else 0,
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._credits.clear()
+            self._counters.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Per-placement hedging counters for monitoring."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "placements": {
+                    placement: {
+                        **counters,
+                        "budget": self.budget_for(placement),
+                        "credits": round(self._credits.get(placement, 0.0), 2),
+                    }
+                    for placement, counters in self._counters.items()
+                },
+            }
+
+
+# Module-level singleton
+hedge_policy = HedgePolicy()
+
+
+async def hedged_call(
+    providers: Sequence[str],
+    call: Callable[[str], Awaitable[_T]],
+    *,
+    placement: str,
+    succeeded: Callable[[_T], bool] = _always,
+    model_of: Callable[[str], Optional[str]] = _no_model,
+    estimate_prompt: Optional[Callable[[], int]] = None,
+    latency_kind: str = COMPLETION,
+) -> HedgeOutcome[_T]:
+    """``hedge_policy.call`` — see the module docstring."""
+    return await hedge_policy.call(
+        providers,
+        call,
+        placement=placement,
+        succeeded=succeeded,
+        model_of=model_of,
+        estimate_prompt=estimate_prompt,
+        latency_kind=latency_kind,
+    )
+
+
+def discarded_usage(discarded: Discarded) -> Dict[str, Any]:
+    """Usage-log fields for a discarded call.
+
+    A finished loser reports its real ``(text, usage_meta)`` tokens; a
+    cancelled one is charged its prompt estimate and no output.
+    """
+    result = discarded.result
+    meta = result[1] if isinstance(result, tuple) and len(result) == 2 else None
+    if not isinstance(meta, dict):
+        meta = {}
+    return {
+        "model": meta.get("model") or discarded.model,
+        "tokens_in": meta.get("tokens_in", discarded.prompt_tokens) or 0,
+        "tokens_out": meta.get("tokens_out", 0) or 0,
+        "detail": {
+            "hedge": "discarded",
+            "provider": discarded.provider,
+            "cancelled": discarded.cancelled,
+            "elapsed_ms": discarded.elapsed_ms,
+        },
+    }
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from typing import Iterable, Literal
 
+from backend.src.modules.ai_router.health import provider_health
+
 ProviderName = Literal["bedrock", "anthropic", "openai"]
 StrategyName = Literal[
     "hybrid", "bedrock_first", "direct_first", "bedrock_only", "direct_only"
@@ -88,11 +90,16 @@ def resolve_available_provider_order(
     has_anthropic: bool,
     has_openai: bool,
 ) -> list[ProviderName]:
-    """Convenience helper that returns strategy-resolved, available providers."""
+    """Strategy-resolved, available providers, reordered by live health.
+
+    Providers with an open circuit breaker or degraded error rate/latency
+    move behind healthy ones (see ``ai_router.health``).
+    """
     ordered = resolve_provider_order(strategy, fallback_order)
-    return filter_available_providers(
+    available = filter_available_providers(
         ordered,
         has_bedrock=has_bedrock,
         has_anthropic=has_anthropic,
         has_openai=has_openai,
     )
+    return provider_health.rank(available)
@@ -12,8 +12,9 @@ from sqlalchemy.orm import Session
 
 from backend.src.core.config import get_settings
 from backend.src.db import models as app_models
+from backend.src.modules.ai_router.clients import provider_clients
 from backend.src.modules.usage.track import try_record_usage
-from backend.src.modules.usage.llm_cache import llm_cache
+from backend.src.modules.usage.llm_cache import llm_cache, provider_answered
 
 from .schemas import (
     CapsuleCategory,
@@ -338,8 +339,6 @@ class CapsuleService:
 
         Returns (text, usage_meta) for cost tracking.
         """
-        settings_obj = get_settings()
-
         # Build context from retrieved citations
         context_parts: List[str] = []
         for i, c in enumerate(citations, 1):
@@ -358,24 +357,37 @@ class CapsuleService:
 
         user_message = f"{query}{extra}\n\n---\nRetrieved Documents:\n\n{doc_context}"
 
-        # ── LLM cache check ─────────────────────────────────────────────────
+        # ── LLM cache / single-flight ───────────────────────────────────────
+        model = os.getenv("RAG_LLM_MODEL", "claude-3-5-haiku-20241022")
         cache_key = llm_cache.make_key(model, capsule.system_prompt, user_message)
-        cached = llm_cache.get(cache_key)
-        if cached is not None:
-            log.debug("LLM cache hit for capsule %s", capsule.id)
-            return cached  # (text, usage_meta) tuple
+        return await llm_cache.get_or_compute(
+            cache_key,
+            lambda: self._request_capsule_completion(
+                capsule=capsule,
+                user_message=user_message,
+                model=model,
+                citation_count=len(citations),
+            ),
+            should_cache=provider_answered,
+        )
 
-        # Use Anthropic (preferred) or OpenAI
+    async def _request_capsule_completion(
+        self,
+        *,
+        capsule: CapsuleDefinition,
+        user_message: str,
+        model: str,
+        citation_count: int,
+    ) -> tuple[str, dict]:
+        """Call Anthropic (preferred) or OpenAI; fallback text if neither works."""
+        settings_obj = get_settings()
         anthropic_key = settings_obj.anthropic_api_key
         openai_key = settings_obj.openai_api_key
-        model = os.getenv("RAG_LLM_MODEL", "claude-3-5-haiku-20241022")
 
         if anthropic_key:
             try:
-                import anthropic
-
-                client = anthropic.Anthropic(api_key=anthropic_key)
-                msg = client.messages.create(
+                client = provider_clients.anthropic(anthropic_key)
+                msg = await client.messages.create(
                     model=model,
                     max_tokens=2048,
                     temperature=0.2,
@@ -387,18 +399,14 @@ class CapsuleService:
                     "tokens_in": msg.usage.input_tokens,
                     "tokens_out": msg.usage.output_tokens,
                 }
-                result = (msg.content[0].text, usage_meta)  # type: ignore[union-attr]
-                llm_cache.put(cache_key, result)
-                return result
+                return msg.content[0].text, usage_meta  # type: ignore[union-attr]
             except Exception as exc:
                 log.warning("Anthropic call failed for capsule %s: %s", capsule.id, exc)
 
         if openai_key:
             try:
-                import openai
-
-                client = openai.OpenAI(api_key=openai_key)
-                resp = client.chat.completions.create(
+                client = provider_clients.openai(openai_key)
+                resp = await client.chat.completions.create(
                     model="gpt-4o-mini",
                     messages=[
                         {"role": "system", "content": capsule.system_prompt},
@@ -413,13 +421,11 @@ class CapsuleService:
                     "tokens_in": getattr(oai_usage, "prompt_tokens", 0),
                     "tokens_out": getattr(oai_usage, "completion_tokens", 0),
                 }
-                result = (resp.choices[0].message.content or "", usage_meta)
-                llm_cache.put(cache_key, result)
-                return result
+                return resp.choices[0].message.content or "", usage_meta
             except Exception as exc:
                 log.warning("OpenAI call failed for capsule %s: %s", capsule.id, exc)
 
         return (
-            f"[Capsule {capsule.name}] Retrieved {len(citations)} relevant "
+            f"[Capsule {capsule.name}] Retrieved {citation_count} relevant "
             f"excerpts but LLM generation unavailable (no API keys configured)."
         ), {}
@@ -0,0 +1,365 @@
+"""Chat thread fan-out for ``/chat/ws`` subscribers.
+
+Every WebSocket subscribed to a thread gets a ``_Connection`` with a
+bounded send queue drained by its own sender task, so a broadcast never
+awaits a socket: it enqueues and returns.  A connection whose queue is
+full (or whose send stalls past ``CHAT_WS_SEND_TIMEOUT``) is a slow
+consumer and is disconnected with close code 1013 instead of buffering
+without bound.  All outbound frames for a socket, including pong/ack
+replies, go through its queue so sends are never interleaved.
+
+Backends:
+
+- ``InMemoryBroadcastBus`` — delivers to sockets in this process only.
+- ``RedisBroadcastBus`` — delivers locally, then publishes the envelope
+  on ``chat:thread:<id>``; a listener task delivers envelopes from other
+  workers/dynos to local sockets (messages tagged with this process's
+  ``node_id`` are skipped).  The listener subscribes to a thread's channel
+  when its first local socket attaches and unsubscribes when the last one
+  leaves, so a worker only receives traffic for threads it serves.  If
+  Redis is unreachable it keeps working as the in-memory bus.
+
+``chat_bus`` is chosen by ``CHAT_BROADCAST_BACKEND`` (``auto`` | ``memory``
+| ``redis``; ``auto`` uses Redis when ``REDIS_URL`` is set and the
+``redis`` package is installed).  Counters are in ``chat_bus.stats`` and
+on ``/api/metrics``.
+
+Tuning (environment):
+
+- ``CHAT_WS_SEND_QUEUE`` (256) — frames buffered per connection
+- ``CHAT_WS_SEND_TIMEOUT`` (10) — seconds one frame may take to send
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Any, Dict, Optional, Set
+
+from fastapi import WebSocket
+
+log = logging.getLogger(__name__)
+
+_SEND_QUEUE_SIZE = max(1, int(os.getenv("CHAT_WS_SEND_QUEUE", "256")))
+_SEND_TIMEOUT_SECONDS = float(os.getenv("CHAT_WS_SEND_TIMEOUT", "10"))
+_CHANNEL_PREFIX = "chat:thread:"
+_SLOW_CONSUMER_CLOSE_CODE = 1013  # "try again later"
+_RECONNECT_DELAY_SECONDS = 1.0
+
+
+class _Connection:
+    """One subscribed WebSocket with a bounded outbound queue."""
+
+    def __init__(self, bus: "InMemoryBroadcastBus", thread_id: str, websocket: WebSocket) -> None:
+        self.bus = bus
+        self.thread_id = thread_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=bus.queue_size)
+        self.closed = False
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    def offer(self, envelope: Dict[str, Any]) -> bool:
+        """Queue ``envelope`` without waiting; False when the queue is full."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(envelope)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def send(self, envelope: Dict[str, Any]) -> None:
+        """Queue a direct reply to this socket (pong, ack, errors)."""
+        if not self.offer(envelope) and not self.closed:
+            self.bus._evict(self, reason="slow_consumer")
+
+    async def _drain(self) -> None:
+        try:
+            while True:
+                envelope = await self.queue.get()
+                await asyncio.wait_for(
+                    self.websocket.send_json(envelope), timeout=self.bus.send_timeout
+                )
+                self.bus._counters["delivered"] += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self.bus._evict(self, reason="slow_consumer")
+        except Exception:  # noqa: BLE001 — socket already gone
+            self.bus._counters["send_errors"] += 1
+            self.bus._evict(self, reason="send_error")
+
+    def stop(self) -> None:
+        self.closed = True
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+
+class InMemoryBroadcastBus:
+    """Per-process registry of thread subscribers with bounded fan-out."""
+
+    backend = "memory"
+
+    def __init__(
+        self,
+        *,
+        queue_size: int = _SEND_QUEUE_SIZE,
+        send_timeout: float = _SEND_TIMEOUT_SECONDS,
+    ) -> None:
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.node_id = uuid.uuid4().hex
+        self._threads: Dict[str, Set[_Connection]] = {}
+        self._counters: Dict[str, int] = {
+            "published": 0,
+            "delivered": 0,
+            "dropped": 0,
+            "slow_consumer_disconnects": 0,
+            "send_errors": 0,
+            "remote_received": 0,
+            "publish_errors": 0,
+        }
+
+    async def start(self) -> None:
+        """Start background work (none for the in-memory bus)."""
+
+    async def stop(self) -> None:
+        """Stop background work and drop every connection."""
+        for connections in list(self._threads.values()):
+            for conn in list(connections):
+                conn.stop()
+        self._threads.clear()
+
+    async def subscribe(self, thread_id: str, websocket: WebSocket) -> _Connection:
+        """Register an accepted WebSocket for ``thread_id`` broadcasts."""
+        conn = _Connection(self, thread_id, websocket)
+        conn.start()
+        connections = self._threads.setdefault(thread_id, set())
+        connections.add(conn)
+        if len(connections) == 1:
+            await self._thread_active(thread_id)
+        return conn
+
+    async def unsubscribe(self, conn: _Connection) -> None:
+        conn.stop()
+        self._discard(conn)
+
+    async def publish(self, thread_id: str, envelope: Dict[str, Any]) -> None:
+        """Fan ``envelope`` out to every subscriber of ``thread_id``."""
+        self._counters["published"] += 1
+        self._deliver_local(thread_id, envelope)
+
+    def _deliver_local(self, thread_id: str, envelope: Dict[str, Any]) -> None:
+        for conn in list(self._threads.get(thread_id, ())):
+            if not conn.offer(envelope):
+                self._counters["dropped"] += 1
+                self._evict(conn, reason="slow_consumer")
+
+    def _discard(self, conn: _Connection) -> None:
+        connections = self._threads.get(conn.thread_id)
+        if connections is None:
+            return
+        connections.discard(conn)
+        if not connections:
+            del self._threads[conn.thread_id]
+            self._thread_idle(conn.thread_id)
+
+    async def _thread_active(self, thread_id: str) -> None:
+        """Hook: ``thread_id`` gained its first local subscriber."""
+
+    def _thread_idle(self, thread_id: str) -> None:
+        """Hook: ``thread_id`` lost its last local subscriber."""
+
+    def _evict(self, conn: _Connection, *, reason: str) -> None:
+        if conn.closed:
+            return
+        conn.stop()
+        self._discard(conn)
+        if reason == "slow_consumer":
+            self._counters["slow_consumer_disconnects"] += 1
+            log.warning("Disconnecting slow WS consumer on thread=%s", conn.thread_id)
+
+            async def _close() -> None:
+                try:
+                    await conn.websocket.close(code=_SLOW_CONSUMER_CLOSE_CODE)
+                except Exception:  # noqa: BLE001
+                    pass
+
+            asyncio.get_running_loop().create_task(_close())
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Fan-out counters for monitoring."""
+        return {
+            "backend": self.backend,
+            "threads": len(self._threads),
+            "connections": sum(len(c) for c in self._threads.values()),
+            "queued": sum(c.queue.qsize() for s in self._threads.values() for c in s),
+            **self._counters,
+        }
+
+
+class RedisBroadcastBus(InMemoryBroadcastBus):
+    """In-memory fan-out plus Redis pub/sub between processes."""
+
+    backend = "redis"
+
+    def __init__(self, redis_url: str = "", *, client: Any = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._redis_url = redis_url
+        self._client = client
+        self._listener: Optional[asyncio.Task[None]] = None
+        self._connected = False
+        self._pubsub: Any = None
+        # Thread ids whose channel the current pubsub connection is subscribed to.
+        self._channels: Set[str] = set()
+        self._channel_lock = asyncio.Lock()
+
+    def _redis(self) -> Any:
+        if self._client is None:
+            import redis.asyncio as aioredis  # type: ignore
+
+            self._client = aioredis.from_url(self._redis_url, decode_responses=True)
+        return self._client
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._channel_lock = asyncio.Lock()  # bound to the serving loop
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):  # noqa: BLE001
+                pass
+            self._listener = None
+        await super().stop()
+        closer = getattr(self._client, "aclose", None)
+        if closer is not None and self._redis_url:
+            try:
+                await closer()
+            except Exception:  # noqa: BLE001
+                pass
+
+    async def publish(self, thread_id: str, envelope: Dict[str, Any]) -> None:
+        await super().publish(thread_id, envelope)
+        message = json.dumps(
+            {"origin": self.node_id, "thread_id": thread_id, "envelope": envelope}
+        )
+        try:
+            await self._redis().publish(f"{_CHANNEL_PREFIX}{thread_id}", message)
+        except Exception as exc:  # noqa: BLE001
+            self._counters["publish_errors"] += 1
+            log.warning("Chat broadcast publish to Redis failed: %s", exc)
+
+    async def _thread_active(self, thread_id: str) -> None:
+        await self._sync_channel(thread_id)
+
+    def _thread_idle(self, thread_id: str) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(self._sync_channel(thread_id))
+
+    async def _sync_channel(self, thread_id: str) -> None:
+        """Subscribe or unsubscribe ``thread_id``'s channel to match local sockets.
+
+        Serialised and re-checked under a lock, so a thread that is left and
+        re-joined in quick succession ends up subscribed.
+        """
+        async with self._channel_lock:
+            pubsub = self._pubsub
+            if pubsub is None:
+                return  # the listener subscribes every active thread on connect
+            wanted = thread_id in self._threads
+            if wanted == (thread_id in self._channels):
+                return
+            channel = f"{_CHANNEL_PREFIX}{thread_id}"
+            try:
+                if wanted:
+                    await pubsub.subscribe(channel)
+                    self._channels.add(thread_id)
+                else:
+                    await pubsub.unsubscribe(channel)
+                    self._channels.discard(thread_id)
+            except Exception as exc:  # noqa: BLE001
+                log.warning("Chat broadcast Redis (un)subscribe failed: %s", exc)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._redis().pubsub(ignore_subscribe_messages=True)
+                async with self._channel_lock:
+                    # This node's own channel keeps the connection subscribed
+                    # (and ``listen()`` running) while no thread is active.
+                    await pubsub.subscribe(f"chat:node:{self.node_id}")
+                    for thread_id in list(self._threads):
+                        await pubsub.subscribe(f"{_CHANNEL_PREFIX}{thread_id}")
+                    self._channels = set(self._threads)
+                    self._pubsub = pubsub
+                self._connected = True
+                async for message in pubsub.listen():
+                    self._on_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                log.warning("Chat broadcast Redis listener error: %s", exc)
+            finally:
+                self._pubsub = None
+                self._channels = set()
+            self._connected = False
+            await asyncio.sleep(_RECONNECT_DELAY_SECONDS)
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        if message.get("type") not in {"message", "pmessage"}:
+            return
+        try:
+            data = json.loads(message["data"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if data.get("origin") == self.node_id:
+            return
+        self._counters["remote_received"] += 1
+        self._deliver_local(str(data.get("thread_id", "")), data.get("envelope") or {})
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats,
+            "redis_connected": self._connected,
+            "redis_channels": len(self._channels),
+        }
+
+
+def _create_bus() -> InMemoryBroadcastBus:
+    mode = os.getenv("CHAT_BROADCAST_BACKEND", "auto").strip().lower()
+    if mode == "memory":
+        return InMemoryBroadcastBus()
+    try:
+        from backend.src.core.config import settings
+
+        redis_url = settings.redis_url or ""
+    except Exception:  # noqa: BLE001
+        redis_url = os.getenv("REDIS_URL", "")
+    try:
+        import redis.asyncio  # type: ignore  # noqa: F401
+    except Exception:  # noqa: BLE001
+        redis_url = ""
+    if redis_url:
+        return RedisBroadcastBus(redis_url)
+    if mode == "redis":
+        log.warning("CHAT_BROADCAST_BACKEND=redis but Redis is unavailable; using memory")
+    return InMemoryBroadcastBus()
+
+
+# Module-level singleton
+chat_bus = _create_bus()
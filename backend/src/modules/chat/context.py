@@ -0,0 +1,287 @@
+"""Incremental conversation context for chat prompt building.
+
+``ContextWindowCache`` keeps one ``ConversationWindow`` per thread: the
+most recent turns that fit the token budget (consecutive same-role
+events merged, as Anthropic requires alternating roles), plus the turns
+that fell out of it for the summary.  Each build only reads events newer
+than the window's cursor and reuses the token counts stored on
+``ChatEvent.token_count`` at write time, so preparing a prompt costs
+O(new messages) instead of re-reading and re-tokenising the history.
+
+When the thread has a stored abstractive summary (``chat.summary``), the
+window also tracks how many dropped tokens that summary does not cover
+yet (``pending_tokens``), which is what triggers the next summary run.
+
+The database stays the source of truth: a window that is missing (cold
+worker, LRU eviction) is rebuilt from the last ``max_events`` events, and
+events written by other workers are picked up through the cursor query.
+``created_at`` is not a commit order (worker clocks skew, and a row can
+commit after a later-stamped one), so the cursor query re-reads the last
+``CHAT_CONTEXT_LOOKBACK_SECONDS`` (30) and skips ids the window has
+already taken.  An unseen event older than the cursor means the window
+is out of order: it is discarded and rebuilt from the database.  Events
+that become visible more than the lookback after their ``created_at`` are
+still missed until the window is rebuilt (eviction or a cold worker).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+from backend.src.db import models
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+# Number of dropped turns kept for the extractive summary.
+_DROPPED_KEEP = 6
+# Dropped turns required before a summary is prepended.
+_MIN_DROPPED_FOR_SUMMARY = 3
+# How far behind the cursor late-committed events are still picked up.
+_LOOKBACK = timedelta(seconds=float(os.getenv("CHAT_CONTEXT_LOOKBACK_SECONDS", "30")))
+
+# ``(uncovered dropped messages, stored summary) -> summary message text``
+Summariser = Callable[[List[Dict[str, str]], Optional[str]], str]
+
+
+def prompt_role(role: str) -> str:
+    """Map a stored event role onto the user/assistant roles providers accept."""
+    return "assistant" if role == "assistant" else "user"
+
+
+def _after(moment: Optional[datetime], through: Optional[datetime]) -> bool:
+    return through is None or (moment is not None and moment > through)
+
+
+@dataclass
+class _Turn:
+    role: str
+    content: str
+    tokens: int
+    until: Optional[datetime]
+    events: int = 1
+
+
+@dataclass
+class ConversationWindow:
+    """Token-budgeted suffix of one thread's conversation."""
+
+    budget: int
+    max_events: int
+    turns: Deque[_Turn] = field(default_factory=deque)
+    tokens: int = 0
+    events: int = 0
+    dropped: Deque[_Turn] = field(default_factory=lambda: deque(maxlen=_DROPPED_KEEP))
+    dropped_count: int = 0
+    summary_through: Optional[datetime] = None
+    pending_tokens: int = 0
+    cursor: Optional[datetime] = None
+    # Ids taken with ``created_at`` inside the lookback, oldest first.
+    recent_ids: "OrderedDict[str, datetime]" = field(default_factory=OrderedDict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def append(self, event: models.ChatEvent, *, tokens: int) -> None:
+        """Add ``event`` to the window and evict turns that no longer fit."""
+        role = prompt_role(event.role)
+        if self.turns and self.turns[-1].role == role:
+            last = self.turns[-1]
+            last.content += "\n\n" + event.content
+            last.tokens += tokens
+            last.until = event.created_at
+            last.events += 1
+        else:
+            self.turns.append(
+                _Turn(
+                    role=role,
+                    content=event.content,
+                    tokens=tokens,
+                    until=event.created_at,
+                )
+            )
+        self.tokens += tokens
+        self.events += 1
+
+        if self.cursor is None or event.created_at > self.cursor:
+            self.cursor = event.created_at
+        self.recent_ids[event.id] = event.created_at
+        horizon = self.cursor - _LOOKBACK
+        while self.recent_ids:
+            oldest_id, oldest_at = next(iter(self.recent_ids.items()))
+            if oldest_at >= horizon:
+                break
+            del self.recent_ids[oldest_id]
+
+        while len(self.turns) > 1 and (
+            self.tokens > self.budget or self.events > self.max_events
+        ):
+            turn = self.turns.popleft()
+            self.tokens -= turn.tokens
+            self.events -= turn.events
+            self.dropped.append(turn)
+            self.dropped_count += 1
+            if _after(turn.until, self.summary_through):
+                self.pending_tokens += turn.tokens
+
+    def reset(self) -> None:
+        """Forget every turn so the next build reloads from the database."""
+        self.turns.clear()
+        self.tokens = 0
+        self.events = 0
+        self.dropped.clear()
+        self.dropped_count = 0
+        self.pending_tokens = 0
+        self.cursor = None
+        self.recent_ids = OrderedDict()
+
+    def set_summary_through(self, through: Optional[datetime]) -> None:
+        """Record how far the thread's stored summary reaches."""
+        if through == self.summary_through:
+            return
+        self.summary_through = through
+        self.pending_tokens = sum(
+            turn.tokens for turn in self.dropped if _after(turn.until, through)
+        )
+
+    def messages(
+        self, summarise: Summariser, *, summary: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """Return fresh message dicts (callers may mutate them)."""
+        selected = [{"role": t.role, "content": t.content} for t in self.turns]
+        if summary or self.dropped_count >= _MIN_DROPPED_FOR_SUMMARY:
+            uncovered = [
+                {"role": t.role, "content": t.content}
+                for t in self.dropped
+                if _after(t.until, self.summary_through)
+            ]
+            text = summarise(uncovered, summary)
+            if text:
+                selected.insert(0, {"role": "user", "content": text})
+        return selected
+
+
+class ContextWindowCache:
+    """LRU of ``ConversationWindow`` objects keyed by thread id."""
+
+    def __init__(self, *, max_threads: int = 512) -> None:
+        self.max_threads = max_threads
+        self._windows: "OrderedDict[str, ConversationWindow]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "cold_builds": 0,
+            "incremental_builds": 0,
+            "events_loaded": 0,
+            "tokens_computed": 0,
+            "late_rebuilds": 0,
+        }
+
+    def messages(
+        self,
+        db: Session,
+        *,
+        thread_id: str,
+        budget: int,
+        max_events: int,
+        estimate: Callable[[str], int],
+        summarise: Summariser,
+        summary: Optional[str] = None,
+        summary_through: Optional[datetime] = None,
+    ) -> List[Dict[str, str]]:
+        """Bring the thread's window up to date and return its prompt messages.
+
+        ``summary``/``summary_through`` are the thread's stored abstractive
+        summary and the ``created_at`` of the last event it covers.
+        """
+        with self._lock:
+            window = self._windows.get(thread_id)
+            if window is not None:
+                self._windows.move_to_end(thread_id)
+            else:
+                window = ConversationWindow(budget=budget, max_events=max_events)
+                self._windows[thread_id] = window
+                while len(self._windows) > self.max_threads:
+                    self._windows.popitem(last=False)
+
+        with window.lock:
+            window.set_summary_through(summary_through)
+            events: List[models.ChatEvent] = []
+            if window.cursor is not None:
+                self._counters["incremental_builds"] += 1
+                events = _events_since(
+                    db,
+                    thread_id=thread_id,
+                    since=window.cursor - _LOOKBACK,
+                    seen=window.recent_ids,
+                )
+                if events and events[0].created_at < window.cursor:
+                    # Late commit behind the cursor: turns would be out of order.
+                    self._counters["late_rebuilds"] += 1
+                    window.reset()
+            if window.cursor is None:
+                self._counters["cold_builds"] += 1
+                events = _recent_events(db, thread_id=thread_id, limit=max_events)
+            self._counters["events_loaded"] += len(events)
+            for event in events:
+                tokens = event.token_count
+                if tokens is None:
+                    tokens = estimate(event.content)
+                    self._counters["tokens_computed"] += 1
+                window.append(event, tokens=tokens)
+            return window.messages(summarise, summary=summary)
+
+    def pending_tokens(self, thread_id: str) -> int:
+        """Dropped tokens not yet covered by the thread's stored summary."""
+        with self._lock:
+            window = self._windows.get(thread_id)
+        return window.pending_tokens if window is not None else 0
+
+    def forget(self, thread_id: str) -> None:
+        with self._lock:
+            self._windows.pop(thread_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._windows.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring."""
+        with self._lock:
+            threads = len(self._windows)
+        return {"threads": threads, **self._counters}
+
+
+def _recent_events(
+    db: Session, *, thread_id: str, limit: int
+) -> List[models.ChatEvent]:
+    stmt = (
+        select(models.ChatEvent)
+        .where(models.ChatEvent.thread_id == thread_id)
+        .order_by(models.ChatEvent.created_at.desc())
+        .limit(limit)
+    )
+    return list(reversed(db.scalars(stmt).all()))
+
+
+def _events_since(
+    db: Session, *, thread_id: str, since: datetime, seen: Iterable[str]
+) -> List[models.ChatEvent]:
+    # ``>=`` plus the ids already taken since ``since``: timestamps are not
+    # unique (SQLite stores whole seconds) and can commit out of order.
+    stmt = (
+        select(models.ChatEvent)
+        .where(
+            models.ChatEvent.thread_id == thread_id,
+            models.ChatEvent.created_at >= since,
+        )
+        .order_by(models.ChatEvent.created_at.asc())
+    )
+    seen_ids = set(seen)
+    return [event for event in db.scalars(stmt).all() if event.id not in seen_ids]
+
+
+# Module-level singleton
+context_windows = ContextWindowCache()
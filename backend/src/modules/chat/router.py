@@ -1,4 +1,4 @@
-"""Chat module router — thread CRUD, event messaging, and WebSocket."""
+"""Chat module router — thread CRUD, event messaging, SSE streaming and WebSocket."""
 
 from __future__ import annotations
 
@@ -6,7 +6,7 @@ import asyncio
 import json
 import logging
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
 from fastapi import (
     APIRouter,
@@ -16,6 +16,7 @@ from fastapi import (
     WebSocket,
     WebSocketDisconnect,
 )
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from backend.src.db import models
@@ -24,26 +25,15 @@ from backend.src.modules.auth.deps import get_current_user
 from backend.src.modules.payments.enforcement import enforce_execution_limit, enforce_platform_budget, enforce_user_budget
 
 from . import schemas, service
+from .broadcast import chat_bus
 
 log = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-# ── In-memory WebSocket registry (per-thread) ────────────────────────────────
-_ws_connections: dict[str, set[WebSocket]] = {}
-
-
-def _broadcast_to_thread(thread_id: str, envelope: dict[str, Any]) -> None:
-    """Queue a broadcast to all WS clients subscribed to a thread."""
-    sockets = _ws_connections.get(thread_id, set())
-    dead: list[WebSocket] = []
-    for ws in sockets:
-        try:
-            asyncio.get_event_loop().create_task(ws.send_json(envelope))
-        except Exception:  # noqa: BLE001
-            dead.append(ws)
-    for ws in dead:
-        sockets.discard(ws)
+async def _broadcast_to_thread(thread_id: str, envelope: dict[str, Any]) -> None:
+    """Publish an envelope to every WS client subscribed to a thread (any worker)."""
+    await chat_bus.publish(thread_id, envelope)
 
 
 def _thread_to_response(thread: models.ChatThread) -> dict[str, Any]:
@@ -162,15 +152,90 @@ async def create_event(
     _budget=Depends(enforce_platform_budget),
     _user_budget=Depends(enforce_user_budget),
 ):
-    """Send a message to a thread and get an AI response."""
+    """Send a message to a thread and get an AI response.
+
+    The response is generated with provider streaming; deltas are pushed to
+    ``/chat/ws`` subscribers as ``chat.delta`` envelopes while this request
+    waits for the persisted event.
+    """
+    thread = service.get_thread(db, user=user, thread_id=thread_id)
+    if thread is None:
+        raise HTTPException(status_code=404, detail="Thread not found")
+
+    user_event = await _persist_user_event(db, thread=thread, payload=payload)
+
+    # Generate AI response (only for user messages)
+    if payload.role == "user":
+        ai_event: models.ChatEvent | None = None
+        async for chunk in _stream_and_broadcast(thread, content=payload.content):
+            if chunk["type"] == "done":
+                ai_event = chunk["event"]
+        if ai_event is None:
+            raise HTTPException(status_code=502, detail="AI response was not completed")
+
+        # Return the AI response (the frontend already has the user message optimistically)
+        return schemas.EventResponse(**_event_to_response(ai_event))
+
+    # For non-user roles (system), just return the event
+    return schemas.EventResponse(**_event_to_response(user_event))
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/threads/{thread_id}/events/stream")
+async def create_event_stream(
+    thread_id: str,
+    payload: schemas.EventCreate,
+    user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_session),
+    _quota=Depends(enforce_execution_limit),
+    _budget=Depends(enforce_platform_budget),
+    _user_budget=Depends(enforce_user_budget),
+):
+    """Send a message and stream the AI response as Server-Sent Events.
+
+    Emits ``chat.event`` for the stored user message, ``chat.delta`` for
+    each generated chunk and a final ``chat.event`` with the persisted
+    assistant event.  The same deltas are broadcast on ``/chat/ws``.
+    """
     thread = service.get_thread(db, user=user, thread_id=thread_id)
     if thread is None:
         raise HTTPException(status_code=404, detail="Thread not found")
 
-    # 1. Persist the user's message
+    user_event = await _persist_user_event(db, thread=thread, payload=payload)
+    user_event_body = _event_to_response(user_event)
+
+    async def _events():
+        yield _sse("chat.event", {"event": user_event_body})
+        if payload.role != "user":
+            return
+        # Generation opens its own short sessions, so it is unaffected by the
+        # request-scoped session closing before the body is streamed.
+        async for chunk in _stream_and_broadcast(thread, content=payload.content):
+            if chunk["type"] == "delta":
+                yield _sse("chat.delta", {"thread_id": thread_id, "delta": chunk["text"]})
+            else:
+                yield _sse("chat.event", {"event": _event_to_response(chunk["event"])})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _persist_user_event(
+    db: Session,
+    *,
+    thread: models.ChatThread,
+    payload: schemas.EventCreate,
+) -> models.ChatEvent:
+    """Store the incoming message, broadcast it and touch the thread."""
     user_event = service.create_event(
         db,
-        thread_id=thread_id,
+        thread_id=thread.id,
         role=payload.role,
         content=payload.content,
         tool_name=payload.tool_name,
@@ -178,42 +243,86 @@ async def create_event(
     )
 
     # Broadcast user message via WS
-    _broadcast_to_thread(thread_id, {
+    await _broadcast_to_thread(thread.id, {
         "type": "chat.event",
         "event": _event_to_response(user_event),
     })
 
-    # 2. Generate AI response (only for user messages)
     if payload.role == "user":
         # Update thread timestamp
         thread.updated_at = datetime.now(timezone.utc)
         db.add(thread)
         db.commit()
+    return user_event
 
-        # Run AI generation (synchronous Anthropic call, wrapped for async)
-        ai_event = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: service.generate_ai_response(db, thread=thread, user_message=payload.content),
-        )
-
-        # Broadcast AI response via WS
-        _broadcast_to_thread(thread_id, {
-            "type": "chat.event",
-            "event": _event_to_response(ai_event),
-        })
-
-        # Broadcast thread update
-        db.refresh(thread)
-        _broadcast_to_thread(thread_id, {
-            "type": "thread.updated",
-            "thread": _thread_to_response(thread),
-        })
 
-        # Return the AI response (the frontend already has the user message optimistically)
-        return schemas.EventResponse(**_event_to_response(ai_event))
+# Generations outlive the request that started them; strong references keep
+# the detached tasks alive until they finish.
+_generations: set[asyncio.Task] = set()
+_GENERATION_END = object()
 
-    # For non-user roles (system), just return the event
-    return schemas.EventResponse(**_event_to_response(user_event))
+
+async def _stream_and_broadcast(
+    thread: models.ChatThread,
+    *,
+    content: str,
+) -> AsyncIterator[dict[str, Any]]:
+    """Relay ``service.stream_ai_response`` chunks, mirroring them to WS subscribers.
+
+    Generation runs in a task detached from the caller, which only observes
+    it.  A client that disconnects mid-stream cancels the observer, not the
+    generation, so the assistant event and its usage (already billed by the
+    provider) are still stored and broadcast.
+    """
+    chunks: asyncio.Queue = asyncio.Queue()
+    task = asyncio.get_running_loop().create_task(
+        _generate_and_broadcast(thread, content=content, chunks=chunks)
+    )
+    _generations.add(task)
+    task.add_done_callback(_generations.discard)
+    while True:
+        chunk = await chunks.get()
+        if chunk is _GENERATION_END:
+            return
+        if isinstance(chunk, Exception):
+            raise chunk
+        yield chunk
+
+
+async def _generate_and_broadcast(
+    thread: models.ChatThread,
+    *,
+    content: str,
+    chunks: asyncio.Queue,
+) -> None:
+    thread_id = thread.id
+    thread_body = _thread_to_response(thread)
+    try:
+        async for chunk in service.stream_ai_response(thread, user_message=content):
+            if chunk["type"] == "delta":
+                await _broadcast_to_thread(thread_id, {
+                    "type": "chat.delta",
+                    "thread_id": thread_id,
+                    "delta": chunk["text"],
+                })
+            else:
+                # Broadcast AI response and thread update via WS
+                await _broadcast_to_thread(thread_id, {
+                    "type": "chat.event",
+                    "event": _event_to_response(chunk["event"]),
+                })
+                await _broadcast_to_thread(thread_id, {
+                    "type": "thread.updated",
+                    "thread": thread_body,
+                })
+            chunks.put_nowait(chunk)
+    except Exception as exc:
+        # Handed to the observer (if it is still listening) instead of being
+        # left on a task nobody awaits.
+        log.exception("Chat generation failed for thread %s", thread_id)
+        chunks.put_nowait(exc)
+    finally:
+        chunks.put_nowait(_GENERATION_END)
 
 
 # ── WebSocket endpoint ────────────────────────────────────────────────────────
@@ -228,30 +337,28 @@ async def chat_websocket(
     WebSocket endpoint for real-time chat events.
     Clients connect with ?thread_id=<id>&token=<jwt>.
     Receives ping/pong and chat messages; broadcasts events to all
-    subscribers on the same thread.
+    subscribers on the same thread, across workers when the Redis bus is on.
     """
     await websocket.accept()
 
-    # Register connection
-    if thread_id not in _ws_connections:
-        _ws_connections[thread_id] = set()
-    _ws_connections[thread_id].add(websocket)
+    # Register connection; all outbound frames go through its bounded queue
+    conn = await chat_bus.subscribe(thread_id, websocket)
 
     log.info("WS connected: thread=%s", thread_id)
 
     try:
-        while True:
+        while not conn.closed:
             raw = await websocket.receive_text()
             try:
                 data = json.loads(raw)
             except json.JSONDecodeError:
-                await websocket.send_json({"type": "error", "message": "Invalid JSON"})
+                conn.send({"type": "error", "message": "Invalid JSON"})
                 continue
 
             msg_type = data.get("type", "")
 
             if msg_type == "ping":
-                await websocket.send_json({
+                conn.send({
                     "type": "pong",
                     "timestamp": data.get("timestamp", str(int(
                         datetime.now(timezone.utc).timestamp() * 1000
@@ -259,12 +366,12 @@ async def chat_websocket(
                 })
             elif msg_type == "chat.message":
                 # Client sent a message via WS — acknowledge receipt
-                await websocket.send_json({
+                conn.send({
                     "type": "chat.ack",
                     "client_id": data.get("client_id", ""),
                 })
             else:
-                await websocket.send_json({
+                conn.send({
                     "type": "error",
                     "message": f"Unknown message type: {msg_type}",
                 })
@@ -274,6 +381,4 @@ async def chat_websocket(
     except Exception as exc:  # noqa: BLE001
         log.warning("WS error thread=%s: %s", thread_id, exc)
     finally:
-        _ws_connections.get(thread_id, set()).discard(websocket)
-        if thread_id in _ws_connections and not _ws_connections[thread_id]:
-            del _ws_connections[thread_id]
+        await chat_bus.unsubscribe(conn)
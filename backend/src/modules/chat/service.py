@@ -2,19 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import time
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Callable, Optional, Sequence, TypeVar
 
 from backend.src.core.config import get_settings
 from backend.src.db import models
+from backend.src.db.session import SessionLocal
 from backend.src.modules.ai_router.bedrock import (
-    invoke_bedrock_text,
+    astream_bedrock_text,
     is_bedrock_enabled,
 )
+from backend.src.modules.ai_router.clients import provider_clients
+from backend.src.modules.ai_router.health import TTFT, provider_health
+from backend.src.modules.ai_router.hedging import Discarded, discarded_usage, hedged_call
 from backend.src.modules.ai_router.strategy import resolve_available_provider_order
+from backend.src.modules.chat.context import context_windows
+from backend.src.modules.chat.summary import thread_summariser
 from backend.src.modules.usage.input_guard import validate_llm_input
 from backend.src.modules.usage.model_router import select_model
 from backend.src.modules.usage.token_counter import count_tokens as _count_tokens
@@ -162,6 +171,7 @@ def create_event(
         content=content,
         tool_name=tool_name,
         event_metadata=event_metadata,
+        token_count=_estimate_tokens(content),
     )
     db.add(event)
     db.commit()
@@ -176,6 +186,11 @@ _CHARS_PER_TOKEN = 4
 # Max tokens to allocate for conversation context (leaves room for system
 # prompt + response within the model's context window).
 _MAX_CONTEXT_TOKENS = 6000
+# Tokens reserved for the summary of messages outside the window.
+_SUMMARY_BUDGET = 200
+_WINDOW_TOKENS = _MAX_CONTEXT_TOKENS - _SUMMARY_BUDGET
+# Maximum events kept verbatim in the prompt window.
+_WINDOW_EVENTS = 50
 # Maximum characters allowed in a single user message before truncation.
 MAX_INPUT_CHARS = 8000
 
@@ -188,67 +203,46 @@ def _estimate_tokens(text: str) -> int:
 def _build_messages_for_ai(
     db: Session,
     *,
-    thread: models.ChatThread,
-    limit: int = 50,
+    thread: models.ChatThread | _ThreadRef,
+    limit: int = _WINDOW_EVENTS,
 ) -> list[dict[str, str]]:
-    """Retrieve recent events and map them to Anthropic message format.
-
-    Applies a sliding window that keeps the most recent messages up to
-    ``_MAX_CONTEXT_TOKENS`` estimated tokens.  Messages that fall outside
-    the window are compressed into a short summary prepended as context,
-    keeping total token usage bounded while preserving key decisions and
-    facts from earlier in the conversation.
+    """Return the thread's recent turns in Anthropic message format.
+
+    Keeps the most recent messages up to ``_MAX_CONTEXT_TOKENS`` estimated
+    tokens (and at most ``limit`` events); messages that fall outside the
+    window are compressed into a short summary prepended as context.  The
+    window is maintained incrementally by ``context.context_windows``, so
+    only events written since the previous build are read, and their
+    stored ``token_count`` is used instead of re-tokenising.  The thread's
+    stored abstractive summary (``chat.summary``), when present, leads the
+    summary message.
     """
-    events = list_events(db, thread_id=thread.id, limit=limit)
-    raw_messages: list[dict[str, str]] = []
-    for event in events:
-        role = event.role
-        # Anthropic only accepts "user" or "assistant"
-        if role in ("system", "tool"):
-            role = "user"
-        elif role not in ("user", "assistant"):
-            role = "user"
-        # Merge consecutive same-role messages
-        if raw_messages and raw_messages[-1]["role"] == role:
-            raw_messages[-1]["content"] += "\n\n" + event.content
-        else:
-            raw_messages.append({"role": role, "content": event.content})
-
-    # ── Token-budgeted sliding window ─────────────────────────────────
-    # Reserve ~200 tokens for the summary prefix.
-    _SUMMARY_BUDGET = 200
-    budget = _MAX_CONTEXT_TOKENS - _SUMMARY_BUDGET
-    selected: list[dict[str, str]] = []
-    split_idx = len(raw_messages)  # index where we stopped including
-
-    for i, msg in enumerate(reversed(raw_messages)):
-        cost = _estimate_tokens(msg["content"])
-        if cost > budget and selected:
-            split_idx = len(raw_messages) - i
-            break
-        budget -= cost
-        selected.append(msg)
-
-    selected.reverse()  # restore chronological order
-
-    # ── Summarise dropped messages ────────────────────────────────────
-    dropped = raw_messages[:split_idx] if split_idx < len(raw_messages) else []
-    if dropped and len(dropped) >= 3:
-        summary = _summarise_dropped_messages(dropped)
-        if summary:
-            # Prepend as a "user" context message so the model has the gist.
-            selected.insert(0, {"role": "user", "content": summary})
-
-    return selected
-
-
-def _summarise_dropped_messages(messages: list[dict[str, str]]) -> str:
-    """Create a lightweight extractive summary of older conversation turns.
-
-    This is NOT an LLM call — it's a fast heuristic extraction that pulls
-    the first sentence of each dropped message.  Keeps cost at zero while
-    still preserving key context.  A future upgrade can use a small model
-    for abstractive summarisation.
+    stored = db.execute(
+        select(models.ChatThread.summary, models.ChatThread.summary_through).where(
+            models.ChatThread.id == thread.id
+        )
+    ).first()
+    return context_windows.messages(
+        db,
+        thread_id=thread.id,
+        budget=_WINDOW_TOKENS,
+        max_events=limit,
+        estimate=_estimate_tokens,
+        summarise=_summarise_dropped_messages,
+        summary=stored.summary if stored else None,
+        summary_through=stored.summary_through if stored else None,
+    )
+
+
+def _summarise_dropped_messages(
+    messages: list[dict[str, str]], summary: Optional[str] = None
+) -> str:
+    """Create the summary message for conversation turns outside the window.
+
+    ``summary`` is the thread's stored abstractive summary (written off the
+    request path by ``chat.summary``); ``messages`` are dropped turns it
+    does not cover yet.  Those are reduced by a fast heuristic extraction
+    that pulls the first sentence of each message — no LLM call here.
     """
     import re
 
@@ -262,33 +256,70 @@ def _summarise_dropped_messages(messages: list[dict[str, str]]) -> str:
         else:
             snippets.append(f"- {msg['role']}: {text[:100]}…")
 
-    if not snippets:
+    body = [summary.strip()] if summary and summary.strip() else []
+    body += snippets
+    if not body:
         return ""
 
     return (
         "[Earlier conversation summary]\n"
-        + "\n".join(snippets)
+        + "\n".join(body)
         + "\n[End summary — recent messages follow]"
     )
 
 
-def generate_ai_response(
+_EMPTY_RESPONSE = "I wasn't able to generate a response. Please try again."
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True)
+class _ThreadRef:
+    """Detached thread attributes, safe to hand to worker-thread sessions."""
+
+    id: str
+    placement: str
+    user_id: str
+
+
+async def _run_db(work: Callable[[Session], _T]) -> _T:
+    """Run ``work`` in its own short-lived session on a worker thread."""
+
+    def _call() -> _T:
+        with SessionLocal() as db:
+            return work(db)
+
+    return await asyncio.to_thread(_call)
+
+
+@dataclass
+class _GenerationPlan:
+    """Everything a provider call needs, resolved once per response."""
+
+    system_prompt: str
+    messages: list[dict[str, str]]
+    provider_order: list[str]
+    anthropic_key: str
+    openai_key: str
+    anthropic_model: str
+    openai_model: str
+    bedrock_model_id: str
+    bedrock_region: str
+    # Older turns are due to be folded into the thread summary.
+    summary_due: bool = False
+
+
+def _plan_generation(
     db: Session,
     *,
-    thread: models.ChatThread,
-    user_message: str,  # noqa: ARG001 — reserved for future prompt augmentation
-) -> models.ChatEvent:
-    """Call configured LLM providers to generate a response and persist it."""
+    thread: _ThreadRef,
+    user_message: str,
+) -> _GenerationPlan:
     settings = get_settings()
     anthropic_key = settings.anthropic_api_key or os.getenv("ANTHROPIC_API_KEY", "")
     openai_key = settings.openai_api_key or os.getenv("OPENAI_API_KEY", "")
     env_model = os.getenv("ANTHROPIC_MODEL")  # explicit override
 
-    # ── Intelligent model routing ─────────────────────────────────
-    # If no explicit model override, route based on prompt complexity.
-    anthropic_model = select_model(user_message, force_model=env_model)
-    openai_model = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
-
     system_prompt = PLACEMENT_SYSTEM_PROMPTS.get(
         thread.placement, DEFAULT_SYSTEM_PROMPT
     )
@@ -311,202 +342,62 @@ def generate_ai_response(
         has_openai=bool(openai_key),
     )
 
-    if not provider_order:
-        log.warning("No AI provider key configured — returning placeholder response")
-        content = (
-            "I'm CapeAI, but my AI backend is not configured yet. "
-            "Please ask your administrator to configure ANTHROPIC_API_KEY and/or OPENAI_API_KEY."
-        )
-        return create_event(
-            db,
-            thread_id=thread.id,
-            role="assistant",
-            content=content,
-            event_metadata={"model": "placeholder", "error": "no_api_key"},
-        )
+    return _GenerationPlan(
+        system_prompt=system_prompt,
+        messages=messages,
+        provider_order=provider_order,
+        anthropic_key=anthropic_key,
+        openai_key=openai_key,
+        # ── Intelligent model routing ─────────────────────────────
+        # If no explicit model override, route based on prompt complexity.
+        anthropic_model=select_model(user_message, force_model=env_model),
+        openai_model=os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini"),
+        bedrock_model_id=os.getenv("CHAT_BEDROCK_MODEL_ID")
+        or settings.ai_bedrock_model_id,
+        bedrock_region=settings.ai_bedrock_region,
+        summary_due=thread_summariser.is_due(
+            context_windows.pending_tokens(thread.id), api_key=anthropic_key
+        ),
+    )
 
-    last_error: Exception | None = None
 
-    for provider in provider_order:
-        if provider == "bedrock":
-            try:
-                conversation = "\n\n".join(
-                    f"{msg['role']}: {msg['content']}" for msg in messages
-                )
-                user_prompt = (
-                    "Conversation context follows. Respond as the assistant to the "
-                    "latest user intent.\n\n"
-                    f"{conversation}"
-                )
-                bedrock = invoke_bedrock_text(
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    model_id=os.getenv("CHAT_BEDROCK_MODEL_ID")
-                    or settings.ai_bedrock_model_id,
-                    region=settings.ai_bedrock_region,
-                )
-                content = (
-                    bedrock.text
-                    if bedrock.text
-                    else "I wasn't able to generate a response. Please try again."
-                )
+def _bedrock_user_prompt(messages: list[dict[str, str]]) -> str:
+    conversation = "\n\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+    return (
+        "Conversation context follows. Respond as the assistant to the "
+        "latest user intent.\n\n"
+        f"{conversation}"
+    )
 
-                event = create_event(
-                    db,
-                    thread_id=thread.id,
-                    role="assistant",
-                    content=content,
-                    event_metadata={
-                        "provider": "bedrock",
-                        "model": bedrock.model_id,
-                        "region": bedrock.region,
-                        "usage": {
-                            "input_tokens": bedrock.input_tokens,
-                            "output_tokens": bedrock.output_tokens,
-                            "estimated_usd": bedrock.estimated_usd,
-                            "latency_ms": bedrock.latency_ms,
-                        },
-                    },
-                )
 
-                try:
-                    from backend.src.modules.usage import service as usage_svc
-
-                    usage_svc.record_usage(
-                        db,
-                        user_id=thread.user_id,
-                        event_type="chat",
-                        model=bedrock.model_id,
-                        tokens_in=bedrock.input_tokens,
-                        tokens_out=bedrock.output_tokens,
-                        thread_id=thread.id,
-                    )
-                    db.commit()
-                except Exception:  # noqa: BLE001
-                    log.warning("Failed to record usage log", exc_info=True)
-
-                return event
-            except Exception as exc:  # noqa: BLE001
-                last_error = exc
-                log.warning("Bedrock API call failed, trying next provider: %s", exc)
-                continue
-
-        if provider == "anthropic" and anthropic_key:
-            try:
-                import anthropic
-
-                client = anthropic.Anthropic(api_key=anthropic_key)
-                response = client.messages.create(
-                    model=anthropic_model,
-                    max_tokens=2048,
-                    system=[
-                        {
-                            "type": "text",
-                            "text": system_prompt,
-                            "cache_control": {"type": "ephemeral"},
-                        }
-                    ],
-                    messages=messages,
-                )
-                content = ""
-                for block in response.content:
-                    if hasattr(block, "text"):
-                        content += block.text
-                if not content:
-                    content = "I wasn't able to generate a response. Please try again."
-
-                event = create_event(
-                    db,
-                    thread_id=thread.id,
-                    role="assistant",
-                    content=content,
-                    event_metadata={
-                        "provider": "anthropic",
-                        "model": response.model,
-                        "usage": {
-                            "input_tokens": response.usage.input_tokens,
-                            "output_tokens": response.usage.output_tokens,
-                        },
-                    },
-                )
+def _anthropic_system(system_prompt: str) -> list[dict[str, Any]]:
+    return [
+        {
+            "type": "text",
+            "text": system_prompt,
+            "cache_control": {"type": "ephemeral"},
+        }
+    ]
 
-                try:
-                    from backend.src.modules.usage import service as usage_svc
-
-                    usage_svc.record_usage(
-                        db,
-                        user_id=thread.user_id,
-                        event_type="chat",
-                        model=response.model,
-                        tokens_in=response.usage.input_tokens,
-                        tokens_out=response.usage.output_tokens,
-                        thread_id=thread.id,
-                    )
-                    db.commit()
-                except Exception:  # noqa: BLE001
-                    log.warning("Failed to record usage log", exc_info=True)
-
-                return event
-            except Exception as exc:  # noqa: BLE001
-                last_error = exc
-                log.warning("Anthropic API call failed, trying next provider: %s", exc)
-                continue
-
-        if provider == "openai" and openai_key:
-            try:
-                from openai import OpenAI
-
-                client = OpenAI(api_key=openai_key)
-                response = client.chat.completions.create(
-                    model=openai_model,
-                    max_tokens=2048,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        *messages,
-                    ],
-                )
-                content = response.choices[0].message.content or ""
-                if not content:
-                    content = "I wasn't able to generate a response. Please try again."
-                usage = getattr(response, "usage", None)
-
-                event = create_event(
-                    db,
-                    thread_id=thread.id,
-                    role="assistant",
-                    content=content,
-                    event_metadata={
-                        "provider": "openai",
-                        "model": response.model,
-                        "usage": {
-                            "input_tokens": getattr(usage, "prompt_tokens", 0),
-                            "output_tokens": getattr(usage, "completion_tokens", 0),
-                        },
-                    },
-                )
 
-                try:
-                    from backend.src.modules.usage import service as usage_svc
-
-                    usage_svc.record_usage(
-                        db,
-                        user_id=thread.user_id,
-                        event_type="chat",
-                        model=response.model,
-                        tokens_in=getattr(usage, "prompt_tokens", 0),
-                        tokens_out=getattr(usage, "completion_tokens", 0),
-                        thread_id=thread.id,
-                    )
-                    db.commit()
-                except Exception:  # noqa: BLE001
-                    log.warning("Failed to record usage log", exc_info=True)
-
-                return event
-            except Exception as exc:  # noqa: BLE001
-                last_error = exc
-                log.warning("OpenAI API call failed, trying next provider: %s", exc)
-                continue
+def _create_placeholder_event(db: Session, *, thread: _ThreadRef) -> models.ChatEvent:
+    log.warning("No AI provider key configured — returning placeholder response")
+    content = (
+        "I'm CapeAI, but my AI backend is not configured yet. "
+        "Please ask your administrator to configure ANTHROPIC_API_KEY and/or OPENAI_API_KEY."
+    )
+    return create_event(
+        db,
+        thread_id=thread.id,
+        role="assistant",
+        content=content,
+        event_metadata={"model": "placeholder", "error": "no_api_key"},
+    )
 
+
+def _create_error_event(
+    db: Session, *, thread: _ThreadRef, last_error: Exception | None
+) -> models.ChatEvent:
     error_content = (
         "I encountered an error generating a response. " "Please try again in a moment."
     )
@@ -519,3 +410,354 @@ def generate_ai_response(
             "error": str(last_error) if last_error else "provider_unavailable"
         },
     )
+
+
+def _persist_ai_response(
+    db: Session,
+    *,
+    thread: _ThreadRef,
+    provider: str,
+    content: str,
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    usage_extra: Optional[dict[str, Any]] = None,
+    metadata_extra: Optional[dict[str, Any]] = None,
+    discarded: Sequence[Discarded] = (),
+) -> models.ChatEvent:
+    """Persist the assistant ``ChatEvent`` and record usage for it (and for
+    any provider call a hedge discarded)."""
+    event_metadata: dict[str, Any] = {"provider": provider, "model": model}
+    event_metadata.update(metadata_extra or {})
+    event_metadata["usage"] = {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        **(usage_extra or {}),
+    }
+    event = create_event(
+        db,
+        thread_id=thread.id,
+        role="assistant",
+        content=content or _EMPTY_RESPONSE,
+        event_metadata=event_metadata,
+    )
+
+    try:
+        from backend.src.modules.usage import service as usage_svc
+
+        usage_svc.record_usage(
+            db,
+            user_id=thread.user_id,
+            event_type="chat",
+            model=model,
+            tokens_in=input_tokens,
+            tokens_out=output_tokens,
+            thread_id=thread.id,
+        )
+        for loser in discarded:
+            usage_svc.record_usage(
+                db,
+                user_id=thread.user_id,
+                event_type="chat",
+                thread_id=thread.id,
+                **discarded_usage(loser),
+            )
+        db.commit()
+    except Exception:  # noqa: BLE001
+        log.warning("Failed to record usage log", exc_info=True)
+
+    return event
+
+
+# ── Streaming generation ──────────────────────────────────────────────────────
+
+
+async def _stream_bedrock(
+    plan: _GenerationPlan, meta: dict[str, Any]
+) -> AsyncIterator[str]:
+    stream = astream_bedrock_text(
+        system_prompt=plan.system_prompt,
+        user_prompt=_bedrock_user_prompt(plan.messages),
+        model_id=plan.bedrock_model_id,
+        region=plan.bedrock_region,
+    )
+    async for text in stream:
+        yield text
+    result = stream.result
+    if result is not None:
+        meta.update(
+            model=result.model_id,
+            input_tokens=result.input_tokens,
+            output_tokens=result.output_tokens,
+            usage_extra={
+                "estimated_usd": result.estimated_usd,
+                "latency_ms": result.latency_ms,
+            },
+            metadata_extra={"region": result.region},
+        )
+
+
+async def _stream_anthropic(
+    plan: _GenerationPlan, meta: dict[str, Any]
+) -> AsyncIterator[str]:
+    client = provider_clients.anthropic(plan.anthropic_key)
+    async with client.messages.stream(
+        model=plan.anthropic_model,
+        max_tokens=2048,
+        system=_anthropic_system(plan.system_prompt),
+        messages=plan.messages,
+    ) as stream:
+        async for text in stream.text_stream:
+            yield text
+        final = await stream.get_final_message()
+    meta.update(
+        model=final.model,
+        input_tokens=final.usage.input_tokens,
+        output_tokens=final.usage.output_tokens,
+    )
+
+
+async def _stream_openai(
+    plan: _GenerationPlan, meta: dict[str, Any]
+) -> AsyncIterator[str]:
+    client = provider_clients.openai(plan.openai_key)
+    stream = await client.chat.completions.create(
+        model=plan.openai_model,
+        max_tokens=2048,
+        messages=[{"role": "system", "content": plan.system_prompt}, *plan.messages],
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    meta["model"] = plan.openai_model
+    async for chunk in stream:
+        meta["model"] = getattr(chunk, "model", None) or meta["model"]
+        usage = getattr(chunk, "usage", None)
+        if usage is not None:
+            meta["input_tokens"] = getattr(usage, "prompt_tokens", 0)
+            meta["output_tokens"] = getattr(usage, "completion_tokens", 0)
+        for choice in getattr(chunk, "choices", None) or []:
+            text = getattr(choice.delta, "content", None)
+            if text:
+                yield text
+
+
+def _planned_model(plan: _GenerationPlan, provider: str) -> str:
+    return {
+        "bedrock": plan.bedrock_model_id,
+        "anthropic": plan.anthropic_model,
+        "openai": plan.openai_model,
+    }.get(provider, "")
+
+
+def _provider_stream(
+    provider: str, plan: _GenerationPlan, meta: dict[str, Any]
+) -> AsyncIterator[str] | None:
+    if provider == "bedrock":
+        return _stream_bedrock(plan, meta)
+    if provider == "anthropic" and plan.anthropic_key:
+        return _stream_anthropic(plan, meta)
+    if provider == "openai" and plan.openai_key:
+        return _stream_openai(plan, meta)
+    return None
+
+
+def _can_stream(provider: str, plan: _GenerationPlan) -> bool:
+    if provider == "anthropic":
+        return bool(plan.anthropic_key)
+    if provider == "openai":
+        return bool(plan.openai_key)
+    return provider == "bedrock"
+
+
+_STREAM_END = object()
+
+
+@dataclass
+class _OpenedStream:
+    """A provider stream that has produced its first chunk.
+
+    The stream is consumed by ``pump`` (its own task, so a hedged call can
+    be cancelled cleanly) into ``chunks``: text, then ``_STREAM_END`` or
+    the exception that interrupted it.
+    """
+
+    provider: str
+    meta: dict[str, Any]
+    chunks: "asyncio.Queue[Any]"
+    pump: "asyncio.Task[None]"
+    started: float
+    first: Any
+    first_token_ms: int | None
+
+
+async def _open_stream(provider: str, plan: _GenerationPlan) -> _OpenedStream:
+    """Start ``provider``'s stream and wait for its first chunk.
+
+    Raises the provider's error when it fails before the first token.
+    """
+    meta: dict[str, Any] = {}
+    source = _provider_stream(provider, plan, meta)
+    if source is None:
+        raise RuntimeError(f"Provider {provider!r} does not support streaming")
+    chunks: asyncio.Queue[Any] = asyncio.Queue()
+
+    async def _pump() -> None:
+        try:
+            async for text in source:
+                chunks.put_nowait(text)
+        except Exception as exc:  # noqa: BLE001
+            chunks.put_nowait(exc)
+        else:
+            chunks.put_nowait(_STREAM_END)
+
+    started = time.perf_counter()
+    pump = asyncio.create_task(_pump())
+    try:
+        first = await chunks.get()
+    except BaseException:
+        pump.cancel()
+        raise
+    if isinstance(first, Exception):
+        provider_health.record_failure(
+            provider, model=_planned_model(plan, provider), error=first
+        )
+        raise first
+    return _OpenedStream(
+        provider=provider,
+        meta=meta,
+        chunks=chunks,
+        pump=pump,
+        started=started,
+        first=first,
+        first_token_ms=(
+            None
+            if first is _STREAM_END
+            else int((time.perf_counter() - started) * 1000)
+        ),
+    )
+
+
+async def stream_ai_response(
+    thread: models.ChatThread,
+    *,
+    user_message: str,
+) -> AsyncIterator[dict[str, Any]]:
+    """Stream an AI response as it is generated, then persist it.
+
+    Yields ``{"type": "delta", "text": ...}`` for every chunk the provider
+    emits and finally ``{"type": "done", "event": ChatEvent}`` once the
+    assistant event is stored.  A provider that fails before its first
+    token falls through to the next one; a failure mid-stream keeps the
+    partial text and records the error in the event metadata.  With
+    hedging enabled a slow first token also starts the next provider and
+    the first to answer wins (``ai_router.hedging``).
+
+    Provider calls are native async.  Database work (history load, event
+    and usage writes) runs in short sessions of its own on a worker thread,
+    so no session is held, or shared across threads, while waiting on a
+    provider.
+    """
+    ref = _ThreadRef(id=thread.id, placement=thread.placement, user_id=thread.user_id)
+    plan = await _run_db(
+        lambda db: _plan_generation(db, thread=ref, user_message=user_message)
+    )
+    if not plan.provider_order:
+        event = await _run_db(lambda db: _create_placeholder_event(db, thread=ref))
+        yield {"type": "done", "event": event}
+        return
+
+    outcome = await hedged_call(
+        [provider for provider in plan.provider_order if _can_stream(provider, plan)],
+        lambda provider: _open_stream(provider, plan),
+        placement=f"chat:{ref.placement}",
+        model_of=lambda provider: _planned_model(plan, provider),
+        estimate_prompt=lambda: _estimate_tokens(
+            plan.system_prompt + "".join(m["content"] for m in plan.messages)
+        ),
+        latency_kind=TTFT,
+    )
+    for loser in outcome.discarded:
+        if isinstance(loser.result, _OpenedStream):
+            loser.result.pump.cancel()
+    if not outcome.ok:
+        last_error = outcome.error
+        event = await _run_db(
+            lambda db: _create_error_event(db, thread=ref, last_error=last_error)
+        )
+        yield {"type": "done", "event": event}
+        return
+
+    opened = outcome.value
+    provider, meta = opened.provider, opened.meta
+    parts: list[str] = []
+    item = opened.first
+    try:
+        while item is not _STREAM_END:
+            if isinstance(item, Exception):
+                provider_health.record_failure(
+                    provider, model=_planned_model(plan, provider), error=item
+                )
+                log.warning("%s stream interrupted after first token: %s", provider, item)
+                meta.setdefault("metadata_extra", {})["error"] = str(item)
+                break
+            parts.append(item)
+            yield {"type": "delta", "text": item}
+            item = await opened.chunks.get()
+        else:
+            # Time to first token is what a fallback decision would save.
+            provider_health.record_success(
+                provider,
+                model=_planned_model(plan, provider),
+                latency_ms=opened.first_token_ms,
+                kind=TTFT,
+            )
+    finally:
+        opened.pump.cancel()
+
+    usage_extra = dict(meta.get("usage_extra") or {})
+    usage_extra["ttft_ms"] = opened.first_token_ms
+    usage_extra.setdefault(
+        "latency_ms", int((time.perf_counter() - opened.started) * 1000)
+    )
+    metadata_extra = {"streamed": True, **(meta.get("metadata_extra") or {})}
+    if outcome.hedged:
+        metadata_extra["hedge"] = {
+            "winner": provider,
+            "discarded": [loser.provider for loser in outcome.discarded],
+        }
+    response_kwargs = dict(
+        thread=ref,
+        provider=provider,
+        content="".join(parts),
+        model=meta.get("model") or _planned_model(plan, provider),
+        input_tokens=meta.get("input_tokens", 0),
+        output_tokens=meta.get("output_tokens", 0),
+        usage_extra=usage_extra,
+        metadata_extra=metadata_extra,
+        discarded=outcome.discarded,
+    )
+    event = await _run_db(lambda db: _persist_ai_response(db, **response_kwargs))
+    if plan.summary_due:
+        thread_summariser.schedule(
+            ref.id,
+            api_key=plan.anthropic_key,
+            keep_tokens=_WINDOW_TOKENS,
+            max_events=_WINDOW_EVENTS,
+            estimate=_estimate_tokens,
+        )
+    yield {"type": "done", "event": event}
+
+
+async def generate_ai_response(
+    thread: models.ChatThread,
+    *,
+    user_message: str,
+) -> models.ChatEvent:
+    """Generate and persist a complete AI response (non-streaming callers)."""
+    event: models.ChatEvent | None = None
+    async for chunk in stream_ai_response(thread, user_message=user_message):
+        if chunk["type"] == "done":
+            event = chunk["event"]
+    if event is None:
+        raise RuntimeError("AI response stream ended without a persisted event")
+    return event
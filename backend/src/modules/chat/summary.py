@@ -0,0 +1,341 @@
+"""Rolling abstractive summaries for long chat threads.
+
+Once a thread's turns start falling out of the prompt window, the first
+sentence of each dropped message is a poor stand-in for what was said.
+``ThreadSummariser`` folds those turns into ``ChatThread.summary`` with
+the budget model (``model_router.BUDGET_MODEL``), so prompts carry the
+summary plus recent turns and stay a flat size as the thread grows.
+
+Runs are scheduled after an assistant reply has been stored, never on the
+request path: the reply is already streamed when the summary is updated.
+A run is scheduled when the thread's context window has at least
+``CHAT_SUMMARY_MIN_TOKENS`` dropped tokens the stored summary does not
+cover; each run folds in at most ``CHAT_SUMMARY_MAX_INPUT_TOKENS`` of
+them (oldest first) and later runs catch up on the rest.  Writes are
+conditional on the ``summary_through`` the run started from, so two
+workers racing on one thread cannot regress it.
+
+Tuning (environment):
+
+- ``CHAT_SUMMARY_ENABLED`` (true)
+- ``CHAT_SUMMARY_MIN_TOKENS`` (1500) — uncovered tokens that trigger a run
+- ``CHAT_SUMMARY_MAX_INPUT_TOKENS`` (6000) — turn tokens folded in per run
+- ``CHAT_SUMMARY_MAX_TOKENS`` (400) — summary length cap
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from backend.src.db import models
+from backend.src.db.session import SessionLocal
+from backend.src.modules.ai_router.clients import provider_clients
+from backend.src.modules.chat.context import prompt_role
+from backend.src.modules.usage import model_router
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+
+_ENABLED = os.getenv("CHAT_SUMMARY_ENABLED", "true").strip().lower() not in {
+    "0",
+    "false",
+    "no",
+}
+_MIN_PENDING_TOKENS = int(os.getenv("CHAT_SUMMARY_MIN_TOKENS", "1500"))
+_MAX_INPUT_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_INPUT_TOKENS", "6000"))
+_MAX_SUMMARY_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "400"))
+
+_SYSTEM_PROMPT = (
+    "You maintain a running summary of a conversation between a user and the "
+    "CapeAI assistant. Merge the new turns into the existing summary. Keep "
+    "facts, decisions, user preferences, open questions and concrete details "
+    "(names, amounts, dates, identifiers); drop greetings and filler. Write "
+    "concise plain-text bullet points and reply with the summary only."
+)
+
+
+@dataclass(frozen=True)
+class _SummaryJob:
+    """Turns to fold into a thread's summary, read in one short session."""
+
+    thread_id: str
+    user_id: str
+    previous: Optional[str]
+    previous_through: Optional[datetime]
+    turns: List[Dict[str, str]]
+    through: datetime
+
+
+def _collect(
+    db: Session,
+    *,
+    thread_id: str,
+    keep_tokens: int,
+    max_events: int,
+    estimate: Callable[[str], int],
+) -> Optional[_SummaryJob]:
+    """Read the uncovered turns that have dropped out of the prompt window.
+
+    ``keep_tokens``/``max_events`` must match the window's budget and event
+    cap (``context.ConversationWindow``), otherwise turns the window has
+    dropped are treated as still in it and never summarised.
+    """
+    thread = db.get(models.ChatThread, thread_id)
+    if thread is None:
+        return None
+    stmt = (
+        select(models.ChatEvent)
+        .where(models.ChatEvent.thread_id == thread_id)
+        .order_by(models.ChatEvent.created_at.asc())
+    )
+    if thread.summary_through is not None:
+        stmt = stmt.where(models.ChatEvent.created_at > thread.summary_through)
+    events = list(db.scalars(stmt).all())
+
+    def _tokens(event: models.ChatEvent) -> int:
+        return event.token_count if event.token_count is not None else estimate(event.content)
+
+    # Newest turns that fit the prompt window stay verbatim.
+    split = len(events)
+    window_tokens = 0
+    while split > 0:
+        cost = _tokens(events[split - 1])
+        kept = len(events) - split
+        if split < len(events) and (
+            window_tokens + cost > keep_tokens or kept >= max_events
+        ):
+            break
+        window_tokens += cost
+        split -= 1
+
+    pending: List[models.ChatEvent] = []
+    pending_tokens = 0
+    for event in events[:split]:
+        cost = _tokens(event)
+        if pending and pending_tokens + cost > _MAX_INPUT_TOKENS:
+            break
+        pending.append(event)
+        pending_tokens += cost
+    if not pending or pending_tokens < _MIN_PENDING_TOKENS:
+        return None
+
+    # Never split events that share the cut-off timestamp.
+    following = events[len(pending)] if len(pending) < len(events) else None
+    if following is not None and following.created_at == pending[-1].created_at:
+        pending = [e for e in pending if e.created_at != following.created_at]
+        if not pending:
+            return None
+
+    turns: List[Dict[str, str]] = []
+    for event in pending:
+        role = prompt_role(event.role)
+        if turns and turns[-1]["role"] == role:
+            turns[-1]["content"] += "\n\n" + event.content
+        else:
+            turns.append({"role": role, "content": event.content})
+    return _SummaryJob(
+        thread_id=thread.id,
+        user_id=thread.user_id,
+        previous=thread.summary,
+        previous_through=thread.summary_through,
+        turns=turns,
+        through=pending[-1].created_at,
+    )
+
+
+def _summary_prompt(job: _SummaryJob) -> str:
+    transcript = "\n\n".join(f"{t['role']}: {t['content']}" for t in job.turns)
+    return (
+        f"Existing summary:\n{job.previous or '(none yet)'}\n\n"
+        f"New turns:\n{transcript}\n\n"
+        "Updated summary:"
+    )
+
+
+def _store(
+    db: Session,
+    job: _SummaryJob,
+    *,
+    text: str,
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+) -> bool:
+    stmt = (
+        update(models.ChatThread)
+        .where(models.ChatThread.id == job.thread_id)
+        .values(
+            summary=text,
+            summary_through=job.through,
+            # A summary refresh is not thread activity.
+            updated_at=models.ChatThread.updated_at,
+        )
+    )
+    if job.previous_through is None:
+        stmt = stmt.where(models.ChatThread.summary_through.is_(None))
+    else:
+        stmt = stmt.where(models.ChatThread.summary_through == job.previous_through)
+    stored = db.execute(stmt).rowcount > 0
+    db.commit()
+    if not stored:
+        return False
+
+    try:
+        from backend.src.modules.usage import service as usage_svc
+
+        usage_svc.record_usage(
+            db,
+            user_id=job.user_id,
+            event_type="chat_summary",
+            model=model,
+            tokens_in=input_tokens,
+            tokens_out=output_tokens,
+            thread_id=job.thread_id,
+        )
+        db.commit()
+    except Exception:  # noqa: BLE001
+        log.warning("Failed to record summary usage", exc_info=True)
+    return True
+
+
+class ThreadSummariser:
+    """Schedules and runs background summary updates, one per thread at a time."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = _ENABLED,
+        min_pending_tokens: int = _MIN_PENDING_TOKENS,
+    ) -> None:
+        self.enabled = enabled
+        self.min_pending_tokens = min_pending_tokens
+        self._inflight: Set[str] = set()
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self._counters: Dict[str, int] = {
+            "scheduled": 0,
+            "skipped_inflight": 0,
+            "updated": 0,
+            "noop": 0,
+            "errors": 0,
+        }
+
+    def is_due(self, pending_tokens: int, *, api_key: str) -> bool:
+        """True when a thread's uncovered dropped turns warrant a run."""
+        return bool(self.enabled and api_key and pending_tokens >= self.min_pending_tokens)
+
+    def schedule(
+        self,
+        thread_id: str,
+        *,
+        api_key: str,
+        keep_tokens: int,
+        max_events: int,
+        estimate: Callable[[str], int],
+    ) -> bool:
+        """Start a background run for ``thread_id`` unless one is in flight."""
+        if thread_id in self._inflight:
+            self._counters["skipped_inflight"] += 1
+            return False
+        self._inflight.add(thread_id)
+        self._counters["scheduled"] += 1
+        task = asyncio.get_running_loop().create_task(
+            self._run_scheduled(
+                thread_id,
+                api_key=api_key,
+                keep_tokens=keep_tokens,
+                max_events=max_events,
+                estimate=estimate,
+            )
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _run_scheduled(self, thread_id: str, **kwargs: Any) -> None:
+        try:
+            await self.run(thread_id, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # noqa: BLE001
+            self._counters["errors"] += 1
+            log.warning("Chat summary failed for thread=%s", thread_id, exc_info=True)
+        finally:
+            self._inflight.discard(thread_id)
+
+    async def run(
+        self,
+        thread_id: str,
+        *,
+        api_key: str,
+        keep_tokens: int,
+        max_events: int,
+        estimate: Callable[[str], int],
+    ) -> bool:
+        """Fold the thread's oldest uncovered turns into its summary."""
+
+        def _load() -> Optional[_SummaryJob]:
+            with SessionLocal() as db:
+                return _collect(
+                    db,
+                    thread_id=thread_id,
+                    keep_tokens=keep_tokens,
+                    max_events=max_events,
+                    estimate=estimate,
+                )
+
+        job = await asyncio.to_thread(_load)
+        if job is None:
+            self._counters["noop"] += 1
+            return False
+
+        client = provider_clients.anthropic(api_key)
+        response = await client.messages.create(
+            model=model_router.BUDGET_MODEL,
+            max_tokens=_MAX_SUMMARY_TOKENS,
+            system=_SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": _summary_prompt(job)}],
+        )
+        text = "".join(
+            getattr(block, "text", "") for block in response.content or []
+        ).strip()
+        if not text:
+            self._counters["noop"] += 1
+            return False
+
+        def _save() -> bool:
+            with SessionLocal() as db:
+                return _store(
+                    db,
+                    job,
+                    text=text,
+                    model=getattr(response, "model", None) or model_router.BUDGET_MODEL,
+                    input_tokens=response.usage.input_tokens,
+                    output_tokens=response.usage.output_tokens,
+                )
+
+        stored = await asyncio.to_thread(_save)
+        self._counters["updated" if stored else "noop"] += 1
+        return stored
+
+    async def aclose(self) -> None:
+        """Cancel in-flight runs (application shutdown)."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Summariser counters for monitoring."""
+        return {"enabled": self.enabled, "inflight": len(self._inflight), **self._counters}
+
+
+# Module-level singleton
+thread_summariser = ThreadSummariser()
@@ -12,6 +12,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from backend.src.db import models
+from backend.src.modules.usage.token_counter import count_tokens
 
 from . import tools
 
@@ -88,6 +89,7 @@ def _record_tool_event(
             "payload": payload,
             "result": result,
         },
+        token_count=count_tokens(f"tool:{tool_name}"),
     )
     db.add(event)
     db.commit()
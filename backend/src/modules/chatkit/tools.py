@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import inspect
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Union
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from backend.src.core.async_bridge import run_sync
 from backend.src.db import models
 from backend.src.modules.flows.constants import DEFAULT_ONBOARDING_TASKS
 from backend.src.modules.payments.config import get_payfast_settings
@@ -15,8 +17,11 @@ from backend.src.modules.payments import service as payments_service
 
 ToolPayload = Dict[str, Any]
 ToolResult = Dict[str, Any]
+# Handlers may be coroutine functions; sync callers run them on the shared
+# ``core.async_bridge`` loop.
 ToolHandler = Callable[
-    [Session, models.User, models.ChatThread, ToolPayload], ToolResult
+    [Session, models.User, models.ChatThread, ToolPayload],
+    Union[ToolResult, Awaitable[ToolResult]],
 ]
 
 
@@ -196,15 +201,12 @@ def _payments_checkout(
     }
 
 
-def _rag_search(
+async def _rag_search(
     db: Session,
     user: models.User,
     _thread: models.ChatThread,
     payload: ToolPayload,
 ) -> ToolResult:
-    """Synchronous wrapper — runs the async RAG query in a new event loop."""
-    import asyncio
-
     from backend.src.modules.rag.service import RAGService
     from backend.src.modules.rag.schemas import RAGQueryRequest, UnsupportedPolicy
 
@@ -222,20 +224,7 @@ def _rag_search(
         include_response=payload.get("include_response", True),
     )
 
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = None
-
-    if loop and loop.is_running():
-        import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor() as pool:
-            result = pool.submit(
-                asyncio.run, service.query(db, user, request)
-            ).result()
-    else:
-        result = asyncio.run(service.query(db, user, request))
-
+    result = await service.query(db, user, request)
     return result.dict()
 
 
@@ -367,4 +356,7 @@ def invoke_tool(
     thread: models.ChatThread,
     payload: ToolPayload,
 ) -> ToolResult:
-    return spec.handler(db, user, thread, payload)
+    result = spec.handler(db, user, thread, payload)
+    if inspect.isawaitable(result):
+        return run_sync(result)
+    return result
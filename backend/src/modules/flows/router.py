@@ -51,7 +51,12 @@ def run_flow(
             raise ValueError("placement required when agent_slug is not provided")
 
         tool_calls = [
-            run_engine.ToolCall(name=call.name, payload=call.payload)
+            run_engine.ToolCall(
+                name=call.name,
+                payload=call.payload,
+                id=call.id,
+                depends_on=list(call.depends_on),
+            )
             for call in payload.tool_calls
         ]
         result = run_engine.execute(
@@ -63,6 +68,7 @@ def run_flow(
             agent=agent_ctx,
             idempotency_key=payload.idempotency_key,
             max_attempts=payload.max_attempts,
+            mode=payload.mode,
         )
     except ValueError as exc:
         raise HTTPException(
@@ -88,6 +94,10 @@ def run_flow(
                 payload=step.payload,
                 result=step.result,
                 event_id=step.event_id,
+                call_id=step.call_id,
+                depends_on=step.depends_on,
+                started_at=step.started_at,
+                duration_ms=step.duration_ms,
             )
             for step in result.steps
         ],
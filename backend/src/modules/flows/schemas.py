@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -15,6 +15,11 @@ class ToolCall(BaseModel):
 
     name: str = Field(..., min_length=2, max_length=80)
     payload: Dict[str, Any] = Field(default_factory=dict)
+    id: Optional[str] = Field(default=None, min_length=1, max_length=64)
+    depends_on: List[str] = Field(
+        default_factory=list,
+        description="Ids of calls that must finish first (parallel mode)",
+    )
 
 
 class FlowRunRequest(BaseModel):
@@ -27,6 +32,10 @@ class FlowRunRequest(BaseModel):
     tool_calls: List[ToolCall] = Field(default_factory=list)
     idempotency_key: Optional[str] = Field(default=None, max_length=128)
     max_attempts: int = Field(default=3, ge=1, le=5)
+    mode: Literal["sequential", "parallel"] = Field(
+        default="sequential",
+        description="'parallel' runs calls concurrently unless they declare depends_on",
+    )
 
 
 class RunStep(BaseModel):
@@ -36,6 +45,10 @@ class RunStep(BaseModel):
     payload: Dict[str, Any]
     result: Dict[str, Any]
     event_id: str
+    call_id: Optional[str] = None
+    depends_on: List[str] = Field(default_factory=list)
+    started_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None
 
 
 class FlowRunResponse(BaseModel):
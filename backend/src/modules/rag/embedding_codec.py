@@ -0,0 +1,126 @@
+"""RAG module — Compact binary encoding for chunk embeddings.
+
+A 1536-dim embedding stored as JSON text is ~30 KB and must be parsed by
+``json.loads`` on every retrieval.  This codec stores it as raw
+little-endian bytes instead (6 KB as float32, 3 KB as float16, 1.5 KB as
+int8) behind a one-byte format tag:
+
+====  =========  ==============================================
+tag   encoding   payload
+====  =========  ==============================================
+0x01  float32    ``dim × <f4``
+0x02  float16    ``dim × <f2``
+0x03  int8       ``<f4`` scale, then ``dim × i1`` (symmetric)
+====  =========  ==============================================
+
+``decode_array`` returns a NumPy view over the stored bytes (no copy) for
+float32/float16.  int8 payloads are returned unscaled by default because
+cosine similarity is scale-invariant; pass ``dequantize=True`` for the
+original magnitudes.
+
+The encoding used for new rows is set by ``RAG_EMBEDDING_ENCODING``
+(``float32`` | ``float16`` | ``int8``; default ``float32``).
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from typing import Any, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+FLOAT32 = "float32"
+FLOAT16 = "float16"
+INT8 = "int8"
+
+_TAGS = {FLOAT32: 0x01, FLOAT16: 0x02, INT8: 0x03}
+_STRUCT_CODES = {0x01: "f", 0x02: "e", 0x03: "b"}
+_NP_DTYPES = {0x01: "<f4", 0x02: "<f2", 0x03: "i1"}
+_SCALE = struct.Struct("<f")
+
+
+def default_encoding() -> str:
+    """Encoding for newly written embeddings (``RAG_EMBEDDING_ENCODING``)."""
+    value = os.getenv("RAG_EMBEDDING_ENCODING", FLOAT32).strip().lower()
+    return value if value in _TAGS else FLOAT32
+
+
+def encode(vec: Sequence[float], encoding: Optional[str] = None) -> bytes:
+    """Encode a vector to the tagged binary format."""
+    encoding = encoding or default_encoding()
+    if encoding not in _TAGS:
+        raise ValueError(f"Unknown embedding encoding: {encoding}")
+    tag = _TAGS[encoding]
+
+    if encoding == INT8:
+        peak = max((abs(float(x)) for x in vec), default=0.0)
+        scale = peak / 127.0 if peak > 0 else 1.0
+        quantized = [max(-127, min(127, round(float(x) / scale))) for x in vec]
+        return (
+            bytes([tag])
+            + _SCALE.pack(scale)
+            + struct.pack(f"<{len(quantized)}b", *quantized)
+        )
+
+    if np is not None:
+        return bytes([tag]) + np.asarray(vec, dtype=_NP_DTYPES[tag]).tobytes()
+    return bytes([tag]) + struct.pack(f"<{len(vec)}{_STRUCT_CODES[tag]}", *vec)
+
+
+def _split(blob: bytes) -> tuple[int, float, memoryview]:
+    view = memoryview(blob)
+    if not view:
+        raise ValueError("Empty embedding payload")
+    tag = view[0]
+    if tag not in _STRUCT_CODES:
+        raise ValueError(f"Unknown embedding format tag: {tag:#x}")
+    if tag == _TAGS[INT8]:
+        (scale,) = _SCALE.unpack_from(view, 1)
+        return tag, scale, view[1 + _SCALE.size :]
+    return tag, 1.0, view[1:]
+
+
+def decode_array(blob: bytes, *, dequantize: bool = False) -> "np.ndarray":
+    """Return the vector as a NumPy array, viewing ``blob`` without copying.
+
+    The result is read-only when ``blob`` is immutable ``bytes``.  Only
+    ``dequantize=True`` on an int8 payload allocates a new array.
+    """
+    if np is None:
+        raise RuntimeError("numpy is required for decode_array")
+    tag, scale, payload = _split(blob)
+    arr = np.frombuffer(payload, dtype=_NP_DTYPES[tag])
+    if dequantize and tag == _TAGS[INT8]:
+        return arr.astype(np.float32) * np.float32(scale)
+    return arr
+
+
+def decode_list(blob: bytes) -> List[float]:
+    """Decode to a plain list of floats (dequantised).  Works without numpy."""
+    tag, scale, payload = _split(blob)
+    code = _STRUCT_CODES[tag]
+    count = len(payload) // struct.calcsize(code)
+    values = struct.unpack(f"<{count}{code}", payload)
+    if tag == _TAGS[INT8]:
+        return [v * scale for v in values]
+    return list(values)
+
+
+def chunk_vector(chunk: Any) -> Optional[Any]:
+    """Return a chunk's embedding from whichever column holds it.
+
+    Prefers the binary ``embedding_bin`` column (as a zero-copy NumPy view
+    when numpy is installed, else a list) and falls back to the legacy
+    JSON ``embedding`` list for rows not yet converted.
+    """
+    blob = getattr(chunk, "embedding_bin", None)
+    if blob:
+        return decode_array(blob) if np is not None else decode_list(blob)
+    vec = getattr(chunk, "embedding", None)
+    if vec and isinstance(vec, list):
+        return vec
+    return None
@@ -0,0 +1,135 @@
+"""RAG module — Persistent content-addressed embedding cache.
+
+Boilerplate paragraphs (policy headers, disclaimers, repeated SOP sections)
+and repeated queries produce identical embedding inputs.  Each embedding is
+stored once in ``rag_embedding_cache`` under::
+
+    sha256(model + "\\0" + normalised text)
+
+so it is shared across documents, users and the semantic cache.
+``embeddings.generate_embeddings`` consults the store before calling the
+provider and writes new vectors back afterwards.
+
+Cache I/O uses its own short-lived session so that it never joins (or is
+rolled back with) the caller's transaction, and any database error degrades
+to a cache miss.  Set ``RAG_EMBEDDING_CACHE=0`` to disable.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import unicodedata
+from typing import Dict, List, Mapping
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from . import embedding_codec
+from .models import EmbeddingCacheEntry
+
+log = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+# Keys per ``IN (...)`` lookup, well under SQLite's bound-parameter limit.
+_LOOKUP_BATCH = 500
+
+
+def is_enabled() -> bool:
+    """Whether the persistent cache is on (``RAG_EMBEDDING_CACHE``, default on)."""
+    return os.getenv("RAG_EMBEDDING_CACHE", "1").strip().lower() not in {
+        "0",
+        "false",
+        "no",
+        "off",
+    }
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC, collapsed whitespace, stripped."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def content_hash(text: str, model: str) -> str:
+    """Cache key for ``text`` embedded with ``model``."""
+    payload = f"{model}\0{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def lookup(hashes: List[str]) -> Dict[str, List[float]]:
+    """Return cached vectors for whichever of ``hashes`` are present."""
+    from backend.src.db.session import SessionLocal
+
+    found: Dict[str, List[float]] = {}
+    unique = list(dict.fromkeys(hashes))
+    try:
+        with SessionLocal() as db:
+            for i in range(0, len(unique), _LOOKUP_BATCH):
+                rows = db.execute(
+                    select(
+                        EmbeddingCacheEntry.content_hash,
+                        EmbeddingCacheEntry.embedding_bin,
+                    ).where(
+                        EmbeddingCacheEntry.content_hash.in_(
+                            unique[i : i + _LOOKUP_BATCH]
+                        )
+                    )
+                ).all()
+                for key, blob in rows:
+                    found[key] = embedding_codec.decode_list(blob)
+    except (SQLAlchemyError, ValueError):
+        log.warning("Embedding cache lookup failed; treating as miss", exc_info=True)
+        return {}
+    return found
+
+
+def store(vectors: Mapping[str, List[float]], model: str) -> int:
+    """Persist new ``{hash: vector}`` entries; returns how many were written.
+
+    Vectors are kept as float32 regardless of ``RAG_EMBEDDING_ENCODING`` so a
+    cache hit returns the provider's values unchanged.
+    """
+    from backend.src.db.session import SessionLocal
+
+    if not vectors:
+        return 0
+    try:
+        with SessionLocal() as db:
+            keys = list(vectors)
+            existing = set()
+            for i in range(0, len(keys), _LOOKUP_BATCH):
+                existing.update(
+                    db.scalars(
+                        select(EmbeddingCacheEntry.content_hash).where(
+                            EmbeddingCacheEntry.content_hash.in_(
+                                keys[i : i + _LOOKUP_BATCH]
+                            )
+                        )
+                    )
+                )
+            new = [
+                EmbeddingCacheEntry(
+                    content_hash=key,
+                    model=model,
+                    embedding_bin=embedding_codec.encode(
+                        vec, embedding_codec.FLOAT32
+                    ),
+                )
+                for key, vec in vectors.items()
+                if key not in existing
+            ]
+            if not new:
+                return 0
+            db.add_all(new)
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent writer stored the same content first.
+                db.rollback()
+                return 0
+            return len(new)
+    except SQLAlchemyError:
+        log.warning("Embedding cache write failed", exc_info=True)
+        return 0
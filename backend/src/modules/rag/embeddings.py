@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import logging
 import math
+import os
 import re
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
+
+from backend.src.modules.ai_router.clients import provider_clients
+from backend.src.modules.usage.token_counter import count_tokens as _count_tokens
+
+from . import embedding_store
 
 log = logging.getLogger(__name__)
 
@@ -86,45 +93,137 @@ def chunk_text(
 _EMBEDDING_MODEL = "text-embedding-3-small"
 _EMBEDDING_DIM = 1536
 
+# Provider request limits for the embeddings endpoint (OpenAI: 2048 inputs,
+# 300k tokens per request).  Token budget leaves headroom because tiktoken /
+# heuristic counts can drift from the provider's own tokeniser.
+_MAX_BATCH_ITEMS = int(os.getenv("RAG_EMBED_BATCH_MAX_ITEMS", "2048"))
+_MAX_BATCH_TOKENS = int(os.getenv("RAG_EMBED_BATCH_MAX_TOKENS", "200000"))
+# Maximum embedding requests in flight per ``generate_embeddings`` call.
+_EMBED_CONCURRENCY = int(os.getenv("RAG_EMBED_CONCURRENCY", "4"))
+
+
+def plan_batches(
+    token_counts: Sequence[int],
+    *,
+    max_items: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> List[Tuple[int, int]]:
+    """Split inputs into ``[start, end)`` ranges within provider limits.
+
+    Greedily packs consecutive texts until adding the next one would exceed
+    either the item or the token cap.  An oversized single text still gets
+    its own batch (the provider will reject or truncate it).
+    """
+    max_items = max_items or _MAX_BATCH_ITEMS
+    max_tokens = max_tokens or _MAX_BATCH_TOKENS
+    batches: List[Tuple[int, int]] = []
+    start = 0
+    tokens = 0
+    for i, count in enumerate(token_counts):
+        if i > start and (i - start >= max_items or tokens + count > max_tokens):
+            batches.append((start, i))
+            start, tokens = i, 0
+        tokens += count
+    if start < len(token_counts):
+        batches.append((start, len(token_counts)))
+    return batches
+
 
 async def generate_embeddings(
     texts: List[str],
     api_key: Optional[str] = None,
+    *,
+    token_counts: Optional[Sequence[int]] = None,
 ) -> List[List[float]]:
     """Generate embeddings for a list of texts using OpenAI.
 
     Falls back to a deterministic hash-based pseudo-embedding when no API key
-    is available (development / testing only).
+    is available (development / testing only).  ``token_counts`` may be
+    passed when the caller has already counted tokens, to avoid re-counting.
+
+    Provider embeddings go through the persistent content-hash cache
+    (``embedding_store``): only texts never embedded before are sent, and
+    duplicates within ``texts`` are sent once.
     """
     if not texts:
         return []
 
     if api_key:
-        return await _openai_embeddings(texts, api_key)
+        if embedding_store.is_enabled():
+            return await _cached_embeddings(texts, api_key, token_counts=token_counts)
+        return await _openai_embeddings(texts, api_key, token_counts=token_counts)
 
     log.warning("No OpenAI API key — using hash-based pseudo-embeddings (dev only)")
     return [_hash_embedding(t) for t in texts]
 
 
-async def _openai_embeddings(texts: List[str], api_key: str) -> List[List[float]]:
-    """Call OpenAI embeddings API in batches."""
-    from openai import AsyncOpenAI
+async def _cached_embeddings(
+    texts: List[str],
+    api_key: str,
+    *,
+    token_counts: Optional[Sequence[int]] = None,
+) -> List[List[float]]:
+    """Serve ``texts`` from ``embedding_store``, embedding only the misses."""
+    hashes = [embedding_store.content_hash(t, _EMBEDDING_MODEL) for t in texts]
+    # The store is a synchronous DB round trip; keep it off the event loop.
+    cached = await asyncio.to_thread(embedding_store.lookup, hashes)
+
+    # First index of each distinct uncached text
+    missing: dict[str, int] = {}
+    for i, key in enumerate(hashes):
+        if key not in cached and key not in missing:
+            missing[key] = i
+
+    if missing:
+        indices = list(missing.values())
+        fresh = await _openai_embeddings(
+            [texts[i] for i in indices],
+            api_key,
+            token_counts=(
+                [token_counts[i] for i in indices] if token_counts is not None else None
+            ),
+        )
+        new_vectors = dict(zip(missing, fresh))
+        await asyncio.to_thread(embedding_store.store, new_vectors, _EMBEDDING_MODEL)
+        cached.update(new_vectors)
 
-    client = AsyncOpenAI(api_key=api_key)
-    all_embeddings: List[List[float]] = []
+    log.debug(
+        "Embedding cache: %d/%d texts served from cache",
+        len(texts) - sum(1 for key in hashes if key in missing),
+        len(texts),
+    )
+    return [cached[key] for key in hashes]
 
-    # OpenAI supports up to 2048 inputs per request; batch at 100 for safety
-    batch_size = 100
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i : i + batch_size]
-        resp = await client.embeddings.create(
-            model=_EMBEDDING_MODEL,
-            input=batch,
-        )
-        for item in resp.data:
-            all_embeddings.append(item.embedding)
 
-    return all_embeddings
+async def _openai_embeddings(
+    texts: List[str],
+    api_key: str,
+    *,
+    token_counts: Optional[Sequence[int]] = None,
+) -> List[List[float]]:
+    """Call OpenAI embeddings API in token-aware batches, concurrently.
+
+    Batches are sized by ``plan_batches`` and at most ``_EMBED_CONCURRENCY``
+    requests run at once; results are reassembled in input order.
+    """
+    client = provider_clients.openai(api_key)
+    if token_counts is None:
+        token_counts = [_count_tokens(t) for t in texts]
+
+    semaphore = asyncio.Semaphore(max(_EMBED_CONCURRENCY, 1))
+
+    async def _embed_batch(start: int, end: int) -> List[List[float]]:
+        async with semaphore:
+            resp = await client.embeddings.create(
+                model=_EMBEDDING_MODEL,
+                input=texts[start:end],
+            )
+        return [item.embedding for item in resp.data]
+
+    results = await asyncio.gather(
+        *(_embed_batch(start, end) for start, end in plan_batches(token_counts))
+    )
+    return [vec for batch in results for vec in batch]
 
 
 def _hash_embedding(text: str, dim: int = _EMBEDDING_DIM) -> List[float]:
@@ -0,0 +1,247 @@
+"""RAG module — Document ingestion pipeline (chunk → embed → bulk store).
+
+Used both inline by ``RAGService.upload_document`` and as a background job
+(``run_ingestion_job``) so that large uploads return immediately with
+``status="processing"`` and the client polls ``GET /rag/documents/{id}``
+until it flips to ``approved`` (or ``failed``).
+
+Each stage is timed and the result is persisted on
+``ApprovedDocument.ingestion_stats``::
+
+    {"chunks": 42, "tokens": 16800, "batches": 1,
+     "chunk_ms": 3, "embed_ms": 812, "store_ms": 25, "total_ms": 840}
+
+``reingest_document`` is the incremental path for content edits: chunks
+whose text is unchanged keep their stored embedding (and are renumbered in
+place), only new or changed chunks are embedded, and stale ones are deleted.
+Its stats add ``reused`` / ``embedded`` / ``removed`` counts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.src.modules.usage.token_counter import count_tokens as _count_tokens
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from . import embedding_codec, embeddings, lexical_index, pgvector_store
+from .matrix_cache import matrix_cache
+from .models import ApprovedDocument, ChunkPosting, DocumentChunk
+from .schemas import DocumentStatus
+
+log = logging.getLogger(__name__)
+
+
+def _ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
+
+def bulk_insert_chunks(
+    db: Session,
+    document_id: str,
+    texts: List[str],
+    vectors: List[List[float]],
+    token_counts: List[int],
+    *,
+    indices: Optional[List[int]] = None,
+) -> List[Tuple[str, List[float]]]:
+    """Insert chunk rows with a single executemany; returns ``(id, vector)`` pairs.
+
+    ``indices`` gives each row's ``chunk_index`` (default ``0..n-1``).  The
+    chunks' ``lexical_index`` postings are inserted alongside.
+    """
+    if indices is None:
+        indices = list(range(len(texts)))
+    rows: List[Dict[str, Any]] = []
+    postings: List[Dict[str, Any]] = []
+    vector_rows: List[Tuple[str, List[float]]] = []
+    for index, text, vec, tokens in zip(indices, texts, vectors, token_counts):
+        chunk_id = str(uuid.uuid4())
+        term_count, chunk_postings = lexical_index.posting_rows(chunk_id, text)
+        postings.extend(chunk_postings)
+        rows.append(
+            {
+                "id": chunk_id,
+                "document_id": document_id,
+                "chunk_index": index,
+                "chunk_text": text,
+                "embedding_bin": embedding_codec.encode(vec),
+                "token_count": tokens,
+                "term_count": term_count,
+            }
+        )
+        vector_rows.append((chunk_id, vec))
+    if rows:
+        db.execute(insert(DocumentChunk), rows)
+        if postings:
+            db.execute(insert(ChunkPosting), postings)
+        pgvector_store.store_embeddings(db, vector_rows)
+    return vector_rows
+
+
+async def ingest_document(
+    db: Session,
+    doc: ApprovedDocument,
+    *,
+    api_key: Optional[str],
+) -> Dict[str, int]:
+    """Chunk, embed and store ``doc``, then mark it approved and commit.
+
+    Returns the per-stage timings that are also saved on the document.
+    """
+    started = time.perf_counter()
+
+    t = time.perf_counter()
+    texts = embeddings.chunk_text(doc.content)
+    token_counts = [_count_tokens(text) for text in texts]
+    chunk_ms = _ms(t)
+
+    t = time.perf_counter()
+    vectors = await embeddings.generate_embeddings(
+        texts, api_key=api_key, token_counts=token_counts
+    )
+    embed_ms = _ms(t)
+
+    t = time.perf_counter()
+    bulk_insert_chunks(db, doc.id, texts, vectors, token_counts)
+    store_ms = _ms(t)
+
+    stats = {
+        "chunks": len(texts),
+        "tokens": sum(token_counts),
+        "batches": len(embeddings.plan_batches(token_counts)) if api_key else 0,
+        "chunk_ms": chunk_ms,
+        "embed_ms": embed_ms,
+        "store_ms": store_ms,
+        "total_ms": _ms(started),
+    }
+    _finish(db, doc, stats)
+    return stats
+
+
+def _chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def reingest_document(
+    db: Session,
+    doc: ApprovedDocument,
+    *,
+    api_key: Optional[str],
+) -> Dict[str, int]:
+    """Re-index ``doc`` after its ``content`` changed, re-embedding only new chunks.
+
+    Stored chunks are matched to the new ``chunk_text`` output by content
+    hash (duplicates pair up in order).  Matches keep their row and
+    embedding and just get the new ``chunk_index``; the rest are deleted
+    and the unmatched new texts are embedded and inserted.  Commits.
+    """
+    started = time.perf_counter()
+
+    t = time.perf_counter()
+    texts = embeddings.chunk_text(doc.content)
+    existing = db.execute(
+        select(DocumentChunk.id, DocumentChunk.chunk_index, DocumentChunk.chunk_text)
+        .where(DocumentChunk.document_id == doc.id)
+        .order_by(DocumentChunk.chunk_index)
+    ).all()
+    by_hash: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+    for chunk_id, chunk_index, chunk_text in existing:
+        by_hash[_chunk_hash(chunk_text)].append((chunk_id, chunk_index))
+
+    renumber: List[Dict[str, Any]] = []
+    new_indices: List[int] = []
+    reused = 0
+    for index, text in enumerate(texts):
+        matches = by_hash.get(_chunk_hash(text))
+        if matches:
+            chunk_id, old_index = matches.pop(0)
+            reused += 1
+            if old_index != index:
+                renumber.append({"id": chunk_id, "chunk_index": index})
+        else:
+            new_indices.append(index)
+    stale = [chunk_id for rows in by_hash.values() for chunk_id, _ in rows]
+    new_texts = [texts[i] for i in new_indices]
+    token_counts = [_count_tokens(text) for text in new_texts]
+    chunk_ms = _ms(t)
+
+    t = time.perf_counter()
+    vectors = await embeddings.generate_embeddings(
+        new_texts, api_key=api_key, token_counts=token_counts
+    )
+    embed_ms = _ms(t)
+
+    t = time.perf_counter()
+    if stale:
+        # Explicit: SQLite does not enforce the ON DELETE CASCADE by default
+        db.execute(delete(ChunkPosting).where(ChunkPosting.chunk_id.in_(stale)))
+        db.execute(delete(DocumentChunk).where(DocumentChunk.id.in_(stale)))
+    if renumber:
+        db.execute(update(DocumentChunk), renumber)
+    bulk_insert_chunks(
+        db, doc.id, new_texts, vectors, token_counts, indices=new_indices
+    )
+    store_ms = _ms(t)
+
+    stats = {
+        "chunks": len(texts),
+        "reused": reused,
+        "embedded": len(new_texts),
+        "removed": len(stale),
+        "tokens": sum(token_counts),
+        "batches": len(embeddings.plan_batches(token_counts)) if api_key else 0,
+        "chunk_ms": chunk_ms,
+        "embed_ms": embed_ms,
+        "store_ms": store_ms,
+        "total_ms": _ms(started),
+    }
+    _finish(db, doc, stats)
+    return stats
+
+
+def _finish(db: Session, doc: ApprovedDocument, stats: Dict[str, int]) -> None:
+    doc.chunk_count = stats["chunks"]
+    doc.status = DocumentStatus.APPROVED.value
+    doc.ingestion_stats = stats
+    db.commit()
+    matrix_cache.invalidate_owner(doc.owner_id)
+    log.info(
+        "Document %s ingested: %d chunks in %d ms (embed %d ms, store %d ms)",
+        doc.id,
+        stats["chunks"],
+        stats["total_ms"],
+        stats["embed_ms"],
+        stats["store_ms"],
+    )
+
+
+async def run_ingestion_job(document_id: str, api_key: Optional[str]) -> None:
+    """Background entrypoint: ingest a ``processing`` document in its own session.
+
+    On failure the document is marked ``failed`` with the error recorded in
+    ``ingestion_stats`` so polling clients can surface it.
+    """
+    from backend.src.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        doc = db.scalar(select(ApprovedDocument).where(ApprovedDocument.id == document_id))
+        if doc is None or doc.status != DocumentStatus.PROCESSING.value:
+            return
+        try:
+            await ingest_document(db, doc, api_key=api_key)
+        except Exception as exc:
+            log.exception("Background ingestion failed for document %s", document_id)
+            db.rollback()
+            doc.status = DocumentStatus.FAILED.value
+            doc.ingestion_stats = {"error": str(exc)[:500]}
+            db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,156 @@
+"""RAG module — Persistent inverted index for BM25 first-stage retrieval.
+
+``reranker.rerank_chunks`` re-tokenises every candidate per query and takes
+IDF from the candidate set only.  This index is built once, at ingest time:
+
+- ``rag_chunk_postings`` holds ``term → (chunk_id, tf)`` postings
+- ``DocumentChunk.term_count`` holds each chunk's length in tokens
+
+At query time only the query is tokenised; postings for its terms are read
+with one SQL query and BM25 is scored with tenant-corpus ``N``, ``avgdl``
+and ``df`` (all approved chunks the user owns, optionally filtered by
+``doc_types``).  ``reciprocal_rank_fusion`` merges the lexical ranking with
+the vector ranking so exact-keyword matches (error codes, clause numbers)
+rank higher than their cosine similarity alone would place them.  The
+fused score only orders results; callers keep reporting cosine similarity.
+
+Usage::
+
+    from backend.src.modules.rag import lexical_index
+
+    rows = lexical_index.posting_rows(chunk_id, text)   # at ingest
+    hits = lexical_index.search(db, owner_id=..., query=..., top_k=20)
+    fused = lexical_index.reciprocal_rank_fusion(vector_hits, lexical_hits)
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from .models import ApprovedDocument, ChunkPosting, DocumentChunk
+from .schemas import DocumentStatus
+
+# BM25 tuning constants (same as ``reranker``)
+_K1 = 1.2
+_B = 0.75
+# RRF damping constant from Cormack et al.; larger flattens rank differences
+_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+# Longest term stored in the index (matches the ``term`` column width)
+MAX_TERM_LENGTH = 64
+
+_WORD_RE = re.compile(r"[a-zA-Z0-9]+")
+
+
+def tokenise(text: str) -> List[str]:
+    """Lowercase word tokenisation, truncated to ``MAX_TERM_LENGTH``."""
+    return [t[:MAX_TERM_LENGTH] for t in _WORD_RE.findall(text.lower())]
+
+
+def posting_rows(chunk_id: str, text: str) -> Tuple[int, List[Dict[str, Any]]]:
+    """Return ``(term_count, postings)`` for a chunk, ready for executemany."""
+    tokens = tokenise(text)
+    return len(tokens), [
+        {"chunk_id": chunk_id, "term": term, "tf": tf}
+        for term, tf in Counter(tokens).items()
+    ]
+
+
+def _scope(stmt, owner_id: str, doc_types: Optional[List[str]]):
+    stmt = stmt.where(
+        ApprovedDocument.owner_id == owner_id,
+        ApprovedDocument.status == DocumentStatus.APPROVED.value,
+    )
+    if doc_types:
+        stmt = stmt.where(ApprovedDocument.doc_type.in_(doc_types))
+    return stmt
+
+
+def search(
+    db: Session,
+    *,
+    owner_id: str,
+    query: str,
+    top_k: int,
+    doc_types: Optional[List[str]] = None,
+) -> List[Tuple[str, float]]:
+    """BM25 over the owner's approved corpus; returns ``(chunk_id, score)`` best-first."""
+    terms = sorted(set(tokenise(query)))
+    if not terms or top_k <= 0:
+        return []
+
+    n_docs, avg_dl = db.execute(
+        _scope(
+            select(func.count(DocumentChunk.id), func.avg(DocumentChunk.term_count))
+            .select_from(DocumentChunk)
+            .join(ApprovedDocument, ApprovedDocument.id == DocumentChunk.document_id),
+            owner_id,
+            doc_types,
+        )
+    ).one()
+    if not n_docs:
+        return []
+    avg_dl = float(avg_dl or 0) or 1.0
+
+    rows = db.execute(
+        _scope(
+            select(
+                ChunkPosting.chunk_id,
+                ChunkPosting.term,
+                ChunkPosting.tf,
+                DocumentChunk.term_count,
+            )
+            .join(DocumentChunk, DocumentChunk.id == ChunkPosting.chunk_id)
+            .join(ApprovedDocument, ApprovedDocument.id == DocumentChunk.document_id)
+            .where(ChunkPosting.term.in_(terms)),
+            owner_id,
+            doc_types,
+        )
+    ).all()
+
+    df: Counter = Counter(term for _, term, _, _ in rows)
+    idf = {
+        term: math.log((n_docs - count + 0.5) / (count + 0.5) + 1.0)
+        for term, count in df.items()
+    }
+    scores: Dict[str, float] = defaultdict(float)
+    for chunk_id, term, tf, dl in rows:
+        norm = _K1 * (1 - _B + _B * (dl or 0) / avg_dl)
+        scores[chunk_id] += idf[term] * (tf * (_K1 + 1)) / (tf + norm)
+
+    return heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], item[0]))
+
+
+def reciprocal_rank_fusion(
+    *rankings: Sequence[Tuple[Any, float, Any]],
+    top_n: Optional[int] = None,
+    k: int = _RRF_K,
+) -> List[Tuple[Any, float, Any]]:
+    """Fuse ``(chunk, score, document)`` rankings by reciprocal rank.
+
+    Each list contributes ``1 / (k + rank)`` per chunk (keyed by ``chunk.id``).
+    Returned scores are normalised to ``[0, 1]`` where 1 means ranked first
+    in every input list.
+    """
+    fused: Dict[str, float] = defaultdict(float)
+    entries: Dict[str, Tuple[Any, Any]] = {}
+    for ranking in rankings:
+        for rank, (chunk, _score, doc) in enumerate(ranking, start=1):
+            fused[chunk.id] += 1.0 / (k + rank)
+            entries.setdefault(chunk.id, (chunk, doc))
+
+    best = len(rankings) / (k + 1) if rankings else 1.0
+    ordered = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    if top_n is not None:
+        ordered = ordered[:top_n]
+    return [
+        (entries[chunk_id][0], round(score / best, 6), entries[chunk_id][1])
+        for chunk_id, score in ordered
+    ]
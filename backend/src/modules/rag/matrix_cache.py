@@ -0,0 +1,222 @@
+"""RAG module — Per-tenant in-process cache of decoded embedding matrices.
+
+Every ``/rag/query`` and capsule run otherwise re-reads all of a user's
+``DocumentChunk`` rows and JSON-decodes every embedding, even when the
+document library has not changed.  This cache keeps the normalised
+``ChunkMatrix`` for each ``(owner_id, doc_types)`` pair, together with a
+lightweight snapshot of the chunk/document metadata needed for citations.
+
+Entries are LRU-evicted once the resident size exceeds ``max_bytes`` and
+expire after ``ttl_seconds`` so that other workers' writes become visible
+within a bounded window.  ``RAGService`` invalidates an owner's entries on
+upload and delete, so the common single-worker case is always fresh.
+
+Usage::
+
+    from backend.src.modules.rag.matrix_cache import matrix_cache
+
+    matrix = matrix_cache.get(owner_id, doc_types)
+    if matrix is None:
+        matrix = matrix_cache.put(owner_id, doc_types, build_matrix())
+
+    matrix_cache.invalidate_owner(owner_id)  # after the library changes
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from .vector_index import ChunkMatrix
+
+log = logging.getLogger(__name__)
+
+# ── Configuration ─────────────────────────────────────────────────────────────
+
+_DEFAULT_MAX_BYTES = int(os.getenv("RAG_MATRIX_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+_DEFAULT_TTL = int(os.getenv("RAG_MATRIX_CACHE_TTL", "300"))  # 5 min
+
+CacheKey = Tuple[str, Optional[Tuple[str, ...]]]
+
+
+@dataclass(frozen=True)
+class CachedChunk:
+    """Session-independent snapshot of a ``DocumentChunk`` (no embedding)."""
+
+    id: str
+    document_id: str
+    chunk_index: int
+    chunk_text: str
+    token_count: int
+
+    @classmethod
+    def from_model(cls, chunk: Any) -> "CachedChunk":
+        return cls(
+            id=chunk.id,
+            document_id=chunk.document_id,
+            chunk_index=chunk.chunk_index,
+            chunk_text=chunk.chunk_text,
+            token_count=chunk.token_count or 0,
+        )
+
+
+@dataclass(frozen=True)
+class CachedDocument:
+    """Session-independent snapshot of an ``ApprovedDocument`` for citations."""
+
+    id: str
+    title: str
+    doc_type: str
+    doc_metadata: Optional[Dict[str, Any]]
+
+    @classmethod
+    def from_model(cls, doc: Any) -> "CachedDocument":
+        return cls(
+            id=doc.id,
+            title=doc.title,
+            doc_type=doc.doc_type,
+            doc_metadata=doc.doc_metadata,
+        )
+
+
+def snapshot_matrix(matrix: ChunkMatrix) -> ChunkMatrix:
+    """Detach a matrix from ORM objects so it can outlive the DB session."""
+    documents = {
+        doc_id: CachedDocument.from_model(doc)
+        for doc_id, doc in matrix.documents.items()
+    }
+    chunks = [CachedChunk.from_model(c) for c in matrix.chunks]
+    return ChunkMatrix(chunks, documents, matrix.matrix)
+
+
+def _entry_bytes(matrix: ChunkMatrix) -> int:
+    """Approximate resident size: vector bytes plus chunk text."""
+    return matrix.nbytes + sum(len(c.chunk_text) for c in matrix.chunks)
+
+
+def make_key(owner_id: str, doc_types: Optional[Sequence[str]]) -> CacheKey:
+    """Normalise ``doc_types`` so equivalent filters share one entry."""
+    return owner_id, (tuple(sorted(set(doc_types))) if doc_types else None)
+
+
+class _Entry:
+    __slots__ = ("matrix", "nbytes", "expires_at")
+
+    def __init__(self, matrix: ChunkMatrix, nbytes: int, ttl: int) -> None:
+        self.matrix = matrix
+        self.nbytes = nbytes
+        self.expires_at = time.monotonic() + ttl
+
+
+class EmbeddingMatrixCache:
+    """Memory-bounded LRU cache of per-tenant embedding matrices."""
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        ttl_seconds: int = _DEFAULT_TTL,
+    ) -> None:
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    # ── Public API ────────────────────────────────────────────────────────
+
+    def get(
+        self, owner_id: str, doc_types: Optional[Sequence[str]] = None
+    ) -> Optional[ChunkMatrix]:
+        """Return the cached matrix for this tenant/filter, else None."""
+        key = make_key(owner_id, doc_types)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if time.monotonic() > entry.expires_at:
+                self._drop(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.matrix
+
+    def put(
+        self,
+        owner_id: str,
+        doc_types: Optional[Sequence[str]],
+        matrix: ChunkMatrix,
+    ) -> ChunkMatrix:
+        """Snapshot and store ``matrix``; returns the cached snapshot."""
+        cached = snapshot_matrix(matrix)
+        nbytes = _entry_bytes(cached)
+        if nbytes > self._max_bytes:
+            log.debug("RAG matrix for owner=%s too large to cache (%d bytes)", owner_id, nbytes)
+            return cached
+
+        key = make_key(owner_id, doc_types)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            while self._entries and self._bytes + nbytes > self._max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._evictions += 1
+            self._entries[key] = _Entry(cached, nbytes, self._ttl)
+            self._bytes += nbytes
+        return cached
+
+    def invalidate_owner(self, owner_id: str) -> None:
+        """Drop every entry (all doc_type filters) belonging to an owner."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == owner_id]:
+                self._drop(key)
+
+    def clear(self) -> None:
+        """Flush all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return cache statistics for monitoring."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "resident_bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": (
+                    round(self._hits / (self._hits + self._misses), 3)
+                    if (self._hits + self._misses) > 0
+                    else 0.0
+                ),
+            }
+
+    # ── Internals ─────────────────────────────────────────────────────────
+
+    def _drop(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+
+# Module-level singleton
+matrix_cache = EmbeddingMatrixCache()
@@ -12,6 +12,7 @@ from sqlalchemy import (
     Index,
     Integer,
     JSON,
+    LargeBinary,
     String,
     Text,
     func,
@@ -36,6 +37,7 @@ class ApprovedDocument(Base):
     status = Column(String(32), nullable=False, server_default="pending")
     chunk_count = Column(Integer, nullable=False, server_default="0")
     doc_metadata = Column(JSON, nullable=True)
+    ingestion_stats = Column(JSON, nullable=True)  # per-stage timings / error
     created_at = Column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
@@ -73,8 +75,15 @@ class DocumentChunk(Base):
     )
     chunk_index = Column(Integer, nullable=False)
     chunk_text = Column(Text, nullable=False)
-    embedding = Column(JSON, nullable=False)  # stored as JSON array of floats
+    # Legacy JSON array of floats; NULL once converted to ``embedding_bin``.
+    embedding = Column(JSON, nullable=True)
+    # Tagged little-endian float32/float16/int8 bytes (see ``embedding_codec``)
+    embedding_bin = Column(LargeBinary, nullable=True)
+    # On PostgreSQL with pgvector, an unmapped ``embedding_vec vector(1536)``
+    # mirror column (+ HNSW index) is managed by ``pgvector_store``.
     token_count = Column(Integer, nullable=False, server_default="0")
+    # Length in ``lexical_index`` tokens (BM25 document length)
+    term_count = Column(Integer, nullable=False, server_default="0")
     created_at = Column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
@@ -87,6 +96,36 @@ class DocumentChunk(Base):
     )
 
 
+class ChunkPosting(Base):
+    """Inverted-index posting: a term's frequency in one chunk (see ``lexical_index``)."""
+
+    __tablename__ = "rag_chunk_postings"
+
+    chunk_id = Column(
+        String(36),
+        ForeignKey("rag_document_chunks.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    term = Column(String(64), primary_key=True)
+    tf = Column(Integer, nullable=False)
+
+    __table_args__ = (Index("ix_rag_postings_term", "term", "chunk_id"),)
+
+
+class EmbeddingCacheEntry(Base):
+    """Content-addressed embedding shared across documents, users and queries."""
+
+    __tablename__ = "rag_embedding_cache"
+
+    # sha256 hex of ``model`` + normalised text (see ``embedding_store``)
+    content_hash = Column(String(64), primary_key=True)
+    model = Column(String(128), nullable=False)
+    embedding_bin = Column(LargeBinary, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
 class RAGQueryLog(Base):
     """Audit log entry for every RAG query — evidence-first."""
 
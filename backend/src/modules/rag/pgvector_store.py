@@ -0,0 +1,206 @@
+"""RAG module — Optional pgvector storage and ANN retrieval for chunk embeddings.
+
+When the PostgreSQL ``vector`` extension is installed and migration
+``20261016_rag_pgvector`` has added ``rag_document_chunks.embedding_vec``
+(with an HNSW cosine index), retrieval pushes the similarity threshold and
+top-K into SQL via the ``<=>`` cosine-distance operator instead of loading
+every chunk into the application.
+
+The column is deliberately *not* mapped on ``DocumentChunk``: it only
+exists on PostgreSQL deployments with the extension, and all access goes
+through the raw SQL helpers below so that SQLite (tests, local dev) and
+Postgres without pgvector keep using the in-app ``vector_index`` path.
+
+The HNSW index is shared by every tenant, and the owner/status/doc_type
+filters are applied to the candidates it returns.  With only
+``hnsw.ef_search`` candidates per scan, a small tenant in a large table
+would get too few (often zero) rows.  On pgvector >= 0.8 ``search`` turns on
+``hnsw.iterative_scan`` so the index keeps scanning until enough rows pass
+the filters; on older versions a short result falls back to an exact scan
+of the tenant's chunks.
+
+Backend selection (``RAG_VECTOR_BACKEND``):
+
+- ``auto`` (default) — use pgvector when the column is present
+- ``pgvector``       — same as auto, but log a warning when unavailable
+- ``memory``         — always use the in-app path
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+
+VECTOR_COLUMN = "embedding_vec"
+
+_BACKEND = os.getenv("RAG_VECTOR_BACKEND", "auto").strip().lower()
+# HNSW candidate list size; raise for recall when filters are selective.
+_EF_SEARCH = int(os.getenv("RAG_PGVECTOR_EF_SEARCH", "100"))
+
+_probe_lock = threading.Lock()
+_probe_results: Dict[str, bool] = {}
+# pgvector release that added ``hnsw.iterative_scan``
+_ITERATIVE_SCAN_VERSION = (0, 8)
+
+
+def vector_literal(vec: Sequence[float]) -> str:
+    """Format a vector in pgvector's text input syntax (``[x,y,...]``)."""
+    return "[" + ",".join(repr(float(x)) for x in vec) + "]"
+
+
+def _probe(db: Session) -> bool:
+    """Check once per database URL whether the pgvector column exists."""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+
+    key = str(bind.url)
+    with _probe_lock:
+        if key in _probe_results:
+            return _probe_results[key]
+
+    try:
+        found = db.execute(
+            text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'rag_document_chunks' AND column_name = :col"
+            ),
+            {"col": VECTOR_COLUMN},
+        ).first()
+        available = found is not None
+    except Exception:
+        log.debug("pgvector probe failed", exc_info=True)
+        db.rollback()
+        available = False
+
+    with _probe_lock:
+        _probe_results[key] = available
+    if available:
+        log.info("RAG retrieval using pgvector column %s", VECTOR_COLUMN)
+    return available
+
+
+def is_enabled(db: Session) -> bool:
+    """Return True when retrieval should be pushed down to pgvector."""
+    if _BACKEND == "memory":
+        return False
+    available = _probe(db)
+    if not available and _BACKEND == "pgvector":
+        log.warning("RAG_VECTOR_BACKEND=pgvector but the extension/column is missing")
+    return available
+
+
+def _iterative_scan_supported(db: Session) -> bool:
+    """Check once per database URL whether pgvector has ``hnsw.iterative_scan``."""
+    key = f"{db.get_bind().url}#iterative_scan"
+    with _probe_lock:
+        if key in _probe_results:
+            return _probe_results[key]
+
+    try:
+        version = db.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        ).scalar()
+        parts = tuple(int(p) for p in str(version or "0").split(".")[:2])
+        supported = parts >= _ITERATIVE_SCAN_VERSION
+    except Exception:
+        log.debug("pgvector version probe failed", exc_info=True)
+        db.rollback()
+        supported = False
+
+    with _probe_lock:
+        _probe_results[key] = supported
+    return supported
+
+
+def reset_probe() -> None:
+    """Forget cached availability probes (after running migrations)."""
+    with _probe_lock:
+        _probe_results.clear()
+
+
+def store_embeddings(db: Session, rows: Sequence[Tuple[str, Sequence[float]]]) -> None:
+    """Write ``(chunk_id, vector)`` pairs into the pgvector column.
+
+    No-op unless pgvector is enabled.  Runs inside the caller's transaction
+    so the JSON and vector representations commit together.
+    """
+    if not rows or not is_enabled(db):
+        return
+    db.execute(
+        text(
+            f"UPDATE rag_document_chunks SET {VECTOR_COLUMN} = CAST(:vec AS vector) "
+            "WHERE id = :id"
+        ),
+        [{"id": chunk_id, "vec": vector_literal(vec)} for chunk_id, vec in rows],
+    )
+
+
+def search(
+    db: Session,
+    *,
+    owner_id: str,
+    query_vec: Sequence[float],
+    top_k: int,
+    similarity_threshold: float,
+    doc_types: Optional[List[str]],
+) -> List[Tuple[str, float]]:
+    """Return ``(chunk_id, cosine_similarity)`` pairs, best first.
+
+    Cosine similarity is ``1 - (a <=> b)``, so the threshold becomes an
+    upper bound on distance and ``ORDER BY distance LIMIT k`` lets the HNSW
+    index serve the top-K directly.  See the module docstring for how
+    tenant filtering keeps the top-K complete.
+    """
+    if top_k <= 0:
+        return []
+
+    doc_type_filter = "AND d.doc_type IN :doc_types " if doc_types else ""
+
+    def _stmt(order_by: str):
+        stmt = text(
+            f"SELECT c.id, c.{VECTOR_COLUMN} <=> CAST(:q AS vector) AS distance "
+            "FROM rag_document_chunks c "
+            "JOIN rag_approved_documents d ON d.id = c.document_id "
+            "WHERE d.owner_id = :owner_id AND d.status = 'approved' "
+            f"{doc_type_filter}"
+            f"AND c.{VECTOR_COLUMN} IS NOT NULL "
+            f"AND c.{VECTOR_COLUMN} <=> CAST(:q AS vector) <= :max_distance "
+            f"ORDER BY {order_by} "
+            "LIMIT :top_k"
+        )
+        if doc_types:
+            stmt = stmt.bindparams(bindparam("doc_types", expanding=True))
+        return stmt
+
+    params = {
+        "q": vector_literal(query_vec),
+        "owner_id": owner_id,
+        "max_distance": 1.0 - similarity_threshold,
+        "top_k": top_k,
+    }
+    if doc_types:
+        params["doc_types"] = list(doc_types)
+
+    iterative = _iterative_scan_supported(db)
+    db.execute(text(f"SET LOCAL hnsw.ef_search = {max(_EF_SEARCH, top_k)}"))
+    if iterative:
+        db.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+    rows = db.execute(_stmt("distance"), params).all()
+    if len(rows) < top_k and not iterative:
+        # The index may have returned only other tenants' rows.  Ordering by
+        # an expression the HNSW index cannot serve forces an exact scan.
+        rows = db.execute(
+            _stmt(f"(c.{VECTOR_COLUMN} <=> CAST(:q AS vector)) + 0"), params
+        ).all()
+    # relaxed_order can return rows slightly out of order.
+    hits = [(row[0], 1.0 - float(row[1])) for row in rows]
+    hits.sort(key=lambda hit: hit[1], reverse=True)
+    return hits
@@ -6,6 +6,10 @@ candidates using keyword overlap (BM25-inspired) scoring.  This is a
 improves precision by promoting chunks whose surface tokens best match
 the query.
 
+``RAGService.query`` now uses ``lexical_index`` (a persistent inverted
+index with corpus-level IDF) as a first-stage retriever fused with the
+vector results; this module remains for re-ranking ad-hoc candidate lists.
+
 Usage::
 
     from backend.src.modules.rag.reranker import rerank_chunks
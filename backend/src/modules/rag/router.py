@@ -6,7 +6,7 @@ import logging
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from backend.src.db.session import get_session
@@ -14,15 +14,17 @@ from backend.src.modules.auth.deps import get_verified_user
 from backend.src.db import models
 
 from .evidence import EvidencePack, generate_evidence_pack
+from .ingest import run_ingestion_job
 from .schemas import (
     DocumentListResponse,
     DocumentResponse,
+    DocumentUpdate,
     DocumentUpload,
     RAGHealthResponse,
     RAGQueryRequest,
     RAGQueryResponse,
 )
-from .service import RAGService
+from .service import DocumentBusyError, RAGService
 
 log = logging.getLogger(__name__)
 
@@ -53,15 +55,32 @@ def _get_service() -> RAGService:
 @router.post("/documents", response_model=DocumentResponse, status_code=201)
 async def upload_document(
     payload: DocumentUpload,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    background: bool = Query(
+        False,
+        description="Return immediately (202, status=processing) and ingest in the background",
+    ),
     current_user: models.User = Depends(get_verified_user),
     db: Session = Depends(get_session),
 ):
     """Upload and ingest a new approved document.
 
     The document is chunked, embedded, and marked as approved for retrieval.
+    With ``?background=true`` the request returns ``202`` straight away and
+    the client polls ``GET /rag/documents/{id}`` until ``status`` is
+    ``approved`` (or ``failed``); ``ingestion`` carries per-stage timings.
     """
     service = _get_service()
-    return await service.upload_document(db, current_user, payload)
+    doc = await service.upload_document(
+        db, current_user, payload, background=background
+    )
+    if background:
+        background_tasks.add_task(
+            run_ingestion_job, *service.ingestion_job_args(doc.id)
+        )
+        response.status_code = 202
+    return doc
 
 
 @router.get("/documents", response_model=DocumentListResponse)
@@ -99,6 +118,30 @@ def get_document(
     return doc
 
 
+@router.patch("/documents/{document_id}", response_model=DocumentResponse)
+async def update_document(
+    document_id: str,
+    payload: DocumentUpdate,
+    current_user: models.User = Depends(get_verified_user),
+    db: Session = Depends(get_session),
+):
+    """Update a document's fields or content.
+
+    New content is re-chunked and only chunks whose text changed are
+    re-embedded; ``ingestion`` reports reused / embedded / removed counts.
+    Changing the content of a document that is still being ingested
+    returns ``409``.
+    """
+    service = _get_service()
+    try:
+        doc = await service.update_document(db, current_user, document_id, payload)
+    except DocumentBusyError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return doc
+
+
 @router.delete("/documents/{document_id}", status_code=204)
 def delete_document(
     document_id: str,
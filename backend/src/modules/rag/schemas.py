@@ -19,6 +19,7 @@ class DocumentStatus(str, Enum):
     PENDING = "pending"          # uploaded, not yet embedded
     PROCESSING = "processing"    # embedding in progress
     APPROVED = "approved"        # ready for retrieval
+    FAILED = "failed"            # ingestion error (see ingestion stats)
     REJECTED = "rejected"        # flagged / removed by admin
     ARCHIVED = "archived"        # soft-deleted
 
@@ -50,6 +51,19 @@ class DocumentUpload(BaseModel):
     )
 
 
+class DocumentUpdate(BaseModel):
+    """Partial update of an approved document.
+
+    A changed ``content`` is re-indexed incrementally: only chunks whose text
+    changed are re-embedded.
+    """
+
+    title: Optional[str] = Field(default=None, max_length=512)
+    content: Optional[str] = None
+    doc_type: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
 class DocumentResponse(BaseModel):
     """Returned after document creation or retrieval."""
 
@@ -60,6 +74,10 @@ class DocumentResponse(BaseModel):
     status: str
     chunk_count: int = 0
     metadata: Optional[Dict[str, Any]] = None
+    ingestion: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Ingestion per-stage timings (ms), or the error if it failed",
+    )
     created_at: datetime
     updated_at: datetime
 
@@ -8,28 +8,43 @@ import os
 import time
 import uuid
 from datetime import datetime, timezone
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from backend.src.core.config import get_settings
 from backend.src.db import models as app_models
 from backend.src.modules.ai_router.bedrock import (
-    invoke_bedrock_text,
+    ainvoke_bedrock_text,
     is_bedrock_enabled,
 )
+from backend.src.modules.ai_router.clients import provider_clients
+from backend.src.modules.ai_router.health import provider_health
+from backend.src.modules.ai_router.hedging import Discarded, hedged_call
 from backend.src.modules.ai_router.strategy import resolve_available_provider_order
-from backend.src.modules.usage.llm_cache import llm_cache
-from backend.src.modules.usage.token_counter import count_tokens as _count_tokens
-from backend.src.modules.usage.track import try_record_usage
+from backend.src.modules.usage.llm_cache import llm_cache, provider_answered
+from backend.src.modules.usage.token_counter import count_tokens
+from backend.src.modules.usage.track import (
+    try_record_discarded_usage,
+    try_record_usage,
+)
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from . import embeddings
+from . import (
+    embedding_codec,
+    embeddings,
+    ingest,
+    lexical_index,
+    pgvector_store,
+    vector_index,
+)
+from .matrix_cache import matrix_cache
 from .models import ApprovedDocument, DocumentChunk, RAGQueryLog
 from .schemas import (
     Citation,
     DocumentListResponse,
     DocumentResponse,
     DocumentStatus,
+    DocumentUpdate,
     DocumentUpload,
     EvidenceTrace,
     RAGHealthResponse,
@@ -40,6 +55,16 @@ from .schemas import (
 
 log = logging.getLogger(__name__)
 
+# Each first-stage retriever returns ``top_k × fanout`` candidates for fusion
+_FUSION_FANOUT = int(os.getenv("RAG_FUSION_FANOUT", "3"))
+# States whose content may be re-ingested; ``pending``/``processing`` belong
+# to a background ``run_ingestion_job``.
+_REINGESTABLE = (DocumentStatus.APPROVED.value, DocumentStatus.FAILED.value)
+
+
+class DocumentBusyError(RuntimeError):
+    """Raised when a document's content changes while it is still being ingested."""
+
 
 class RAGService:
     """Approved-document RAG pipeline with evidence-first design.
@@ -70,8 +95,15 @@ class RAGService:
         db: Session,
         user: app_models.User,
         payload: DocumentUpload,
+        *,
+        background: bool = False,
     ) -> DocumentResponse:
-        """Ingest a new document: store → chunk → embed → approve."""
+        """Ingest a new document: store → chunk → embed → approve.
+
+        With ``background=True`` the document is committed in ``processing``
+        state and returned immediately; the caller must schedule
+        ``ingest.run_ingestion_job`` (see ``ingestion_job_args``).
+        """
         doc = ApprovedDocument(
             id=str(uuid.uuid4()),
             owner_id=user.id,
@@ -82,40 +114,24 @@ class RAGService:
             doc_metadata=payload.metadata,
         )
         db.add(doc)
-        db.flush()
 
-        # Chunk
-        chunks_text = embeddings.chunk_text(payload.content)
-        if not chunks_text:
-            doc.status = DocumentStatus.APPROVED.value
-            doc.chunk_count = 0
+        if background:
             db.commit()
+            db.refresh(doc)
             return self._doc_to_response(doc)
 
-        # Embed
-        settings = get_settings()
-        api_key = self._openai_key or settings.openai_api_key
-        vectors = await embeddings.generate_embeddings(chunks_text, api_key=api_key)
-
-        # Store chunks
-        for idx, (text, vec) in enumerate(zip(chunks_text, vectors)):
-            chunk = DocumentChunk(
-                id=str(uuid.uuid4()),
-                document_id=doc.id,
-                chunk_index=idx,
-                chunk_text=text,
-                embedding=vec,
-                token_count=_count_tokens(text),
-            )
-            db.add(chunk)
-
-        doc.chunk_count = len(chunks_text)
-        doc.status = DocumentStatus.APPROVED.value
-        db.commit()
+        db.flush()
+        await ingest.ingest_document(db, doc, api_key=self._embedding_api_key())
         db.refresh(doc)
-        log.info("Document %s ingested: %d chunks", doc.id, doc.chunk_count)
         return self._doc_to_response(doc)
 
+    def ingestion_job_args(self, document_id: str) -> Tuple[str, Optional[str]]:
+        """Arguments for ``ingest.run_ingestion_job`` for a background upload."""
+        return document_id, self._embedding_api_key()
+
+    def _embedding_api_key(self) -> Optional[str]:
+        return self._openai_key or get_settings().openai_api_key
+
     def list_documents(
         self,
         db: Session,
@@ -159,6 +175,54 @@ class RAGService:
         )
         return self._doc_to_response(doc) if doc else None
 
+    async def update_document(
+        self,
+        db: Session,
+        user: app_models.User,
+        document_id: str,
+        payload: DocumentUpdate,
+    ) -> Optional[DocumentResponse]:
+        """Apply a partial update; changed content is re-indexed incrementally.
+
+        Returns None if the document does not exist or is archived.  Raises
+        ``DocumentBusyError`` when the content changes while the document is
+        still ``pending``/``processing``.
+        """
+        stmt = select(ApprovedDocument).where(
+            ApprovedDocument.id == document_id,
+            ApprovedDocument.owner_id == user.id,
+            ApprovedDocument.status != DocumentStatus.ARCHIVED.value,
+        )
+        if payload.content is not None:
+            # Row lock (PostgreSQL): a concurrent re-ingest waits for this one.
+            stmt = stmt.with_for_update()
+        doc = db.scalar(stmt)
+        if not doc:
+            return None
+        reingest = payload.content is not None and payload.content != doc.content
+        if reingest and doc.status not in _REINGESTABLE:
+            status = doc.status
+            db.rollback()
+            raise DocumentBusyError(f"Document is {status}; retry once ingestion finishes")
+
+        if payload.title is not None:
+            doc.title = payload.title
+        if payload.doc_type is not None:
+            doc.doc_type = payload.doc_type
+        if payload.metadata is not None:
+            doc.doc_metadata = payload.metadata
+
+        if reingest:
+            doc.content = payload.content
+            await ingest.reingest_document(
+                db, doc, api_key=self._embedding_api_key()
+            )
+        else:
+            db.commit()
+            matrix_cache.invalidate_owner(user.id)
+        db.refresh(doc)
+        return self._doc_to_response(doc)
+
     def delete_document(
         self, db: Session, user: app_models.User, document_id: str
     ) -> bool:
@@ -173,6 +237,7 @@ class RAGService:
             return False
         doc.status = DocumentStatus.ARCHIVED.value
         db.commit()
+        matrix_cache.invalidate_owner(user.id)
         return True
 
     # ------------------------------------------------------------------
@@ -201,21 +266,13 @@ class RAGService:
         )
         query_vec = query_vectors[0]
 
-        # 2. Retrieve candidate chunks (approved docs owned by user)
-        candidates = self._retrieve_chunks(
-            db,
-            user=user,
-            query_vec=query_vec,
-            top_k=request.top_k,
-            similarity_threshold=request.similarity_threshold,
-            doc_types=request.doc_types,
+        # 2. Retrieve candidate chunks (approved docs owned by user).
+        #    Synchronous DB and NumPy work runs on a worker thread so a
+        #    shared event loop (e.g. the ChatKit tool bridge) is not blocked.
+        candidates = await asyncio.to_thread(
+            self._retrieve_candidates, db, user=user, request=request, query_vec=query_vec
         )
 
-        # 2b. Re-rank using hybrid cosine + BM25 scoring
-        from backend.src.modules.rag.reranker import rerank_chunks
-
-        candidates = rerank_chunks(request.query, candidates, top_n=request.top_k)
-
         # 3. Build citations
         citations: List[Citation] = []
         for chunk, score, doc in candidates:
@@ -247,23 +304,20 @@ class RAGService:
             )
         elif request.include_response:
             # 5. Generate LLM response with retrieved context
+            hedge_losers: List[Discarded] = []
             response_text, llm_usage_meta = await self._generate_response(
                 query=request.query,
                 citations=citations,
                 grounded=grounded,
                 unsupported_policy=request.unsupported_policy,
+                owner_id=user.id,
+                discarded=hedge_losers,
             )
 
             # Record LLM usage for cost tracking
-            if llm_usage_meta:
-                try_record_usage(
-                    db,
-                    user_id=user.id,
-                    event_type="agent:rag",
-                    model=llm_usage_meta.get("model"),
-                    tokens_in=llm_usage_meta.get("tokens_in", 0),
-                    tokens_out=llm_usage_meta.get("tokens_out", 0),
-                )
+            await asyncio.to_thread(
+                self._record_llm_usage, db, user, llm_usage_meta, hedge_losers
+            )
 
         # 6. Build evidence trace
         elapsed_ms = int((time.time() - t0) * 1000)
@@ -282,7 +336,8 @@ class RAGService:
         )
 
         # 7. Audit log
-        self._log_query(
+        await asyncio.to_thread(
+            self._log_query,
             db,
             user=user,
             query_text=request.query,
@@ -303,6 +358,74 @@ class RAGService:
             processing_time_ms=elapsed_ms,
         )
 
+    def _retrieve_candidates(
+        self,
+        db: Session,
+        *,
+        user: app_models.User,
+        request: RAGQueryRequest,
+        query_vec: List[float],
+    ) -> List[Tuple[DocumentChunk, float, ApprovedDocument]]:
+        """Vector and BM25 first stages, fused by reciprocal rank (blocking).
+
+        RRF only decides the order: every returned score is the chunk's
+        cosine similarity, and lexical-only hits must clear the same
+        ``similarity_threshold`` as vector hits before they are fused.
+        """
+        fetch_k = request.top_k * _FUSION_FANOUT
+        vector_hits = self._retrieve_chunks(
+            db,
+            user=user,
+            query_vec=query_vec,
+            top_k=fetch_k,
+            similarity_threshold=request.similarity_threshold,
+            doc_types=request.doc_types,
+        )
+        lexical_hits = self._retrieve_chunks_lexical(
+            db,
+            user=user,
+            query=request.query,
+            top_k=fetch_k,
+            doc_types=request.doc_types,
+        )
+        similarity = {chunk.id: score for chunk, score, _ in vector_hits}
+        gated_lexical: List[Tuple[DocumentChunk, float, ApprovedDocument]] = []
+        for chunk, bm25, doc in lexical_hits:
+            if chunk.id not in similarity:
+                stored_vec = embedding_codec.chunk_vector(chunk)
+                if stored_vec is None:
+                    continue
+                score = float(embeddings.cosine_similarity(query_vec, stored_vec))
+                if score < request.similarity_threshold:
+                    continue
+                similarity[chunk.id] = score
+            gated_lexical.append((chunk, bm25, doc))
+
+        fused = lexical_index.reciprocal_rank_fusion(
+            vector_hits, gated_lexical, top_n=request.top_k
+        )
+        return [(chunk, similarity[chunk.id], doc) for chunk, _, doc in fused]
+
+    @staticmethod
+    def _record_llm_usage(
+        db: Session,
+        user: app_models.User,
+        usage_meta: dict,
+        discarded: List[Discarded],
+    ) -> None:
+        if usage_meta:
+            try_record_usage(
+                db,
+                user_id=user.id,
+                event_type="agent:rag",
+                model=usage_meta.get("model"),
+                tokens_in=usage_meta.get("tokens_in", 0),
+                tokens_out=usage_meta.get("tokens_out", 0),
+            )
+        try_record_discarded_usage(
+            db, user_id=user.id, event_type="agent:rag", discarded=discarded
+        )
+
     # ------------------------------------------------------------------
     # Health
     # ------------------------------------------------------------------
@@ -322,22 +445,14 @@ class RAGService:
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _retrieve_chunks(
+    def _load_candidate_chunks(
         self,
         db: Session,
         *,
         user: app_models.User,
-        query_vec: List[float],
-        top_k: int,
-        similarity_threshold: float,
         doc_types: Optional[List[str]],
-    ) -> List[Tuple[DocumentChunk, float, ApprovedDocument]]:
-        """Retrieve top-K chunks by cosine similarity from approved documents.
-
-        Uses in-application cosine similarity (portable across PostgreSQL
-        and SQLite). Can be upgraded to pgvector ``<=>`` operator for scale.
-        """
-        # Build base query for approved docs owned by user
+    ) -> Tuple[Dict[str, ApprovedDocument], List[DocumentChunk]]:
+        """Load the user's approved documents and all of their chunks."""
         doc_q = select(ApprovedDocument).where(
             ApprovedDocument.owner_id == user.id,
             ApprovedDocument.status == DocumentStatus.APPROVED.value,
@@ -347,20 +462,68 @@ class RAGService:
 
         docs = {d.id: d for d in db.scalars(doc_q).all()}
         if not docs:
-            return []
+            return docs, []
 
-        # Fetch all chunks for those documents
         chunks = db.scalars(
             select(DocumentChunk).where(
                 DocumentChunk.document_id.in_(list(docs.keys()))
             )
         ).all()
+        return docs, list(chunks)
+
+    def _retrieve_chunks(
+        self,
+        db: Session,
+        *,
+        user: app_models.User,
+        query_vec: List[float],
+        top_k: int,
+        similarity_threshold: float,
+        doc_types: Optional[List[str]],
+    ) -> List[Tuple[DocumentChunk, float, ApprovedDocument]]:
+        """Retrieve top-K chunks by cosine similarity from approved documents.
+
+        Uses in-application cosine similarity (portable across PostgreSQL
+        and SQLite). Scoring is vectorised via ``vector_index.ChunkMatrix``
+        when numpy is installed, and the decoded matrix is kept in the
+        per-tenant ``matrix_cache`` between queries; otherwise falls back to
+        a pure-Python loop. On PostgreSQL with the pgvector extension the
+        threshold and top-K are pushed into SQL via ``pgvector_store``.
+        """
+        if pgvector_store.is_enabled(db):
+            return self._retrieve_chunks_pgvector(
+                db,
+                user=user,
+                query_vec=query_vec,
+                top_k=top_k,
+                similarity_threshold=similarity_threshold,
+                doc_types=doc_types,
+            )
+
+        if vector_index.is_available():
+            matrix = matrix_cache.get(user.id, doc_types)
+            if matrix is None:
+                docs, chunks = self._load_candidate_chunks(
+                    db, user=user, doc_types=doc_types
+                )
+                matrix = matrix_cache.put(
+                    user.id, doc_types, vector_index.ChunkMatrix.build(chunks, docs)
+                )
+            return matrix.search(
+                query_vec,
+                top_k=top_k,
+                similarity_threshold=similarity_threshold,
+            )
+
+        docs, chunks = self._load_candidate_chunks(db, user=user, doc_types=doc_types)
+        if not docs:
+            return []
 
         # Score every chunk
         scored: List[Tuple[DocumentChunk, float, ApprovedDocument]] = []
         for chunk in chunks:
-            stored_vec = chunk.embedding
-            if not stored_vec or not isinstance(stored_vec, list):
+            stored_vec = embedding_codec.chunk_vector(chunk)
+            if stored_vec is None:
                 continue
             score = embeddings.cosine_similarity(query_vec, stored_vec)
             if score >= similarity_threshold:
@@ -370,27 +533,107 @@ class RAGService:
         scored.sort(key=lambda x: x[1], reverse=True)
         return scored[:top_k]
 
+    def _retrieve_chunks_pgvector(
+        self,
+        db: Session,
+        *,
+        user: app_models.User,
+        query_vec: List[float],
+        top_k: int,
+        similarity_threshold: float,
+        doc_types: Optional[List[str]],
+    ) -> List[Tuple[DocumentChunk, float, ApprovedDocument]]:
+        """ANN retrieval via the pgvector HNSW index; loads only the top-K rows."""
+        hits = pgvector_store.search(
+            db,
+            owner_id=user.id,
+            query_vec=query_vec,
+            top_k=top_k,
+            similarity_threshold=similarity_threshold,
+            doc_types=doc_types,
+        )
+        return self._load_hits(db, hits)
+
+    def _retrieve_chunks_lexical(
+        self,
+        db: Session,
+        *,
+        user: app_models.User,
+        query: str,
+        top_k: int,
+        doc_types: Optional[List[str]],
+    ) -> List[Tuple[DocumentChunk, float, ApprovedDocument]]:
+        """BM25 retrieval from the persistent inverted index (``lexical_index``)."""
+        hits = lexical_index.search(
+            db, owner_id=user.id, query=query, top_k=top_k, doc_types=doc_types
+        )
+        return self._load_hits(db, hits)
+
+    @staticmethod
+    def _load_hits(
+        db: Session, hits: List[Tuple[str, float]]
+    ) -> List[Tuple[DocumentChunk, float, ApprovedDocument]]:
+        """Load ``(chunk_id, score)`` hits as ``(chunk, score, document)`` in order."""
+        if not hits:
+            return []
+
+        chunks = {
+            c.id: c
+            for c in db.scalars(
+                select(DocumentChunk).where(
+                    DocumentChunk.id.in_([chunk_id for chunk_id, _ in hits])
+                )
+            ).all()
+        }
+        docs = {
+            d.id: d
+            for d in db.scalars(
+                select(ApprovedDocument).where(
+                    ApprovedDocument.id.in_({c.document_id for c in chunks.values()})
+                )
+            ).all()
+        }
+        return [
+            (chunks[chunk_id], score, docs[chunks[chunk_id].document_id])
+            for chunk_id, score in hits
+            if chunk_id in chunks
+        ]
+
     async def _generate_response(
         self,
         query: str,
         citations: List[Citation],
         grounded: bool,
         unsupported_policy: UnsupportedPolicy,
+        owner_id: Optional[str] = None,
+        discarded: Optional[List[Discarded]] = None,
     ) -> Tuple[str, dict]:
         """Generate an LLM response using retrieved context.
 
-        Checks the semantic cache first for near-duplicate queries.
+        Checks the semantic cache first for near-duplicate queries.  The
+        cache is namespaced by owner and system prompt, and a hit also
+        requires the same set of cited chunks, so an answer is only reused
+        for the same tenant, policy and evidence.
+        Providers are tried with ``hedged_call``; calls that lost a hedge
+        race are appended to ``discarded`` for usage recording.
         Returns (text, usage_meta) for cost tracking.
         """
+        system_prompt = self._build_system_prompt(grounded, unsupported_policy)
+
         # ── Semantic cache check ──────────────────────────────────────
-        from backend.src.modules.usage.semantic_cache import semantic_cache
+        from backend.src.modules.usage.semantic_cache import semantic_caches
 
-        sem_hit = await semantic_cache.get(query)
+        sem_cache = semantic_caches.namespace(
+            "rag", owner_id=owner_id, system_prompt=system_prompt
+        )
+        evidence = "|".join(
+            sorted(f"{c.document_id}#{c.chunk_index}" for c in citations)
+        )
+        sem_hit = await sem_cache.get(query, context=evidence)
         if sem_hit is not None:
             log.debug("RAG semantic cache hit for query")
             return sem_hit
 
-        system_prompt = self._build_system_prompt(grounded, unsupported_policy)
         user_prompt = self._build_user_prompt(query, citations)
 
         settings = get_settings()
@@ -402,31 +645,41 @@ class RAGService:
             has_openai=bool(self._openai_key or settings.openai_api_key),
         )
 
-        result: Tuple[str, dict] = ("[Error: No AI provider configured]", {})
-
-        for provider in provider_order:
-            if provider == "bedrock":
-                result = await self._call_bedrock(system_prompt, user_prompt)
-                if not result[0].startswith("[Error"):
-                    break
-                continue
-            if provider == "anthropic":
-                result = await self._call_anthropic(system_prompt, user_prompt)
-                if not result[0].startswith("[Error"):
-                    break
-                continue
-            if provider == "openai":
-                result = await self._call_openai(system_prompt, user_prompt)
-                if not result[0].startswith("[Error"):
-                    break
-                continue
+        calls = {
+            "bedrock": self._call_bedrock,
+            "anthropic": self._call_anthropic,
+            "openai": self._call_openai,
+        }
+        outcome = await hedged_call(
+            [provider for provider in provider_order if provider in calls],
+            lambda provider: calls[provider](system_prompt, user_prompt),
+            placement="rag",
+            succeeded=lambda result: not result[0].startswith("[Error"),
+            model_of=self._provider_model,
+            estimate_prompt=lambda: count_tokens(system_prompt + user_prompt),
+        )
+        if discarded is not None:
+            discarded.extend(outcome.discarded)
+        result: Tuple[str, dict] = outcome.value or (
+            "[Error: No AI provider configured]",
+            {},
+        )
 
         # Store in semantic cache for future similar queries
         if result and result[0] and not result[0].startswith("[Error"):
-            await semantic_cache.put(query, result)
+            await sem_cache.put(query, result, context=evidence)
 
         return result
 
+    def _provider_model(self, provider: str) -> Optional[str]:
+        if provider == "bedrock":
+            return (
+                os.getenv("RAG_BEDROCK_MODEL_ID") or get_settings().ai_bedrock_model_id
+            )
+        if provider == "openai":
+            return os.getenv("RAG_OPENAI_MODEL", "gpt-4o-mini")
+        return self._model
+
     async def _call_bedrock(
         self, system_prompt: str, user_prompt: str
     ) -> Tuple[str, dict]:
@@ -435,19 +688,25 @@ class RAGService:
         model_id = os.getenv("RAG_BEDROCK_MODEL_ID") or settings.ai_bedrock_model_id
 
         cache_key = llm_cache.make_key(model_id, system_prompt, user_prompt)
-        cached = llm_cache.get(cache_key)
-        if cached is not None:
-            log.debug("RAG Bedrock cache hit")
-            return cached
+        return await llm_cache.get_or_compute(
+            cache_key,
+            lambda: self._request_bedrock(
+                model_id, settings.ai_bedrock_region, system_prompt, user_prompt
+            ),
+            should_cache=provider_answered,
+        )
 
+    async def _request_bedrock(
+        self, model_id: str, region: str, system_prompt: str, user_prompt: str
+    ) -> Tuple[str, dict]:
         try:
-            result = await asyncio.to_thread(
-                invoke_bedrock_text,
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                model_id=model_id,
-                region=settings.ai_bedrock_region,
-            )
+            with provider_health.track("bedrock", model_id):
+                result = await ainvoke_bedrock_text(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    model_id=model_id,
+                    region=region,
+                )
             usage_meta = {
                 "model": result.model_id,
                 "tokens_in": result.input_tokens,
@@ -457,9 +716,7 @@ class RAGService:
                 "provider": "bedrock",
                 "region": result.region,
             }
-            payload = (result.text or "", usage_meta)
-            llm_cache.put(cache_key, payload)
-            return payload
+            return result.text or "", usage_meta
         except Exception as exc:
             log.exception("Bedrock API error during RAG response")
             return f"[Error generating response: {exc}]", {}
@@ -524,43 +781,45 @@ class RAGService:
         self, system_prompt: str, user_prompt: str
     ) -> Tuple[str, dict]:
         """Call Anthropic Claude API. Returns (text, usage_meta)."""
-        from anthropic import AsyncAnthropic
-
-        # Check cache first
-        cache_key = llm_cache.make_key(self._model, system_prompt, user_prompt)
-        cached = llm_cache.get(cache_key)
-        if cached is not None:
-            log.debug("RAG Anthropic cache hit")
-            return cached
+        cache_key = llm_cache.make_key(
+            self._provider_model("anthropic"), system_prompt, user_prompt
+        )
+        return await llm_cache.get_or_compute(
+            cache_key,
+            lambda: self._request_anthropic(system_prompt, user_prompt),
+            should_cache=provider_answered,
+        )
 
+    async def _request_anthropic(
+        self, system_prompt: str, user_prompt: str
+    ) -> Tuple[str, dict]:
         settings = get_settings()
         api_key = self._anthropic_key or settings.anthropic_api_key
         if not api_key:
             return "[Error: No Anthropic API key configured]", {}
 
-        client = AsyncAnthropic(api_key=api_key)
+        client = provider_clients.anthropic(api_key)
         try:
-            resp = await client.messages.create(
-                model=self._model,
-                max_tokens=2048,
-                system=[
-                    {
-                        "type": "text",
-                        "text": system_prompt,
-                        "cache_control": {"type": "ephemeral"},
-                    }
-                ],
-                messages=[{"role": "user", "content": user_prompt}],
-            )
+            with provider_health.track("anthropic", self._model):
+                resp = await client.messages.create(
+                    model=self._model,
+                    max_tokens=2048,
+                    system=[
+                        {
+                            "type": "text",
+                            "text": system_prompt,
+                            "cache_control": {"type": "ephemeral"},
+                        }
+                    ],
+                    messages=[{"role": "user", "content": user_prompt}],
+                )
             text = resp.content[0].text if resp.content else ""
             usage_meta = {
                 "model": resp.model,
                 "tokens_in": resp.usage.input_tokens,
                 "tokens_out": resp.usage.output_tokens,
             }
-            result = (text, usage_meta)
-            llm_cache.put(cache_key, result)
-            return result
+            return text, usage_meta
         except Exception as exc:
             log.exception("Anthropic API error during RAG response")
             return f"[Error generating response: {exc}]", {}
@@ -569,31 +828,35 @@ class RAGService:
         self, system_prompt: str, user_prompt: str
     ) -> Tuple[str, dict]:
         """Call OpenAI API. Returns (text, usage_meta)."""
-        from openai import AsyncOpenAI
-
-        # Check cache first
-        cache_key = llm_cache.make_key(self._model, system_prompt, user_prompt)
-        cached = llm_cache.get(cache_key)
-        if cached is not None:
-            log.debug("RAG OpenAI cache hit")
-            return cached
+        cache_key = llm_cache.make_key(
+            self._provider_model("openai"), system_prompt, user_prompt
+        )
+        return await llm_cache.get_or_compute(
+            cache_key,
+            lambda: self._request_openai(system_prompt, user_prompt),
+            should_cache=provider_answered,
+        )
 
+    async def _request_openai(
+        self, system_prompt: str, user_prompt: str
+    ) -> Tuple[str, dict]:
         settings = get_settings()
         api_key = self._openai_key or settings.openai_api_key
         if not api_key:
             return "[Error: No OpenAI API key configured]", {}
 
-        client = AsyncOpenAI(api_key=api_key)
-        openai_model = os.getenv("RAG_OPENAI_MODEL", "gpt-4o-mini")
+        client = provider_clients.openai(api_key)
+        openai_model = self._provider_model("openai")
         try:
-            resp = await client.chat.completions.create(
-                model=openai_model,
-                max_tokens=2048,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-            )
+            with provider_health.track("openai", openai_model):
+                resp = await client.chat.completions.create(
+                    model=openai_model,
+                    max_tokens=2048,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                )
             text = resp.choices[0].message.content or ""
             usage = getattr(resp, "usage", None)
             usage_meta = {
@@ -601,9 +864,7 @@ class RAGService:
                 "tokens_in": getattr(usage, "prompt_tokens", 0),
                 "tokens_out": getattr(usage, "completion_tokens", 0),
             }
-            result = (text, usage_meta)
-            llm_cache.put(cache_key, result)
-            return result
+            return text, usage_meta
         except Exception as exc:
             log.exception("OpenAI API error during RAG response")
             return f"[Error generating response: {exc}]", {}
@@ -655,6 +916,7 @@ class RAGService:
             status=doc.status,
             chunk_count=doc.chunk_count or 0,
             metadata=doc.doc_metadata,
+            ingestion=doc.ingestion_stats,
             created_at=doc.created_at,
             updated_at=doc.updated_at,
         )
@@ -0,0 +1,149 @@
+"""RAG module — Vectorised top-K retrieval over chunk embeddings.
+
+Replaces the per-chunk pure-Python cosine loop with a single
+matrix-vector product over a row-normalised ``float32`` matrix, followed
+by an ``argpartition`` top-K selection.  Scoring N chunks becomes one
+BLAS call instead of N Python-level dot products.
+
+``numpy`` is optional: when it is not installed ``is_available()`` returns
+False and callers keep the portable in-application loop.
+
+Usage::
+
+    from backend.src.modules.rag import vector_index
+
+    matrix = vector_index.ChunkMatrix.build(chunks, docs_by_id)
+    results = matrix.search(query_vec, top_k=5, similarity_threshold=0.3)
+    # → [(chunk, score, document), ...] sorted by score descending
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+
+from .embedding_codec import chunk_vector
+from .embeddings import embedding_dimensions
+
+log = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+    log.info("numpy not installed — RAG retrieval uses the pure-Python scorer")
+
+
+def is_available() -> bool:
+    """Return True when the vectorised engine can be used."""
+    return np is not None
+
+
+class ChunkMatrix:
+    """Normalised embedding matrix for one set of candidate chunks.
+
+    Row ``i`` of ``matrix`` is the unit-length embedding of ``chunks[i]``;
+    ``documents`` maps ``chunk.document_id`` to its parent document so
+    search results keep the ``(chunk, score, document)`` tuple shape that
+    the re-ranker and citation builder expect.
+    """
+
+    __slots__ = ("chunks", "documents", "matrix")
+
+    def __init__(
+        self,
+        chunks: Sequence[Any],
+        documents: Mapping[str, Any],
+        matrix: "np.ndarray",
+    ) -> None:
+        self.chunks = list(chunks)
+        self.documents = documents
+        self.matrix = matrix
+
+    @classmethod
+    def build(
+        cls,
+        chunks: Sequence[Any],
+        documents: Mapping[str, Any],
+        *,
+        dim: Optional[int] = None,
+    ) -> "ChunkMatrix":
+        """Stack chunk embeddings into a row-normalised float32 matrix.
+
+        Embeddings are read via ``embedding_codec.chunk_vector`` (binary
+        column first, legacy JSON second) and copied once, straight into a
+        preallocated matrix.  Chunks with a missing, malformed or
+        wrong-dimension embedding are skipped, mirroring the legacy loop
+        which never scored them.
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for vectorised retrieval")
+
+        dim = dim or embedding_dimensions()
+        vectors: List[Any] = []
+        kept: List[Any] = []
+        for chunk in chunks:
+            if chunk.document_id not in documents:
+                continue
+            vec = chunk_vector(chunk)
+            if vec is None or len(vec) != dim:
+                continue
+            vectors.append(vec)
+            kept.append(chunk)
+
+        matrix = np.empty((len(vectors), dim), dtype=np.float32)
+        for row, vec in enumerate(vectors):
+            matrix[row] = vec
+        if vectors:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix /= norms
+        return cls(kept, documents, matrix)
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the embedding matrix."""
+        return int(self.matrix.nbytes)
+
+    def search(
+        self,
+        query_vec: Sequence[float],
+        *,
+        top_k: int,
+        similarity_threshold: float,
+    ) -> List[Tuple[Any, float, Any]]:
+        """Return up to ``top_k`` chunks scoring at least the threshold.
+
+        Results are sorted by cosine similarity, highest first.
+        """
+        n = len(self.chunks)
+        if n == 0 or top_k <= 0:
+            return []
+
+        query = np.asarray(query_vec, dtype=np.float32)
+        if query.ndim != 1 or query.shape[0] != self.matrix.shape[1]:
+            return []
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            return []
+
+        scores = self.matrix @ (query / norm)
+
+        k = min(top_k, n)
+        if k < n:
+            idx = np.argpartition(-scores, k - 1)[:k]
+        else:
+            idx = np.arange(n)
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+
+        results: List[Tuple[Any, float, Any]] = []
+        for i in idx:
+            score = float(scores[i])
+            if score < similarity_threshold:
+                break
+            chunk = self.chunks[i]
+            results.append((chunk, score, self.documents[chunk.document_id]))
+        return results
@@ -19,44 +19,307 @@ Usage::
 
 Thread-safe via a simple lock; suitable for async FastAPI workers because
 the critical section is a microsecond dict lookup — no I/O under the lock.
+
+The in-process store is an ``OrderedDict`` in LRU order (hits move to the
+end, overflow pops the front) so every operation is O(1).  Because the TTL
+is uniform, insertion order is expiry order: a FIFO queue of
+``(expires_at, key)`` acts as the expiry wheel.  ``put`` retires at most a
+few expired entries from its head; the rest is swept off the request path
+by ``start_sweeper`` (a daemon thread started with the app).  Counters for
+hits, misses, evictions, expirations and resident bytes are in ``stats``
+and published on ``/api/metrics``.
+
+Two-tier mode: when Redis is configured (``REDIS_URL``, connection from
+``core.redis._get_store``) the in-process store is an L1 in front of a
+shared Redis L2, so web dynos, uvicorn workers and the scheduler share one
+warm cache.  Values are stored as compact JSON (zlib-compressed above
+``LLM_CACHE_COMPRESS_MIN`` bytes) under ``llmcache:v1:<key>`` with the same
+TTL.  ``get_or_compute`` adds cross-process single-flight: the first
+process to miss takes a short Redis ``SET NX`` fill lock and calls the
+provider; the others poll L2 for its result instead of calling too,
+backing off from 50 ms to 1 s between polls.  Lock and poll round-trips run
+in worker threads (the Redis client is synchronous), and the lock is
+released with an atomic compare-and-delete so a holder whose lock expired
+cannot delete the next holder's.
+Without Redis (or with ``LLM_CACHE_SHARED=off``) behaviour is purely
+in-memory as before.
+
+Within a process ``get_or_compute`` is also single-flight: concurrent
+callers on the same event loop with the same key await one shared future,
+so a burst of identical prompts costs one provider call.  The shared
+outcome is returned to every waiter even when ``should_cache`` rejects it
+(error fallbacks are delivered, just not stored).  Call sites wrap their
+provider logic with it::
+
+    key = llm_cache.make_key(model, system_prompt, user_prompt)
+    return await llm_cache.get_or_compute(
+        key, lambda: call_provider(...), should_cache=provider_answered
+    )
 """
 
 from __future__ import annotations
 
+import asyncio
+import base64
 import hashlib
+import json
 import logging
 import os
+import sys
 import threading
 import time
-from typing import Any, Optional
+import uuid
+import zlib
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Optional
 
 log = logging.getLogger(__name__)
 
 # Default: 5 minutes.  Override via environment variable.
 _DEFAULT_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "300"))
 _DEFAULT_MAX_SIZE = int(os.getenv("LLM_CACHE_MAX_SIZE", "512"))
+# Background expiry sweep interval, and expired entries retired per ``put``
+_SWEEP_INTERVAL_SECONDS = float(os.getenv("LLM_CACHE_SWEEP_SECONDS", "30"))
+_PUT_EXPIRY_BUDGET = 8
+
+# Shared (Redis) tier
+_SHARED_MODE = os.getenv("LLM_CACHE_SHARED", "auto").strip().lower()
+_KEY_PREFIX = "llmcache:v1:"
+_LOCK_PREFIX = "llmcache:fill:"
+_COMPRESS_MIN_BYTES = int(os.getenv("LLM_CACHE_COMPRESS_MIN", "1024"))
+# How long a filling process may hold the lock / others wait for its result
+_FILL_LOCK_SECONDS = int(os.getenv("LLM_CACHE_FILL_LOCK_SECONDS", "60"))
+_FILL_POLL_SECONDS = 0.05
+_FILL_POLL_MAX_SECONDS = 1.0
+# Delete the fill lock only while it still holds this process's token.
+_RELEASE_LOCK_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+_AUTO = object()
+
+
+class _FlightAbandoned(Exception):
+    """The coalesced call's owner was cancelled; waiters retry themselves."""
+
+
+def provider_answered(value: Any) -> bool:
+    """True for a ``(text, usage_meta)`` result with non-empty usage metadata.
+
+    LLM call sites return ``(fallback_text, {})`` when every provider fails;
+    those results must not be cached.
+    """
+    return isinstance(value, tuple) and len(value) == 2 and bool(value[1])
+
+
+def _encode(value: Any) -> Optional[str]:
+    """Serialise a cache value compactly; ``None`` if not JSON-serialisable."""
+    kind = "t" if isinstance(value, tuple) else "v"
+    try:
+        raw = json.dumps([kind, value], separators=(",", ":"), ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    if len(raw) >= _COMPRESS_MIN_BYTES:
+        packed = zlib.compress(raw.encode("utf-8"), 6)
+        return "z:" + base64.b64encode(packed).decode("ascii")
+    return "j:" + raw
+
+
+def _decode(payload: Any) -> Optional[Any]:
+    if isinstance(payload, bytes):
+        payload = payload.decode("utf-8")
+    if not isinstance(payload, str) or len(payload) < 2:
+        return None
+    try:
+        if payload.startswith("z:"):
+            raw = zlib.decompress(base64.b64decode(payload[2:])).decode("utf-8")
+        elif payload.startswith("j:"):
+            raw = payload[2:]
+        else:
+            return None
+        kind, value = json.loads(raw)
+    except (ValueError, TypeError, zlib.error):
+        return None
+    return tuple(value) if kind == "t" else value
+
+
+def _default_shared_store() -> Optional[Any]:
+    """Redis client from ``core.redis`` or ``None`` when only memory is available."""
+    if _SHARED_MODE in {"0", "off", "false", "no"}:
+        return None
+    try:
+        from backend.src.core.redis import _get_store, _MemoryStore
+
+        store = _get_store()
+    except Exception:
+        log.debug("LLM cache shared tier unavailable", exc_info=True)
+        return None
+    return None if isinstance(store, _MemoryStore) else store
+
+
+def _approx_bytes(value: Any) -> int:
+    """Cheap payload size estimate (string lengths, not interpreter overhead)."""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_approx_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_approx_bytes(k) + _approx_bytes(v) for k, v in value.items())
+    return sys.getsizeof(value)
 
 
 class _CacheEntry:
-    __slots__ = ("value", "expires_at")
+    __slots__ = ("value", "expires_at", "nbytes")
 
     def __init__(self, value: Any, ttl: int) -> None:
         self.value = value
         self.expires_at = time.monotonic() + ttl
+        self.nbytes = _approx_bytes(value)
 
 
 class LLMCache:
-    """Bounded, TTL-evicting LLM response cache."""
+    """Bounded, TTL-evicting LLM response cache with optional Redis L2.
+
+    ``shared`` is a Redis-like client (``get``/``setex``/``set(nx, ex)``/
+    ``delete``); by default it is resolved lazily from ``core.redis`` and
+    ``None`` disables the shared tier.
+    """
 
     def __init__(
         self,
         ttl_seconds: int = _DEFAULT_TTL_SECONDS,
         max_size: int = _DEFAULT_MAX_SIZE,
+        *,
+        shared: Any = _AUTO,
     ) -> None:
         self._ttl = ttl_seconds
         self._max_size = max_size
-        self._store: dict[str, _CacheEntry] = {}
+        self._store: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        # (expires_at, key, entry) in insertion == expiry order; an item is
+        # stale once ``_store[key]`` is no longer that entry
+        self._expiry: "deque[tuple[float, str, _CacheEntry]]" = deque()
         self._lock = threading.Lock()
+        self._shared = shared
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._l2_hits = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._coalesced = 0
+        # (id(event loop), key) -> future of the in-flight ``get_or_compute``
+        self._inflight: dict[tuple[int, str], "asyncio.Future[Any]"] = {}
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Shared tier
+    # ------------------------------------------------------------------
+
+    def _shared_store(self) -> Optional[Any]:
+        if self._shared is _AUTO:
+            self._shared = _default_shared_store()
+        return self._shared
+
+    def _shared_get(self, key: str) -> Optional[Any]:
+        shared = self._shared_store()
+        if shared is None:
+            return None
+        try:
+            payload = shared.get(_KEY_PREFIX + key)
+        except Exception:
+            log.warning("LLM cache L2 read failed", exc_info=True)
+            return None
+        return _decode(payload) if payload is not None else None
+
+    def _shared_put(self, key: str, value: Any) -> None:
+        shared = self._shared_store()
+        if shared is None:
+            return
+        payload = _encode(value)
+        if payload is None:
+            log.debug("LLM cache value not serialisable; kept in L1 only")
+            return
+        try:
+            shared.setex(_KEY_PREFIX + key, self._ttl, payload)
+        except Exception:
+            log.warning("LLM cache L2 write failed", exc_info=True)
+
+    # ------------------------------------------------------------------
+    # Local store (caller holds ``self._lock`` for the ``_``-helpers)
+    # ------------------------------------------------------------------
+
+    def _remove(self, key: str) -> None:
+        entry = self._store.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def _expire(self, now: float, budget: Optional[int] = None) -> int:
+        """Retire expired entries from the head of the expiry queue."""
+        retired = 0
+        while self._expiry and (budget is None or retired < budget):
+            expires_at, key, entry = self._expiry[0]
+            if self._store.get(key) is not entry:
+                self._expiry.popleft()  # overwritten or already removed
+                continue
+            if expires_at > now:
+                break
+            self._expiry.popleft()
+            self._remove(key)
+            self._expirations += 1
+            retired += 1
+        return retired
+
+    def _put_local(self, key: str, value: Any) -> None:
+        entry = _CacheEntry(value, self._ttl)
+        with self._lock:
+            self._expire(time.monotonic(), _PUT_EXPIRY_BUDGET)
+            self._remove(key)
+            self._store[key] = entry
+            self._bytes += entry.nbytes
+            self._expiry.append((entry.expires_at, key, entry))
+            while len(self._store) > self._max_size:
+                _, evicted = self._store.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._evictions += 1
+            if len(self._expiry) > 2 * self._max_size + 64:
+                # Many overwrites/evictions left stale queue items; compact
+                self._expiry = deque(
+                    item for item in self._expiry if self._store.get(item[1]) is item[2]
+                )
+
+    def sweep(self) -> int:
+        """Drop every expired entry now; returns how many were removed."""
+        with self._lock:
+            return self._expire(time.monotonic())
+
+    def start_sweeper(self, interval_seconds: float = _SWEEP_INTERVAL_SECONDS) -> None:
+        """Run ``sweep`` every ``interval_seconds`` in a daemon thread."""
+        if self._sweeper and self._sweeper.is_alive():
+            return
+        self._sweeper_stop.clear()
+
+        def _loop() -> None:
+            while not self._sweeper_stop.wait(interval_seconds):
+                try:
+                    removed = self.sweep()
+                    if removed:
+                        log.debug("LLM cache sweep removed %d expired entries", removed)
+                except Exception:  # pragma: no cover - defensive
+                    log.exception("LLM cache sweep failed")
+
+        self._sweeper = threading.Thread(target=_loop, name="llm-cache-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        """Stop the background sweep thread, if running."""
+        self._sweeper_stop.set()
+        if self._sweeper:
+            self._sweeper.join(timeout=5)
+            self._sweeper = None
 
     # ------------------------------------------------------------------
     # Public API
@@ -69,47 +332,201 @@ class LLMCache:
         return hashlib.sha256(raw.encode()).hexdigest()
 
     def get(self, key: str) -> Optional[Any]:
-        """Return cached value or ``None`` on miss/expiry."""
+        """Return cached value or ``None`` on miss/expiry (L1, then L2)."""
         with self._lock:
             entry = self._store.get(key)
-            if entry is None:
-                return None
-            if time.monotonic() > entry.expires_at:
-                del self._store[key]
-                return None
-            return entry.value
+            if entry is not None:
+                if time.monotonic() <= entry.expires_at:
+                    self._store.move_to_end(key)
+                    self._hits += 1
+                    return entry.value
+                self._remove(key)
+                self._expirations += 1
+
+        value = self._shared_get(key)
+        with self._lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._l2_hits += 1
+        if value is not None:
+            self._put_local(key, value)
+        return value
 
     def put(self, key: str, value: Any) -> None:
-        """Insert or overwrite an entry.  Evicts oldest on overflow."""
+        """Insert or overwrite an entry in both tiers.  Evicts oldest on overflow."""
+        self._put_local(key, value)
+        self._shared_put(key, value)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        *,
+        should_cache: Callable[[Any], bool] = lambda value: value is not None,
+    ) -> Any:
+        """Return the cached value or compute, cache and return it.
+
+        Concurrent misses for ``key`` on the same event loop share one
+        ``compute`` call (in-process single-flight).  With the shared tier,
+        concurrent misses across processes also call ``compute`` once: the
+        fill-lock holder computes, the others poll L2 for up to
+        ``LLM_CACHE_FILL_LOCK_SECONDS`` and only compute themselves if the
+        holder fails or times out.  Results rejected by ``should_cache``
+        (e.g. error fallbacks) are returned but not stored.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # not under asyncio (e.g. trio): no coalescing
+            return await self._fill(key, compute, should_cache)
+        flight_key = (id(loop), key)
         with self._lock:
-            # Evict expired entries first
-            now = time.monotonic()
-            expired = [k for k, v in self._store.items() if now > v.expires_at]
-            for k in expired:
-                del self._store[k]
+            flight = self._inflight.get(flight_key)
+            owner = flight is None
+            if owner:
+                flight = loop.create_future()
+                self._inflight[flight_key] = flight
+            else:
+                self._coalesced += 1
+
+        if not owner:
+            try:
+                return await asyncio.shield(flight)
+            except _FlightAbandoned:
+                return await self.get_or_compute(key, compute, should_cache=should_cache)
+
+        try:
+            value = await self._fill(key, compute, should_cache)
+        except asyncio.CancelledError:
+            flight.set_exception(_FlightAbandoned())
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            raise
+        else:
+            flight.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(flight_key, None)
+            if not flight.cancelled():
+                flight.exception()  # retrieved: no "never retrieved" warning
 
-            # Evict oldest if still over budget
-            while len(self._store) >= self._max_size:
-                oldest_key = min(self._store, key=lambda k: self._store[k].expires_at)
-                del self._store[oldest_key]
+    async def _fill(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool],
+    ) -> Any:
+        """Compute and store ``key`` under the cross-process fill lock."""
+        shared = self._shared_store()
+        lock_key = _LOCK_PREFIX + key
+        token = uuid.uuid4().hex
+        holder = False
+        if shared is not None:
+            try:
+                holder = bool(
+                    await asyncio.to_thread(
+                        shared.set, lock_key, token, nx=True, ex=_FILL_LOCK_SECONDS
+                    )
+                )
+            except Exception:
+                log.warning("LLM cache fill lock unavailable", exc_info=True)
+                holder = True  # Redis trouble: behave as a plain miss
+            if not holder:
+                cached = await self._await_fill(key, lock_key, shared)
+                if cached is not None:
+                    return cached
+
+        try:
+            value = await compute()
+            if should_cache(value):
+                await asyncio.to_thread(self.put, key, value)
+            return value
+        finally:
+            if holder:
+                try:
+                    await asyncio.to_thread(
+                        shared.eval, _RELEASE_LOCK_SCRIPT, 1, lock_key, token
+                    )
+                except Exception:
+                    log.debug("LLM cache fill lock release failed", exc_info=True)
+
+    async def _await_fill(self, key: str, lock_key: str, shared: Any) -> Optional[Any]:
+        """Poll for another process's fill of ``key``; None means compute it here."""
+        deadline = time.monotonic() + _FILL_LOCK_SECONDS
+        delay = _FILL_POLL_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _FILL_POLL_MAX_SECONDS)
+            try:
+                cached, released = await asyncio.to_thread(
+                    self._poll_fill, key, lock_key, shared
+                )
+            except Exception:
+                return None
+            if cached is not None:
+                return cached
+            if released:
+                return None  # holder finished without caching
+        return None
 
-            self._store[key] = _CacheEntry(value, self._ttl)
+    def _poll_fill(self, key: str, lock_key: str, shared: Any) -> tuple[Optional[Any], bool]:
+        """``(cached value, lock released)`` — blocking Redis round-trips."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached, False
+        return None, shared.get(lock_key) is None
 
     def invalidate(self, key: str) -> None:
-        """Remove a specific entry."""
+        """Remove a specific entry from both tiers."""
         with self._lock:
-            self._store.pop(key, None)
+            self._remove(key)
+        shared = self._shared_store()
+        if shared is not None:
+            try:
+                shared.delete(_KEY_PREFIX + key)
+            except Exception:
+                log.warning("LLM cache L2 delete failed", exc_info=True)
 
     def clear(self) -> None:
-        """Drop all cached entries."""
+        """Drop all in-process entries (the shared tier expires by TTL)."""
         with self._lock:
             self._store.clear()
+            self._expiry.clear()
+            self._bytes = 0
 
     @property
     def size(self) -> int:
         """Current number of entries (including potentially expired)."""
         return len(self._store)
 
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return cache statistics for monitoring."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._store),
+                "max_size": self._max_size,
+                "ttl_seconds": self._ttl,
+                "resident_bytes": self._bytes,
+                "hits": self._hits,
+                "l2_hits": self._l2_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._inflight),
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "shared_tier": self._shared is not None and self._shared is not _AUTO,
+            }
+
 
 # Module-level singleton
 llm_cache = LLMCache()
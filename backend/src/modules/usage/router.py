@@ -128,3 +128,26 @@ async def admin_cost_report(
         "users": rows,
         "by_agent": by_agent,
     }
+
+
+@router.get("/admin/caches")
+async def admin_cache_stats(_admin=Depends(require_roles("admin"))):
+    """Admin-only: LLM cache counters, semantic cache hit rates per
+    namespace kind and namespace, and the RAG embedding-matrix cache.
+
+    Use the per-kind ``hit_rate`` to decide where thresholds / TTLs can be
+    relaxed (``SEMANTIC_CACHE_<KIND>_THRESHOLD`` etc.).
+    """
+    from backend.src.modules.rag.matrix_cache import matrix_cache
+    from backend.src.modules.usage.llm_cache import llm_cache
+    from backend.src.modules.usage.semantic_cache import (
+        semantic_cache,
+        semantic_caches,
+    )
+
+    return {
+        "llm": llm_cache.stats,
+        "semantic": semantic_cache.stats,
+        "semantic_namespaces": semantic_caches.stats,
+        "rag_matrix": matrix_cache.stats,
+    }
@@ -8,6 +8,16 @@ Uses the same OpenAI text-embedding-3-small model already deployed for RAG
 (no new infrastructure).  Entries are stored in-memory with TTL eviction
 and a configurable similarity threshold.
 
+Embeddings live as unit-length rows of a preallocated ``float32`` NumPy
+matrix, so a lookup is one matrix-vector product instead of a Python loop
+over every entry.  Past ``SEMANTIC_CACHE_SKETCH_MIN`` entries the scan runs
+over a 64-dim random-projection sketch of each row instead and only the
+best ``SEMANTIC_CACHE_CANDIDATES`` are re-scored exactly, which keeps
+lookups sub-millisecond at 10k+ entries.  Expiry is tracked in
+a min-heap keyed by expiry time, so expired entries are dropped in
+``O(log n)`` each rather than by rebuilding the entry list on every
+lookup.  Without numpy the same slots are scored with a Python loop.
+
 Usage::
 
     from backend.src.modules.usage.semantic_cache import semantic_cache
@@ -19,24 +29,64 @@ Usage::
     # … call LLM …
 
     await semantic_cache.put(user_prompt, (text, usage_meta))
+
+``semantic_caches`` holds namespaced pools (per owner / agent / capsule and
+system-prompt hash, with per-kind capacity and threshold) for callers whose
+answers depend on who is asking or on retrieved context; see
+``NamespacedSemanticCache``.
 """
 
 from __future__ import annotations
 
+import hashlib
+import heapq
+import itertools
 import logging
 import math
 import os
 import threading
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Optional
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
 log = logging.getLogger(__name__)
 
 # ── Configuration ─────────────────────────────────────────────────────────────
 
 _DEFAULT_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "600"))  # 10 min
-_DEFAULT_MAX_SIZE = int(os.getenv("SEMANTIC_CACHE_MAX_SIZE", "256"))
+_DEFAULT_MAX_SIZE = int(os.getenv("SEMANTIC_CACHE_MAX_SIZE", "2048"))
 _DEFAULT_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+# Slots allocated up front; the matrix doubles up to ``max_size`` as needed.
+# Kept small: a namespace exists per owner/agent/prompt and most hold a few
+# entries.
+_INITIAL_CAPACITY = 4
+# Random-projection prefilter: sketch width, when it kicks in, and how many
+# sketch candidates are re-scored against the full embeddings
+_SKETCH_DIM = 64
+_SKETCH_MIN_ENTRIES = int(os.getenv("SEMANTIC_CACHE_SKETCH_MIN", "1024"))
+_SKETCH_CANDIDATES = int(os.getenv("SEMANTIC_CACHE_CANDIDATES", "32"))
+
+
+@lru_cache(maxsize=8)
+def _projection(dim: int) -> Any:
+    """Fixed random projection for the sketch prefilter.
+
+    Seeded, so it is identical for every namespace of the same width and is
+    shared between them rather than allocated per namespace.
+    """
+    rng = np.random.default_rng(0)
+    projection = (rng.standard_normal((dim, _SKETCH_DIM)) / math.sqrt(_SKETCH_DIM)).astype(
+        np.float32
+    )
+    projection.setflags(write=False)
+    return projection
 
 
 def _cosine_similarity(a: list[float], b: list[float]) -> float:
@@ -49,12 +99,35 @@ def _cosine_similarity(a: list[float], b: list[float]) -> float:
     return dot / (norm_a * norm_b)
 
 
+def _context_id(context: Optional[str]) -> int:
+    """Stable non-zero int64 tag for a context string (0 = no context)."""
+    if not context:
+        return 0
+    digest = hashlib.blake2b(context.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True) or 1
+
+
+def _unit(vec: list[float]) -> Optional[list[float]]:
+    norm = math.sqrt(sum(x * x for x in vec))
+    if norm == 0:
+        return None
+    return [x / norm for x in vec]
+
+
 class SemanticCache:
     """In-memory embedding-based cache for LLM responses.
 
-    Each entry stores: (embedding, value, timestamp).
-    On lookup, the query embedding is compared against all stored entries;
-    if cosine similarity >= threshold, the cached value is returned.
+    Entries occupy numbered slots: slot ``i`` holds row ``i`` of the
+    embedding matrix, ``_values[i]`` and a generation number.  The expiry
+    heap holds ``(expires_at, generation, slot)``; an entry whose generation
+    no longer matches its slot is stale and skipped.  Because the TTL is
+    uniform the heap top is also the oldest entry, which is what gets
+    evicted when the cache is full.
+
+    On lookup, the query embedding is compared against all live entries;
+    if the best cosine similarity is >= threshold, its value is returned.
+    Entries stored with a ``context`` (e.g. a fingerprint of the retrieved
+    evidence) only match lookups with the same context.
     """
 
     def __init__(
@@ -68,8 +141,19 @@ class SemanticCache:
         self._max_size = max_size
         self._threshold = similarity_threshold
         self._lock = threading.Lock()
-        # list of (embedding, value, insert_time)
-        self._entries: list[tuple[list[float], Any, float]] = []
+        self._dim: Optional[int] = None
+        # (capacity, dim) float32 unit rows + bool mask; lists without numpy
+        self._matrix: Any = None
+        self._sketch: Any = None  # (capacity, _SKETCH_DIM) = matrix @ projection
+        self._projection: Any = None
+        self._live: Any = []
+        self._values: list[Any] = []
+        self._contexts: Any = []  # per-slot context id (int64 array with numpy)
+        self._generation: list[int] = []
+        self._free: list[int] = []
+        self._heap: list[tuple[float, int, int]] = []
+        self._counter = itertools.count()
+        self._size = 0
         self._hits = 0
         self._misses = 0
 
@@ -95,60 +179,169 @@ class SemanticCache:
             log.debug("Semantic cache embedding failed", exc_info=True)
             return None
 
+    # ── Slot management (caller holds the lock) ──────────────────────────
+
+    def _capacity(self) -> int:
+        return len(self._live)
+
+    def _grow(self) -> None:
+        old = self._capacity()
+        new = min(max(old * 2, _INITIAL_CAPACITY), self._max_size)
+        if np is not None:
+            if self._projection is None:
+                self._projection = _projection(self._dim)
+            matrix = np.zeros((new, self._dim), dtype=np.float32)
+            sketch = np.zeros((new, _SKETCH_DIM), dtype=np.float32)
+            live = np.zeros(new, dtype=bool)
+            contexts = np.zeros(new, dtype=np.int64)
+            if self._matrix is not None:
+                matrix[:old] = self._matrix
+                sketch[:old] = self._sketch
+                live[:old] = self._live
+                contexts[:old] = self._contexts
+            self._matrix, self._sketch = matrix, sketch
+            self._live, self._contexts = live, contexts
+        else:
+            self._matrix = (self._matrix or []) + [None] * (new - old)
+            self._live = self._live + [False] * (new - old)
+            self._contexts = self._contexts + [0] * (new - old)
+        self._values.extend([None] * (new - old))
+        self._generation.extend([0] * (new - old))
+        self._free.extend(range(new - 1, old - 1, -1))
+
+    def _release(self, slot: int) -> None:
+        self._live[slot] = False
+        self._values[slot] = None
+        self._contexts[slot] = 0
+        if np is not None:
+            self._matrix[slot] = 0.0
+            self._sketch[slot] = 0.0
+        else:
+            self._matrix[slot] = None
+        self._free.append(slot)
+        self._size -= 1
+
+    def _purge_expired(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            _, generation, slot = heapq.heappop(self._heap)
+            if self._live[slot] and self._generation[slot] == generation:
+                self._release(slot)
+
+    def _evict_oldest(self) -> None:
+        while self._heap:
+            _, generation, slot = heapq.heappop(self._heap)
+            if self._live[slot] and self._generation[slot] == generation:
+                self._release(slot)
+                return
+
+    def _best_match(self, unit: list[float], context_id: int) -> tuple[int, float]:
+        """Return ``(slot, score)`` of the most similar eligible entry, or ``(-1, 0)``."""
+        if self._size == 0:
+            return -1, 0.0
+        if np is not None:
+            query = np.asarray(unit, dtype=np.float32)
+            excluded = ~self._live | (self._contexts != context_id)
+            if self._size < max(_SKETCH_MIN_ENTRIES, _SKETCH_CANDIDATES + 1):
+                slots = None
+                scores = self._matrix @ query
+                scores[excluded] = -np.inf
+            else:
+                rough = self._sketch @ (query @ self._projection)
+                rough[excluded] = -np.inf
+                slots = np.argpartition(rough, -_SKETCH_CANDIDATES)[-_SKETCH_CANDIDATES:]
+                scores = self._matrix[slots] @ query
+                scores[excluded[slots]] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] == -np.inf:
+                return -1, 0.0
+            return (best if slots is None else int(slots[best])), float(scores[best])
+        best_slot, best_score = -1, 0.0
+        for slot, row in enumerate(self._matrix):
+            if row is None or self._contexts[slot] != context_id:
+                continue
+            score = sum(x * y for x, y in zip(unit, row))
+            if best_slot < 0 or score > best_score:
+                best_slot, best_score = slot, score
+        return best_slot, best_score
+
     # ── Public API ────────────────────────────────────────────────────────
 
-    async def get(self, query: str) -> Optional[Any]:
-        """Look up a semantically similar cached entry.
+    async def get(self, query: str, *, context: Optional[str] = None) -> Optional[Any]:
+        """Look up a semantically similar cached entry stored with the same ``context``.
 
         Returns the cached value if found, else None.
         """
         vec = await self._embed(query)
-        if vec is None:
-            self._misses += 1
-            return None
-
-        now = time.monotonic()
+        unit = _unit(vec) if vec is not None else None
         best_val = None
         best_score = 0.0
 
         with self._lock:
-            # Evict expired while scanning
-            alive: list[tuple[list[float], Any, float]] = []
-            for emb, val, ts in self._entries:
-                if (now - ts) > self._ttl:
-                    continue
-                alive.append((emb, val, ts))
-                score = _cosine_similarity(vec, emb)
-                if score >= self._threshold and score > best_score:
-                    best_score = score
-                    best_val = val
-            self._entries = alive
+            if unit is not None and len(unit) == self._dim:
+                self._purge_expired(time.monotonic())
+                slot, best_score = self._best_match(unit, _context_id(context))
+                if slot >= 0 and best_score >= self._threshold:
+                    best_val = self._values[slot]
+
+            if best_val is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
 
         if best_val is not None:
-            self._hits += 1
             log.debug("Semantic cache HIT (score=%.3f)", best_score)
-        else:
-            self._misses += 1
-
         return best_val
 
-    async def put(self, query: str, value: Any) -> None:
-        """Store a query/response pair in the cache."""
+    async def put(
+        self, query: str, value: Any, *, context: Optional[str] = None
+    ) -> None:
+        """Store a query/response pair in the cache, optionally under ``context``."""
         vec = await self._embed(query)
-        if vec is None:
+        unit = _unit(vec) if vec is not None else None
+        if unit is None or self._max_size <= 0:
             return
 
         now = time.monotonic()
         with self._lock:
-            self._entries.append((vec, value, now))
-            # Evict oldest if over size
-            if len(self._entries) > self._max_size:
-                self._entries = self._entries[-self._max_size:]
+            if self._dim is None:
+                self._dim = len(unit)
+            elif len(unit) != self._dim:
+                log.debug("Semantic cache: embedding dimension changed; entry skipped")
+                return
+
+            self._purge_expired(now)
+            if not self._free:
+                if self._capacity() < self._max_size:
+                    self._grow()
+                else:
+                    self._evict_oldest()
+
+            slot = self._free.pop()
+            generation = next(self._counter)
+            self._matrix[slot] = unit
+            if np is not None:
+                self._sketch[slot] = self._matrix[slot] @ self._projection
+            self._live[slot] = True
+            self._values[slot] = value
+            self._contexts[slot] = _context_id(context)
+            self._generation[slot] = generation
+            self._size += 1
+            heapq.heappush(self._heap, (now + self._ttl, generation, slot))
 
     def clear(self) -> None:
         """Flush all entries."""
         with self._lock:
-            self._entries.clear()
+            self._dim = None
+            self._matrix = None
+            self._sketch = None
+            self._projection = None
+            self._live = []
+            self._values = []
+            self._contexts = []
+            self._generation = []
+            self._free = []
+            self._heap = []
+            self._size = 0
             self._hits = 0
             self._misses = 0
 
@@ -157,10 +350,15 @@ class SemanticCache:
         """Return cache statistics for monitoring."""
         with self._lock:
             return {
-                "entries": len(self._entries),
+                "entries": self._size,
                 "max_size": self._max_size,
                 "ttl_seconds": self._ttl,
                 "similarity_threshold": self._threshold,
+                "resident_bytes": (
+                    int(self._matrix.nbytes + self._sketch.nbytes)
+                    if np is not None and self._matrix is not None
+                    else 0
+                ),
                 "hits": self._hits,
                 "misses": self._misses,
                 "hit_rate": (
@@ -171,5 +369,161 @@ class SemanticCache:
             }
 
 
-# Module-level singleton
+# ── Namespaces ────────────────────────────────────────────────────────────────
+
+_NAMESPACE_KINDS = ("default", "rag", "agent", "capsule")
+_MAX_NAMESPACES = int(os.getenv("SEMANTIC_CACHE_MAX_NAMESPACES", "1024"))
+
+
+@dataclass(frozen=True)
+class NamespacePolicy:
+    """Capacity, threshold and TTL applied to every namespace of one kind."""
+
+    max_size: int
+    similarity_threshold: float
+    ttl_seconds: int
+
+    @classmethod
+    def from_env(cls, kind: str) -> "NamespacePolicy":
+        """``SEMANTIC_CACHE_<KIND>_MAX_SIZE`` / ``_THRESHOLD`` / ``_TTL`` overrides."""
+        prefix = f"SEMANTIC_CACHE_{kind.upper()}_"
+        return cls(
+            max_size=int(os.getenv(prefix + "MAX_SIZE", "256")),
+            similarity_threshold=float(
+                os.getenv(prefix + "THRESHOLD", str(_DEFAULT_THRESHOLD))
+            ),
+            ttl_seconds=int(os.getenv(prefix + "TTL", str(_DEFAULT_TTL))),
+        )
+
+
+def namespace_key(
+    kind: str,
+    *,
+    owner_id: Optional[str] = None,
+    agent: Optional[str] = None,
+    system_prompt: Optional[str] = None,
+) -> str:
+    """Build ``kind:owner:agent:prompt-hash`` (``*`` for unscoped parts)."""
+    prompt = (
+        hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+        if system_prompt
+        else "*"
+    )
+    return f"{kind}:{owner_id or '*'}:{agent or '*'}:{prompt}"
+
+
+class NamespacedSemanticCache:
+    """Per-namespace ``SemanticCache`` pools with per-namespace hit rates.
+
+    A namespace scopes entries to one owner (tenant), agent or capsule, and
+    system prompt, so a hit can never cross tenants or prompt variants; the
+    threshold and TTL can then be relaxed per kind via ``NamespacePolicy``.
+    Namespaces are created lazily and the least recently used one is
+    dropped beyond ``SEMANTIC_CACHE_MAX_NAMESPACES`` (its counters are kept
+    in the per-kind totals).
+
+    Usage::
+
+        cache = semantic_caches.namespace("rag", owner_id=user.id, system_prompt=sp)
+        hit = await cache.get(query, context=evidence_fingerprint)
+    """
+
+    def __init__(
+        self,
+        *,
+        max_namespaces: int = _MAX_NAMESPACES,
+        policies: Optional[dict[str, NamespacePolicy]] = None,
+    ) -> None:
+        self._max_namespaces = max_namespaces
+        self._policies = policies or {
+            kind: NamespacePolicy.from_env(kind) for kind in _NAMESPACE_KINDS
+        }
+        self._lock = threading.Lock()
+        self._caches: "OrderedDict[str, SemanticCache]" = OrderedDict()
+        self._retired: dict[str, dict[str, int]] = {}
+
+    def policy(self, kind: str) -> NamespacePolicy:
+        return self._policies.get(kind) or self._policies["default"]
+
+    def namespace(
+        self,
+        kind: str,
+        *,
+        owner_id: Optional[str] = None,
+        agent: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+    ) -> SemanticCache:
+        """Return (creating if needed) the cache for this namespace."""
+        key = namespace_key(
+            kind, owner_id=owner_id, agent=agent, system_prompt=system_prompt
+        )
+        with self._lock:
+            cache = self._caches.get(key)
+            if cache is not None:
+                self._caches.move_to_end(key)
+                return cache
+            policy = self.policy(kind)
+            cache = SemanticCache(
+                ttl_seconds=policy.ttl_seconds,
+                max_size=policy.max_size,
+                similarity_threshold=policy.similarity_threshold,
+            )
+            self._caches[key] = cache
+            while len(self._caches) > self._max_namespaces:
+                old_key, old = self._caches.popitem(last=False)
+                old_stats = old.stats
+                totals = self._retired.setdefault(
+                    old_key.split(":", 1)[0], {"hits": 0, "misses": 0}
+                )
+                totals["hits"] += old_stats["hits"]
+                totals["misses"] += old_stats["misses"]
+            return cache
+
+    def clear(self) -> None:
+        """Drop every namespace and counter."""
+        with self._lock:
+            self._caches.clear()
+            self._retired.clear()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Per-kind totals plus per-namespace hit rates (busiest first)."""
+        with self._lock:
+            caches = list(self._caches.items())
+            retired = {kind: dict(t) for kind, t in self._retired.items()}
+
+        namespaces = []
+        by_kind: dict[str, dict[str, Any]] = {}
+        for key, cache in caches:
+            ns = cache.stats
+            namespaces.append({"namespace": key, **ns})
+            kind = by_kind.setdefault(
+                key.split(":", 1)[0],
+                {"namespaces": 0, "entries": 0, "hits": 0, "misses": 0},
+            )
+            kind["namespaces"] += 1
+            kind["entries"] += ns["entries"]
+            kind["hits"] += ns["hits"]
+            kind["misses"] += ns["misses"]
+        for kind_name, totals in retired.items():
+            kind = by_kind.setdefault(
+                kind_name, {"namespaces": 0, "entries": 0, "hits": 0, "misses": 0}
+            )
+            kind["hits"] += totals["hits"]
+            kind["misses"] += totals["misses"]
+        for kind in by_kind.values():
+            lookups = kind["hits"] + kind["misses"]
+            kind["hit_rate"] = round(kind["hits"] / lookups, 3) if lookups else 0.0
+
+        namespaces.sort(key=lambda n: n["hits"] + n["misses"], reverse=True)
+        return {
+            "namespaces": len(caches),
+            "max_namespaces": self._max_namespaces,
+            "by_kind": by_kind,
+            "top": namespaces[:50],
+        }
+
+
+# Module-level singletons
 semantic_cache = SemanticCache()
+semantic_caches = NamespacedSemanticCache()
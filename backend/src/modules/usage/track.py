@@ -9,10 +9,13 @@ by the platform, regardless of which agent or service triggered the call.
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Sequence
 
 from sqlalchemy.orm import Session
 
+if TYPE_CHECKING:
+    from backend.src.modules.ai_router.hedging import Discarded
+
 log = logging.getLogger(__name__)
 
 
@@ -64,3 +67,28 @@ def try_record_usage(
         db.commit()
     except Exception:
         log.warning("Failed to record LLM usage (%s)", event_type, exc_info=True)
+
+
+def try_record_discarded_usage(
+    db: Session | None,
+    *,
+    user_id: str | None,
+    event_type: str,
+    discarded: Sequence[Discarded],
+    thread_id: Optional[str] = None,
+) -> None:
+    """Record the provider calls a hedged request discarded.
+
+    The losing call of a hedge is billed too, so each one gets its own
+    ``UsageLog`` row (``detail["hedge"] == "discarded"``).  Never raises.
+    """
+    from backend.src.modules.ai_router.hedging import discarded_usage
+
+    for call in discarded:
+        try_record_usage(
+            db,
+            user_id=user_id,
+            event_type=event_type,
+            thread_id=thread_id,
+            **discarded_usage(call),
+        )
@@ -1,7 +1,24 @@
-"""Lightweight orchestrator entry point for ChatKit-driven workflows."""
+"""Lightweight orchestrator entry point for ChatKit-driven workflows.
+
+Flows run in one of two modes:
+
+- ``sequential`` (default) — tool calls run one after another in the
+  request's session, each seeing the thread the previous one produced.
+- ``parallel`` — tool calls form a dependency graph: a call waits for the
+  calls named in its ``depends_on`` and otherwise runs concurrently with
+  the rest, at most ``FLOW_MAX_CONCURRENCY`` at a time.  Each call runs in
+  its own short-lived session on a worker thread and retries with
+  non-blocking backoff, so a flow of independent tools takes roughly as
+  long as its slowest path rather than the sum of its steps.
+
+In both modes ``FlowRun.steps`` lists the calls in request order, each
+with its ``started_at`` and ``duration_ms``.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import os
 import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -10,7 +27,9 @@ from typing import Any, Dict, Iterable, List, Optional, Tuple
 from sqlalchemy import desc, select
 from sqlalchemy.orm import Session
 
+from backend.src.core.async_bridge import run_sync
 from backend.src.db import models
+from backend.src.db.session import SessionLocal
 from backend.src.modules.chatkit import service as chatkit_service
 from backend.src.modules.flows.onboarding import update_task
 from backend.src.modules.usage.track import try_record_usage
@@ -18,10 +37,16 @@ from backend.src.modules.usage.track import try_record_usage
 
 @dataclass
 class ToolCall:
-    """Declarative tool invocation requested by the frontend."""
+    """Declarative tool invocation requested by the frontend.
+
+    ``id`` defaults to the call's position (``"0"``, ``"1"``, ...);
+    ``depends_on`` lists ids that must finish first in ``parallel`` mode.
+    """
 
     name: str
     payload: Dict[str, Any]
+    id: Optional[str] = None
+    depends_on: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -32,6 +57,10 @@ class RunStep:
     payload: Dict[str, Any]
     result: Dict[str, Any]
     event_id: str
+    call_id: Optional[str] = None
+    depends_on: List[str] = field(default_factory=list)
+    started_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None
 
 
 @dataclass
@@ -74,12 +103,23 @@ class RunExecutionError(RuntimeError):
 PENDING_THREAD_PLACEHOLDER = "__pending__"
 DEFAULT_RETRY_DELAY = 0.5
 RETRY_BACKOFF = 2.0
+EXECUTION_MODES = ("sequential", "parallel")
+MAX_CONCURRENCY = max(1, int(os.getenv("FLOW_MAX_CONCURRENCY", "4")))
 
 
 def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
 def _deserialize_steps(payload: Iterable[Dict[str, Any]]) -> List[RunStep]:
     steps: List[RunStep] = []
     for item in payload or []:
@@ -91,11 +131,28 @@ def _deserialize_steps(payload: Iterable[Dict[str, Any]]) -> List[RunStep]:
                 payload=item.get("payload", {}) or {},
                 result=item.get("result", {}) or {},
                 event_id=item.get("event_id", ""),
+                call_id=item.get("call_id"),
+                depends_on=list(item.get("depends_on") or []),
+                started_at=_parse_timestamp(item.get("started_at")),
+                duration_ms=item.get("duration_ms"),
             )
         )
     return steps
 
 
+def _serialize_step(step: RunStep) -> Dict[str, Any]:
+    return {
+        "tool": step.tool,
+        "payload": step.payload,
+        "result": step.result,
+        "event_id": step.event_id,
+        "call_id": step.call_id,
+        "depends_on": step.depends_on,
+        "started_at": step.started_at.isoformat() if step.started_at else None,
+        "duration_ms": step.duration_ms,
+    }
+
+
 def _build_result_from_model(flow_run: models.FlowRun) -> RunResult:
     return RunResult(
         run_id=flow_run.id,
@@ -150,6 +207,184 @@ def _invoke_with_retry(
             delay *= RETRY_BACKOFF
 
 
+async def _ainvoke_with_retry(
+    *,
+    user: models.User,
+    placement: str,
+    tool_name: str,
+    payload: Dict[str, Any],
+    thread_id: str,
+    max_attempts: int,
+    agent_id: str | None = None,
+) -> Tuple[Dict[str, Any], str]:
+    """Async ``_invoke_with_retry``: own session per attempt, non-blocking backoff.
+
+    Returns the tool result and the id of the recorded chat event.
+    """
+    user_id = getattr(user, "id", None)
+
+    def _attempt() -> Tuple[Dict[str, Any], str]:
+        with SessionLocal() as db:
+            step_user = (db.get(models.User, user_id) if user_id else None) or user
+            _thread, result, event = chatkit_service.invoke_tool(
+                db,
+                user=step_user,
+                placement=placement,
+                tool_name=tool_name,
+                payload=payload,
+                thread_id=thread_id,
+                agent_id=agent_id,
+            )
+            return result, event.id
+
+    attempts = 0
+    delay = DEFAULT_RETRY_DELAY
+    while True:
+        attempts += 1
+        try:
+            return await asyncio.to_thread(_attempt)
+        except ValueError:
+            raise
+        except Exception:  # noqa: BLE001
+            if attempts >= max_attempts:
+                raise
+            await asyncio.sleep(delay)
+            delay *= RETRY_BACKOFF
+
+
+def _call_ids(tool_calls: List[ToolCall]) -> List[str]:
+    """Resolve call ids and validate that ``depends_on`` forms a DAG."""
+    ids = [call.id or str(index) for index, call in enumerate(tool_calls)]
+    if len(set(ids)) != len(ids):
+        raise ValueError("tool call ids must be unique")
+    known = set(ids)
+    for call_id, call in zip(ids, tool_calls):
+        for dep in call.depends_on:
+            if dep not in known:
+                raise ValueError(f"tool call '{call_id}' depends on unknown call '{dep}'")
+
+    deps = {call_id: set(call.depends_on) for call_id, call in zip(ids, tool_calls)}
+    resolved: set = set()
+    while len(resolved) < len(ids):
+        ready = [cid for cid in ids if cid not in resolved and deps[cid] <= resolved]
+        if not ready:
+            raise ValueError("tool call dependencies contain a cycle")
+        resolved.update(ready)
+    return ids
+
+
+async def _run_graph(
+    tool_calls: List[ToolCall],
+    ids: List[str],
+    *,
+    user: models.User,
+    placement: str,
+    thread_id: str,
+    max_attempts: int,
+    agent_id: str | None,
+    concurrency: int,
+) -> Tuple[List[Optional[RunStep]], List[BaseException]]:
+    """Run calls as soon as their dependencies finish, ``concurrency`` at a time.
+
+    After the first failure no further calls start; calls already running
+    are allowed to finish.  Returns per-call steps (``None`` for calls that
+    did not run) in request order and the errors in the order they occurred.
+    """
+    limiter = asyncio.Semaphore(concurrency)
+    steps: List[Optional[RunStep]] = [None] * len(tool_calls)
+    errors: List[BaseException] = []
+    tasks: Dict[str, asyncio.Task[None]] = {}
+
+    async def _node(index: int) -> None:
+        call = tool_calls[index]
+        deps = [tasks[dep] for dep in call.depends_on]
+        if deps:
+            await asyncio.wait(deps)
+        if errors:
+            return
+        async with limiter:
+            if errors:
+                return
+            started_at = _now()
+            started = time.perf_counter()
+            try:
+                result, event_id = await _ainvoke_with_retry(
+                    user=user,
+                    placement=placement,
+                    tool_name=call.name,
+                    payload=call.payload,
+                    thread_id=thread_id,
+                    max_attempts=max_attempts,
+                    agent_id=agent_id,
+                )
+            except Exception as exc:  # noqa: BLE001
+                errors.append(exc)
+                return
+        steps[index] = RunStep(
+            tool=call.name,
+            payload=call.payload,
+            result=result,
+            event_id=event_id,
+            call_id=ids[index],
+            depends_on=list(call.depends_on),
+            started_at=started_at,
+            duration_ms=int((time.perf_counter() - started) * 1000),
+        )
+
+    for index, call_id in enumerate(ids):
+        tasks[call_id] = asyncio.ensure_future(_node(index))
+    await asyncio.gather(*tasks.values())
+    return steps, errors
+
+
+def _apply_onboarding_side_effects(
+    db: Session,
+    *,
+    user: models.User,
+    placement: str,
+    thread_id: str,
+    call: ToolCall,
+) -> None:
+    if placement != "onboarding":
+        return
+    # mark tasks for known onboarding tools
+    if call.name == "onboarding.plan":
+        # seed default tasks
+        update_task(
+            db,
+            user_id=getattr(user, "id", ""),
+            thread_id=thread_id,
+            task_id="invite_team",
+            done=False,
+            label="Invite core teammates",
+        )
+    if call.name == "onboarding.checklist" and isinstance(call.payload, dict):
+        task_id = call.payload.get("task_id")
+        if isinstance(task_id, str):
+            update_task(
+                db,
+                user_id=getattr(user, "id", ""),
+                thread_id=thread_id,
+                task_id=task_id,
+                done=bool(call.payload.get("done", True)),
+                label=call.payload.get("label"),
+            )
+
+
+def _record_tool_call_usage(
+    db: Session, *, user: models.User, tool: str, flow_run_id: str
+) -> None:
+    # Record each tool invocation as a separate execution for quota accounting.
+    # The router-level enforce_execution_limit ran once for the whole request;
+    # this ensures the usage log accurately reflects per-tool-call costs.
+    try_record_usage(
+        db,
+        user_id=getattr(user, "id", None),
+        event_type="flow:tool_call",
+        detail={"tool": tool, "flow_run_id": flow_run_id},
+    )
+
+
 def _mark_failed(
     db: Session,
     *,
@@ -162,7 +397,7 @@ def _mark_failed(
     flow_run.error_message = message
     if thread_id:
         flow_run.thread_id = thread_id
-    flow_run.steps = steps_payload
+    flow_run.steps = list(steps_payload)
     flow_run.completed_at = _now()
     db.add(flow_run)
     db.commit()
@@ -226,13 +461,19 @@ def execute(
     agent: AgentContext | None = None,
     idempotency_key: str | None = None,
     max_attempts: int = 3,
+    mode: str = "sequential",
+    concurrency: int = MAX_CONCURRENCY,
 ) -> RunResult:
-    """Execute a sequence of tool calls and return structured trace data."""
+    """Execute tool calls (see module docstring for modes) and return trace data."""
     steps: List[RunStep] = []
     steps_payload: List[Dict[str, Any]] = []
     current_thread_id = thread_id
     max_attempts = max(1, max_attempts)
 
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"unknown execution mode '{mode}'")
+    call_ids = _call_ids(tool_calls)
+
     if agent:
         effective_placement = agent.placement
         allowed_tools = set(agent.allowed_tools)
@@ -276,19 +517,18 @@ def execute(
     db.add(flow_run)
     db.commit()
 
-    for call in tool_calls:
-        if allowed_tools is not None and call.name not in allowed_tools:
-            raise ValueError(f"tool '{call.name}' not allowed for agent")
+    if mode == "parallel":
+        if allowed_tools is not None:
+            for call in tool_calls:
+                if call.name not in allowed_tools:
+                    raise ValueError(f"tool '{call.name}' not allowed for agent")
         try:
-            thread, result, event = _invoke_with_retry(
+            # Every call shares one thread, so create it before fanning out.
+            thread = chatkit_service.ensure_thread(
                 db,
                 user=user,
                 placement=effective_placement,
-                tool_name=call.name,
-                payload=call.payload,
                 thread_id=current_thread_id,
-                max_attempts=max_attempts,
-                agent_id=agent.agent.id if agent else None,
             )
         except ValueError as exc:
             _mark_failed(
@@ -299,9 +539,38 @@ def execute(
                 message=str(exc),
             )
             raise
-        except (
-            Exception
-        ) as exc:  # noqa: BLE001 broad but captured for retries exhaustion
+        current_thread_id = thread.id
+
+        graph_steps, errors = run_sync(
+            _run_graph(
+                tool_calls,
+                call_ids,
+                user=user,
+                placement=effective_placement,
+                thread_id=current_thread_id,
+                max_attempts=max_attempts,
+                agent_id=agent.agent.id if agent else None,
+                concurrency=max(1, concurrency),
+            )
+        )
+        for call, step in zip(tool_calls, graph_steps):
+            if step is None:
+                continue
+            _record_tool_call_usage(
+                db, user=user, tool=call.name, flow_run_id=flow_run.id
+            )
+            _apply_onboarding_side_effects(
+                db,
+                user=user,
+                placement=effective_placement,
+                thread_id=current_thread_id,
+                call=call,
+            )
+            steps.append(step)
+            steps_payload.append(_serialize_step(step))
+
+        if errors:
+            exc = errors[0]
             _mark_failed(
                 db,
                 flow_run=flow_run,
@@ -309,68 +578,84 @@ def execute(
                 thread_id=current_thread_id,
                 message=str(exc),
             )
+            if isinstance(exc, ValueError):
+                raise exc
             raise RunExecutionError(
                 "Flow run failed after exhausting retries.",
                 run_id=flow_run.id,
                 retryable=False,
             ) from exc
+    else:
+        for call_id, call in zip(call_ids, tool_calls):
+            if allowed_tools is not None and call.name not in allowed_tools:
+                raise ValueError(f"tool '{call.name}' not allowed for agent")
+            started_at = _now()
+            started = time.perf_counter()
+            try:
+                thread, result, event = _invoke_with_retry(
+                    db,
+                    user=user,
+                    placement=effective_placement,
+                    tool_name=call.name,
+                    payload=call.payload,
+                    thread_id=current_thread_id,
+                    max_attempts=max_attempts,
+                    agent_id=agent.agent.id if agent else None,
+                )
+            except ValueError as exc:
+                _mark_failed(
+                    db,
+                    flow_run=flow_run,
+                    steps_payload=steps_payload,
+                    thread_id=current_thread_id,
+                    message=str(exc),
+                )
+                raise
+            except (
+                Exception
+            ) as exc:  # noqa: BLE001 broad but captured for retries exhaustion
+                _mark_failed(
+                    db,
+                    flow_run=flow_run,
+                    steps_payload=steps_payload,
+                    thread_id=current_thread_id,
+                    message=str(exc),
+                )
+                raise RunExecutionError(
+                    "Flow run failed after exhausting retries.",
+                    run_id=flow_run.id,
+                    retryable=False,
+                ) from exc
+
+            current_thread_id = thread.id
+            _record_tool_call_usage(
+                db, user=user, tool=call.name, flow_run_id=flow_run.id
+            )
 
-        current_thread_id = thread.id
-
-        # Record each tool invocation as a separate execution for quota accounting.
-        # The router-level enforce_execution_limit ran once for the whole request;
-        # this ensures the usage log accurately reflects per-tool-call costs.
-        try_record_usage(
-            db,
-            user_id=getattr(user, "id", None),
-            event_type="flow:tool_call",
-            detail={"tool": call.name, "flow_run_id": flow_run.id},
-        )
-
-        steps.append(
-            RunStep(
+            step = RunStep(
                 tool=call.name,
                 payload=call.payload,
                 result=result,
                 event_id=event.id,
+                call_id=call_id,
+                depends_on=list(call.depends_on),
+                started_at=started_at,
+                duration_ms=int((time.perf_counter() - started) * 1000),
+            )
+            steps.append(step)
+            steps_payload.append(_serialize_step(step))
+            flow_run.thread_id = current_thread_id
+            flow_run.steps = list(steps_payload)
+            db.add(flow_run)
+            db.commit()
+
+            _apply_onboarding_side_effects(
+                db,
+                user=user,
+                placement=effective_placement,
+                thread_id=thread.id,
+                call=call,
             )
-        )
-        steps_payload.append(
-            {
-                "tool": call.name,
-                "payload": call.payload,
-                "result": result,
-                "event_id": event.id,
-            }
-        )
-        flow_run.thread_id = current_thread_id
-        flow_run.steps = steps_payload
-        db.add(flow_run)
-        db.commit()
-
-        if effective_placement == "onboarding":
-            # mark tasks for known onboarding tools
-            if call.name == "onboarding.plan":
-                # seed default tasks
-                update_task(
-                    db,
-                    user_id=getattr(user, "id", ""),
-                    thread_id=thread.id,
-                    task_id="invite_team",
-                    done=False,
-                    label="Invite core teammates",
-                )
-            if call.name == "onboarding.checklist" and isinstance(call.payload, dict):
-                task_id = call.payload.get("task_id")
-                if isinstance(task_id, str):
-                    update_task(
-                        db,
-                        user_id=getattr(user, "id", ""),
-                        thread_id=thread.id,
-                        task_id=task_id,
-                        done=bool(call.payload.get("done", True)),
-                        label=call.payload.get("label"),
-                    )
 
     if current_thread_id is None or current_thread_id == PENDING_THREAD_PLACEHOLDER:
         message = "No thread produced during orchestration run."
@@ -388,7 +673,7 @@ def execute(
         )
 
     flow_run.thread_id = current_thread_id
-    flow_run.steps = steps_payload
+    flow_run.steps = list(steps_payload)
     flow_run.status = "succeeded"
     flow_run.error_message = None
     flow_run.completed_at = _now()
@@ -0,0 +1,234 @@
+"""Agent task worker for tasks queued by the agents API.
+
+Runs up to ``AGENT_TASK_WORKER_CONCURRENCY`` agent pipelines at once in
+one event loop.  Each claimed task gets a heartbeat loop that renews its
+lease (see ``modules.agents.task_queue``) and cancels the run when the
+task's cancellation is requested or the lease is lost to another worker.
+
+    python -m backend.src.worker.agent_task_worker
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Dict, Optional, Set
+
+from backend.src.db.session import SessionLocal
+from backend.src.modules.agents import task_queue
+from backend.src.modules.agents.executor import AgentExecutor
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+logger = logging.getLogger(__name__)
+
+AGENT_TASK_WORKER_ENABLED = os.getenv("AGENT_TASK_QUEUE_ENABLED", "").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+CONCURRENCY = max(1, int(os.getenv("AGENT_TASK_WORKER_CONCURRENCY", "4")))
+POLL_SECONDS = float(os.getenv("AGENT_TASK_POLL_SECONDS", "2"))
+HEARTBEAT_SECONDS = float(os.getenv("AGENT_TASK_HEARTBEAT_SECONDS", "15"))
+IDLE_SECONDS = int(os.getenv("AGENT_TASK_IDLE_SECONDS", "60"))
+
+
+def _with_session(func, *args):
+    with SessionLocal() as session:
+        return func(session, *args)
+
+
+class AgentTaskWorker:
+    """Claims queued agent tasks and runs them with bounded concurrency."""
+
+    def __init__(
+        self,
+        *,
+        worker_id: Optional[str] = None,
+        concurrency: int = CONCURRENCY,
+        poll_seconds: float = POLL_SECONDS,
+        heartbeat_seconds: float = HEARTBEAT_SECONDS,
+    ) -> None:
+        self.worker_id = worker_id or f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+        self.concurrency = max(1, concurrency)
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._running: Set[asyncio.Task[None]] = set()
+        self._missing_table_logged = False
+        self._counters: Dict[str, int] = {
+            "claimed": 0,
+            "completed": 0,
+            "retried": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "lease_lost": 0,
+        }
+
+    async def run_once(self) -> bool:
+        """Claim and run one task to completion; False when none is due."""
+        claimed = await self._claim()
+        if claimed is None:
+            return False
+        await self._run(claimed)
+        return True
+
+    async def serve(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Claim tasks until ``stop`` is set, keeping every slot busy."""
+        stop = stop or asyncio.Event()
+        try:
+            while not stop.is_set():
+                await self._slots.acquire()
+                try:
+                    claimed = await self._claim()
+                except Exception:  # noqa: BLE001
+                    self._slots.release()
+                    logger.exception("Agent task claim failed")
+                    claimed = None
+                else:
+                    if claimed is None:
+                        self._slots.release()
+                if claimed is None:
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=self.poll_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                task = asyncio.get_running_loop().create_task(self._run_slot(claimed))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+        finally:
+            # Leases of unfinished runs expire and are reclaimed elsewhere.
+            for task in list(self._running):
+                task.cancel()
+            if self._running:
+                await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def _claim(self) -> Optional[task_queue.ClaimedTask]:
+        try:
+            claimed = await asyncio.to_thread(
+                _with_session, task_queue.claim_next, self.worker_id
+            )
+        except (OperationalError, ProgrammingError) as exc:
+            if "tasks" not in str(exc).lower():
+                raise
+            if not self._missing_table_logged:
+                logger.warning(
+                    "tasks table missing queue columns; worker idle",
+                    extra={"error": str(exc)},
+                )
+                self._missing_table_logged = True
+            return None
+        if claimed is not None:
+            self._counters["claimed"] += 1
+        return claimed
+
+    async def _run_slot(self, claimed: task_queue.ClaimedTask) -> None:
+        try:
+            await self._run(claimed)
+        finally:
+            self._slots.release()
+
+    async def _run(self, claimed: task_queue.ClaimedTask) -> None:
+        worker_id = self.worker_id
+        run = asyncio.get_running_loop().create_task(self._pipeline(claimed))
+        beat = asyncio.get_running_loop().create_task(self._heartbeat(claimed, run))
+        try:
+            result = await run
+        except asyncio.CancelledError:
+            if not (beat.done() and not beat.cancelled() and beat.result()):
+                raise  # worker shutdown, not a stop requested by the heartbeat
+            stopped = await asyncio.to_thread(
+                _with_session, task_queue.mark_cancelled, claimed.id, worker_id
+            )
+            self._counters["cancelled" if stopped else "lease_lost"] += 1
+            logger.info("Agent task %d stopped (cancelled=%s)", claimed.id, stopped)
+            return
+        except Exception as exc:  # noqa: BLE001
+            logger.exception(
+                "Agent task %d failed (attempt %d/%d)",
+                claimed.id, claimed.attempt, claimed.max_attempts,
+            )
+            status = await asyncio.to_thread(
+                _with_session, task_queue.fail, claimed.id, worker_id, str(exc)
+            )
+            if status == task_queue.TaskStatus.QUEUED:
+                self._counters["retried"] += 1
+            elif status == task_queue.TaskStatus.CANCELLED:
+                self._counters["cancelled"] += 1
+            elif status is None:
+                self._counters["lease_lost"] += 1
+            else:
+                self._counters["failed"] += 1
+            return
+        finally:
+            beat.cancel()
+            await asyncio.gather(beat, return_exceptions=True)
+
+        stored = await asyncio.to_thread(
+            _with_session, task_queue.complete, claimed.id, worker_id, result
+        )
+        self._counters["completed" if stored else "lease_lost"] += 1
+        logger.info("Agent task %d completed (stored=%s)", claimed.id, stored)
+
+    async def _pipeline(self, claimed: task_queue.ClaimedTask) -> Dict[str, Any]:
+        async def _progress(event: Dict[str, Any]) -> None:
+            await asyncio.to_thread(
+                _with_session, task_queue.report_progress, claimed.id, self.worker_id, event
+            )
+
+        with SessionLocal() as session:
+            executor = AgentExecutor(session)
+            return await executor.run_pipeline(
+                claimed.agent_id, claimed.input_data, _progress
+            )
+
+    async def _heartbeat(
+        self, claimed: task_queue.ClaimedTask, run: "asyncio.Task[Any]"
+    ) -> bool:
+        """Renew the lease until ``run`` ends; True if it had to stop the run."""
+        while not run.done():
+            await asyncio.sleep(self.heartbeat_seconds)
+            keep = await asyncio.to_thread(
+                _with_session, task_queue.heartbeat, claimed.id, self.worker_id
+            )
+            if not keep:
+                run.cancel()
+                return True
+        return False
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Worker counters for monitoring."""
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "running": len(self._running),
+            **self._counters,
+        }
+
+
+def main() -> None:
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+
+    if not AGENT_TASK_WORKER_ENABLED:
+        logger.warning(
+            "AGENT_TASK_QUEUE_ENABLED is false; worker idle",
+            extra={"env": os.getenv("ENV", "unknown")},
+        )
+        while True:
+            time.sleep(IDLE_SECONDS)
+
+    worker = AgentTaskWorker()
+    logger.info(
+        "Agent task worker %s started (concurrency=%d)",
+        worker.worker_id, worker.concurrency,
+    )
+    asyncio.run(worker.serve())
+
+
+if __name__ == "__main__":
+    main()
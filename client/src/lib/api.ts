@@ -208,6 +208,19 @@ export type FlowRunStep = {
   payload: Record<string, unknown>;
   result: Record<string, unknown>;
   event_id: string;
+  call_id?: string | null;
+  depends_on?: string[];
+  started_at?: string | null;
+  duration_ms?: number | null;
+};
+
+export type FlowToolCall = {
+  name: string;
+  payload: Record<string, unknown>;
+  /** Defaults to the call's position ("0", "1", ...) */
+  id?: string;
+  /** Ids of calls that must finish first when mode is "parallel" */
+  depends_on?: string[];
 };
 
 export type FlowRunResponse = {
@@ -230,9 +243,10 @@ export type RunFlowPayload = {
   agent_slug?: string;
   agent_version?: string;
   thread_id?: string;
-  tool_calls: Array<{ name: string; payload: Record<string, unknown> }>;
+  tool_calls: FlowToolCall[];
   idempotency_key?: string;
   max_attempts?: number;
+  mode?: "sequential" | "parallel";
 };
 
 export async function runFlow(payload: RunFlowPayload): Promise<FlowRunResponse> {
@@ -53,6 +53,12 @@ export type ChatSocketEnvelope =
       type: "chat.event";
       event: ChatMessage;
     }
+  | {
+      /** Incremental assistant text while a response is being generated */
+      type: "chat.delta";
+      thread_id: string;
+      delta: string;
+    }
   | {
       type: "thread.updated";
       thread: ChatThread;
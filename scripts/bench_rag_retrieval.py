@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Benchmark RAG retrieval backends and report the in-app/pgvector crossover.
+
+Compares, for growing per-tenant chunk counts:
+
+- ``python``   — legacy per-chunk pure-Python cosine loop
+- ``numpy``    — JSON decode + ``ChunkMatrix`` build + search (cache miss)
+- ``cached``   — search against an already-built matrix (cache hit)
+- ``pgvector`` — SQL top-K over an HNSW index (only with ``--pg-url``)
+
+Usage:
+    python scripts/bench_rag_retrieval.py
+    python scripts/bench_rag_retrieval.py --sizes 1000,10000,50000 --top-k 5
+    python scripts/bench_rag_retrieval.py --pg-url postgresql+psycopg://u:p@localhost/db
+
+The pgvector run creates and drops a scratch table (``rag_bench_chunks``);
+it requires the ``vector`` extension on the target database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.src.modules.rag import embeddings, vector_index  # noqa: E402
+from backend.src.modules.rag.pgvector_store import vector_literal  # noqa: E402
+
+DIM = embeddings.embedding_dimensions()
+
+
+def _random_vec(rng: random.Random) -> List[float]:
+    return [rng.uniform(-1.0, 1.0) for _ in range(DIM)]
+
+
+def _timeit(fn: Callable[[], object], repeats: int) -> float:
+    """Median wall time in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def _bench_in_app(n: int, query: List[float], top_k: int, repeats: int) -> Dict[str, float]:
+    rng = random.Random(n)
+    raw_json = [json.dumps(_random_vec(rng)) for _ in range(n)]
+    docs = {"doc": SimpleNamespace(id="doc")}
+
+    def _chunks():
+        return [
+            SimpleNamespace(id=str(i), document_id="doc", embedding=json.loads(raw))
+            for i, raw in enumerate(raw_json)
+        ]
+
+    def _python():
+        scored = []
+        for chunk in _chunks():
+            score = embeddings.cosine_similarity(query, chunk.embedding)
+            scored.append((chunk, score))
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return scored[:top_k]
+
+    def _numpy_cold():
+        matrix = vector_index.ChunkMatrix.build(_chunks(), docs)
+        return matrix.search(query, top_k=top_k, similarity_threshold=-1.0)
+
+    warm = vector_index.ChunkMatrix.build(_chunks(), docs)
+
+    results = {
+        "numpy": _timeit(_numpy_cold, repeats),
+        "cached": _timeit(
+            lambda: warm.search(query, top_k=top_k, similarity_threshold=-1.0), repeats
+        ),
+    }
+    # The pure-Python loop is slow; cap it to keep the run short.
+    results["python"] = _timeit(_python, 1) if n <= 20_000 else float("nan")
+    return results
+
+
+def _bench_pgvector(
+    url: str, n: int, query: List[float], top_k: int, repeats: int
+) -> Optional[float]:
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(url)
+    rng = random.Random(n)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text("DROP TABLE IF EXISTS rag_bench_chunks"))
+        conn.execute(
+            text(f"CREATE TABLE rag_bench_chunks (id int PRIMARY KEY, v vector({DIM}))")
+        )
+        batch = []
+        for i in range(n):
+            batch.append({"id": i, "v": vector_literal(_random_vec(rng))})
+            if len(batch) == 1000:
+                conn.execute(
+                    text("INSERT INTO rag_bench_chunks VALUES (:id, CAST(:v AS vector))"),
+                    batch,
+                )
+                batch = []
+        if batch:
+            conn.execute(
+                text("INSERT INTO rag_bench_chunks VALUES (:id, CAST(:v AS vector))"), batch
+            )
+        conn.execute(
+            text("CREATE INDEX ON rag_bench_chunks USING hnsw (v vector_cosine_ops)")
+        )
+
+    stmt = text(
+        "SELECT id, v <=> CAST(:q AS vector) AS d FROM rag_bench_chunks "
+        "ORDER BY d LIMIT :k"
+    )
+    q = vector_literal(query)
+    try:
+        with engine.connect() as conn:
+            return _timeit(lambda: conn.execute(stmt, {"q": q, "k": top_k}).all(), repeats)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS rag_bench_chunks"))
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", default="500,1000,2500,5000,10000,25000")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--pg-url", default=None, help="Postgres URL with pgvector")
+    args = parser.parse_args()
+
+    if not vector_index.is_available():
+        sys.exit("numpy is required: pip install numpy")
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    query = _random_vec(random.Random(0))
+
+    header = f"{'chunks':>8} {'python':>10} {'numpy':>10} {'cached':>10}"
+    if args.pg_url:
+        header += f" {'pgvector':>10}"
+    print(header + "   (median ms)")
+
+    crossover: Optional[int] = None
+    for n in sizes:
+        row = _bench_in_app(n, query, args.top_k, args.repeats)
+        line = f"{n:>8} {row['python']:>10.2f} {row['numpy']:>10.2f} {row['cached']:>10.3f}"
+        if args.pg_url:
+            pg = _bench_pgvector(args.pg_url, n, query, args.top_k, args.repeats)
+            line += f" {pg:>10.2f}"
+            if crossover is None and pg is not None and pg < row["numpy"]:
+                crossover = n
+        print(line)
+
+    if args.pg_url:
+        if crossover is None:
+            print("\npgvector did not beat the uncached in-app path at these sizes.")
+        else:
+            print(
+                f"\npgvector beats the uncached in-app path from ~{crossover} chunks "
+                "per tenant; below that, RAG_VECTOR_BACKEND=memory is cheaper."
+            )
+
+
+if __name__ == "__main__":
+    main()
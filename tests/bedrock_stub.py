@@ -0,0 +1,217 @@
+"""Local stand-in for the Bedrock runtime ``InvokeModel`` API.
+
+Lets the async Bedrock path be exercised offline: point
+``AI_BEDROCK_ENDPOINT_URL`` at the stub and supply any AWS credentials
+(signatures are recorded, not verified).
+
+Usage::
+
+    with BedrockStubServer() as stub:
+        os.environ["AI_BEDROCK_ENDPOINT_URL"] = stub.url
+        ...
+        stub.requests  # [{"path": ..., "headers": ..., "body": ...}, ...]
+
+or standalone::
+
+    python tests/bedrock_stub.py --port 8765
+
+Replies echo the last user message in Anthropic-format JSON with
+whitespace-token usage counts; ``invoke-with-response-stream`` sends the
+same reply word by word as event-stream ``chunk`` messages.  A ``reply``
+or ``status`` can be forced per server for failure-path tests.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import struct
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+def _echo_text(payload: Dict[str, Any]) -> str:
+    messages = payload.get("messages") or []
+    if not messages:
+        return ""
+    content = messages[-1].get("content")
+    if isinstance(content, list):
+        return " ".join(
+            str(part.get("text", "")) for part in content if isinstance(part, dict)
+        )
+    return str(content or "")
+
+
+def encode_stream_event(event: Dict[str, Any]) -> bytes:
+    """Frame one Anthropic stream event as a Bedrock ``chunk`` event-stream message."""
+    headers = b""
+    for name, value in (
+        (":event-type", "chunk"),
+        (":content-type", "application/json"),
+        (":message-type", "event"),
+    ):
+        raw_name, raw_value = name.encode(), value.encode()
+        headers += struct.pack("!B", len(raw_name)) + raw_name
+        headers += b"\x07" + struct.pack("!H", len(raw_value)) + raw_value
+    body = json.dumps(
+        {"bytes": base64.b64encode(json.dumps(event).encode("utf-8")).decode("ascii")}
+    ).encode("utf-8")
+    prelude = struct.pack("!II", 12 + len(headers) + len(body) + 4, len(headers))
+    prelude += struct.pack("!I", zlib.crc32(prelude))
+    message = prelude + headers + body
+    return message + struct.pack("!I", zlib.crc32(message))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_StubHTTPServer"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server API
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            payload = json.loads(raw or b"{}")
+        except ValueError:
+            payload = {}
+        self.server.stub.requests.append(
+            {"path": self.path, "headers": dict(self.headers.items()), "body": payload}
+        )
+
+        stub = self.server.stub
+        streaming = self.path.endswith("/invoke-with-response-stream")
+        if not self.path.startswith("/model/") or not (
+            streaming or self.path.endswith("/invoke")
+        ):
+            self._reply(404, {"message": f"Unknown operation {self.path}"})
+            return
+        if stub.status >= 400:
+            self._reply(stub.status, {"message": "stubbed failure"})
+            return
+
+        prompt = _echo_text(payload)
+        text = stub.reply if stub.reply is not None else f"stub: {prompt}"
+        if streaming:
+            self._reply_stream(prompt, text)
+            return
+        self._reply(
+            200,
+            {
+                "id": f"msg_stub_{len(stub.requests)}",
+                "type": "message",
+                "role": "assistant",
+                "content": [{"type": "text", "text": text}],
+                "usage": {
+                    "input_tokens": len(prompt.split()),
+                    "output_tokens": len(text.split()),
+                },
+            },
+        )
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _reply_stream(self, prompt: str, text: str) -> None:
+        words = text.split(" ")
+        events: List[Dict[str, Any]] = [
+            {
+                "type": "message_start",
+                "message": {"usage": {"input_tokens": len(prompt.split())}},
+            },
+            {"type": "content_block_start", "index": 0},
+        ]
+        events += [
+            {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": word if i == 0 else f" {word}"},
+            }
+            for i, word in enumerate(words)
+        ]
+        events += [
+            {"type": "content_block_stop", "index": 0},
+            {"type": "message_delta", "usage": {"output_tokens": len(text.split())}},
+            {"type": "message_stop"},
+        ]
+        encoded = b"".join(encode_stream_event(event) for event in events)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, *_args: Any) -> None:
+        return
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: "BedrockStubServer"
+
+
+class BedrockStubServer:
+    """Threaded HTTP server answering ``POST /model/{id}/invoke[-with-response-stream]``."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        reply: Optional[str] = None,
+        status: int = 200,
+    ) -> None:
+        self.reply = reply
+        self.status = status
+        self.requests: List[Dict[str, Any]] = []
+        self._server = _StubHTTPServer((host, port), _Handler)
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "BedrockStubServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="bedrock-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "BedrockStubServer":
+        return self.start()
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Bedrock InvokeModel stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    stub = BedrockStubServer(args.host, args.port)
+    print(f"Bedrock stub listening on {stub.url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
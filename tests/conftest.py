@@ -269,6 +269,18 @@ def _email_sink(monkeypatch, app):
     # (no teardown needed)
 
 
+@pytest.fixture(autouse=True)
+def _provider_health_reset():
+    """Start every test with no provider health history (closed breakers)
+    and no banked hedge credits."""
+    from backend.src.modules.ai_router.health import provider_health
+    from backend.src.modules.ai_router.hedging import hedge_policy
+
+    provider_health.reset()
+    hedge_policy.reset()
+    yield
+
+
 @pytest.fixture(autouse=True)
 def _auth_rate_limiter_determinism(monkeypatch):
     """Make login attempt gating deterministic in tests (no wall-clock dependency)."""
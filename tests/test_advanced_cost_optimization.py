@@ -217,6 +217,144 @@ class TestSemanticCache:
         b = [0.0, 1.0]
         assert abs(_cosine_similarity(a, b)) < 0.001
 
+    @staticmethod
+    def _cache_with_vectors(vectors, **kwargs):
+        from backend.src.modules.usage.semantic_cache import SemanticCache
+
+        cache = SemanticCache(**kwargs)
+
+        async def _embed(text):
+            return vectors[text]
+
+        cache._embed = _embed
+        return cache
+
+    def test_hit_on_similar_and_miss_on_dissimilar(self):
+        cache = self._cache_with_vectors(
+            {"cash flow": [1.0, 0.0, 0.1], "cash-flow?": [1.0, 0.0, 0.12], "weather": [0.0, 1.0, 0.0]},
+            max_size=10,
+        )
+        asyncio.run(cache.put("cash flow", "cached answer"))
+        assert asyncio.run(cache.get("cash-flow?")) == "cached answer"
+        assert asyncio.run(cache.get("weather")) is None
+        assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+    def test_pure_python_fallback_without_numpy(self, monkeypatch):
+        from backend.src.modules.usage import semantic_cache as sc
+
+        monkeypatch.setattr(sc, "np", None)
+        cache = self._cache_with_vectors(
+            {"a": [1.0, 0.0], "b": [0.0, 1.0], "a2": [0.99, 0.05]}, max_size=2
+        )
+        asyncio.run(cache.put("a", "A"))
+        asyncio.run(cache.put("b", "B"))
+        assert asyncio.run(cache.get("a2")) == "A"
+        assert cache.stats["resident_bytes"] == 0
+
+    def test_expired_entries_dropped_via_heap(self, monkeypatch):
+        from backend.src.modules.usage import semantic_cache as sc
+
+        clock = [100.0]
+        monkeypatch.setattr(sc.time, "monotonic", lambda: clock[0])
+        cache = self._cache_with_vectors({"q": [1.0, 0.0]}, ttl_seconds=10, max_size=10)
+        asyncio.run(cache.put("q", "v"))
+        clock[0] = 109.0
+        assert asyncio.run(cache.get("q")) == "v"
+        clock[0] = 111.0
+        assert asyncio.run(cache.get("q")) is None
+        assert cache.stats["entries"] == 0
+
+    def test_full_cache_evicts_oldest_and_reuses_slot(self):
+        vectors = {f"q{i}": [math.cos(i), math.sin(i)] for i in range(4)}
+        cache = self._cache_with_vectors(vectors, max_size=3, similarity_threshold=0.999)
+        for i in range(4):
+            asyncio.run(cache.put(f"q{i}", i))
+        assert cache.stats["entries"] == 3
+        assert asyncio.run(cache.get("q0")) is None
+        assert [asyncio.run(cache.get(f"q{i}")) for i in (1, 2, 3)] == [1, 2, 3]
+
+    def test_context_must_match_for_hit(self):
+        cache = self._cache_with_vectors({"q": [1.0, 0.0]}, max_size=10)
+        asyncio.run(cache.put("q", "answer-for-A", context="docA#0"))
+        assert asyncio.run(cache.get("q", context="docB#0")) is None
+        assert asyncio.run(cache.get("q")) is None
+        assert asyncio.run(cache.get("q", context="docA#0")) == "answer-for-A"
+
+    def test_namespaces_isolate_tenants_and_apply_policies(self, monkeypatch):
+        from backend.src.modules.usage import semantic_cache as sc
+
+        vectors = {"q": [1.0, 0.0], "q-ish": [0.9, 0.436]}  # cosine ≈ 0.9
+
+        async def _embed(text):
+            return vectors[text]
+
+        monkeypatch.setattr(sc.SemanticCache, "_embed", staticmethod(_embed))
+        caches = sc.NamespacedSemanticCache(
+            policies={
+                "default": sc.NamespacePolicy(8, 0.99, 60),
+                "rag": sc.NamespacePolicy(8, 0.85, 60),
+            }
+        )
+        alice = caches.namespace("rag", owner_id="alice", system_prompt="sp")
+        asyncio.run(alice.put("q", "alice answer"))
+
+        assert caches.namespace("rag", owner_id="alice", system_prompt="sp") is alice
+        assert asyncio.run(alice.get("q-ish")) == "alice answer"
+        bob = caches.namespace("rag", owner_id="bob", system_prompt="sp")
+        assert asyncio.run(bob.get("q")) is None
+        other_prompt = caches.namespace("rag", owner_id="alice", system_prompt="sp2")
+        assert asyncio.run(other_prompt.get("q")) is None
+
+        stats = caches.stats
+        assert stats["namespaces"] == 3
+        assert stats["by_kind"]["rag"]["hits"] == 1
+        assert stats["by_kind"]["rag"]["misses"] == 2
+        assert stats["top"][0]["similarity_threshold"] == 0.85
+
+    def test_namespace_lru_keeps_retired_counters(self, monkeypatch):
+        from backend.src.modules.usage import semantic_cache as sc
+
+        async def _embed(text):
+            return [1.0, 0.0]
+
+        monkeypatch.setattr(sc.SemanticCache, "_embed", staticmethod(_embed))
+        caches = sc.NamespacedSemanticCache(max_namespaces=1)
+        asyncio.run(caches.namespace("agent", agent="finance").get("q"))
+        caches.namespace("capsule", agent="onboarding")
+        stats = caches.stats
+        assert stats["namespaces"] == 1
+        assert stats["by_kind"]["agent"]["misses"] == 1
+
+    def test_small_namespaces_stay_small(self, monkeypatch):
+        pytest.importorskip("numpy")
+        from backend.src.modules.usage import semantic_cache as sc
+
+        async def _embed(text):
+            return [1.0] + [0.0] * 1535
+
+        monkeypatch.setattr(sc.SemanticCache, "_embed", staticmethod(_embed))
+        caches = sc.NamespacedSemanticCache()
+        first = caches.namespace("agent", agent="finance")
+        second = caches.namespace("agent", agent="dev")
+        asyncio.run(first.put("q", "answer"))
+        asyncio.run(second.put("q", "answer"))
+
+        # A single 1536-d entry costs a few rows, not a preallocated block.
+        assert first.stats["resident_bytes"] <= 4 * (1536 + sc._SKETCH_DIM) * 4
+        assert first._projection is second._projection
+
+    def test_sketch_prefilter_finds_exact_match_at_scale(self, monkeypatch):
+        np = pytest.importorskip("numpy")
+        from backend.src.modules.usage import semantic_cache as sc
+
+        monkeypatch.setattr(sc, "_SKETCH_MIN_ENTRIES", 100)
+        rng = np.random.default_rng(7)
+        vectors = {f"q{i}": rng.standard_normal(256).tolist() for i in range(500)}
+        cache = self._cache_with_vectors(vectors, max_size=500)
+        for i in range(500):
+            asyncio.run(cache.put(f"q{i}", i))
+        assert all(asyncio.run(cache.get(f"q{i}")) == i for i in range(0, 500, 25))
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # F. Batch API
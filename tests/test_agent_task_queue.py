@@ -0,0 +1,236 @@
+"""Database-backed agent task queue and worker (``agents.task_queue``)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete
+
+from backend.src.db import models
+from backend.src.db.session import SessionLocal
+from backend.src.modules.agents import task_queue
+from backend.src.modules.agents.executor import AgentExecutor, TaskCreate, TaskStatus
+from backend.src.worker.agent_task_worker import AgentTaskWorker
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    # Claims pick the oldest due task, so start from an empty table.
+    session.execute(delete(models.Task))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _enqueue(db, *, max_attempts: int = 3) -> models.Task:
+    return task_queue.enqueue(
+        db,
+        TaskCreate(
+            agent_id=str(uuid.uuid4()),
+            goal="Summarise the ledger",
+            input={"query": "ledger"},
+            user_id=str(uuid.uuid4()),
+        ),
+        max_attempts=max_attempts,
+    )
+
+
+def _reload(db, task_id: int) -> models.Task:
+    db.expire_all()
+    return db.get(models.Task, task_id)
+
+
+def _age_lease(db, task_id: int, seconds: int = 3600) -> None:
+    task = _reload(db, task_id)
+    task.heartbeat_at = datetime.now(timezone.utc) - timedelta(seconds=seconds)
+    db.commit()
+
+
+class _Socket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, text):
+        self.frames.append(json.loads(text))
+
+
+def test_claim_leases_task_to_one_worker(db):
+    task = _enqueue(db)
+
+    claimed = task_queue.claim_next(db, "worker-a")
+    assert claimed is not None
+    assert (claimed.id, claimed.attempt) == (task.id, 1)
+    assert task_queue.claim_next(db, "worker-b") is None
+
+    row = _reload(db, task.id)
+    assert row.status == TaskStatus.RUNNING
+    assert row.locked_by == "worker-a"
+    assert row.heartbeat_at is not None
+    assert task_queue.heartbeat(db, task.id, "worker-a") is True
+    assert task_queue.heartbeat(db, task.id, "worker-b") is False
+
+
+def test_expired_lease_is_reclaimed_and_old_worker_loses_it(db):
+    task = _enqueue(db)
+    task_queue.claim_next(db, "worker-a")
+    _age_lease(db, task.id)
+
+    claimed = task_queue.claim_next(db, "worker-b")
+    assert claimed is not None and claimed.attempt == 2
+
+    assert task_queue.complete(db, task.id, "worker-a", {"stale": True}) is False
+    assert task_queue.complete(db, task.id, "worker-b", {"ok": True}) is True
+    row = _reload(db, task.id)
+    assert row.status == TaskStatus.COMPLETED
+    assert row.output_data == {"ok": True}
+    assert row.locked_by is None
+
+
+def test_expired_lease_on_final_attempt_fails_task(db):
+    task = _enqueue(db, max_attempts=1)
+    task_queue.claim_next(db, "worker-a")
+    _age_lease(db, task.id)
+
+    assert task_queue.claim_next(db, "worker-b") is None
+    row = _reload(db, task.id)
+    assert row.status == TaskStatus.FAILED
+    assert "lease expired" in row.error_message
+
+
+def test_failed_attempt_retries_with_backoff_then_fails(db):
+    task = _enqueue(db, max_attempts=2)
+    task_queue.claim_next(db, "worker-a")
+    task_queue.report_progress(db, task.id, "worker-a", {"progress": 80})
+
+    assert task_queue.fail(db, task.id, "worker-a", "boom") == TaskStatus.QUEUED
+    row = _reload(db, task.id)
+    assert row.error_message == "boom"
+    assert row.progress is None
+    assert row.run_after.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+    assert task_queue.claim_next(db, "worker-a") is None
+
+    row.run_after = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+    claimed = task_queue.claim_next(db, "worker-a")
+    assert claimed is not None and claimed.attempt == 2
+    assert task_queue.fail(db, task.id, "worker-a", "boom again") == TaskStatus.FAILED
+    assert _reload(db, task.id).completed_at is not None
+
+
+def test_cancel_queued_task_is_immediate(db):
+    task = _enqueue(db)
+
+    assert task_queue.request_cancel(db, task) == TaskStatus.CANCELLED
+    assert task_queue.claim_next(db, "worker-a") is None
+
+
+def test_cancel_running_task_stops_heartbeat(db):
+    task = _enqueue(db)
+    task_queue.claim_next(db, "worker-a")
+
+    assert task_queue.request_cancel(db, _reload(db, task.id)) == TaskStatus.RUNNING
+    assert task_queue.heartbeat(db, task.id, "worker-a") is False
+    assert task_queue.mark_cancelled(db, task.id, "worker-a") is True
+    assert _reload(db, task.id).status == TaskStatus.CANCELLED
+
+
+def test_worker_runs_pipeline_and_records_progress(db, monkeypatch):
+    task = _enqueue(db)
+
+    async def _pipeline(self, agent_id, input_data, progress=None):
+        await progress({"message": "Working", "progress": 50})
+        return {"message": f"done:{input_data['query']}"}
+
+    monkeypatch.setattr(AgentExecutor, "run_pipeline", _pipeline)
+    worker = AgentTaskWorker(worker_id="worker-a", heartbeat_seconds=0.05)
+
+    assert asyncio.run(worker.run_once()) is True
+    assert asyncio.run(worker.run_once()) is False
+
+    row = _reload(db, task.id)
+    assert row.status == TaskStatus.COMPLETED
+    assert row.output_data == {"message": "done:ledger"}
+    assert row.progress == {"message": "Working", "progress": 50}
+    assert worker.stats["completed"] == 1
+
+
+def test_worker_retries_failed_pipeline(db, monkeypatch):
+    task = _enqueue(db)
+
+    async def _pipeline(self, agent_id, input_data, progress=None):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(AgentExecutor, "run_pipeline", _pipeline)
+    worker = AgentTaskWorker(worker_id="worker-a")
+
+    asyncio.run(worker.run_once())
+    row = _reload(db, task.id)
+    assert row.status == TaskStatus.QUEUED
+    assert row.attempts == 1
+    assert row.error_message == "provider down"
+    assert worker.stats["retried"] == 1
+
+
+def test_worker_stops_run_when_cancel_requested(db, monkeypatch):
+    task = _enqueue(db)
+    started = asyncio.Event()
+
+    async def _pipeline(self, agent_id, input_data, progress=None):
+        started.set()
+        await asyncio.sleep(30)
+        return {}
+
+    monkeypatch.setattr(AgentExecutor, "run_pipeline", _pipeline)
+    worker = AgentTaskWorker(worker_id="worker-a", heartbeat_seconds=0.02)
+
+    async def _scenario():
+        run = asyncio.create_task(worker.run_once())
+        await started.wait()
+        with SessionLocal() as other:
+            task_queue.request_cancel(other, other.get(models.Task, task.id))
+        await asyncio.wait_for(run, timeout=5)
+
+    asyncio.run(_scenario())
+    assert _reload(db, task.id).status == TaskStatus.CANCELLED
+    assert worker.stats["cancelled"] == 1
+
+
+def test_stream_progress_relays_worker_events(db, monkeypatch):
+    task = _enqueue(db)
+
+    async def _pipeline(self, agent_id, input_data, progress=None):
+        await progress({"message": "Initializing agent...", "progress": 10})
+        await asyncio.sleep(0.1)
+        return {"message": "done"}
+
+    monkeypatch.setattr(AgentExecutor, "run_pipeline", _pipeline)
+    worker = AgentTaskWorker(worker_id="worker-a")
+    socket = _Socket()
+
+    async def _scenario():
+        stream = asyncio.create_task(
+            task_queue.stream_progress(socket, task.id, poll_seconds=0.01)
+        )
+        await asyncio.sleep(0.05)
+        await worker.run_once()
+        return await asyncio.wait_for(stream, timeout=5)
+
+    assert asyncio.run(_scenario()) == TaskStatus.COMPLETED
+    assert socket.frames[0] == {
+        "task_id": str(task.id),
+        "status": "running",
+        "message": "Task started",
+    }
+    assert {"message": "Initializing agent...", "progress": 10} in socket.frames
+    assert socket.frames[-1] == {
+        "task_id": str(task.id),
+        "status": "completed",
+        "result": {"message": "done"},
+    }
@@ -0,0 +1,156 @@
+"""Shared sync-to-async bridge (``core.async_bridge``)."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from backend.src.core.async_bridge import AsyncBridge
+from backend.src.modules.chatkit import tools
+
+
+async def _where():
+    await asyncio.sleep(0)
+    return threading.current_thread().name, asyncio.get_running_loop()
+
+
+def test_calls_reuse_one_background_loop():
+    bridge = AsyncBridge(name="bridge-test")
+    try:
+        first = bridge.run(_where())
+        second = bridge.run(_where())
+    finally:
+        bridge.close()
+
+    assert first[0] == "bridge-test"
+    assert first == second
+    assert bridge.stats["starts"] == 1
+    assert bridge.stats["calls"] == 2
+
+
+def test_runs_from_inside_a_running_loop():
+    bridge = AsyncBridge()
+
+    async def _caller():
+        return bridge.run(_where())
+
+    try:
+        name, loop = asyncio.run(_caller())
+    finally:
+        bridge.close()
+    assert name == "async-bridge"
+    assert loop.is_closed()
+
+
+def test_concurrent_callers_share_the_loop():
+    bridge = AsyncBridge()
+
+    async def _slow(value):
+        await asyncio.sleep(0.05)
+        return value, asyncio.get_running_loop()
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda i: bridge.run(_slow(i)), range(8)))
+    finally:
+        bridge.close()
+
+    assert [value for value, _ in results] == list(range(8))
+    assert len({id(loop) for _, loop in results}) == 1
+
+
+def test_errors_propagate_and_bridge_loop_calls_are_rejected():
+    bridge = AsyncBridge()
+
+    async def _boom():
+        raise ValueError("nope")
+
+    async def _reenter():
+        return bridge.run(_where())
+
+    try:
+        with pytest.raises(ValueError, match="nope"):
+            bridge.run(_boom())
+        with pytest.raises(RuntimeError, match="bridge loop"):
+            bridge.run(_reenter())
+        assert bridge.stats["errors"] == 2
+    finally:
+        bridge.close()
+
+
+def test_close_then_restart():
+    bridge = AsyncBridge()
+    first = bridge.run(_where())[1]
+    bridge.close()
+    assert bridge.stats["running"] is False
+
+    second = bridge.run(_where())[1]
+    bridge.close()
+    assert second is not first
+    assert bridge.stats["starts"] == 2
+
+
+def test_invoke_tool_awaits_async_handlers():
+    async def _handler(_db, user, _thread, payload):
+        await asyncio.sleep(0)
+        return {"user": user.id, "echo": payload["q"]}
+
+    spec = tools.ToolSpec(
+        name="test.async", description="", placement="test", handler=_handler
+    )
+
+    async def _from_loop():
+        return tools.invoke_tool(
+            None,
+            spec=spec,
+            user=SimpleNamespace(id="u1"),
+            thread=None,
+            payload={"q": "hi"},
+        )
+
+    assert asyncio.run(_from_loop()) == {"user": "u1", "echo": "hi"}
+
+
+def test_concurrent_rag_searches_do_not_serialise_on_the_bridge(monkeypatch):
+    from backend.src.modules.rag import embeddings
+    from backend.src.modules.rag.service import RAGService
+
+    spans = []
+
+    async def _embed(texts, api_key=None, **_kwargs):
+        return [[1.0, 0.0] for _ in texts]
+
+    def _slow_retrieve(self, _db, **_kwargs):
+        started = time.perf_counter()
+        time.sleep(0.3)  # blocking DB / NumPy work
+        spans.append((started, time.perf_counter()))
+        return []
+
+    monkeypatch.setattr(embeddings, "generate_embeddings", _embed)
+    monkeypatch.setattr(RAGService, "_retrieve_chunks", _slow_retrieve)
+    monkeypatch.setattr(RAGService, "_retrieve_chunks_lexical", lambda *_a, **_k: [])
+    monkeypatch.setattr(RAGService, "_log_query", lambda *_a, **_k: None)
+
+    spec = tools.TOOLS["rag.search"]
+    user = SimpleNamespace(id="u1", email="u1@example.com")
+
+    def _search(query):
+        return tools.invoke_tool(
+            None,
+            spec=spec,
+            user=user,
+            thread=None,
+            payload={"query": query, "include_response": False},
+        )
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(_search, ["first", "second"]))
+
+    assert [r["grounded"] for r in results] == [False, False]
+    (start_a, end_a), (start_b, end_b) = spans
+    assert start_b < end_a and start_a < end_b
@@ -46,7 +46,7 @@ def test_invoke_bedrock_text_uses_openclaw_cost_fallback(
     monkeypatch.setenv("OPENCLAW_COST_PER_1K_OUTPUT_USD", "0.02")
 
     fake_boto3 = types.SimpleNamespace(
-        client=lambda service_name, region_name=None: fake_client
+        client=lambda service_name, region_name=None, **_kwargs: fake_client
     )
     monkeypatch.setitem(__import__("sys").modules, "boto3", fake_boto3)
 
@@ -58,3 +58,155 @@ def test_invoke_bedrock_text_uses_openclaw_cost_fallback(
     assert result.estimated_usd == pytest.approx(0.05)
     assert fake_client.calls, "expected invoke_model to be called"
     assert fake_client.calls[0]["modelId"] == "anthropic.test-model"
+
+
+def test_ainvoke_bedrock_text_signs_request_against_stub(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pytest.importorskip("httpx")
+    pytest.importorskip("botocore")
+    import asyncio
+
+    from bedrock_stub import BedrockStubServer
+
+    from backend.src.modules.ai_router import bedrock
+    from backend.src.modules.ai_router.clients import ProviderClientRegistry
+
+    monkeypatch.setenv("AI_BEDROCK_ENABLED", "1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIDSTUB")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "stub-secret")
+    monkeypatch.setenv("AI_BEDROCK_COST_PER_1K_INPUT_USD", "1")
+    monkeypatch.setenv("AI_BEDROCK_COST_PER_1K_OUTPUT_USD", "1")
+    monkeypatch.setattr(bedrock, "_credentials", None)
+    registry = ProviderClientRegistry()
+    monkeypatch.setattr(bedrock, "provider_clients", registry)
+
+    async def _run() -> list:
+        try:
+            return await asyncio.gather(
+                *(
+                    bedrock.ainvoke_bedrock_text(
+                        system_prompt="system",
+                        user_prompt=f"hello there {i}",
+                        model_id="anthropic.test-model:0",
+                        region="eu-north-1",
+                    )
+                    for i in range(3)
+                )
+            )
+        finally:
+            await registry.aclose()
+
+    with BedrockStubServer() as stub:
+        monkeypatch.setenv("AI_BEDROCK_ENDPOINT_URL", stub.url)
+        results = asyncio.run(_run())
+
+    assert sorted(r.text for r in results) == [
+        "stub: hello there 0",
+        "stub: hello there 1",
+        "stub: hello there 2",
+    ]
+    assert results[0].input_tokens == 3
+    assert results[0].estimated_usd == pytest.approx(0.007)
+    assert results[0].model_id == "anthropic.test-model:0"
+    assert len(stub.requests) == 3
+    request = stub.requests[0]
+    assert request["path"] == "/model/anthropic.test-model%3A0/invoke"
+    assert request["headers"]["Authorization"].startswith("AWS4-HMAC-SHA256")
+    assert request["body"]["system"] == "system"
+
+
+def test_ainvoke_bedrock_text_raises_on_error_status(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pytest.importorskip("httpx")
+    pytest.importorskip("botocore")
+    import asyncio
+
+    from bedrock_stub import BedrockStubServer
+
+    from backend.src.modules.ai_router import bedrock
+    from backend.src.modules.ai_router.clients import ProviderClientRegistry
+
+    monkeypatch.setenv("AI_BEDROCK_ENABLED", "1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIDSTUB")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "stub-secret")
+    monkeypatch.setattr(bedrock, "_credentials", None)
+    registry = ProviderClientRegistry()
+    monkeypatch.setattr(bedrock, "provider_clients", registry)
+
+    async def _run() -> None:
+        try:
+            await bedrock.ainvoke_bedrock_text(system_prompt="s", user_prompt="u")
+        finally:
+            await registry.aclose()
+
+    with BedrockStubServer(status=429) as stub:
+        monkeypatch.setenv("AI_BEDROCK_ENDPOINT_URL", stub.url)
+        with pytest.raises(RuntimeError, match="429"):
+            asyncio.run(_run())
+
+
+def test_astream_bedrock_text_decodes_event_stream_from_stub(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pytest.importorskip("httpx")
+    pytest.importorskip("botocore")
+    import asyncio
+
+    from bedrock_stub import BedrockStubServer
+
+    from backend.src.modules.ai_router import bedrock
+    from backend.src.modules.ai_router.clients import ProviderClientRegistry
+
+    monkeypatch.setenv("AI_BEDROCK_ENABLED", "1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIDSTUB")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "stub-secret")
+    monkeypatch.setattr(bedrock, "_credentials", None)
+    registry = ProviderClientRegistry()
+    monkeypatch.setattr(bedrock, "provider_clients", registry)
+
+    async def _run():
+        stream = bedrock.astream_bedrock_text(
+            system_prompt="system", user_prompt="one two three"
+        )
+        try:
+            deltas = [text async for text in stream]
+        finally:
+            await registry.aclose()
+        return deltas, stream.result
+
+    with BedrockStubServer() as stub:
+        monkeypatch.setenv("AI_BEDROCK_ENDPOINT_URL", stub.url)
+        deltas, result = asyncio.run(_run())
+
+    assert deltas == ["stub:", " one", " two", " three"]
+    assert result is not None
+    assert result.text == "stub: one two three"
+    assert result.input_tokens == 3
+    assert result.output_tokens == 4
+    assert stub.requests[0]["path"].endswith("/invoke-with-response-stream")
+    assert stub.requests[0]["headers"]["Accept"] == "application/vnd.amazon.eventstream"
+
+
+def test_credentials_are_resolved_off_the_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("botocore")
+    import asyncio
+    import threading
+
+    from backend.src.modules.ai_router import bedrock
+
+    threads: list[threading.Thread] = []
+    frozen = types.SimpleNamespace(access_key="AKIDSTUB", secret_key="stub", token=None)
+
+    def _frozen():
+        threads.append(threading.current_thread())
+        return frozen
+
+    monkeypatch.setattr(bedrock, "_frozen_credentials", _frozen)
+    headers = asyncio.run(
+        bedrock._signed_headers("https://bedrock.test/model/m/invoke", b"{}", "us-east-1")
+    )
+
+    assert "Authorization" in headers
+    assert threads and threads[0] is not threading.main_thread()
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import sys
-import types
 from types import SimpleNamespace
 
 import pytest
@@ -53,8 +52,31 @@ class _DummyDB:
     def commit(self) -> None:
         return
 
+    def __enter__(self):
+        return self
 
-def test_chat_generate_ai_response_uses_bedrock_when_available(
+    def __exit__(self, *_exc):
+        return None
+
+
+class _FakeBedrockStream:
+    def __init__(self, text: str | None, result: BedrockTextResult | None) -> None:
+        self._text = text
+        self.result = None
+        self._result = result
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        if self._text is None:
+            raise RuntimeError("forced bedrock error")
+        yield self._text
+        self.result = self._result
+
+
+@pytest.mark.anyio
+async def test_chat_generate_ai_response_uses_bedrock_when_available(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     settings = SimpleNamespace(
@@ -67,6 +89,7 @@ def test_chat_generate_ai_response_uses_bedrock_when_available(
         ai_bedrock_region="eu-north-1",
     )
     monkeypatch.setattr(chat_service, "get_settings", lambda: settings)
+    monkeypatch.setattr(chat_service, "SessionLocal", _DummyDB)
     monkeypatch.setattr(
         chat_service,
         "_build_messages_for_ai",
@@ -75,19 +98,22 @@ def test_chat_generate_ai_response_uses_bedrock_when_available(
 
     bedrock_calls: dict[str, str] = {}
 
-    def _fake_bedrock(**kwargs: str) -> BedrockTextResult:
+    def _fake_bedrock(**kwargs: str) -> _FakeBedrockStream:
         bedrock_calls.update(kwargs)
-        return BedrockTextResult(
-            text="bedrock reply",
-            model_id="bedrock-chat-model",
-            region="eu-north-1",
-            input_tokens=11,
-            output_tokens=7,
-            estimated_usd=0.0005,
-            latency_ms=123,
+        return _FakeBedrockStream(
+            "bedrock reply",
+            BedrockTextResult(
+                text="bedrock reply",
+                model_id="bedrock-chat-model",
+                region="eu-north-1",
+                input_tokens=11,
+                output_tokens=7,
+                estimated_usd=0.0005,
+                latency_ms=123,
+            ),
         )
 
-    monkeypatch.setattr(chat_service, "invoke_bedrock_text", _fake_bedrock)
+    monkeypatch.setattr(chat_service, "astream_bedrock_text", _fake_bedrock)
 
     captured_event: dict[str, object] = {}
 
@@ -102,19 +128,17 @@ def test_chat_generate_ai_response_uses_bedrock_when_available(
     monkeypatch.setattr(usage_service, "record_usage", lambda *_a, **_k: None)
 
     thread = SimpleNamespace(id="thread-1", placement="support", user_id="user-1")
-    result = chat_service.generate_ai_response(
-        _DummyDB(),
-        thread=thread,
-        user_message="hello",
-    )
+    result = await chat_service.generate_ai_response(thread, user_message="hello")
 
     assert result["event_metadata"]["provider"] == "bedrock"
+    assert result["event_metadata"]["region"] == "eu-north-1"
     assert result["content"] == "bedrock reply"
     assert bedrock_calls["model_id"] == "bedrock-chat-model"
     assert bedrock_calls["region"] == "eu-north-1"
 
 
-def test_chat_generate_ai_response_falls_back_to_openai_when_bedrock_fails(
+@pytest.mark.anyio
+async def test_chat_generate_ai_response_falls_back_to_openai_when_bedrock_fails(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
     settings = SimpleNamespace(
@@ -127,6 +151,7 @@ def test_chat_generate_ai_response_falls_back_to_openai_when_bedrock_fails(
         ai_bedrock_region="eu-north-1",
     )
     monkeypatch.setattr(chat_service, "get_settings", lambda: settings)
+    monkeypatch.setattr(chat_service, "SessionLocal", _DummyDB)
     monkeypatch.setattr(
         chat_service,
         "_build_messages_for_ai",
@@ -134,28 +159,32 @@ def test_chat_generate_ai_response_falls_back_to_openai_when_bedrock_fails(
     )
     monkeypatch.setattr(
         chat_service,
-        "invoke_bedrock_text",
-        lambda **_kwargs: (_ for _ in ()).throw(RuntimeError("forced bedrock error")),
+        "astream_bedrock_text",
+        lambda **_kwargs: _FakeBedrockStream(None, None),
     )
 
-    class _FakeOpenAIResponse:
-        def __init__(self) -> None:
-            self.model = "gpt-4o-mini"
-            self.choices = [
-                SimpleNamespace(
-                    message=SimpleNamespace(content="openai fallback reply")
-                )
-            ]
-            self.usage = SimpleNamespace(prompt_tokens=9, completion_tokens=5)
-
-    class _FakeOpenAIClient:
-        def __init__(self, *_args, **_kwargs) -> None:
-            self.chat = SimpleNamespace(
-                completions=SimpleNamespace(create=lambda **_k: _FakeOpenAIResponse())
-            )
-
-    monkeypatch.setitem(
-        sys.modules, "openai", types.SimpleNamespace(OpenAI=_FakeOpenAIClient)
+    async def _openai_stream():
+        yield SimpleNamespace(
+            model="gpt-4o-mini",
+            choices=[SimpleNamespace(delta=SimpleNamespace(content="openai fallback reply"))],
+            usage=None,
+        )
+        yield SimpleNamespace(
+            model="gpt-4o-mini",
+            choices=[],
+            usage=SimpleNamespace(prompt_tokens=9, completion_tokens=5),
+        )
+
+    async def _create(**_kwargs):
+        return _openai_stream()
+
+    fake_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=_create))
+    )
+    monkeypatch.setattr(
+        chat_service,
+        "provider_clients",
+        SimpleNamespace(openai=lambda _key: fake_client),
     )
 
     captured_event: dict[str, object] = {}
@@ -171,14 +200,11 @@ def test_chat_generate_ai_response_falls_back_to_openai_when_bedrock_fails(
     monkeypatch.setattr(usage_service, "record_usage", lambda *_a, **_k: None)
 
     thread = SimpleNamespace(id="thread-2", placement="support", user_id="user-2")
-    result = chat_service.generate_ai_response(
-        _DummyDB(),
-        thread=thread,
-        user_message="hello",
-    )
+    result = await chat_service.generate_ai_response(thread, user_message="hello")
 
     assert result["event_metadata"]["provider"] == "openai"
     assert result["content"] == "openai fallback reply"
+    assert result["event_metadata"]["usage"]["input_tokens"] == 9
 
 
 @pytest.mark.anyio
@@ -239,10 +265,8 @@ async def test_finance_call_llm_uses_bedrock_when_first(
             ai_bedrock_region="eu-north-1",
         ),
     )
-    monkeypatch.setattr(
-        finance_service,
-        "invoke_bedrock_text",
-        lambda **_kwargs: BedrockTextResult(
+    async def _fake_bedrock(**_kwargs):
+        return BedrockTextResult(
             text="finance bedrock reply",
             model_id="bedrock-finance-model",
             region="eu-north-1",
@@ -250,8 +274,9 @@ async def test_finance_call_llm_uses_bedrock_when_first(
             output_tokens=10,
             estimated_usd=0.001,
             latency_ms=50,
-        ),
-    )
+        )
+
+    monkeypatch.setattr(finance_service, "ainvoke_bedrock_text", _fake_bedrock)
 
     text, usage = await svc._call_llm("finance query bedrock test")
 
@@ -279,11 +304,10 @@ async def test_finance_call_llm_returns_safe_fallback_when_bedrock_fails(
         "resolve_available_provider_order",
         lambda **_kwargs: ["bedrock"],
     )
-    monkeypatch.setattr(
-        finance_service,
-        "invoke_bedrock_text",
-        lambda **_kwargs: (_ for _ in ()).throw(RuntimeError("forced bedrock failure")),
-    )
+    async def _failing_bedrock(**_kwargs):
+        raise RuntimeError("forced bedrock failure")
+
+    monkeypatch.setattr(finance_service, "ainvoke_bedrock_text", _failing_bedrock)
 
     text, usage = await svc._call_llm("finance query fallback test")
 
@@ -0,0 +1,195 @@
+"""Chat WebSocket fan-out bus (``chat.broadcast``)."""
+
+from __future__ import annotations
+
+import asyncio
+
+from starlette.testclient import TestClient
+
+from backend.src.modules.chat.broadcast import InMemoryBroadcastBus, RedisBroadcastBus
+
+
+class _FakeWebSocket:
+    def __init__(self, *, block: bool = False) -> None:
+        self.sent: list[dict] = []
+        self.closed_with: int | None = None
+        self._block = block
+
+    async def send_json(self, data) -> None:
+        if self._block:
+            await asyncio.Event().wait()
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+class _FakeBroker:
+    def __init__(self) -> None:
+        self.subscribers: list[tuple[asyncio.Queue, str]] = []
+
+    def channels(self) -> list[str]:
+        return sorted(c for _, c in self.subscribers if c.startswith("chat:thread:"))
+
+
+class _FakeRedis:
+    def __init__(self, broker: _FakeBroker) -> None:
+        self.broker = broker
+
+    async def publish(self, channel: str, message: str) -> int:
+        for queue, subscribed in self.broker.subscribers:
+            if channel == subscribed:
+                queue.put_nowait({"type": "message", "channel": channel, "data": message})
+        return 1
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> "_FakePubSub":
+        return _FakePubSub(self.broker)
+
+
+class _FakePubSub:
+    def __init__(self, broker: _FakeBroker) -> None:
+        self.broker = broker
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self.broker.subscribers.append((self.queue, channel))
+
+    async def unsubscribe(self, channel: str) -> None:
+        self.broker.subscribers.remove((self.queue, channel))
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_publish_fans_out_to_thread_subscribers_only():
+    async def _run():
+        bus = InMemoryBroadcastBus()
+        a, b, other = _FakeWebSocket(), _FakeWebSocket(), _FakeWebSocket()
+        await bus.subscribe("t-1", a)
+        conn_b = await bus.subscribe("t-1", b)
+        await bus.subscribe("t-2", other)
+
+        await bus.publish("t-1", {"type": "chat.delta", "delta": "hi"})
+        await _settle()
+        await bus.unsubscribe(conn_b)
+        await bus.publish("t-1", {"type": "chat.delta", "delta": "again"})
+        await _settle()
+        stats = bus.stats
+        await bus.stop()
+        return a, b, other, stats
+
+    a, b, other, stats = asyncio.run(_run())
+    assert [m["delta"] for m in a.sent] == ["hi", "again"]
+    assert [m["delta"] for m in b.sent] == ["hi"]
+    assert other.sent == []
+    assert stats["published"] == 2
+    assert stats["delivered"] == 3
+    assert stats["connections"] == 2
+
+
+def test_full_queue_disconnects_slow_consumer():
+    async def _run():
+        bus = InMemoryBroadcastBus(queue_size=2)
+        slow, fast = _FakeWebSocket(block=True), _FakeWebSocket()
+        await bus.subscribe("t-1", slow)
+        await bus.subscribe("t-1", fast)
+        for i in range(5):
+            await bus.publish("t-1", {"n": i})
+            await _settle()
+        stats = bus.stats
+        await bus.stop()
+        return slow, fast, stats
+
+    slow, fast, stats = asyncio.run(_run())
+    assert slow.closed_with == 1013
+    assert [m["n"] for m in fast.sent] == [0, 1, 2, 3, 4]
+    assert stats["slow_consumer_disconnects"] == 1
+    assert stats["dropped"] == 1
+    assert stats["connections"] == 1
+
+
+def test_stalled_send_times_out_and_disconnects():
+    async def _run():
+        bus = InMemoryBroadcastBus(send_timeout=0.01)
+        stalled = _FakeWebSocket(block=True)
+        conn = await bus.subscribe("t-1", stalled)
+        await bus.publish("t-1", {"n": 1})
+        await asyncio.sleep(0.05)
+        await _settle()
+        return stalled, conn, bus.stats
+
+    stalled, conn, stats = asyncio.run(_run())
+    assert conn.closed
+    assert stalled.closed_with == 1013
+    assert stats["connections"] == 0
+
+
+def test_redis_bus_delivers_across_workers_once():
+    async def _run():
+        broker = _FakeBroker()
+        worker_a = RedisBroadcastBus(client=_FakeRedis(broker))
+        worker_b = RedisBroadcastBus(client=_FakeRedis(broker))
+        await worker_a.start()
+        await worker_b.start()
+        await _settle()
+
+        on_a, on_b = _FakeWebSocket(), _FakeWebSocket()
+        await worker_a.subscribe("t-1", on_a)
+        await worker_b.subscribe("t-1", on_b)
+
+        await worker_a.publish("t-1", {"type": "chat.event", "id": "e-1"})
+        await _settle()
+        stats_b = worker_b.stats
+        await worker_a.stop()
+        await worker_b.stop()
+        return on_a, on_b, stats_b
+
+    on_a, on_b, stats_b = asyncio.run(_run())
+    assert on_a.sent == [{"type": "chat.event", "id": "e-1"}]
+    assert on_b.sent == [{"type": "chat.event", "id": "e-1"}]
+    assert stats_b["remote_received"] == 1
+    assert stats_b["redis_connected"] is True
+
+
+def test_redis_bus_subscribes_only_to_threads_with_local_sockets():
+    async def _run():
+        broker = _FakeBroker()
+        bus = RedisBroadcastBus(client=_FakeRedis(broker))
+        early = await bus.subscribe("t-0", _FakeWebSocket())
+        await bus.start()
+        await _settle()
+        seen = [broker.channels()]
+
+        first = await bus.subscribe("t-1", _FakeWebSocket())
+        second = await bus.subscribe("t-1", _FakeWebSocket())
+        seen.append(broker.channels())
+        await bus.unsubscribe(first)
+        await _settle()
+        seen.append(broker.channels())
+        await bus.unsubscribe(second)
+        await bus.unsubscribe(early)
+        await _settle()
+        seen.append(broker.channels())
+        await bus.stop()
+        return seen
+
+    assert asyncio.run(_run()) == [
+        ["chat:thread:t-0"],
+        ["chat:thread:t-0", "chat:thread:t-1"],
+        ["chat:thread:t-0", "chat:thread:t-1"],
+        [],
+    ]
+
+
+def test_chat_ws_replies_through_bus(app):
+    with TestClient(app) as client, client.websocket_connect("/api/chat/ws?thread_id=t-ws") as ws:
+        ws.send_json({"type": "ping", "timestamp": "123"})
+        assert ws.receive_json() == {"type": "pong", "timestamp": "123"}
+        ws.send_json({"type": "chat.message", "client_id": "c-1"})
+        assert ws.receive_json() == {"type": "chat.ack", "client_id": "c-1"}
@@ -0,0 +1,147 @@
+"""Incremental chat context window (``chat.context``)."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.src.db import models
+from backend.src.db.session import SessionLocal
+from backend.src.modules.chat import service
+from backend.src.modules.chat.context import ContextWindowCache
+
+_T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def windows(monkeypatch):
+    cache = ContextWindowCache()
+    monkeypatch.setattr(service, "context_windows", cache)
+    return cache
+
+
+def _thread(db) -> models.ChatThread:
+    uid = str(uuid.uuid4())
+    db.add(
+        models.User(
+            id=uid,
+            email=f"ctx-{uid[:8]}@example.test",
+            hashed_password="not-used",
+            first_name="Test",
+            last_name="Context",
+            role="Customer",
+            is_active=True,
+        )
+    )
+    thread = models.ChatThread(id=str(uuid.uuid4()), user_id=uid, placement="support")
+    db.add(thread)
+    db.commit()
+    return thread
+
+
+def _add(db, thread, n: int, *, start: int = 0, chars: int = 40, at=None) -> None:
+    for i in range(start, start + n):
+        db.add(
+            models.ChatEvent(
+                id=str(uuid.uuid4()),
+                thread_id=thread.id,
+                role="user" if i % 2 == 0 else "assistant",
+                content=f"m{i} " + "x" * chars,
+                token_count=chars // 4,
+                created_at=at or _T0 + timedelta(seconds=i),
+            )
+        )
+    db.commit()
+
+
+def test_create_event_stores_token_count(db):
+    thread = _thread(db)
+    event = service.create_event(
+        db, thread_id=thread.id, role="user", content="a" * 400
+    )
+    assert event.token_count == service._estimate_tokens("a" * 400)
+
+
+def test_incremental_build_reads_only_new_events(db, windows, monkeypatch):
+    thread = _thread(db)
+    _add(db, thread, 4)
+    first = service._build_messages_for_ai(db, thread=thread)
+    assert [m["content"][:2] for m in first] == ["m0", "m1", "m2", "m3"]
+
+    _add(db, thread, 2, start=4)
+    second = service._build_messages_for_ai(db, thread=thread)
+    assert [m["content"][:2] for m in second] == ["m0", "m1", "m2", "m3", "m4", "m5"]
+    assert windows.stats["cold_builds"] == 1
+    assert windows.stats["incremental_builds"] == 1
+    assert windows.stats["events_loaded"] == 6
+    # Stored counts are reused; nothing is re-tokenised.
+    assert windows.stats["tokens_computed"] == 0
+
+
+def test_window_matches_cold_rebuild_and_summarises_dropped(db, windows):
+    thread = _thread(db)
+    for batch in range(6):
+        _add(db, thread, 10, start=batch * 10, chars=2000)
+        incremental = service._build_messages_for_ai(db, thread=thread)
+
+    windows.clear()
+    cold = service._build_messages_for_ai(db, thread=thread)
+
+    assert incremental == cold
+    assert cold[0]["content"].startswith("[Earlier conversation summary]")
+    assert cold[-1]["content"].startswith("m59")
+    window_tokens = sum(service._estimate_tokens(m["content"]) for m in cold[1:])
+    assert window_tokens <= service._MAX_CONTEXT_TOKENS
+
+
+def test_event_limit_keeps_most_recent_events(db, windows):
+    thread = _thread(db)
+    _add(db, thread, 60)
+    messages = service._build_messages_for_ai(db, thread=thread, limit=50)
+    assert messages[-1]["content"].startswith("m59")
+    assert not any(m["content"].startswith("m9 ") for m in messages)
+
+
+def test_same_timestamp_events_are_not_duplicated(db, windows):
+    thread = _thread(db)
+    _add(db, thread, 2, at=_T0)
+    service._build_messages_for_ai(db, thread=thread)
+    _add(db, thread, 1, start=2, at=_T0)
+    messages = service._build_messages_for_ai(db, thread=thread)
+    contents = "\n\n".join(m["content"] for m in messages)
+    assert sorted(c[:2] for c in contents.split("\n\n")) == ["m0", "m1", "m2"]
+
+
+def test_late_committed_event_rebuilds_window(db, windows):
+    thread = _thread(db)
+    _add(db, thread, 4)
+    service._build_messages_for_ai(db, thread=thread)
+
+    # Stamped before the cursor (m3) but committed after the last build.
+    _add(db, thread, 1, start=4, at=_T0 + timedelta(seconds=1, milliseconds=500))
+    messages = service._build_messages_for_ai(db, thread=thread)
+    assert windows.stats["late_rebuilds"] == 1
+
+    windows.clear()
+    assert messages == service._build_messages_for_ai(db, thread=thread)
+    assert any(m["content"].startswith("m4") for m in messages)
+
+
+def test_returned_messages_are_copies(db, windows):
+    thread = _thread(db)
+    _add(db, thread, 1)
+    messages = service._build_messages_for_ai(db, thread=thread)
+    messages[-1]["content"] = "mutated"
+    again = service._build_messages_for_ai(db, thread=thread)
+    assert again[-1]["content"].startswith("m0")
@@ -0,0 +1,314 @@
+"""Async streaming chat generation (``chat.service.stream_ai_response``)."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.src.modules.chat import service as chat_service
+
+
+class _DummyDB:
+    def commit(self) -> None:
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return None
+
+
+def _chunk(text=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=text))] if text else []
+    return SimpleNamespace(model="gpt-4o-mini-2024", choices=choices, usage=usage)
+
+
+class _FakeOpenAIStream:
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+
+def _setup(monkeypatch, *, order, openai_chunks):
+    settings = SimpleNamespace(
+        anthropic_api_key="",
+        openai_api_key="openai-key",
+        ai_provider_strategy="hybrid",
+        ai_provider_fallback_order=",".join(order),
+        ai_bedrock_enabled="bedrock" in order,
+        ai_bedrock_model_id="bedrock-chat-model",
+        ai_bedrock_region="eu-north-1",
+    )
+    monkeypatch.setattr(chat_service, "get_settings", lambda: settings)
+    monkeypatch.setattr(chat_service, "SessionLocal", _DummyDB)
+    monkeypatch.setattr(
+        chat_service,
+        "resolve_available_provider_order",
+        lambda **_kwargs: list(order),
+    )
+    monkeypatch.setattr(
+        chat_service,
+        "_build_messages_for_ai",
+        lambda *_args, **_kwargs: [{"role": "user", "content": "hello"}],
+    )
+
+    calls: list[dict] = []
+
+    async def _create(**kwargs):
+        calls.append(kwargs)
+        return _FakeOpenAIStream(openai_chunks)
+
+    fake_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=_create))
+    )
+    monkeypatch.setattr(
+        chat_service,
+        "provider_clients",
+        SimpleNamespace(openai=lambda _key: fake_client),
+    )
+    monkeypatch.setattr(
+        chat_service, "create_event", lambda _db, **kwargs: SimpleNamespace(**kwargs)
+    )
+
+    import backend.src.modules.usage.service as usage_service
+
+    monkeypatch.setattr(usage_service, "record_usage", lambda *_a, **_k: None)
+    return calls
+
+
+async def _collect(thread):
+    return [
+        chunk
+        async for chunk in chat_service.stream_ai_response(thread, user_message="hello")
+    ]
+
+
+def test_stream_yields_deltas_then_persisted_event(monkeypatch):
+    calls = _setup(
+        monkeypatch,
+        order=["openai"],
+        openai_chunks=[
+            _chunk("Hel"),
+            _chunk("lo!"),
+            _chunk(usage=SimpleNamespace(prompt_tokens=4, completion_tokens=2)),
+        ],
+    )
+    thread = SimpleNamespace(id="t-1", placement="support", user_id="u-1")
+
+    chunks = asyncio.run(_collect(thread))
+
+    assert [c["text"] for c in chunks if c["type"] == "delta"] == ["Hel", "lo!"]
+    done = chunks[-1]
+    assert done["type"] == "done"
+    event = done["event"]
+    assert event.content == "Hello!"
+    assert event.event_metadata["provider"] == "openai"
+    assert event.event_metadata["model"] == "gpt-4o-mini-2024"
+    assert event.event_metadata["streamed"] is True
+    assert event.event_metadata["usage"]["input_tokens"] == 4
+    assert event.event_metadata["usage"]["output_tokens"] == 2
+    assert event.event_metadata["usage"]["ttft_ms"] is not None
+    assert calls[0]["stream"] is True
+
+
+def test_stream_falls_back_when_provider_fails_before_first_token(monkeypatch):
+    _setup(monkeypatch, order=["bedrock", "openai"], openai_chunks=[_chunk("fallback")])
+
+    class _FailingStream:
+        result = None
+
+        def __aiter__(self):
+            return self._iterate()
+
+        async def _iterate(self):
+            raise RuntimeError("bedrock down")
+            yield  # pragma: no cover
+
+    monkeypatch.setattr(
+        chat_service, "astream_bedrock_text", lambda **_kwargs: _FailingStream()
+    )
+    thread = SimpleNamespace(id="t-2", placement="support", user_id="u-2")
+
+    chunks = asyncio.run(_collect(thread))
+
+    assert [c["text"] for c in chunks if c["type"] == "delta"] == ["fallback"]
+    assert chunks[-1]["event"].event_metadata["provider"] == "openai"
+
+
+def test_stream_keeps_partial_text_when_interrupted(monkeypatch):
+    _setup(monkeypatch, order=["bedrock", "openai"], openai_chunks=[_chunk("unused")])
+
+    class _InterruptedStream:
+        result = None
+
+        def __aiter__(self):
+            return self._iterate()
+
+        async def _iterate(self):
+            yield "partial"
+            raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(
+        chat_service, "astream_bedrock_text", lambda **_kwargs: _InterruptedStream()
+    )
+    thread = SimpleNamespace(id="t-3", placement="support", user_id="u-3")
+
+    chunks = asyncio.run(_collect(thread))
+
+    event = chunks[-1]["event"]
+    assert event.content == "partial"
+    assert event.event_metadata["provider"] == "bedrock"
+    assert event.event_metadata["model"] == "bedrock-chat-model"
+    assert event.event_metadata["error"] == "connection reset"
+
+
+def test_generate_ai_response_returns_persisted_event(monkeypatch):
+    _setup(monkeypatch, order=["openai"], openai_chunks=[_chunk("Hi"), _chunk(" there")])
+    thread = SimpleNamespace(id="t-4", placement="support", user_id="u-4")
+
+    event = asyncio.run(chat_service.generate_ai_response(thread, user_message="hello"))
+
+    assert event.content == "Hi there"
+    assert event.thread_id == "t-4"
+
+
+def test_generate_ai_response_raises_when_stream_has_no_result(monkeypatch):
+    async def _no_done(_thread, *, user_message):
+        yield {"type": "delta", "text": user_message}
+
+    monkeypatch.setattr(chat_service, "stream_ai_response", _no_done)
+    thread = SimpleNamespace(id="t-5", placement="support", user_id="u-5")
+
+    with pytest.raises(RuntimeError, match="without a persisted event"):
+        asyncio.run(chat_service.generate_ai_response(thread, user_message="hello"))
+
+
+def test_client_disconnect_still_persists_event_and_usage(monkeypatch):
+    from backend.src.modules.chat import router as chat_router
+
+    _setup(
+        monkeypatch,
+        order=["openai"],
+        openai_chunks=[
+            _chunk("Hi"),
+            _chunk(" there"),
+            _chunk(usage=SimpleNamespace(prompt_tokens=5, completion_tokens=2)),
+        ],
+    )
+    stored: list = []
+
+    def _create_event(_db, **kwargs):
+        stored.append(kwargs)
+        return SimpleNamespace(id="e-6", tool_name=None, created_at=None, **kwargs)
+
+    monkeypatch.setattr(chat_service, "create_event", _create_event)
+    import backend.src.modules.usage.service as usage_service
+
+    usage_rows: list = []
+    monkeypatch.setattr(usage_service, "record_usage", lambda _db, **kw: usage_rows.append(kw))
+    thread = SimpleNamespace(
+        id="t-6", placement="support", user_id="u-6", title=None, context=None,
+        created_at=None, updated_at=None,
+    )
+
+    async def _disconnect_after_first_delta():
+        relay = chat_router._stream_and_broadcast(thread, content="hello")
+        first = await relay.__anext__()
+        await relay.aclose()
+        assert not stored
+        await asyncio.gather(*chat_router._generations)
+        return first
+
+    first = asyncio.run(_disconnect_after_first_delta())
+
+    assert first == {"type": "delta", "text": "Hi"}
+    assert [(e["role"], e["content"]) for e in stored] == [("assistant", "Hi there")]
+    assert [(r["tokens_in"], r["tokens_out"]) for r in usage_rows] == [(5, 2)]
+
+
+def test_sse_endpoint_streams_deltas_and_persists_event(app, client, monkeypatch):
+    import uuid
+
+    from backend.src.db import models
+    from backend.src.db.session import SessionLocal
+    from backend.src.modules.auth.csrf import CSRF_COOKIE_NAME
+    from backend.src.modules.auth.deps import get_current_user
+    from backend.src.modules.payments import enforcement
+
+    with SessionLocal() as db:
+        user = models.User(email=f"sse_{uuid.uuid4().hex[:10]}@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+
+    app.dependency_overrides[get_current_user] = lambda: user
+    for dep in (
+        enforcement.enforce_execution_limit,
+        enforcement.enforce_platform_budget,
+        enforcement.enforce_user_budget,
+    ):
+        app.dependency_overrides[dep] = lambda: None
+
+    async def _fake_stream(_plan, meta):
+        meta.update(model="fake-model", input_tokens=3, output_tokens=2)
+        for text in ("Hel", "lo"):
+            await asyncio.sleep(0)
+            yield text
+
+    settings = SimpleNamespace(
+        anthropic_api_key="",
+        openai_api_key="openai-key",
+        ai_provider_strategy="hybrid",
+        ai_provider_fallback_order="openai",
+        ai_bedrock_enabled=False,
+        ai_bedrock_model_id="",
+        ai_bedrock_region="",
+    )
+    monkeypatch.setattr(chat_service, "get_settings", lambda: settings)
+    monkeypatch.setattr(
+        chat_service, "resolve_available_provider_order", lambda **_kwargs: ["openai"]
+    )
+    monkeypatch.setattr(
+        chat_service, "_provider_stream", lambda _p, plan, meta: _fake_stream(plan, meta)
+    )
+
+    token = client.get("/api/auth/csrf").json()["csrf_token"]
+    client.cookies.set(CSRF_COOKIE_NAME, token, path="/")
+    headers = {"X-CSRF-Token": token}
+    try:
+        thread_id = client.post(
+            "/api/chat/threads", json={"placement": "support"}, headers=headers
+        ).json()["id"]
+        resp = client.post(
+            f"/api/chat/threads/{thread_id}/events/stream",
+            json={"content": "hello"},
+            headers=headers,
+        )
+        events = client.get(f"/api/chat/threads/{thread_id}/events").json()["results"]
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    frames = [f for f in resp.text.split("\n\n") if f]
+    assert [f.split("\n")[0] for f in frames] == [
+        "event: chat.event",
+        "event: chat.delta",
+        "event: chat.delta",
+        "event: chat.event",
+    ]
+    assert '"delta": "Hel"' in frames[1]
+    assert [(e["role"], e["content"]) for e in events] == [
+        ("user", "hello"),
+        ("assistant", "Hello"),
+    ]
@@ -0,0 +1,236 @@
+"""Background abstractive thread summaries (``chat.summary``)."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from backend.src.db import models
+from backend.src.db.session import SessionLocal
+from backend.src.modules.chat import service
+from backend.src.modules.chat import summary as summary_mod
+from backend.src.modules.chat.context import ContextWindowCache
+from backend.src.modules.usage import model_router
+
+_T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class _FakeMessages:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace(
+            model=kwargs["model"],
+            content=[SimpleNamespace(type="text", text=self.replies.pop(0))],
+            usage=SimpleNamespace(input_tokens=900, output_tokens=60),
+        )
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def windows(monkeypatch):
+    cache = ContextWindowCache()
+    monkeypatch.setattr(service, "context_windows", cache)
+    return cache
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    messages = _FakeMessages(["S1", "S2"])
+    monkeypatch.setattr(
+        summary_mod.provider_clients,
+        "anthropic",
+        lambda api_key: SimpleNamespace(messages=messages),
+    )
+    return messages
+
+
+def _thread(db, *, events: int, chars: int = 2000) -> models.ChatThread:
+    uid = str(uuid.uuid4())
+    db.add(
+        models.User(
+            id=uid,
+            email=f"sum-{uid[:8]}@example.test",
+            hashed_password="not-used",
+            first_name="Test",
+            last_name="Summary",
+            role="Customer",
+            is_active=True,
+        )
+    )
+    thread = models.ChatThread(id=str(uuid.uuid4()), user_id=uid, placement="support")
+    db.add(thread)
+    for i in range(events):
+        db.add(
+            models.ChatEvent(
+                id=str(uuid.uuid4()),
+                thread_id=thread.id,
+                role="user" if i % 2 == 0 else "assistant",
+                content=f"m{i}. " + "x" * chars,
+                token_count=chars // 4,
+                created_at=_T0 + timedelta(seconds=i),
+            )
+        )
+    db.commit()
+    return thread
+
+
+def _run(thread_id: str) -> bool:
+    summariser = summary_mod.ThreadSummariser()
+    return asyncio.run(
+        summariser.run(
+            thread_id,
+            api_key="sk-test",
+            keep_tokens=service._WINDOW_TOKENS,
+            max_events=service._WINDOW_EVENTS,
+            estimate=service._estimate_tokens,
+        )
+    )
+
+
+def _event_time(db, thread, index: int):
+    return db.scalar(
+        models.ChatEvent.__table__.select()
+        .with_only_columns(models.ChatEvent.created_at)
+        .where(
+            models.ChatEvent.thread_id == thread.id,
+            models.ChatEvent.content.startswith(f"m{index}. "),
+        )
+    )
+
+
+def test_summary_message_leads_with_stored_summary():
+    text = service._summarise_dropped_messages(
+        [{"role": "user", "content": "Latest dropped question. More."}],
+        "- user is on the Pro plan",
+    )
+    assert text.startswith("[Earlier conversation summary]\n- user is on the Pro plan\n")
+    assert "- user: Latest dropped question." in text
+
+
+def test_run_folds_oldest_dropped_turns_with_budget_model(db, fake_llm):
+    thread = _thread(db, events=40)
+
+    assert _run(thread.id) is True
+    db.refresh(thread)
+    assert thread.summary == "S1"
+    # 500-token events: 12 fit CHAT_SUMMARY_MAX_INPUT_TOKENS (6000).
+    assert thread.summary_through == _event_time(db, thread, 11)
+    call = fake_llm.calls[0]
+    assert call["model"] == model_router.BUDGET_MODEL
+    prompt = call["messages"][0]["content"]
+    assert "Existing summary:\n(none yet)" in prompt
+    assert "m0." in prompt and "m11." in prompt and "m12." not in prompt
+
+    assert _run(thread.id) is True
+    db.refresh(thread)
+    assert thread.summary == "S2"
+    assert "Existing summary:\nS1" in fake_llm.calls[1]["messages"][0]["content"]
+
+    usage = db.scalars(
+        models.UsageLog.__table__.select()
+        .with_only_columns(models.UsageLog.event_type)
+        .where(models.UsageLog.thread_id == thread.id)
+    ).all()
+    assert usage == ["chat_summary", "chat_summary"]
+
+
+def test_run_is_noop_while_history_fits_the_window(db, fake_llm):
+    thread = _thread(db, events=8)
+    assert _run(thread.id) is False
+    assert fake_llm.calls == []
+
+
+def test_many_short_messages_dropped_by_event_cap_are_summarised(db, fake_llm):
+    # 200 short turns fit the token budget but not the 50-event window cap.
+    thread = _thread(db, events=200, chars=60)
+
+    assert _run(thread.id) is True
+    db.refresh(thread)
+    assert thread.summary == "S1"
+    assert thread.summary_through == _event_time(db, thread, 149)
+
+
+def test_stale_run_does_not_overwrite_newer_summary(db):
+    thread = _thread(db, events=40)
+    job = summary_mod._collect(
+        db,
+        thread_id=thread.id,
+        keep_tokens=service._WINDOW_TOKENS,
+        max_events=service._WINDOW_EVENTS,
+        estimate=service._estimate_tokens,
+    )
+    assert job is not None
+    thread.summary = "newer"
+    thread.summary_through = _event_time(db, thread, 20)
+    db.commit()
+
+    stored = summary_mod._store(
+        db, job, text="stale", model="m", input_tokens=1, output_tokens=1
+    )
+    db.refresh(thread)
+    assert stored is False
+    assert thread.summary == "newer"
+
+
+def test_prompt_uses_summary_plus_uncovered_turns(db, windows):
+    thread = _thread(db, events=30)
+    service._build_messages_for_ai(db, thread=thread)
+    pending_before = windows.pending_tokens(thread.id)
+    assert pending_before > 0
+
+    thread.summary = "- stored summary"
+    thread.summary_through = _event_time(db, thread, 16)
+    db.commit()
+    messages = service._build_messages_for_ai(db, thread=thread)
+
+    head = messages[0]["content"]
+    assert head.startswith("[Earlier conversation summary]\n- stored summary\n")
+    assert "m16." not in head and "m17." in head
+    assert windows.pending_tokens(thread.id) < pending_before
+
+
+def test_schedule_runs_once_per_thread():
+    summariser = summary_mod.ThreadSummariser()
+    started = []
+
+    async def _fake_run(thread_id, **_kwargs):
+        started.append(thread_id)
+        await asyncio.sleep(0)
+        return True
+
+    summariser.run = _fake_run
+
+    async def _go():
+        kwargs = dict(api_key="k", keep_tokens=1, max_events=1, estimate=len)
+        first = summariser.schedule("t-1", **kwargs)
+        second = summariser.schedule("t-1", **kwargs)
+        await asyncio.sleep(0.01)
+        third = summariser.schedule("t-1", **kwargs)
+        await summariser.aclose()
+        return first, second, third
+
+    assert asyncio.run(_go()) == (True, False, True)
+    assert summariser.stats["skipped_inflight"] == 1
+
+
+def test_is_due_requires_key_and_threshold():
+    summariser = summary_mod.ThreadSummariser(min_pending_tokens=100)
+    assert summariser.is_due(150, api_key="k")
+    assert not summariser.is_due(50, api_key="k")
+    assert not summariser.is_due(150, api_key="")
@@ -20,6 +20,7 @@ Validates:
 
 from __future__ import annotations
 
+import asyncio
 import time
 import uuid
 from datetime import datetime, timedelta, timezone
@@ -31,7 +32,7 @@ import pytest
 from backend.src.db import models
 from backend.src.db.session import SessionLocal
 from backend.src.modules.usage.track import try_record_usage
-from backend.src.modules.usage.llm_cache import LLMCache, llm_cache
+from backend.src.modules.usage.llm_cache import LLMCache, llm_cache, provider_answered
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
@@ -348,6 +349,293 @@ class TestLLMCache:
         assert k1 != k3
 
 
+class TestLLMCacheLRU:
+    """Verify O(1) LRU ordering, queued expiry and the stats counters."""
+
+    def test_get_refreshes_recency(self):
+        cache = LLMCache(ttl_seconds=60, max_size=2, shared=None)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        assert cache.get("a") == "1"
+        cache.put("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1" and cache.get("c") == "3"
+        assert cache.stats["evictions"] == 1
+
+    def test_counters_and_bytes(self):
+        cache = LLMCache(ttl_seconds=60, max_size=10, shared=None)
+        cache.put("k", ("hello", {"model": "m"}))
+        cache.get("k")
+        cache.get("missing")
+        stats = cache.stats
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+        assert stats["resident_bytes"] == len("hello") + len("model") + len("m")
+        cache.put("k", ("hi", {}))
+        assert cache.stats["resident_bytes"] == 2
+        cache.invalidate("k")
+        assert cache.stats["resident_bytes"] == 0
+
+    def test_sweep_retires_expired_entries(self, monkeypatch):
+        from backend.src.modules.usage import llm_cache as module
+
+        clock = [1000.0]
+        monkeypatch.setattr(module.time, "monotonic", lambda: clock[0])
+        cache = LLMCache(ttl_seconds=10, max_size=100, shared=None)
+        for i in range(20):
+            cache.put(f"k{i}", i)
+        clock[0] += 11
+        cache.put("fresh", "x")  # retires only a bounded batch inline
+        assert 1 < cache.size < 21
+        assert cache.sweep() > 0
+        assert cache.size == 1
+        assert cache.stats["expirations"] == 20
+
+    def test_overwrites_do_not_grow_expiry_queue_unbounded(self):
+        cache = LLMCache(ttl_seconds=60, max_size=4, shared=None)
+        for i in range(1000):
+            cache.put("same", i)
+        assert len(cache._expiry) <= 2 * 4 + 64
+        assert cache.get("same") == 999
+
+    def test_metrics_endpoint_publishes_cache_stats(self, client):
+        body = client.get("/api/metrics").json()
+        assert {"hits", "misses", "evictions", "resident_bytes"} <= set(body["caches"]["llm"])
+        assert {"hit_rate", "resident_bytes", "max_bytes"} <= set(body["caches"]["rag_matrix"])
+
+    def test_admin_cache_stats_include_rag_matrix(self):
+        from backend.src.modules.usage.router import admin_cache_stats
+
+        body = asyncio.run(admin_cache_stats(_admin=None))
+        assert {"hit_rate", "resident_bytes", "max_bytes"} <= set(body["rag_matrix"])
+
+
+class _FakeRedis:
+    """Minimal stand-in for the ``redis.Redis`` calls the shared tier uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def eval(self, script, numkeys, key, token):
+        # Only the fill-lock compare-and-delete script is used.
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+class TestLLMCacheSharedTier:
+    """Verify the optional Redis L2 and cross-process single-flight."""
+
+    def test_l2_shared_between_processes(self):
+        redis = _FakeRedis()
+        web, worker = LLMCache(shared=redis), LLMCache(shared=redis)
+        web.put("k", ("answer", {"model": "m", "tokens_in": 3}))
+        assert worker.get("k") == ("answer", {"model": "m", "tokens_in": 3})
+        assert worker.size == 1  # promoted into L1
+
+    def test_large_values_are_compressed(self):
+        redis = _FakeRedis()
+        cache = LLMCache(shared=redis)
+        text = "policy " * 2000
+        cache.put("k", (text, {}))
+        payload = next(v for k, v in redis.data.items() if k.endswith(":k"))
+        assert payload.startswith("z:") and len(payload) < len(text) // 10
+        assert LLMCache(shared=redis).get("k") == (text, {})
+
+    def test_unserialisable_values_stay_local(self):
+        redis = _FakeRedis()
+        cache = LLMCache(shared=redis)
+        cache.put("k", object())
+        assert redis.data == {}
+        assert cache.get("k") is not None
+
+    def test_single_flight_across_processes(self):
+        redis = _FakeRedis()
+        calls = []
+
+        async def _compute():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return ("answer", {})
+
+        async def _race():
+            return await asyncio.gather(
+                *(LLMCache(shared=redis).get_or_compute("k", _compute) for _ in range(5))
+            )
+
+        results = asyncio.run(_race())
+        assert len(calls) == 1
+        assert all(r == ("answer", {}) for r in results)
+        assert not any(k.startswith("llmcache:fill:") for k in redis.data)
+
+    def test_fill_lock_is_released_only_by_its_holder(self):
+        redis = _FakeRedis()
+
+        async def _compute():
+            # The lock expired mid-compute and another process took it.
+            redis.data["llmcache:fill:k"] = "other-holder"
+            return ("answer", {})
+
+        asyncio.run(LLMCache(shared=redis).get_or_compute("k", _compute))
+        assert redis.data["llmcache:fill:k"] == "other-holder"
+
+    def test_uncacheable_result_lets_waiters_compute(self):
+        redis = _FakeRedis()
+        calls = []
+
+        async def _compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return ("[Error: provider down]", {})
+
+        async def _race():
+            return await asyncio.gather(
+                *(
+                    LLMCache(shared=redis).get_or_compute(
+                        "k", _compute, should_cache=lambda r: not r[0].startswith("[Error")
+                    )
+                    for _ in range(2)
+                )
+            )
+
+        asyncio.run(_race())
+        assert len(calls) == 2
+        assert LLMCache(shared=redis).get("k") is None
+
+    def test_without_redis_behaves_in_memory(self):
+        cache = LLMCache(shared=None)
+
+        async def _compute():
+            return "v"
+
+        assert asyncio.run(cache.get_or_compute("k", _compute)) == "v"
+        assert cache.get("k") == "v"
+
+
+class TestLLMCacheSingleFlight:
+    """In-process coalescing of identical in-flight calls."""
+
+    def test_concurrent_callers_share_one_call(self):
+        cache = LLMCache(shared=None)
+        calls = []
+
+        async def _compute():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return ("answer", {"model": "m"})
+
+        async def _race():
+            return await asyncio.gather(
+                *(cache.get_or_compute("k", _compute) for _ in range(5))
+            )
+
+        results = asyncio.run(_race())
+        assert len(calls) == 1
+        assert all(r == ("answer", {"model": "m"}) for r in results)
+        assert cache.stats["coalesced"] == 4
+        assert cache.stats["in_flight"] == 0
+
+    def test_rejected_result_is_shared_but_not_stored(self):
+        cache = LLMCache(shared=None)
+        calls = []
+
+        async def _compute():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return ("fallback", {})
+
+        async def _race():
+            return await asyncio.gather(
+                *(
+                    cache.get_or_compute("k", _compute, should_cache=provider_answered)
+                    for _ in range(3)
+                )
+            )
+
+        assert asyncio.run(_race()) == [("fallback", {})] * 3
+        assert len(calls) == 1
+        assert cache.get("k") is None
+
+    def test_errors_propagate_to_every_waiter(self):
+        cache = LLMCache(shared=None)
+
+        async def _compute():
+            await asyncio.sleep(0.02)
+            raise RuntimeError("provider down")
+
+        async def _race():
+            return await asyncio.gather(
+                *(cache.get_or_compute("k", _compute) for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(_race())
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_waiter_recomputes_when_owner_is_cancelled(self):
+        cache = LLMCache(shared=None)
+        calls = []
+
+        async def _compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "v"
+
+        async def _race():
+            owner = asyncio.create_task(cache.get_or_compute("k", _compute))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(cache.get_or_compute("k", _compute))
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            return await waiter
+
+        assert asyncio.run(_race()) == "v"
+        assert len(calls) == 2
+
+    def test_agent_calls_are_coalesced(self):
+        from backend.src.modules.agents.customer_agent.service import CustomerAgentService
+
+        llm_cache.clear()
+        svc = CustomerAgentService()
+        calls = []
+
+        async def _create(**_kwargs):
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return MagicMock(
+                content=[MagicMock(text="hello")],
+                model="claude-test",
+                usage=MagicMock(input_tokens=3, output_tokens=2),
+            )
+
+        svc.anthropic_client = MagicMock()
+        svc.anthropic_client.messages.create = _create
+        svc.model = "claude-test"
+        prompt = f"coalesce {uuid.uuid4()}"
+
+        async def _race():
+            return await asyncio.gather(*(svc._call_llm(prompt) for _ in range(4)))
+
+        results = asyncio.run(_race())
+        assert len(calls) == 1
+        assert {text for text, _ in results} == {"hello"}
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # Fix #1 extended: agent _call_llm returns tuple
 # ══════════════════════════════════════════════════════════════════════════════
@@ -0,0 +1,198 @@
+"""Orchestrator flow execution modes (``orchestrator.run_engine``)."""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from backend.src.db import models
+from backend.src.db.session import SessionLocal
+from backend.src.orchestrator import run_engine
+from backend.src.orchestrator.run_engine import RunExecutionError, ToolCall
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db) -> models.User:
+    uid = str(uuid.uuid4())
+    row = models.User(
+        id=uid,
+        email=f"flow-{uid[:8]}@example.test",
+        hashed_password="not-used",
+        first_name="Test",
+        last_name="Flow",
+        role="Customer",
+        is_active=True,
+    )
+    db.add(row)
+    db.commit()
+    return row
+
+
+class _SlowTools:
+    """Stand-in for ``chatkit_service.invoke_tool`` that sleeps per call."""
+
+    def __init__(self, delay: float = 0.2, fail: set | None = None):
+        self.delay = delay
+        self.fail = fail or set()
+        self.calls: list[tuple[str, float, float]] = []
+        self.attempts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, db, *, user, placement, tool_name, payload, thread_id, agent_id=None):
+        key = payload.get("key", tool_name)
+        with self._lock:
+            self.attempts[key] = self.attempts.get(key, 0) + 1
+        start = time.perf_counter()
+        time.sleep(self.delay)
+        if key in self.fail:
+            raise RuntimeError(f"{key} unavailable")
+        with self._lock:
+            self.calls.append((key, start, time.perf_counter()))
+        thread = SimpleNamespace(id=thread_id)
+        return thread, {"key": key}, SimpleNamespace(id=f"evt-{key}")
+
+
+@pytest.fixture
+def slow_tools(monkeypatch):
+    tools = _SlowTools()
+    monkeypatch.setattr(run_engine.chatkit_service, "invoke_tool", tools)
+    monkeypatch.setattr(run_engine, "DEFAULT_RETRY_DELAY", 0.01)
+    return tools
+
+
+def _calls(*specs) -> list[ToolCall]:
+    return [
+        ToolCall(name="money.summary", payload={"key": key}, id=key, depends_on=deps)
+        for key, deps in specs
+    ]
+
+
+def test_parallel_mode_runs_independent_calls_concurrently(db, user, slow_tools):
+    started = time.perf_counter()
+    result = run_engine.execute(
+        db,
+        user=user,
+        placement="money",
+        tool_calls=_calls(("rag", []), ("money", []), ("energy", [])),
+        mode="parallel",
+    )
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5  # three 0.2s calls: max(step), not sum(step)
+    assert result.status == "succeeded"
+    assert [s.call_id for s in result.steps] == ["rag", "money", "energy"]
+    assert all(s.duration_ms >= 190 and s.started_at for s in result.steps)
+
+    run = db.get(models.FlowRun, result.run_id)
+    db.refresh(run)
+    assert [s["call_id"] for s in run.steps] == ["rag", "money", "energy"]
+    assert all(s["started_at"] and s["duration_ms"] >= 190 for s in run.steps)
+    assert run.thread_id == result.thread_id != run_engine.PENDING_THREAD_PLACEHOLDER
+
+
+def test_dependent_call_waits_for_its_dependencies(db, user, slow_tools):
+    slow_tools.delay = 0.1
+    result = run_engine.execute(
+        db,
+        user=user,
+        placement="money",
+        tool_calls=_calls(("a", []), ("b", []), ("c", ["a", "b"])),
+        mode="parallel",
+    )
+    timing = {key: (start, end) for key, start, end in slow_tools.calls}
+    assert timing["c"][0] >= max(timing["a"][1], timing["b"][1])
+    assert result.steps[2].depends_on == ["a", "b"]
+
+
+def test_concurrency_limit_bounds_in_flight_calls(db, user, slow_tools):
+    slow_tools.delay = 0.1
+    started = time.perf_counter()
+    run_engine.execute(
+        db,
+        user=user,
+        placement="money",
+        tool_calls=_calls(("a", []), ("b", []), ("c", [])),
+        mode="parallel",
+        concurrency=1,
+    )
+    assert time.perf_counter() - started >= 0.3
+
+
+def test_failed_call_stops_dependents_and_marks_run_failed(db, user, slow_tools):
+    slow_tools.delay = 0.01
+    slow_tools.fail = {"a"}
+    with pytest.raises(RunExecutionError) as excinfo:
+        run_engine.execute(
+            db,
+            user=user,
+            placement="money",
+            tool_calls=_calls(("a", []), ("b", ["a"])),
+            mode="parallel",
+            max_attempts=2,
+        )
+    assert slow_tools.attempts == {"a": 2}
+
+    run = db.get(models.FlowRun, excinfo.value.run_id)
+    db.refresh(run)
+    assert run.status == "failed"
+    assert "a unavailable" in run.error_message
+
+
+@pytest.mark.parametrize(
+    "specs, message",
+    [
+        ((("a", ["b"]), ("b", ["a"])), "cycle"),
+        ((("a", ["missing"]),), "unknown call"),
+        ((("a", []), ("a", [])), "unique"),
+    ],
+)
+def test_invalid_dependency_graph_is_rejected(db, user, slow_tools, specs, message):
+    with pytest.raises(ValueError, match=message):
+        run_engine.execute(
+            db, user=user, placement="money", tool_calls=_calls(*specs), mode="parallel"
+        )
+    assert slow_tools.calls == []
+
+
+def test_parallel_mode_with_real_tools_shares_one_thread(db, user):
+    result = run_engine.execute(
+        db,
+        user=user,
+        placement="money",
+        tool_calls=[
+            ToolCall(name="money.summary", payload={"period": "q1"}),
+            ToolCall(name="money.summary", payload={"period": "q2"}),
+        ],
+        mode="parallel",
+    )
+    assert [s.result["summary"]["period"] for s in result.steps] == ["q1", "q2"]
+    assert [s.call_id for s in result.steps] == ["0", "1"]
+    thread_ids = {
+        db.get(models.ChatEvent, s.event_id).thread_id for s in result.steps
+    }
+    assert thread_ids == {result.thread_id}
+
+
+def test_sequential_mode_records_step_timings(db, user):
+    result = run_engine.execute(
+        db,
+        user=user,
+        placement="money",
+        tool_calls=[ToolCall(name="money.summary", payload={})],
+    )
+    step = result.steps[0]
+    assert step.call_id == "0"
+    assert step.started_at is not None and step.duration_ms is not None
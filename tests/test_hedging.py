@@ -0,0 +1,400 @@
+"""Hedged provider calls (``ai_router.hedging``)."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.src.modules.ai_router import hedging
+from backend.src.modules.ai_router.health import TTFT, ProviderHealth
+from backend.src.modules.ai_router.hedging import (
+    Discarded,
+    HedgePolicy,
+    discarded_usage,
+    parse_budgets,
+)
+from backend.src.modules.chat import service as chat_service
+
+
+def _policy(**overrides) -> HedgePolicy:
+    options = dict(
+        enabled=True,
+        budget=1.0,
+        budgets={},
+        burst=1,
+        default_delay_ms=20,
+        min_delay_ms=0,
+        health=ProviderHealth(),
+    )
+    options.update(overrides)
+    return HedgePolicy(**options)
+
+
+def _provider(delays: dict, *, fail=(), cancelled: list | None = None):
+    async def _call(provider):
+        try:
+            await asyncio.sleep(delays[provider])
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(provider)
+            raise
+        if provider in fail:
+            raise RuntimeError(f"{provider} down")
+        return provider.upper(), {"model": f"{provider}-model", "tokens_in": 3, "tokens_out": 2}
+
+    return _call
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    policy = _policy()
+    cancelled: list = []
+
+    outcome = asyncio.run(
+        policy.call(
+            ["bedrock", "openai"],
+            _provider({"bedrock": 5, "openai": 0}, cancelled=cancelled),
+            placement="rag",
+            model_of=lambda p: f"{p}-model",
+            estimate_prompt=lambda: 42,
+        )
+    )
+
+    assert (outcome.provider, outcome.hedged) == ("openai", True)
+    assert cancelled == ["bedrock"]
+    [loser] = outcome.discarded
+    assert (loser.provider, loser.cancelled, loser.prompt_tokens) == ("bedrock", True, 42)
+    stats = policy.stats["placements"]["rag"]
+    assert (stats["hedged"], stats["hedge_won"], stats["discarded"]) == (1, 1, 1)
+
+
+def test_fast_primary_is_not_hedged():
+    policy = _policy(default_delay_ms=1000)
+
+    outcome = asyncio.run(
+        policy.call(["bedrock", "openai"], _provider({"bedrock": 0, "openai": 0}), placement="rag")
+    )
+
+    assert (outcome.provider, outcome.hedged, outcome.discarded) == ("bedrock", False, [])
+    assert policy.stats["placements"]["rag"]["credits"] == 1
+
+
+def test_failure_falls_through_without_spending_budget():
+    policy = _policy(default_delay_ms=1000)
+
+    outcome = asyncio.run(
+        policy.call(
+            ["bedrock", "anthropic", "openai"],
+            _provider({"bedrock": 0, "anthropic": 0, "openai": 0}, fail={"bedrock"}),
+            placement="rag",
+        )
+    )
+
+    assert outcome.provider == "anthropic"
+    assert not outcome.hedged
+    assert str(outcome.error) == "bedrock down"
+
+
+def test_rejected_results_fall_through_and_last_one_is_kept():
+    policy = _policy()
+
+    async def _call(provider):
+        return f"[Error from {provider}]", {}
+
+    outcome = asyncio.run(
+        policy.call(
+            ["bedrock", "openai"],
+            _call,
+            placement="rag",
+            succeeded=lambda result: not result[0].startswith("[Error"),
+        )
+    )
+
+    assert not outcome.ok
+    assert outcome.value == ("[Error from openai]", {})
+    assert policy.stats["placements"]["rag"]["failed"] == 1
+
+
+def test_budget_limits_hedging():
+    policy = _policy(budget=0.5)
+    delays = {"bedrock": 0.1, "openai": 0}
+
+    first = asyncio.run(policy.call(["bedrock", "openai"], _provider(delays), placement="rag"))
+    second = asyncio.run(policy.call(["bedrock", "openai"], _provider(delays), placement="rag"))
+
+    assert (first.provider, first.hedged) == ("bedrock", False)
+    assert (second.provider, second.hedged) == ("openai", True)
+    assert policy.stats["placements"]["rag"]["budget_denied"] == 1
+
+
+def test_disabled_policy_is_sequential():
+    policy = _policy(enabled=False)
+
+    outcome = asyncio.run(
+        policy.call(["bedrock", "openai"], _provider({"bedrock": 0.1, "openai": 0}), placement="rag")
+    )
+
+    assert (outcome.provider, outcome.hedged) == ("bedrock", False)
+
+
+def test_placement_budgets_and_delay():
+    health = ProviderHealth()
+    policy = _policy(
+        budget=0.05,
+        budgets=parse_budgets("chat=0.1, chat:admin=0, bogus, rag=x"),
+        default_delay_ms=2000,
+        min_delay_ms=100,
+        max_delay_ms=5000,
+        min_samples=5,
+        health=health,
+    )
+    assert policy.budget_for("chat:support") == 0.1
+    assert policy.budget_for("chat:admin") == 0
+    assert policy.budget_for("rag") == 0.05
+
+    assert policy.delay("openai") == 2.0
+    for latency in (300, 300, 300, 300, 900):
+        health.record_success("openai", latency_ms=latency, model="gpt-4o-mini")
+    assert policy.delay("openai", "gpt-4o-mini") == pytest.approx(0.9)
+    health.record_success("openai", latency_ms=60000)
+    assert policy.delay("openai") == 5.0
+    assert policy.delay("openai", kind=TTFT) == 2.0
+
+
+def test_discarded_usage_charges_what_was_spent():
+    finished = discarded_usage(
+        Discarded(
+            provider="openai",
+            model="gpt-4o-mini",
+            result=("text", {"model": "gpt-4o-mini-2024", "tokens_in": 10, "tokens_out": 4}),
+        )
+    )
+    assert (finished["model"], finished["tokens_in"], finished["tokens_out"]) == (
+        "gpt-4o-mini-2024",
+        10,
+        4,
+    )
+
+    cancelled = discarded_usage(Discarded(provider="bedrock", model="m", prompt_tokens=25))
+    assert (cancelled["model"], cancelled["tokens_in"], cancelled["tokens_out"]) == ("m", 25, 0)
+    assert cancelled["detail"]["hedge"] == "discarded"
+    assert cancelled["detail"]["cancelled"] is True
+
+
+def test_chat_stream_hedges_slow_first_token(monkeypatch):
+    class _DummyDB:
+        def commit(self):
+            return
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_exc):
+            return None
+
+    settings = SimpleNamespace(
+        anthropic_api_key="",
+        openai_api_key="openai-key",
+        ai_provider_strategy="hybrid",
+        ai_provider_fallback_order="bedrock,openai",
+        ai_bedrock_enabled=True,
+        ai_bedrock_model_id="bedrock-chat-model",
+        ai_bedrock_region="eu-north-1",
+    )
+    monkeypatch.setattr(chat_service, "get_settings", lambda: settings)
+    monkeypatch.setattr(chat_service, "SessionLocal", _DummyDB)
+    monkeypatch.setattr(
+        chat_service,
+        "resolve_available_provider_order",
+        lambda **_kwargs: ["bedrock", "openai"],
+    )
+    monkeypatch.setattr(
+        chat_service,
+        "_build_messages_for_ai",
+        lambda *_args, **_kwargs: [{"role": "user", "content": "hello"}],
+    )
+    monkeypatch.setattr(hedging, "hedge_policy", _policy())
+
+    closed: list = []
+
+    class _SlowBedrock:
+        result = None
+
+        def __aiter__(self):
+            return self._iterate()
+
+        async def _iterate(self):
+            try:
+                await asyncio.sleep(5)
+                yield "too late"
+            finally:
+                closed.append("bedrock")
+
+    monkeypatch.setattr(chat_service, "astream_bedrock_text", lambda **_kwargs: _SlowBedrock())
+
+    async def _openai_stream():
+        yield SimpleNamespace(
+            model="gpt-4o-mini",
+            choices=[SimpleNamespace(delta=SimpleNamespace(content="fast reply"))],
+            usage=SimpleNamespace(prompt_tokens=6, completion_tokens=2),
+        )
+
+    async def _create(**_kwargs):
+        return _openai_stream()
+
+    monkeypatch.setattr(
+        chat_service,
+        "provider_clients",
+        SimpleNamespace(
+            openai=lambda _key: SimpleNamespace(
+                chat=SimpleNamespace(completions=SimpleNamespace(create=_create))
+            )
+        ),
+    )
+    monkeypatch.setattr(
+        chat_service, "create_event", lambda _db, **kwargs: SimpleNamespace(**kwargs)
+    )
+    usage_rows: list = []
+
+    import backend.src.modules.usage.service as usage_service
+
+    monkeypatch.setattr(usage_service, "record_usage", lambda _db, **kw: usage_rows.append(kw))
+
+    thread = SimpleNamespace(id="t-h", placement="support", user_id="u-h")
+    event = asyncio.run(chat_service.generate_ai_response(thread, user_message="hello"))
+
+    assert event.content == "fast reply"
+    assert event.event_metadata["provider"] == "openai"
+    assert event.event_metadata["hedge"] == {"winner": "openai", "discarded": ["bedrock"]}
+    assert closed == ["bedrock"]
+    assert [row["model"] for row in usage_rows] == ["gpt-4o-mini", "bedrock-chat-model"]
+    assert usage_rows[1]["detail"]["cancelled"] is True
+    assert usage_rows[1]["tokens_in"] > 0
+
+
+def test_agent_call_llm_reports_discarded_calls(monkeypatch):
+    from backend.src.modules.agents.finance_agent import service as finance_service
+    from backend.src.modules.usage.llm_cache import llm_cache
+
+    llm_cache.clear()
+    svc = finance_service.FinanceAgentService(
+        openai_api_key=None,
+        anthropic_api_key=None,
+        ai_provider_strategy="hybrid",
+        ai_provider_fallback_order="bedrock,openai",
+    )
+    monkeypatch.setattr(
+        finance_service,
+        "resolve_available_provider_order",
+        lambda **_kwargs: ["bedrock", "openai"],
+    )
+    monkeypatch.setattr(
+        finance_service,
+        "get_settings",
+        lambda: SimpleNamespace(ai_bedrock_model_id="bedrock-finance", ai_bedrock_region="eu"),
+    )
+
+    async def _slow_bedrock(**_kwargs):
+        await asyncio.sleep(5)
+
+    async def _openai(**_kwargs):
+        return SimpleNamespace(
+            model="gpt-4o-mini",
+            choices=[SimpleNamespace(message=SimpleNamespace(content="openai answer"))],
+            usage=SimpleNamespace(prompt_tokens=8, completion_tokens=3),
+        )
+
+    monkeypatch.setattr(finance_service, "ainvoke_bedrock_text", _slow_bedrock)
+    svc.openai_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=_openai))
+    )
+    monkeypatch.setattr(hedging, "hedge_policy", _policy())
+
+    losers: list = []
+    text, usage = asyncio.run(svc._call_llm("hedged finance query", discarded=losers))
+
+    assert text == "openai answer"
+    assert usage["tokens_in"] == 8
+    assert [(loser.provider, loser.model, loser.cancelled) for loser in losers] == [
+        ("bedrock", "bedrock-finance", True)
+    ]
+
+
+def test_rag_hedge_calls_each_provider_once(monkeypatch):
+    from backend.src.modules.rag import service as rag_service
+    from backend.src.modules.rag.schemas import UnsupportedPolicy
+    from backend.src.modules.usage import track
+    from backend.src.modules.usage.llm_cache import llm_cache
+
+    llm_cache.clear()
+    svc = rag_service.RAGService(
+        openai_api_key="openai-key",
+        anthropic_api_key="anthropic-key",
+        model="claude-rag-model",
+    )
+    monkeypatch.setattr(
+        rag_service,
+        "get_settings",
+        lambda: SimpleNamespace(
+            anthropic_api_key="",
+            openai_api_key="",
+            ai_provider_strategy="hybrid",
+            ai_provider_fallback_order="anthropic,openai",
+            ai_bedrock_enabled=False,
+        ),
+    )
+    monkeypatch.setattr(
+        rag_service,
+        "resolve_available_provider_order",
+        lambda **_kwargs: ["anthropic", "openai"],
+    )
+    monkeypatch.setattr(hedging, "hedge_policy", _policy())
+
+    calls: list = []
+
+    async def _slow_anthropic(**_kwargs):
+        calls.append("anthropic")
+        await asyncio.sleep(5)
+
+    async def _openai(**_kwargs):
+        calls.append("openai")
+        return SimpleNamespace(
+            model="gpt-4o-mini",
+            choices=[SimpleNamespace(message=SimpleNamespace(content="openai answer"))],
+            usage=SimpleNamespace(prompt_tokens=8, completion_tokens=3),
+        )
+
+    monkeypatch.setattr(
+        rag_service,
+        "provider_clients",
+        SimpleNamespace(
+            anthropic=lambda _key: SimpleNamespace(
+                messages=SimpleNamespace(create=_slow_anthropic)
+            ),
+            openai=lambda _key: SimpleNamespace(
+                chat=SimpleNamespace(completions=SimpleNamespace(create=_openai))
+            ),
+        ),
+    )
+    usage_rows: list = []
+    monkeypatch.setattr(rag_service, "try_record_usage", lambda _db, **kw: usage_rows.append(kw))
+    monkeypatch.setattr(track, "try_record_usage", lambda _db, **kw: usage_rows.append(kw))
+
+    losers: list = []
+    text, usage = asyncio.run(
+        svc._generate_response(
+            query="hedged rag query about provider keys",
+            citations=[],
+            grounded=False,
+            unsupported_policy=UnsupportedPolicy.FLAG,
+            discarded=losers,
+        )
+    )
+    svc._record_llm_usage(None, SimpleNamespace(id="u-rag"), usage, losers)
+
+    assert text == "openai answer"
+    assert sorted(calls) == ["anthropic", "openai"]
+    assert [(loser.provider, loser.cancelled) for loser in losers] == [("anthropic", True)]
+    assert [row["model"] for row in usage_rows] == ["gpt-4o-mini", "claude-rag-model"]
+    assert usage_rows[1]["tokens_out"] == 0
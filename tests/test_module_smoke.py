@@ -90,6 +90,12 @@ class TestChatSmokeAuth:
         resp = client.get("/api/chat/threads")
         assert resp.status_code in _AUTH_REJECT
 
+    def test_event_stream_requires_auth(self, client):
+        resp = client.post(
+            "/api/chat/threads/some-thread/events/stream", json={"content": "hi"}
+        )
+        assert resp.status_code in _AUTH_REJECT
+
 
 class TestSupportSmokeAuth:
     """support module – FAQ & tickets require verified user."""
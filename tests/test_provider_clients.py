@@ -0,0 +1,123 @@
+"""Tests for the pooled provider client registry (``ai_router.clients``)."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import types
+
+import pytest
+
+from backend.src.modules.ai_router.clients import ProviderClientRegistry
+
+
+class _FakeAsyncClient:
+    instances: list["_FakeAsyncClient"] = []
+
+    def __init__(self, *, api_key, http_client=None):
+        self.api_key = api_key
+        self.http_client = http_client
+        self.closed = False
+        _FakeAsyncClient.instances.append(self)
+
+    async def close(self):
+        self.closed = True
+
+
+def _fake_sdks(monkeypatch):
+    _FakeAsyncClient.instances = []
+    monkeypatch.setitem(
+        sys.modules, "anthropic", types.SimpleNamespace(AsyncAnthropic=_FakeAsyncClient)
+    )
+    monkeypatch.setitem(
+        sys.modules, "openai", types.SimpleNamespace(AsyncOpenAI=_FakeAsyncClient)
+    )
+
+
+class TestProviderClientRegistry:
+    def test_clients_are_reused_per_provider_and_key(self, monkeypatch):
+        pytest.importorskip("httpx")
+        _fake_sdks(monkeypatch)
+        registry = ProviderClientRegistry()
+
+        a = registry.anthropic("key-1")
+        assert registry.anthropic("key-1") is a
+        assert registry.anthropic("key-2") is not a
+        assert registry.openai("key-1") is not a
+        assert registry.stats["clients"] == 3
+        assert a.http_client is not None
+        assert all("key-1" not in map(str, key) for key in registry._clients)
+
+    def test_rebuilt_after_owning_loop_closes(self, monkeypatch):
+        pytest.importorskip("httpx")
+        _fake_sdks(monkeypatch)
+        registry = ProviderClientRegistry()
+
+        async def _get():
+            return registry.openai("key"), registry.openai("key")
+
+        first, again = asyncio.run(_get())
+        assert first is again
+        second, _ = asyncio.run(_get())
+        assert second is not first
+
+    def test_live_loops_get_separate_clients(self, monkeypatch):
+        pytest.importorskip("httpx")
+        _fake_sdks(monkeypatch)
+        registry = ProviderClientRegistry()
+        other = asyncio.new_event_loop()
+
+        async def _get():
+            return registry.openai("key")
+
+        try:
+            theirs = other.run_until_complete(_get())
+
+            async def _mine():
+                client = registry.openai("key")
+                await registry.aclose()
+                return client
+
+            mine = asyncio.run(_mine())
+            assert mine is not theirs
+            assert mine.closed and not theirs.closed
+            assert registry.stats["clients"] == 1
+            assert other.run_until_complete(_get()) is theirs
+        finally:
+            other.close()
+
+    def test_aclose_closes_clients_and_empties(self, monkeypatch):
+        pytest.importorskip("httpx")
+        _fake_sdks(monkeypatch)
+        registry = ProviderClientRegistry()
+
+        async def _run():
+            client = registry.anthropic("key")
+            await registry.aclose()
+            return client
+
+        client = asyncio.run(_run())
+        assert client.closed
+        assert registry.stats["clients"] == 0
+
+    def test_bedrock_client_pooled_per_region(self, monkeypatch):
+        pytest.importorskip("botocore")
+        built = []
+
+        def _client(service_name, region_name=None, **kwargs):
+            built.append((service_name, region_name, kwargs))
+            return types.SimpleNamespace(region=region_name)
+
+        monkeypatch.setitem(sys.modules, "boto3", types.SimpleNamespace(client=_client))
+        registry = ProviderClientRegistry()
+
+        eu = registry.bedrock("eu-north-1")
+        assert registry.bedrock("eu-north-1") is eu
+        assert registry.bedrock("us-east-1") is not eu
+        assert [b[:2] for b in built] == [
+            ("bedrock-runtime", "eu-north-1"),
+            ("bedrock-runtime", "us-east-1"),
+        ]
+        config = built[0][2]["config"]
+        assert config.tcp_keepalive is True
+        assert config.max_pool_connections >= 10
@@ -0,0 +1,201 @@
+"""Adaptive provider routing (``ai_router.health``)."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.src.modules.ai_router import strategy
+from backend.src.modules.ai_router.health import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    TTFT,
+    ProviderHealth,
+    is_throttle,
+    provider_health,
+)
+
+ORDER = ["bedrock", "anthropic", "openai"]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def health(clock):
+    return ProviderHealth(adaptive=True, alpha=0.2, clock=clock)
+
+
+def _fail(health, provider, times=1, **kwargs):
+    for _ in range(times):
+        health.record_failure(provider, error=RuntimeError("boom"), **kwargs)
+
+
+def test_consecutive_failures_open_breaker_and_demote(health):
+    _fail(health, "bedrock", times=4)
+    assert health.state("bedrock") == CLOSED
+
+    _fail(health, "bedrock")
+    assert health.state("bedrock") == OPEN
+    # Open providers stay available as a last resort.
+    assert health.rank(ORDER) == ["anthropic", "openai", "bedrock"]
+
+
+def test_throttling_opens_breaker_immediately(health):
+    class _Throttled(Exception):
+        status_code = 429
+
+    assert is_throttle(_Throttled())
+    assert is_throttle(RuntimeError("ThrottlingException: Rate exceeded"))
+    assert not is_throttle(RuntimeError("invalid api key"))
+
+    health.record_failure("anthropic", error=_Throttled())
+    assert health.state("anthropic") == OPEN
+    assert health.rank(ORDER) == ["bedrock", "openai", "anthropic"]
+    assert health.stats["providers"]["anthropic"]["throttled"] == 1
+
+
+def test_half_open_allows_one_probe_and_closes_on_success(health, clock):
+    _fail(health, "bedrock", times=5)
+    clock.now += 31
+    assert health.state("bedrock") == HALF_OPEN
+
+    # The first caller gets the probe in bedrock's usual slot; others do not.
+    assert health.rank(ORDER) == ORDER
+    assert health.rank(ORDER) == ["anthropic", "openai", "bedrock"]
+
+    health.record_success("bedrock", latency_ms=100)
+    assert health.state("bedrock") == CLOSED
+    # Closed again, but degraded until the error rate decays.
+    assert health.rank(ORDER) == ["anthropic", "openai", "bedrock"]
+    for _ in range(4):
+        health.record_success("bedrock", latency_ms=100)
+    assert health.rank(ORDER) == ORDER
+
+
+def test_failed_probe_doubles_cooldown(health, clock):
+    _fail(health, "bedrock", times=5)
+    clock.now += 31
+    assert health.rank(ORDER)[0] == "bedrock"
+
+    _fail(health, "bedrock")
+    assert health.state("bedrock") == OPEN
+    clock.now += 31
+    assert health.state("bedrock") == OPEN
+    clock.now += 30
+    assert health.state("bedrock") == HALF_OPEN
+
+
+def test_error_rate_and_latency_degrade_without_opening(health):
+    health.record_success("bedrock", latency_ms=100)
+    _fail(health, "bedrock", times=2)
+    health.record_success("bedrock", latency_ms=100)
+    assert health.state("bedrock") == CLOSED
+    assert health.rank(ORDER) == ["anthropic", "openai", "bedrock"]
+
+    health.reset()
+    health.record_success("bedrock", latency_ms=4000)
+    health.record_success("anthropic", latency_ms=500)
+    health.record_success("openai", latency_ms=700)
+    assert health.rank(ORDER) == ["anthropic", "openai", "bedrock"]
+
+
+def test_latency_compares_like_with_like(health):
+    # Chat's TTFT must not make a provider that only served full completions look slow.
+    health.record_success("bedrock", latency_ms=4000)
+    health.record_success("anthropic", latency_ms=300, kind=TTFT)
+    assert health.rank(ORDER) == ORDER
+    assert health.latency_percentile("bedrock", 95, kind=TTFT) is None
+    assert health.stats["providers"]["anthropic"]["ttft_p95_ms"] == 300
+    assert health.stats["providers"]["anthropic"]["p95_ms"] is None
+
+    health.record_success("openai", latency_ms=1500, kind=TTFT)
+    assert health.rank(ORDER) == ["bedrock", "anthropic", "openai"]
+
+
+def test_static_order_when_not_adaptive(clock):
+    health = ProviderHealth(adaptive=False, clock=clock)
+    _fail(health, "bedrock", times=10)
+    assert health.rank(ORDER) == ORDER
+
+
+def test_track_records_outcome_and_model_percentiles(health):
+    with health.track("openai", "gpt-4o-mini"):
+        pass
+    with pytest.raises(ValueError):
+        with health.track("openai", "gpt-4o-mini"):
+            raise ValueError("bad request")
+
+    openai = health.stats["providers"]["openai"]
+    assert (openai["calls"], openai["errors"]) == (2, 1)
+    model = openai["models"]["gpt-4o-mini"]
+    assert model["calls"] == 2
+    assert model["p50_ms"] is not None and model["p95_ms"] is not None
+
+
+def test_strategy_order_uses_live_health(monkeypatch):
+    monkeypatch.setattr(provider_health, "adaptive", True)
+    _fail(provider_health, "bedrock", times=5)
+
+    order = strategy.resolve_available_provider_order(
+        strategy="hybrid",
+        fallback_order="bedrock,anthropic,openai",
+        has_bedrock=True,
+        has_anthropic=True,
+        has_openai=True,
+    )
+    assert order == ["anthropic", "openai", "bedrock"]
+
+
+@pytest.mark.parametrize(
+    "module, cls",
+    [
+        ("content_agent", "ContentAgentService"),
+        ("customer_agent", "CustomerAgentService"),
+        ("dev_agent", "DevAgentService"),
+    ],
+)
+def test_agents_try_providers_in_health_order(monkeypatch, module, cls):
+    import importlib
+
+    service = importlib.import_module(f"backend.src.modules.agents.{module}.service")
+    monkeypatch.setattr(provider_health, "adaptive", True)
+    _fail(provider_health, "anthropic", times=5)
+
+    calls: list = []
+
+    async def _anthropic(**_kwargs):
+        calls.append("anthropic")
+        raise RuntimeError("anthropic down")
+
+    async def _openai(**_kwargs):
+        calls.append("openai")
+        return SimpleNamespace(
+            model="gpt-4o-mini",
+            choices=[SimpleNamespace(message=SimpleNamespace(content="openai answer"))],
+            usage=SimpleNamespace(prompt_tokens=4, completion_tokens=2),
+        )
+
+    svc = getattr(service, cls)()
+    svc.anthropic_client = SimpleNamespace(messages=SimpleNamespace(create=_anthropic))
+    svc.openai_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=_openai))
+    )
+
+    text, _usage = asyncio.run(svc._call_providers(f"{module} ranking query"))
+
+    assert text == "openai answer"
+    assert calls == ["openai"]
@@ -0,0 +1,330 @@
+"""Tests for the RAG ingestion pipeline (batching, concurrency, background job)."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.src.db import models
+from backend.src.db.session import SessionLocal
+from backend.src.modules.rag import embeddings, ingest
+from backend.src.modules.rag.models import ApprovedDocument, DocumentChunk
+from backend.src.modules.rag.schemas import DocumentStatus, DocumentUpdate, DocumentUpload
+from backend.src.modules.rag.service import DocumentBusyError, RAGService
+
+
+def _create_user(db) -> models.User:
+    user = models.User(email=f"rag-{uuid.uuid4()}@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+class TestPlanBatches:
+    def test_respects_token_budget(self):
+        assert embeddings.plan_batches([40, 40, 40, 40], max_items=100, max_tokens=100) == [
+            (0, 2),
+            (2, 4),
+        ]
+
+    def test_respects_item_cap(self):
+        assert embeddings.plan_batches([1] * 5, max_items=2, max_tokens=1000) == [
+            (0, 2),
+            (2, 4),
+            (4, 5),
+        ]
+
+    def test_oversized_text_gets_own_batch(self):
+        assert embeddings.plan_batches([10, 500, 10], max_items=10, max_tokens=100) == [
+            (0, 1),
+            (1, 2),
+            (2, 3),
+        ]
+
+    def test_empty(self):
+        assert embeddings.plan_batches([]) == []
+
+
+class TestConcurrentEmbeddings:
+    def test_bounded_concurrency_preserves_order(self, monkeypatch):
+        state = {"in_flight": 0, "peak": 0, "calls": 0}
+
+        class _FakeEmbeddings:
+            async def create(self, *, model, input):  # noqa: A002
+                state["calls"] += 1
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+                await asyncio.sleep(0.01)
+                state["in_flight"] -= 1
+                return SimpleNamespace(
+                    data=[SimpleNamespace(embedding=[float(t)]) for t in input]
+                )
+
+        class _FakeAsyncOpenAI:
+            def __init__(self, *args, **kwargs):
+                self.embeddings = _FakeEmbeddings()
+
+        monkeypatch.setitem(sys.modules, "openai", SimpleNamespace(AsyncOpenAI=_FakeAsyncOpenAI))
+        monkeypatch.setattr(embeddings, "_MAX_BATCH_ITEMS", 2)
+        monkeypatch.setattr(embeddings, "_EMBED_CONCURRENCY", 2)
+
+        texts = [str(i) for i in range(9)]
+        vectors = asyncio.run(
+            embeddings._openai_embeddings(
+                texts, "key", token_counts=[1] * len(texts)
+            )
+        )
+
+        assert vectors == [[float(i)] for i in range(9)]
+        assert state["calls"] == 5
+        assert state["peak"] == 2
+
+
+class TestIngestionPipeline:
+    def test_inline_upload_bulk_inserts_and_records_timings(self):
+        with SessionLocal() as db:
+            user = _create_user(db)
+            content = "\n\n".join(f"Section {i}. " + "word " * 300 for i in range(4))
+            resp = asyncio.run(
+                RAGService().upload_document(
+                    db, user, DocumentUpload(title="SOP", content=content)
+                )
+            )
+
+            assert resp.status == DocumentStatus.APPROVED.value
+            assert resp.chunk_count >= 2
+            assert set(resp.ingestion) >= {"chunk_ms", "embed_ms", "store_ms", "total_ms"}
+            stored = db.scalar(
+                select(func.count())
+                .select_from(DocumentChunk)
+                .where(DocumentChunk.document_id == resp.id)
+            )
+            assert stored == resp.chunk_count
+
+    def test_background_job_transitions_processing_to_approved(self):
+        with SessionLocal() as db:
+            user = _create_user(db)
+            service = RAGService()
+            resp = asyncio.run(
+                service.upload_document(
+                    db,
+                    user,
+                    DocumentUpload(title="Policy", content="Refunds take 30 days."),
+                    background=True,
+                )
+            )
+            assert resp.status == DocumentStatus.PROCESSING.value
+            assert resp.chunk_count == 0
+
+            asyncio.run(ingest.run_ingestion_job(*service.ingestion_job_args(resp.id)))
+
+            db.expire_all()
+            doc = db.get(ApprovedDocument, resp.id)
+            assert doc.status == DocumentStatus.APPROVED.value
+            assert doc.chunk_count == 1
+            assert doc.ingestion_stats["chunks"] == 1
+
+    def test_background_job_failure_marks_document_failed(self, monkeypatch):
+        async def _boom(*_args, **_kwargs):
+            raise RuntimeError("embedding provider down")
+
+        monkeypatch.setattr(embeddings, "generate_embeddings", _boom)
+        with SessionLocal() as db:
+            user = _create_user(db)
+            service = RAGService()
+            resp = asyncio.run(
+                service.upload_document(
+                    db,
+                    user,
+                    DocumentUpload(title="Policy", content="Some content."),
+                    background=True,
+                )
+            )
+            asyncio.run(ingest.run_ingestion_job(*service.ingestion_job_args(resp.id)))
+
+            db.expire_all()
+            doc = db.get(ApprovedDocument, resp.id)
+            assert doc.status == DocumentStatus.FAILED.value
+            assert "provider down" in doc.ingestion_stats["error"]
+
+
+def _sections(*names: str) -> str:
+    return "\n\n".join(f"Section {name}. " + "word " * 240 for name in names)
+
+
+def _stored_chunks(db, document_id):
+    return db.execute(
+        select(DocumentChunk.id, DocumentChunk.chunk_index, DocumentChunk.chunk_text)
+        .where(DocumentChunk.document_id == document_id)
+        .order_by(DocumentChunk.chunk_index)
+    ).all()
+
+
+class TestIncrementalReingestion:
+    def test_only_changed_chunks_are_reembedded(self):
+        with SessionLocal() as db:
+            user = _create_user(db)
+            service = RAGService()
+            doc = asyncio.run(
+                service.upload_document(
+                    db, user, DocumentUpload(title="SOP", content=_sections("A", "B", "C", "D"))
+                )
+            )
+            before = _stored_chunks(db, doc.id)
+            assert len(before) == 4
+
+            updated = asyncio.run(
+                service.update_document(
+                    db, user, doc.id, DocumentUpdate(content=_sections("A", "B2", "C", "D"))
+                )
+            )
+            assert updated.ingestion["reused"] == 3
+            assert updated.ingestion["embedded"] == 1
+            assert updated.ingestion["removed"] == 1
+
+            after = _stored_chunks(db, doc.id)
+            assert [row.chunk_index for row in after] == [0, 1, 2, 3]
+            assert [row.id for row in after] == [
+                before[0].id, after[1].id, before[2].id, before[3].id
+            ]
+            assert after[1].id != before[1].id
+            assert "Section B2." in after[1].chunk_text
+
+    def test_insertion_renumbers_reused_chunks_in_place(self):
+        with SessionLocal() as db:
+            user = _create_user(db)
+            service = RAGService()
+            doc = asyncio.run(
+                service.upload_document(
+                    db, user, DocumentUpload(title="SOP", content=_sections("A", "B", "C"))
+                )
+            )
+            before = _stored_chunks(db, doc.id)
+
+            updated = asyncio.run(
+                service.update_document(
+                    db, user, doc.id, DocumentUpdate(content=_sections("X", "A", "B", "C"))
+                )
+            )
+            assert updated.chunk_count == 4
+            assert updated.ingestion["reused"] == 2
+            assert updated.ingestion["embedded"] == 2
+
+            after = _stored_chunks(db, doc.id)
+            assert [row.chunk_index for row in after] == [0, 1, 2, 3]
+            assert [row.id for row in after[2:]] == [row.id for row in before[1:]]
+
+    def test_metadata_only_update_skips_reindexing(self):
+        with SessionLocal() as db:
+            user = _create_user(db)
+            service = RAGService()
+            doc = asyncio.run(
+                service.upload_document(
+                    db, user, DocumentUpload(title="SOP", content="Short policy.")
+                )
+            )
+            updated = asyncio.run(
+                service.update_document(db, user, doc.id, DocumentUpdate(title="Renamed"))
+            )
+            assert updated.title == "Renamed"
+            assert updated.ingestion == doc.ingestion
+            assert "reused" not in updated.ingestion
+
+    def test_content_change_while_processing_is_rejected(self):
+        with SessionLocal() as db:
+            user = _create_user(db)
+            service = RAGService()
+            doc = asyncio.run(
+                service.upload_document(
+                    db, user, DocumentUpload(title="SOP", content="Old text."), background=True
+                )
+            )
+            with pytest.raises(DocumentBusyError):
+                asyncio.run(
+                    service.update_document(db, user, doc.id, DocumentUpdate(content="New."))
+                )
+            renamed = asyncio.run(
+                service.update_document(db, user, doc.id, DocumentUpdate(title="Renamed"))
+            )
+            assert renamed.status == DocumentStatus.PROCESSING.value
+
+            asyncio.run(ingest.run_ingestion_job(*service.ingestion_job_args(doc.id)))
+            db.expire_all()
+            updated = asyncio.run(
+                service.update_document(db, user, doc.id, DocumentUpdate(content="New."))
+            )
+            assert updated.status == DocumentStatus.APPROVED.value
+            assert [c.chunk_text for c in _stored_chunks(db, doc.id)] == ["New."]
+
+    def test_missing_or_archived_document_returns_none(self):
+        with SessionLocal() as db:
+            user = _create_user(db)
+            service = RAGService()
+            doc = asyncio.run(
+                service.upload_document(db, user, DocumentUpload(title="SOP", content="Text."))
+            )
+            service.delete_document(db, user, doc.id)
+            assert asyncio.run(
+                service.update_document(db, user, doc.id, DocumentUpdate(title="x"))
+            ) is None
+            assert asyncio.run(
+                service.update_document(db, user, "missing", DocumentUpdate(title="x"))
+            ) is None
+
+
+class TestEmbeddingStore:
+    @staticmethod
+    def _fake_openai(monkeypatch, sent):
+        class _FakeEmbeddings:
+            async def create(self, *, model, input):  # noqa: A002
+                sent.extend(input)
+                return SimpleNamespace(
+                    data=[SimpleNamespace(embedding=[float(len(t)), 1.0]) for t in input]
+                )
+
+        class _FakeAsyncOpenAI:
+            def __init__(self, *args, **kwargs):
+                self.embeddings = _FakeEmbeddings()
+
+        monkeypatch.setitem(sys.modules, "openai", SimpleNamespace(AsyncOpenAI=_FakeAsyncOpenAI))
+
+    def test_hash_normalises_whitespace_and_includes_model(self):
+        from backend.src.modules.rag import embedding_store
+
+        a = embedding_store.content_hash("Refund  policy\n\napplies ", "m1")
+        assert a == embedding_store.content_hash("Refund policy applies", "m1")
+        assert a != embedding_store.content_hash("Refund policy applies", "m2")
+        assert a != embedding_store.content_hash("refund policy applies", "m1")
+
+    def test_only_new_texts_are_sent_to_provider(self, monkeypatch):
+        sent: list = []
+        self._fake_openai(monkeypatch, sent)
+        boiler = f"Confidential disclaimer {uuid.uuid4()}"
+        fresh = f"New section {uuid.uuid4()}"
+
+        first = asyncio.run(embeddings.generate_embeddings([boiler, boiler], api_key="k"))
+        assert sent == [boiler]
+        assert first[0] == first[1] == [float(len(boiler)), 1.0]
+
+        sent.clear()
+        second = asyncio.run(
+            embeddings.generate_embeddings([fresh, " " + boiler], api_key="k")
+        )
+        assert sent == [fresh]
+        assert second == [[float(len(fresh)), 1.0], first[0]]
+
+    def test_disabled_cache_always_calls_provider(self, monkeypatch):
+        sent: list = []
+        self._fake_openai(monkeypatch, sent)
+        monkeypatch.setenv("RAG_EMBEDDING_CACHE", "0")
+        text = f"Header {uuid.uuid4()}"
+
+        asyncio.run(embeddings.generate_embeddings([text], api_key="k"))
+        asyncio.run(embeddings.generate_embeddings([text], api_key="k"))
+        assert sent == [text, text]
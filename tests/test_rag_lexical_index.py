@@ -0,0 +1,166 @@
+"""Tests for the persistent BM25 inverted index and rank fusion (``rag.lexical_index``)."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+
+from backend.src.db import models
+from backend.src.db.session import SessionLocal
+from backend.src.modules.rag import embedding_codec, embeddings, lexical_index
+from backend.src.modules.rag.models import ChunkPosting, DocumentChunk
+from backend.src.modules.rag.schemas import (
+    DocumentUpdate,
+    DocumentUpload,
+    RAGQueryRequest,
+    UnsupportedPolicy,
+)
+from backend.src.modules.rag.service import RAGService
+
+
+def _create_user(db) -> models.User:
+    user = models.User(email=f"bm25-{uuid.uuid4()}@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _upload(db, user, title, content):
+    return asyncio.run(
+        RAGService().upload_document(db, user, DocumentUpload(title=title, content=content))
+    )
+
+
+def _hit(chunk_id):
+    return (SimpleNamespace(id=chunk_id), 0.0, None)
+
+
+class TestTokenisation:
+    def test_posting_rows_count_terms(self):
+        term_count, rows = lexical_index.posting_rows("c1", "Refund, refund: REFUND policy!")
+        assert term_count == 4
+        assert {r["term"]: r["tf"] for r in rows} == {"refund": 3, "policy": 1}
+        assert all(r["chunk_id"] == "c1" for r in rows)
+
+    def test_terms_truncated_to_column_width(self):
+        assert lexical_index.tokenise("x" * 100) == ["x" * lexical_index.MAX_TERM_LENGTH]
+
+
+class TestReciprocalRankFusion:
+    def test_agreement_ranks_first_and_normalises(self):
+        fused = lexical_index.reciprocal_rank_fusion(
+            [_hit("a"), _hit("b"), _hit("c")],
+            [_hit("a"), _hit("d")],
+        )
+        assert [chunk.id for chunk, _, _ in fused][:2] == ["a", "b"]
+        assert fused[0][1] == 1.0
+        assert all(0 < score < 1 for _, score, _ in fused[1:])
+
+    def test_top_n_and_empty_lists(self):
+        fused = lexical_index.reciprocal_rank_fusion([_hit("a"), _hit("b")], [], top_n=1)
+        assert [chunk.id for chunk, _, _ in fused] == ["a"]
+        assert lexical_index.reciprocal_rank_fusion([], []) == []
+
+
+class TestBM25Search:
+    def test_keyword_match_ranks_first_within_tenant(self):
+        with SessionLocal() as db:
+            user = _create_user(db)
+            other = _create_user(db)
+            _upload(db, user, "Refunds", "Refunds are processed within 30 days.")
+            target = _upload(db, user, "Errors", "Error ERR4471 means the invoice is locked.")
+            _upload(db, user, "Shipping", "Orders ship within 2 business days.")
+            _upload(db, other, "Other", "ERR4471 ERR4471 ERR4471 in another tenant.")
+
+            hits = lexical_index.search(db, owner_id=user.id, query="what is err4471", top_k=5)
+
+            chunk_ids = [chunk_id for chunk_id, _ in hits]
+            target_chunk = db.scalar(
+                select(DocumentChunk.id).where(DocumentChunk.document_id == target.id)
+            )
+            assert chunk_ids[0] == target_chunk
+            owned = set(
+                db.scalars(
+                    select(DocumentChunk.id).where(
+                        DocumentChunk.document_id.in_(
+                            select(models.ApprovedDocument.id).where(
+                                models.ApprovedDocument.owner_id == user.id
+                            )
+                        )
+                    )
+                )
+            )
+            assert set(chunk_ids) <= owned
+
+    def test_archived_documents_are_excluded(self):
+        with SessionLocal() as db:
+            user = _create_user(db)
+            doc = _upload(db, user, "Errors", "Error ERR9001 means retry later.")
+            RAGService().delete_document(db, user, doc.id)
+            assert lexical_index.search(db, owner_id=user.id, query="ERR9001", top_k=5) == []
+
+    def test_reingestion_drops_stale_postings(self):
+        with SessionLocal() as db:
+            user = _create_user(db)
+            doc = _upload(db, user, "Errors", "Error ERR1234 means retry later.")
+            asyncio.run(
+                RAGService().update_document(
+                    db, user, doc.id, DocumentUpdate(content="Error ERR5678 means retry later.")
+                )
+            )
+            assert lexical_index.search(db, owner_id=user.id, query="ERR1234", top_k=5) == []
+            assert len(lexical_index.search(db, owner_id=user.id, query="ERR5678", top_k=5)) == 1
+            orphans = db.scalar(
+                select(func.count())
+                .select_from(ChunkPosting)
+                .outerjoin(DocumentChunk, DocumentChunk.id == ChunkPosting.chunk_id)
+                .where(DocumentChunk.id.is_(None))
+            )
+            assert orphans == 0
+
+    def test_lexical_only_hits_below_threshold_are_not_grounding(self):
+        with SessionLocal() as db:
+            user = _create_user(db)
+            _upload(db, user, "Errors", "Error ERR4242 means the invoice is locked.")
+            resp = asyncio.run(
+                RAGService().query(
+                    db,
+                    user,
+                    RAGQueryRequest(
+                        query="ERR4242",
+                        similarity_threshold=0.99,
+                        unsupported_policy=UnsupportedPolicy.REFUSE,
+                    ),
+                )
+            )
+            assert not resp.grounded
+            assert resp.refused
+            assert resp.evidence.citations == []
+
+    def test_citations_report_cosine_not_fused_score(self, monkeypatch):
+        monkeypatch.setattr(RAGService, "_retrieve_chunks", lambda self, db, **kw: [])
+        with SessionLocal() as db:
+            user = _create_user(db)
+            doc = _upload(db, user, "Errors", "Error ERR4242 means the invoice is locked.")
+            resp = asyncio.run(
+                RAGService().query(
+                    db,
+                    user,
+                    RAGQueryRequest(
+                        query="ERR4242",
+                        similarity_threshold=0.0,
+                        include_response=False,
+                    ),
+                )
+            )
+            chunk = db.scalar(select(DocumentChunk).where(DocumentChunk.document_id == doc.id))
+            query_vec = asyncio.run(embeddings.generate_embeddings(["ERR4242"]))[0]
+            expected = embeddings.cosine_similarity(
+                query_vec, embedding_codec.chunk_vector(chunk)
+            )
+            assert resp.grounded
+            assert resp.evidence.citations[0].similarity_score == round(expected, 4)
@@ -0,0 +1,257 @@
+"""Tests for the vectorised RAG retrieval engine (``rag.vector_index``)."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from backend.src.modules.rag import embeddings, vector_index
+
+pytestmark = pytest.mark.skipif(
+    not vector_index.is_available(), reason="numpy not installed"
+)
+
+
+def _chunk(idx: int, text: str, doc_id: str = "doc-1"):
+    return SimpleNamespace(
+        id=f"chunk-{idx}",
+        document_id=doc_id,
+        chunk_index=idx,
+        chunk_text=text,
+        embedding=embeddings._hash_embedding(text),
+    )
+
+
+def _legacy_scores(query_vec, chunks, docs, top_k, threshold):
+    scored = []
+    for chunk in chunks:
+        score = embeddings.cosine_similarity(query_vec, chunk.embedding)
+        if score >= threshold:
+            scored.append((chunk, score, docs[chunk.document_id]))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:top_k]
+
+
+class TestChunkMatrix:
+    def test_matches_pure_python_ranking(self):
+        docs = {"doc-1": SimpleNamespace(id="doc-1"), "doc-2": SimpleNamespace(id="doc-2")}
+        chunks = [
+            _chunk(i, f"policy paragraph {i}", doc_id="doc-1" if i % 2 else "doc-2")
+            for i in range(40)
+        ]
+        query_vec = embeddings._hash_embedding("policy paragraph 7")
+
+        expected = _legacy_scores(query_vec, chunks, docs, top_k=5, threshold=0.5)
+        matrix = vector_index.ChunkMatrix.build(chunks, docs)
+        got = matrix.search(query_vec, top_k=5, similarity_threshold=0.5)
+
+        assert [c.id for c, _s, _d in got] == [c.id for c, _s, _d in expected]
+        for (_c1, s1, d1), (_c2, s2, d2) in zip(got, expected):
+            assert s1 == pytest.approx(s2, abs=1e-5)
+            assert d1 is d2
+
+    def test_threshold_filters_results(self):
+        docs = {"doc-1": SimpleNamespace(id="doc-1")}
+        chunks = [_chunk(i, f"text {i}") for i in range(5)]
+        matrix = vector_index.ChunkMatrix.build(chunks, docs)
+        query_vec = embeddings._hash_embedding("text 3")
+
+        got = matrix.search(query_vec, top_k=5, similarity_threshold=0.9999)
+        assert [c.id for c, _s, _d in got] == ["chunk-3"]
+
+    def test_skips_malformed_embeddings(self):
+        docs = {"doc-1": SimpleNamespace(id="doc-1")}
+        good = _chunk(0, "good")
+        bad_dim = SimpleNamespace(id="bad", document_id="doc-1", embedding=[0.1, 0.2])
+        missing = SimpleNamespace(id="none", document_id="doc-1", embedding=None)
+        matrix = vector_index.ChunkMatrix.build([good, bad_dim, missing], docs)
+        assert len(matrix) == 1
+
+    def test_empty_and_mismatched_query(self):
+        docs = {"doc-1": SimpleNamespace(id="doc-1")}
+        empty = vector_index.ChunkMatrix.build([], docs)
+        assert empty.search([0.1] * 1536, top_k=3, similarity_threshold=0.0) == []
+
+        matrix = vector_index.ChunkMatrix.build([_chunk(0, "x")], docs)
+        assert matrix.search([1.0, 0.0], top_k=3, similarity_threshold=0.0) == []
+
+
+class TestEmbeddingMatrixCache:
+    def _matrix(self, n: int = 3):
+        docs = {
+            "doc-1": SimpleNamespace(
+                id="doc-1", title="SOP", doc_type="sop", doc_metadata=None
+            )
+        }
+        chunks = [_chunk(i, f"chunk {i}") for i in range(n)]
+        for c in chunks:
+            c.token_count = 2
+        return vector_index.ChunkMatrix.build(chunks, docs)
+
+    def test_put_snapshots_and_get_hits(self):
+        from backend.src.modules.rag.matrix_cache import (
+            CachedChunk,
+            EmbeddingMatrixCache,
+        )
+
+        cache = EmbeddingMatrixCache(max_bytes=10_000_000, ttl_seconds=60)
+        assert cache.get("owner-1", None) is None
+        cache.put("owner-1", ["sop", "policy"], self._matrix())
+
+        hit = cache.get("owner-1", ["policy", "sop"])
+        assert hit is not None
+        assert isinstance(hit.chunks[0], CachedChunk)
+        assert not hasattr(hit.chunks[0], "embedding")
+        stats = cache.stats
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["resident_bytes"] > hit.nbytes
+
+    def test_invalidate_owner_drops_all_filters(self):
+        from backend.src.modules.rag.matrix_cache import EmbeddingMatrixCache
+
+        cache = EmbeddingMatrixCache(max_bytes=10_000_000, ttl_seconds=60)
+        cache.put("owner-1", None, self._matrix())
+        cache.put("owner-1", ["sop"], self._matrix())
+        cache.put("owner-2", None, self._matrix())
+
+        cache.invalidate_owner("owner-1")
+        assert cache.get("owner-1", None) is None
+        assert cache.get("owner-1", ["sop"]) is None
+        assert cache.get("owner-2", None) is not None
+
+    def test_lru_eviction_respects_byte_budget(self):
+        from backend.src.modules.rag.matrix_cache import EmbeddingMatrixCache
+
+        one_entry = self._matrix().nbytes + 100
+        cache = EmbeddingMatrixCache(max_bytes=one_entry * 2, ttl_seconds=60)
+        cache.put("a", None, self._matrix())
+        cache.put("b", None, self._matrix())
+        cache.get("a", None)  # touch → "b" becomes least recently used
+        cache.put("c", None, self._matrix())
+
+        assert cache.get("b", None) is None
+        assert cache.get("a", None) is not None
+        assert cache.stats["evictions"] == 1
+        assert cache.stats["resident_bytes"] <= one_entry * 2
+
+
+class TestPgvectorStore:
+    def test_disabled_on_sqlite(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+
+        from backend.src.modules.rag import pgvector_store
+
+        with Session(create_engine("sqlite://")) as db:
+            assert pgvector_store.is_enabled(db) is False
+            # Writes are a no-op rather than an error without the extension
+            pgvector_store.store_embeddings(db, [("chunk-1", [0.1, 0.2])])
+
+    def test_vector_literal_format(self):
+        from backend.src.modules.rag.pgvector_store import vector_literal
+
+        assert vector_literal([1, 0.5, -2.0]) == "[1.0,0.5,-2.0]"
+
+    @pytest.mark.parametrize("version", ["0.7.4", "0.8.0"])
+    def test_small_tenant_gets_full_top_k(self, version):
+        from backend.src.modules.rag import pgvector_store
+
+        class _Result:
+            def __init__(self, rows):
+                self.rows = rows
+
+            def all(self):
+                return self.rows
+
+            def scalar(self):
+                return self.rows[0][0] if self.rows else None
+
+        class _FakePostgres:
+            """Shared HNSW index: the ANN scan sees other tenants' rows first."""
+
+            def __init__(self):
+                self.sql = []
+
+            def get_bind(self):
+                return SimpleNamespace(url=f"postgresql://fake/{version}")
+
+            def execute(self, stmt, params=None):
+                sql = str(stmt)
+                self.sql.append(sql)
+                if "pg_extension" in sql:
+                    return _Result([(version,)])
+                if not sql.startswith("SELECT"):
+                    return _Result([])
+                iterative = any("iterative_scan" in s for s in self.sql)
+                exact = "+ 0" in sql
+                if iterative or exact:
+                    return _Result([("c-2", 0.3), ("c-1", 0.1), ("c-3", 0.5)])
+                return _Result([])  # ef_search candidates all filtered out
+
+            def rollback(self):
+                pass
+
+        db = _FakePostgres()
+        pgvector_store.reset_probe()
+        try:
+            hits = pgvector_store.search(
+                db,
+                owner_id="small-tenant",
+                query_vec=[1.0, 0.0],
+                top_k=3,
+                similarity_threshold=0.0,
+                doc_types=None,
+            )
+        finally:
+            pgvector_store.reset_probe()
+
+        assert [chunk_id for chunk_id, _ in hits] == ["c-1", "c-2", "c-3"]
+        searches = [sql for sql in db.sql if sql.startswith("SELECT c.id")]
+        if version == "0.8.0":
+            assert any("hnsw.iterative_scan = relaxed_order" in sql for sql in db.sql)
+            assert len(searches) == 1
+        else:
+            assert len(searches) == 2 and "+ 0" in searches[1]
+
+
+class TestEmbeddingCodec:
+    def test_float32_roundtrip_is_zero_copy(self):
+        import numpy as np
+
+        from backend.src.modules.rag import embedding_codec
+
+        vec = embeddings._hash_embedding("policy")
+        blob = embedding_codec.encode(vec, embedding_codec.FLOAT32)
+        assert len(blob) == 1 + 4 * len(vec)
+
+        arr = embedding_codec.decode_array(blob)
+        assert arr.dtype == np.dtype("<f4")
+        assert np.shares_memory(arr, np.frombuffer(blob, dtype=np.uint8))
+        assert np.allclose(arr, vec, atol=1e-7)
+
+    @pytest.mark.parametrize("encoding,tol", [("float16", 1e-3), ("int8", 1e-2)])
+    def test_quantised_encodings_preserve_cosine(self, encoding, tol):
+        from backend.src.modules.rag import embedding_codec
+
+        vec = embeddings._hash_embedding("refund window")
+        blob = embedding_codec.encode(vec, encoding)
+        decoded = embedding_codec.decode_list(blob)
+        assert len(decoded) == len(vec)
+        assert embeddings.cosine_similarity(vec, decoded) == pytest.approx(1.0, abs=tol)
+
+    def test_matrix_reads_binary_and_legacy_json(self):
+        from backend.src.modules.rag import embedding_codec
+
+        docs = {"doc-1": SimpleNamespace(id="doc-1")}
+        legacy = _chunk(0, "legacy json row")
+        binary = _chunk(1, "binary row")
+        binary.embedding_bin = embedding_codec.encode(binary.embedding, "int8")
+        binary.embedding = None
+
+        matrix = vector_index.ChunkMatrix.build([legacy, binary], docs)
+        assert len(matrix) == 2
+        got = matrix.search(
+            embeddings._hash_embedding("binary row"), top_k=1, similarity_threshold=0.0
+        )
+        assert got[0][0].id == "chunk-1"